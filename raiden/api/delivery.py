@@ -0,0 +1,229 @@
+""" Push delivery of the node's payment events to external consumers.
+
+The payment events are read from the `state_events` table of the node's
+database, in the order they were logged, starting after the identifier of the
+last event the consumer has seen, or after the last event scanned if it was
+not a payment event. The identifier of the event is included in what is
+delivered, consumers use it to resume after a disconnection and to deduplicate
+events which were delivered twice.
+"""
+import json
+import random
+from typing import TYPE_CHECKING
+
+import gevent
+import requests
+import structlog
+from eth_utils import to_checksum_address
+from gevent.event import Event
+
+from raiden.api.v1.encoding import (
+    EventPaymentReceivedSuccessSchema,
+    EventPaymentSentFailedSchema,
+    EventPaymentSentSuccessSchema,
+)
+from raiden.settings import (
+    DEFAULT_EVENT_STREAM_KEEPALIVE,
+    DEFAULT_WEBHOOK_BATCH_SIZE,
+    DEFAULT_WEBHOOK_MAX_RETRY_BACKOFF,
+    DEFAULT_WEBHOOK_RETRY_BACKOFF,
+    DEFAULT_WEBHOOK_TIMEOUT,
+)
+from raiden.storage.sqlite import SerializedSQLiteStorage
+from raiden.transfer.events import (
+    EventPaymentReceivedSuccess,
+    EventPaymentSentFailed,
+    EventPaymentSentSuccess,
+)
+from raiden.utils.metrics import Counter
+from raiden.utils.runnable import Runnable
+from raiden.utils.typing import Any, Dict, EventID, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    # pylint: disable=unused-import
+    from raiden.raiden_service import RaidenService
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+PAYMENT_EVENT_SCHEMAS = {
+    EventPaymentSentSuccess: EventPaymentSentSuccessSchema(),
+    EventPaymentSentFailed: EventPaymentSentFailedSchema(),
+    EventPaymentReceivedSuccess: EventPaymentReceivedSuccessSchema(),
+}
+# The types as they are stored in the database, see `raiden.storage.serialization`
+PAYMENT_EVENT_TYPES = [f"{type_.__module__}.{type_.__name__}" for type_ in PAYMENT_EVENT_SCHEMAS]
+
+WEBHOOK_CURSOR_SETTING = "webhook_cursor"
+
+
+def get_payment_events(
+    storage: SerializedSQLiteStorage, after: EventID, limit: int
+) -> Tuple[List[Tuple[EventID, Dict[str, Any]]], EventID]:
+    """ Returns the first `limit` payment events logged after the event
+    `after`, serialized like the events of the payments endpoint of the API,
+    and the identifier of the last event scanned.
+
+    The state changes of the node, e.g. every new block, log events which are
+    not payment events. The next call must start after the last event scanned
+    instead of the last payment event, otherwise these are scanned over and
+    over again.
+    """
+    result = list()
+    events, last_scanned = storage.get_events_after(after, PAYMENT_EVENT_TYPES, limit)
+    for event_identifier, event in events:
+        schema = PAYMENT_EVENT_SCHEMAS[type(event.wrapped_event)]
+        serialized_event = schema.dump(event)
+        serialized_event["event_identifier"] = event_identifier
+        serialized_event["token_network_address"] = to_checksum_address(
+            event.token_network_address
+        )
+        result.append((event_identifier, serialized_event))
+    return result, last_scanned
+
+
+class WebhookDelivery(Runnable):
+    """ Posts the payment events of the node to the webhook at `url`.
+
+    The events are posted in order, at most `batch_size` at a time, as the JSON
+    object `{"events": [...]}`. Once the webhook acknowledges a batch with a 2xx
+    response the identifier of its last event is stored in the node's
+    database, and the delivery resumes after it when the node restarts. A
+    failed post is retried after a random delay which doubles with each
+    failure, up to `max_retry_backoff` seconds.
+
+    The delivery is at least once, a batch which was received by the webhook
+    but not acknowledged, e.g. because the post timed out or the node stopped,
+    is posted again.
+    """
+
+    def __init__(
+        self,
+        raiden: "RaidenService",
+        url: str,
+        batch_size: int = DEFAULT_WEBHOOK_BATCH_SIZE,
+        timeout: float = DEFAULT_WEBHOOK_TIMEOUT,
+        retry_backoff: float = DEFAULT_WEBHOOK_RETRY_BACKOFF,
+        max_retry_backoff: float = DEFAULT_WEBHOOK_MAX_RETRY_BACKOFF,
+    ) -> None:
+        super().__init__()
+        self.raiden = raiden
+        self.url = url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        self.session = requests.Session()
+        self.delivered_counter = Counter(
+            "raiden_webhook_events_delivered_total",
+            "Number of payment events acknowledged by the webhook",
+        )
+        self.failed_counter = Counter(
+            "raiden_webhook_posts_failed_total", "Number of posts to the webhook which failed"
+        )
+
+        self._stop_event = Event()
+
+    def start(self) -> None:
+        log.debug("Webhook delivery started", url=self.url)
+        self._stop_event.clear()
+        super().start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.greenlet.join()
+
+    def get_metrics(self) -> List[Counter]:
+        return [self.delivered_counter, self.failed_counter]
+
+    def _stopped(self) -> bool:
+        # The node's database is closed once the node stops
+        return self._stop_event.is_set() or self.raiden.stop_event.is_set()
+
+    def _run(self) -> None:  # pylint: disable=method-hidden
+        storage = self.raiden.wal.storage
+        cursor = EventID(int(storage.get_setting(WEBHOOK_CURSOR_SETTING) or 0))
+        failures = 0
+
+        while not self._stopped():
+            # Taken before the events are read, otherwise an event logged
+            # while they are being posted could be missed
+            state_changed_event = self.raiden.state_changed_event
+            events, last_scanned = get_payment_events(storage, cursor, self.batch_size)
+
+            if not events:
+                cursor = last_scanned
+                gevent.wait(
+                    [self._stop_event, self.raiden.stop_event, state_changed_event], count=1
+                )
+                continue
+
+            if not self._post([event for _, event in events]):
+                self.failed_counter.inc()
+                failures += 1
+                delay = min(self.max_retry_backoff, self.retry_backoff * 2 ** failures)
+                gevent.wait(
+                    [self._stop_event, self.raiden.stop_event],
+                    timeout=random.uniform(0, delay),
+                    count=1,
+                )
+                continue
+
+            if self._stopped():
+                return
+
+            failures = 0
+            cursor = last_scanned
+            storage.set_setting(WEBHOOK_CURSOR_SETTING, str(cursor))
+            self.delivered_counter.inc(len(events))
+
+    def _post(self, events: List[Dict[str, Any]]) -> bool:
+        try:
+            response = self.session.post(self.url, json={"events": events}, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            log.warning("Posting to the webhook failed", url=self.url, error=str(e))
+            return False
+
+        if not response.ok:
+            log.warning(
+                "The webhook rejected the events", url=self.url, status_code=response.status_code
+            )
+            return False
+
+        return True
+
+
+def payment_event_stream(
+    raiden: "RaidenService",
+    after: EventID,
+    batch_size: int = DEFAULT_WEBHOOK_BATCH_SIZE,
+    keepalive: float = DEFAULT_EVENT_STREAM_KEEPALIVE,
+) -> Iterator[str]:
+    """ The payment events logged after `after` and all the following ones, in
+    the server-sent events format.
+
+    The `id` of an event is its identifier, which clients reconnecting to the
+    stream send in the `Last-Event-ID` header. A comment is sent if there is
+    no event for `keepalive` seconds, so that idle streams are kept open and
+    the disconnected clients are noticed.
+    """
+    storage = raiden.wal.storage
+    cursor = after
+
+    # Sent right away, so that the client knows the stream is open
+    yield ": connected\n\n"
+
+    while not raiden.stop_event.is_set():
+        state_changed_event = raiden.state_changed_event
+        events, cursor = get_payment_events(storage, cursor, batch_size)
+
+        if not events:
+            ready = gevent.wait(
+                [raiden.stop_event, state_changed_event], timeout=keepalive, count=1
+            )
+            if not ready:
+                yield ": keepalive\n\n"
+            continue
+
+        for event_identifier, event in events:
+            yield f"id: {event_identifier}\ndata: {json.dumps(event)}\n\n"
@@ -1,3 +1,7 @@
+from bisect import bisect_right
+from itertools import islice
+from typing import TYPE_CHECKING
+
 import gevent
 import structlog
 from eth_utils import is_binary_address, to_checksum_address
@@ -24,6 +28,7 @@ from raiden.exceptions import (
     InvalidSecret,
     InvalidSecretHash,
     InvalidSettleTimeout,
+    RaidenError,
     RaidenRecoverableError,
     TokenNotRegistered,
     UnknownTokenAddress,
@@ -62,8 +67,13 @@ from raiden.utils.typing import (
     TokenAmount,
     TokenNetworkAddress,
     Tuple,
+    Union,
 )
 
+if TYPE_CHECKING:
+    # pylint: disable=unused-import
+    from raiden.raiden_service import PaymentStatus
+
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 EVENTS_PAYMENT_HISTORY_RELATED = (
@@ -144,20 +154,74 @@ def transfer_tasks_view(
     view = list()
 
     for secrethash, transfer_task in transfer_tasks.items():
-        transfer, role = get_transfer_from_task(secrethash, transfer_task)
+        transfer_view = transfer_task_view(secrethash, transfer_task, token_address, channel_id)
+        if transfer_view is not None:
+            view.append(transfer_view)
+
+    return view
+
+
+def transfer_tasks_page(
+    transfer_tasks: Dict[SecretHash, TransferTask],
+    token_address: TokenAddress = None,
+    channel_id: ChannelID = None,
+    after: SecretHash = None,
+    limit: int = None,
+    sorted_secrethashes: List[SecretHash] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[SecretHash]]:
+    """ Paginated version of `transfer_tasks_view`, the tasks are ordered by
+    secrethash and `after` is the secrethash of the last task seen.
+
+    `sorted_secrethashes` are the keys of `transfer_tasks` in ascending order,
+    the page starts with a binary search in it.
+
+    Returns the views and the secrethash of the last one if there are more
+    tasks, None otherwise.
+    """
+    if sorted_secrethashes is None:
+        sorted_secrethashes = sorted(transfer_tasks)
+
+    start = 0
+    if after is not None:
+        start = bisect_right(sorted_secrethashes, after)
+
+    view = list()
+    last_secrethash = None
 
-        if transfer is None:
+    for position in range(start, len(sorted_secrethashes)):
+        secrethash = sorted_secrethashes[position]
+        transfer_view = transfer_task_view(
+            secrethash, transfer_tasks[secrethash], token_address, channel_id
+        )
+        if transfer_view is None:
             continue
-        if token_address is not None:
-            if transfer.token != token_address:
-                continue
-            elif channel_id is not None:
-                if transfer.balance_proof.channel_identifier != channel_id:
-                    continue
+        if limit is not None and len(view) == limit:
+            return view, last_secrethash
 
-        view.append(flatten_transfer(transfer, role))
+        view.append(transfer_view)
+        last_secrethash = secrethash
 
-    return view
+    return view, None
+
+
+def transfer_task_view(
+    secrethash: SecretHash,
+    transfer_task: TransferTask,
+    token_address: TokenAddress = None,
+    channel_id: ChannelID = None,
+) -> Optional[Dict[str, Any]]:
+    transfer, role = get_transfer_from_task(secrethash, transfer_task)
+
+    if transfer is None:
+        return None
+    if token_address is not None:
+        if transfer.token != token_address:
+            return None
+        elif channel_id is not None:
+            if transfer.balance_proof.channel_identifier != channel_id:
+                return None
+
+    return flatten_transfer(transfer, role)
 
 
 class RaidenAPI:
@@ -662,6 +726,50 @@ class RaidenAPI:
 
         return result
 
+    def get_channel_page(
+        self,
+        registry_address: PaymentNetworkAddress,
+        token_address: TokenAddress = None,
+        state: str = None,
+        after: Tuple[TokenNetworkAddress, ChannelID] = None,
+        limit: int = None,
+    ) -> Tuple[List[NettingChannelState], Optional[Tuple[TokenNetworkAddress, ChannelID]]]:
+        """ Returns up to `limit` channels, optionally of `token_address` and
+        in `state`, following the position `after`.
+
+        Return:
+            The channels, ordered by token network address and channel
+            identifier, and the position of the last returned channel if there
+            are more channels, None otherwise.
+        """
+        if token_address and not is_binary_address(token_address):
+            raise InvalidAddress("Expected binary address format for token in get_channel_page")
+
+        channels = views.iter_channelstate(
+            chain_state=views.state_from_raiden(self.raiden),
+            payment_network_address=registry_address,
+            token_address=token_address,
+            state=state,
+            after=after,
+        )
+
+        if limit is None:
+            return list(channels), None
+
+        # Fetch one more channel to know if there is a next page
+        result = list(islice(channels, limit + 1))
+
+        next_position = None
+        if len(result) > limit:
+            result = result[:limit]
+            last_channel = result[-1]
+            next_position = (
+                last_channel.canonical_identifier.token_network_address,
+                last_channel.canonical_identifier.channel_identifier,
+            )
+
+        return result, next_position
+
     def get_node_network_state(self, node_address: Address):
         """ Returns the currently network status of `node_address`. """
         return views.get_node_network_status(
@@ -782,6 +890,123 @@ class RaidenAPI:
         )
         return payment_status
 
+    def transfer_batch_async(
+        self,
+        registry_address: PaymentNetworkAddress,
+        token_address: TokenAddress,
+        payments: List[Tuple[Address, TokenAmount, Optional[PaymentID]]],
+    ) -> List[Union["PaymentStatus", RaidenError]]:
+        """ Start a payment of `token_address` for each `(target, amount,
+        identifier)` in `payments`.
+
+        The token is validated once for the whole batch. The result for each
+        payment is either its `PaymentStatus`, or the error that prevented it
+        from starting.
+        """
+        if not is_binary_address(token_address):
+            raise InvalidAddress("token address is not valid.")
+
+        token_network_address = views.get_token_network_address_by_token_address(
+            chain_state=views.state_from_raiden(self.raiden),
+            payment_network_address=registry_address,
+            token_address=token_address,
+        )
+        if token_network_address is None:
+            raise UnknownTokenAddress("Token address is not known.")
+
+        results: List[Optional[Union["PaymentStatus", RaidenError]]] = list()
+        valid_payments = list()
+        for target, amount, identifier in payments:
+            if not isinstance(amount, int):
+                results.append(InvalidAmount("Amount not a number"))
+            elif amount <= 0:
+                results.append(InvalidAmount("Amount negative"))
+            elif amount > UINT256_MAX:
+                results.append(InvalidAmount("Amount too large"))
+            elif not is_binary_address(target):
+                results.append(InvalidAddress("target address is not valid."))
+            else:
+                results.append(None)
+                valid_payments.append((target, amount, identifier))
+
+        log.debug(
+            "Initiating transfer batch",
+            initiator=pex(self.raiden.address),
+            token=pex(token_address),
+            payments=len(payments),
+            invalid_payments=len(payments) - len(valid_payments),
+        )
+
+        statuses = iter(
+            self.raiden.mediated_transfers_async(
+                token_network_address=token_network_address, payments=valid_payments
+            )
+        )
+        return [next(statuses) if result is None else result for result in results]
+
+    def _get_payment_token_network(
+        self, token_address: TokenAddress, target: Address
+    ) -> TokenNetworkAddress:
+        if not is_binary_address(token_address):
+            raise InvalidAddress("token address is not valid.")
+
+        if not is_binary_address(target):
+            raise InvalidAddress("target address is not valid.")
+
+        token_network_address = views.get_token_network_address_by_token_address(
+            chain_state=views.state_from_raiden(self.raiden),
+            payment_network_address=self.raiden.default_registry.address,
+            token_address=token_address,
+        )
+        if token_network_address is None:
+            raise UnknownTokenAddress("Token address is not known.")
+
+        return token_network_address
+
+    def get_pending_payment(
+        self, token_address: TokenAddress, target: Address, identifier: PaymentID
+    ) -> Optional["PaymentStatus"]:
+        """ Return the status of the payment with `identifier` to `target`,
+        if the payment is still in flight, None otherwise.
+        """
+        token_network_address = self._get_payment_token_network(token_address, target)
+
+        statuses = self.raiden.targets_to_identifiers_to_statuses.get(target, {})
+        payment_status = statuses.get(identifier)
+        if payment_status is None or payment_status.token_network_address != token_network_address:
+            return None
+
+        return payment_status
+
+    def get_payment_result(
+        self, token_address: TokenAddress, target: Address, identifier: PaymentID
+    ) -> Optional[architecture.Event]:
+        """ Return the `EventPaymentSentSuccess` or `EventPaymentSentFailed`
+        with the outcome of the latest finished payment with `identifier` to
+        `target`, None if there is no such payment.
+        """
+        token_network_address = self._get_payment_token_network(token_address, target)
+
+        latest_record = None
+        for event_type in (EventPaymentSentSuccess, EventPaymentSentFailed):
+            record = self.raiden.wal.storage.get_latest_event_by_data_field(
+                {
+                    "_type": f"{event_type.__module__}.{event_type.__name__}",
+                    "token_network_address": to_checksum_address(token_network_address),
+                    "target": to_checksum_address(target),
+                    "identifier": str(identifier),
+                }
+            )
+            if record is not None and (
+                latest_record is None or record.event_identifier > latest_record.event_identifier
+            ):
+                latest_record = record
+
+        if latest_record is None:
+            return None
+
+        return latest_record.data
+
     def get_raiden_events_payment_history_with_timestamps(
         self,
         token_address: TokenAddress = None,
@@ -946,6 +1171,18 @@ class RaidenAPI:
     def get_pending_transfers(
         self, token_address: TokenAddress = None, partner_address: Address = None
     ) -> List[Dict[str, Any]]:
+        view, _ = self.get_pending_transfers_page(
+            token_address=token_address, partner_address=partner_address
+        )
+        return view
+
+    def get_pending_transfers_page(
+        self,
+        token_address: TokenAddress = None,
+        partner_address: Address = None,
+        after: SecretHash = None,
+        limit: int = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[SecretHash]]:
         chain_state = views.state_from_raiden(self.raiden)
         transfer_tasks = views.get_all_transfer_tasks(chain_state)
         channel_id = None
@@ -961,4 +1198,11 @@ class RaidenAPI:
                 )
                 channel_id = partner_channel.identifier
 
-        return transfer_tasks_view(transfer_tasks, token_address, channel_id)
+        return transfer_tasks_page(
+            transfer_tasks,
+            token_address,
+            channel_id,
+            after,
+            limit,
+            sorted_secrethashes=views.get_sorted_secrethashes(chain_state),
+        )
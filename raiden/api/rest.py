@@ -2,24 +2,37 @@ import errno
 import json
 import logging
 import socket
+import time
+from collections import defaultdict
+from functools import partial
 from hashlib import sha256
 from http import HTTPStatus
 from typing import Dict
+from urllib.parse import urlencode
 
 import gevent
 import gevent.pool
 import structlog
-from eth_utils import encode_hex, to_checksum_address
-from flask import Flask, make_response, request, send_from_directory, url_for
+from eth_utils import (
+    decode_hex,
+    encode_hex,
+    is_checksum_address,
+    to_canonical_address,
+    to_checksum_address,
+)
+from flask import Flask, Response, g, make_response, request, send_from_directory, url_for
 from flask.json import jsonify
 from flask_cors import CORS
 from flask_restful import Api, abort
+from gevent.event import AsyncResult
+from gevent.lock import BoundedSemaphore
 from gevent.pywsgi import WSGIServer
 from hexbytes import HexBytes
 from raiden_webui import RAIDEN_WEBUI_PATH
 from webargs.flaskparser import parser
 from werkzeug.exceptions import NotFound
 
+from raiden.api.delivery import payment_event_stream
 from raiden.api.objects import AddressList, PartnersPerTokenList
 from raiden.api.v1.encoding import (
     AddressListSchema,
@@ -31,6 +44,7 @@ from raiden.api.v1.encoding import (
     InvalidEndpoint,
     PartnersPerTokenListSchema,
     PaymentSchema,
+    PaymentStatusSchema,
 )
 from raiden.api.v1.resources import (
     AddressResource,
@@ -42,8 +56,13 @@ from raiden.api.v1.resources import (
     ChannelsResourceByTokenAndPartnerAddress,
     ConnectionsInfoResource,
     ConnectionsResource,
+    CPUProfileResource,
+    EventStreamResource,
+    MemoryGrowthResource,
     PartnersResourceByTokenAddress,
+    PaymentBatchResource,
     PaymentResource,
+    PaymentStatusResource,
     PendingTransfersResource,
     PendingTransfersResourceByTokenAddress,
     PendingTransfersResourceByTokenAndPartnerAddress,
@@ -52,7 +71,7 @@ from raiden.api.v1.resources import (
     TokensResource,
     create_blueprint,
 )
-from raiden.constants import GENESIS_BLOCK_NUMBER, UINT256_MAX, Environment
+from raiden.constants import GENESIS_BLOCK_NUMBER, SECRETHASH_LENGTH, UINT256_MAX, Environment
 from raiden.exceptions import (
     AddressWithoutCode,
     AlreadyRegisteredTokenAddress,
@@ -77,7 +96,13 @@ from raiden.exceptions import (
     TransactionThrew,
     UnknownTokenAddress,
 )
+from raiden.settings import (
+    DEFAULT_API_CONCURRENCY_LIMITS,
+    DEFAULT_API_MAX_CONNECTIONS,
+    DEFAULT_API_QUEUE_TIMEOUT,
+)
 from raiden.transfer import channel, views
+from raiden.transfer.architecture import Event
 from raiden.transfer.events import (
     EventPaymentReceivedSuccess,
     EventPaymentSentFailed,
@@ -91,6 +116,8 @@ from raiden.utils import (
     split_endpoint,
     typing,
 )
+from raiden.utils.debugging import SamplingProfiler, trace_memory_growth
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram, render_metrics
 from raiden.utils.runnable import Runnable
 
 log = structlog.get_logger(__name__)
@@ -103,8 +130,51 @@ ERROR_STATUS_CODES = [
     HTTPStatus.NOT_FOUND,
     HTTPStatus.NOT_IMPLEMENTED,
     HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.SERVICE_UNAVAILABLE,
 ]
 
+# Requests are admitted by endpoint class, each class has its own concurrency
+# limit. Payments are long running but cheap for the node, queries on the
+# node's history are expensive and would otherwise starve the transport and
+# the alarm task of CPU time. A stream holds its slot for as long as it is
+# open, so the streams have their own class and don't starve the other
+# endpoints.
+ENDPOINT_CLASS_PAYMENTS = "payments"
+ENDPOINT_CLASS_QUERY = "query"
+ENDPOINT_CLASS_STREAMS = "streams"
+ENDPOINT_CLASS_DEFAULT = "default"
+ENDPOINT_CLASSES = {
+    ("POST", "token_target_paymentresource"): ENDPOINT_CLASS_PAYMENTS,
+    ("POST", "paymentbatchresource"): ENDPOINT_CLASS_PAYMENTS,
+    ("GET", "paymentstatusresource"): ENDPOINT_CLASS_PAYMENTS,
+    ("GET", "paymentresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "token_paymentresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "token_target_paymentresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "blockchaineventsnetworkresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "blockchaineventstokenresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "tokenchanneleventsresourceblockchain"): ENDPOINT_CLASS_QUERY,
+    ("GET", "channelblockchaineventsresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "raideninternaleventsresource"): ENDPOINT_CLASS_QUERY,
+    ("GET", "eventstreamresource"): ENDPOINT_CLASS_STREAMS,
+}
+
+# The keys of a pending transfer, see `raiden.api.python.flatten_transfer`
+PENDING_TRANSFER_FIELDS = (
+    "payment_identifier",
+    "token_address",
+    "token_network_address",
+    "channel_identifier",
+    "initiator",
+    "target",
+    "transferred_amount",
+    "locked_amount",
+    "role",
+)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROFILE_CONTENT_TYPE = "text/plain; charset=utf-8"
+EVENT_STREAM_CONTENT_TYPE = "text/event-stream"
+
 
 URLS_V1 = [
     ("/address", AddressResource),
@@ -123,6 +193,11 @@ URLS_V1 = [
         PaymentResource,
         "token_target_paymentresource",
     ),
+    (
+        "/payments/<hexaddress:token_address>/<hexaddress:target_address>/<int:identifier>",
+        PaymentStatusResource,
+    ),
+    ("/payment_batches/<hexaddress:token_address>", PaymentBatchResource),
     ("/tokens", TokensResource),
     ("/tokens/<hexaddress:token_address>/partners", PartnersResourceByTokenAddress),
     ("/tokens/<hexaddress:token_address>", RegisterTokenResource),
@@ -152,6 +227,14 @@ URLS_V1 = [
         ChannelBlockchainEventsResource,
     ),
     ("/_debug/raiden_events", RaidenInternalEventsResource),
+    ("/events/stream", EventStreamResource),
+]
+
+# Profiling slows down the node, these are only available if enabled with
+# --enable-profiling
+PROFILING_URLS_V1 = [
+    ("/_debug/profile", CPUProfileResource),
+    ("/_debug/memory", MemoryGrowthResource),
 ]
 
 
@@ -182,6 +265,58 @@ def api_error(errors, status_code):
     return response
 
 
+def api_stream_response(result, headers=None):
+    """ Like `api_response` for a list, but the items are serialized one at a
+    time while the response is sent, so the whole JSON document is never held
+    in memory.
+    """
+
+    def generate():
+        yield "["
+        for pos, item in enumerate(result):
+            if pos:
+                yield ","
+            yield json.dumps(item)
+        yield "]"
+
+    log.debug("Request successful, streaming response")
+    return Response(generate(), status=HTTPStatus.OK, mimetype="application/json", headers=headers)
+
+
+def next_page_headers(cursor):
+    """ The `Link` header pointing to the page following `cursor`, with the
+    same query parameters as the current request.
+    """
+    if cursor is None:
+        return None
+
+    args = request.args.to_dict()
+    args["cursor"] = cursor
+    return {"Link": f'<{request.base_url}?{urlencode(args)}>; rel="next"'}
+
+
+def encode_channel_cursor(position):
+    token_network_address, channel_identifier = position
+    return f"{to_checksum_address(token_network_address)}:{channel_identifier}"
+
+
+def decode_channel_cursor(cursor):
+    token_network_address, _, channel_identifier = cursor.partition(":")
+    if not is_checksum_address(token_network_address) or not channel_identifier.isdigit():
+        raise ValueError("Invalid cursor")
+    return to_canonical_address(token_network_address), int(channel_identifier)
+
+
+def decode_secrethash_cursor(cursor):
+    try:
+        secrethash = decode_hex(cursor)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if len(secrethash) != SECRETHASH_LENGTH:
+        raise ValueError("Invalid cursor")
+    return secrethash
+
+
 @parser.error_handler
 def handle_request_parsing_error(err, _req, _schema, _err_status_code, _err_headers):
     """ This handles request parsing errors generated for example by schema
@@ -255,6 +390,19 @@ def convert_to_serializable(event_list):
     return returned_events
 
 
+def set_payment_outcome(payment: Dict, event: typing.Optional[Event]) -> None:
+    """ Update the `payment` status with the outcome from `event`, if the
+    payment is finished. """
+    if isinstance(event, EventPaymentSentSuccess):
+        payment["amount"] = event.amount
+        payment["secret"] = event.secret
+        payment["secret_hash"] = sha256(event.secret).digest()
+        payment["status"] = "success"
+    elif isinstance(event, EventPaymentSentFailed):
+        payment["reason"] = event.reason
+        payment["status"] = "failed"
+
+
 def restapi_setup_urls(flask_api_context, rest_api, urls):
     for url_tuple in urls:
         if len(url_tuple) == 2:
@@ -320,6 +468,8 @@ class APIServer(Runnable):
         restapi_setup_type_converters(flask_app, {"hexaddress": HexAddressConverter})
 
         restapi_setup_urls(flask_api_context, rest_api, URLS_V1)
+        if config.get("enable_profiling", False):
+            restapi_setup_urls(flask_api_context, rest_api, PROFILING_URLS_V1)
 
         self.config = config
         self.rest_api = rest_api
@@ -332,14 +482,30 @@ class APIServer(Runnable):
 
         self.flask_app.config["WEBUI_PATH"] = RAIDEN_WEBUI_PATH
 
+        concurrency_limits = dict(DEFAULT_API_CONCURRENCY_LIMITS)
+        concurrency_limits.update(config.get("concurrency_limits", dict()))
+        self.endpoint_class_semaphores = {
+            endpoint_class: BoundedSemaphore(limit)
+            for endpoint_class, limit in concurrency_limits.items()
+        }
+        self.queue_timeout = config.get("queue_timeout", DEFAULT_API_QUEUE_TIMEOUT)
+        self.request_latency_histograms: Dict[str, Histogram] = dict()
+
         self.flask_app.register_error_handler(HTTPStatus.NOT_FOUND, endpoint_not_found)
         self.flask_app.register_error_handler(Exception, self.unhandled_exception)
         self.flask_app.before_request(self._is_raiden_running)
+        self.flask_app.before_request(self._admit_request)
+        self.flask_app.after_request(self._finish_request_on_close)
+        self.flask_app.teardown_request(self._finish_request)
 
         # needed so flask_restful propagates the exception to our error handler above
         # or else, it'll replace it with a E500 response
         self.flask_app.config["PROPAGATE_EXCEPTIONS"] = True
 
+        self.flask_app.add_url_rule(
+            "/metrics", "metrics", view_func=self._serve_metrics, methods=("GET",)
+        )
+
         if web_ui:
             for route in ("/ui/<path:file_name>", "/ui", "/ui/", "/index.html", "/"):
                 self.flask_app.add_url_rule(
@@ -357,6 +523,79 @@ class APIServer(Runnable):
         if not self.rest_api.raiden_api.raiden:
             raise RuntimeError("The RaidenService must be started before the API can be used")
 
+    def _admit_request(self):
+        """ Wait for the request's endpoint class to be below its concurrency
+        limit, or reject the request if it waited for too long.
+        """
+        g.request_start = time.monotonic()
+
+        if request.endpoint is None:
+            return None
+
+        endpoint = request.endpoint.rsplit(".", 1)[-1]
+        endpoint_class = ENDPOINT_CLASSES.get((request.method, endpoint), ENDPOINT_CLASS_DEFAULT)
+        semaphore = self.endpoint_class_semaphores[endpoint_class]
+
+        if not semaphore.acquire(timeout=self.queue_timeout):
+            return api_error(
+                errors=f"Too many concurrent {endpoint_class} requests, try again later",
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+
+        g.request_semaphore = semaphore
+        return None
+
+    def _finish_request_on_close(self, response):
+        """ Finish a streamed request once its response is sent.
+
+        The teardown of a request runs before the generator of a streamed
+        response is consumed, the request must hold its slot until then.
+        """
+        if response.is_streamed:
+            semaphore = g.pop("request_semaphore", None)
+            request_start = g.pop("request_start", None)
+            response.call_on_close(
+                partial(self._end_request, semaphore, request_start, self._request_route())
+            )
+        return response
+
+    def _finish_request(self, _exception):
+        semaphore = g.pop("request_semaphore", None)
+        request_start = g.pop("request_start", None)
+        self._end_request(semaphore, request_start, self._request_route())
+
+    @staticmethod
+    def _request_route():
+        if request.url_rule is None:
+            return None
+        return f"{request.method} {request.url_rule.rule}"
+
+    def _end_request(self, semaphore, request_start, route):
+        if semaphore is not None:
+            semaphore.release()
+
+        if request_start is None or route is None:
+            return
+
+        histogram = self.request_latency_histograms.get(route)
+        if histogram is None:
+            histogram = Histogram(
+                name="raiden_api_request_duration_seconds",
+                documentation="Time to process the requests to the REST API",
+                buckets=DEFAULT_LATENCY_BUCKETS,
+                labels={"route": route},
+            )
+            self.request_latency_histograms[route] = histogram
+        histogram.observe(time.monotonic() - request_start)
+
+    def _serve_metrics(self):
+        """ Expose the metrics of the node and of the API in the Prometheus
+        text format.
+        """
+        metrics = self.rest_api.raiden_api.raiden.metrics.collect()
+        metrics.extend(self.request_latency_histograms.values())
+        return Response(render_metrics(metrics), content_type=METRICS_CONTENT_TYPE)
+
     def _serve_webui(self, file_name="index.html"):  # pylint: disable=redefined-builtin
         try:
             if not file_name:
@@ -418,7 +657,7 @@ class APIServer(Runnable):
 
         # server.stop() clears the handle and the pool, this is okay since a
         # new WSGIServer is created on each start
-        pool = gevent.pool.Pool()
+        pool = gevent.pool.Pool(self.config.get("max_connections", DEFAULT_API_MAX_CONNECTIONS))
         wsgiserver = WSGIServer(
             (self.config["host"], self.config["port"]),
             self.flask_app,
@@ -490,9 +729,11 @@ class RestAPI:
         self.address_list_schema = AddressListSchema()
         self.partner_per_token_list_schema = PartnersPerTokenListSchema()
         self.payment_schema = PaymentSchema()
+        self.payment_status_schema = PaymentStatusSchema()
         self.sent_success_payment_schema = EventPaymentSentSuccessSchema()
         self.received_success_payment_schema = EventPaymentReceivedSuccessSchema()
         self.failed_payment_schema = EventPaymentSentFailedSchema()
+        self.profiling_lock = BoundedSemaphore()
 
     def get_our_address(self):
         return api_response(result=dict(our_address=to_checksum_address(self.raiden_api.address)))
@@ -702,27 +943,49 @@ class RestAPI:
 
         return connection_managers
 
-    def get_channel_list(
+    def get_channel_page(
         self,
         registry_address: typing.PaymentNetworkAddress,
         token_address: typing.TokenAddress = None,
-        partner_address: typing.Address = None,
+        state: str = None,
+        cursor: str = None,
+        limit: int = None,
+        projection: typing.List[str] = None,
     ):
         log.debug(
-            "Getting channel list",
+            "Getting channel page",
             node=pex(self.raiden_api.address),
             registry_address=to_checksum_address(registry_address),
             token_address=optional_address_to_string(token_address),
-            partner_address=optional_address_to_string(partner_address),
+            state=state,
+            cursor=cursor,
+            limit=limit,
         )
-        raiden_service_result = self.raiden_api.get_channel_list(
-            registry_address, token_address, partner_address
+        try:
+            after = decode_channel_cursor(cursor) if cursor is not None else None
+            channel_schema = ChannelStateSchema(only=projection)
+        except ValueError as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.BAD_REQUEST)
+
+        try:
+            channels, next_position = self.raiden_api.get_channel_page(
+                registry_address=registry_address,
+                token_address=token_address,
+                state=state,
+                after=after,
+                limit=limit,
+            )
+        except InvalidAddress as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.CONFLICT)
+
+        next_cursor = None
+        if next_position is not None:
+            next_cursor = encode_channel_cursor(next_position)
+
+        return api_stream_response(
+            result=(channel_schema.dump(channel_state) for channel_state in channels),
+            headers=next_page_headers(next_cursor),
         )
-        assert isinstance(raiden_service_result, list)
-        result = [
-            self.channel_schema.dump(channel_schema) for channel_schema in raiden_service_result
-        ]
-        return api_response(result=result)
 
     def get_tokens_list(self, registry_address: typing.PaymentNetworkAddress):
         log.debug(
@@ -851,6 +1114,69 @@ class RestAPI:
             )
         ]
 
+    def get_event_stream(self, after: int = None, last_event_id: int = None):
+        """ Streams the payment events of the node as server-sent events.
+
+        The stream starts after the event `Last-Event-ID`, which is sent by
+        the clients reconnecting to the stream, or else after the event
+        `after`. Without either only the events logged from now on are sent.
+        """
+        raiden = self.raiden_api.raiden
+        if last_event_id is not None:
+            after = last_event_id
+        if after is None:
+            after = raiden.wal.storage.get_latest_event_identifier()
+
+        log.debug("Streaming the payment events", node=pex(raiden.address), after=after)
+
+        response = Response(
+            payment_event_stream(raiden, after), content_type=EVENT_STREAM_CONTENT_TYPE
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    def get_cpu_profile(self, duration: float, interval: float):
+        """ Samples the stacks of the running greenlets for `duration`
+        seconds, the result is in the collapsed stack format.
+        """
+        if not self.profiling_lock.acquire(blocking=False):
+            return api_error(
+                errors="A profile is already being taken", status_code=HTTPStatus.CONFLICT
+            )
+
+        try:
+            log.info("Profiling the CPU", duration=duration, interval=interval)
+            profiler = SamplingProfiler(interval)
+            profiler.start()
+            try:
+                gevent.sleep(duration)
+            finally:
+                profiler.stop()
+        finally:
+            self.profiling_lock.release()
+
+        return Response(profiler.collapsed_stacks(), content_type=PROFILE_CONTENT_TYPE)
+
+    def get_memory_growth(self, duration: float, limit: int):
+        """ Traces the memory allocations for `duration` seconds, the result
+        is the `limit` lines of code whose allocated memory grew the most.
+        """
+        if not self.profiling_lock.acquire(blocking=False):
+            return api_error(
+                errors="A profile is already being taken", status_code=HTTPStatus.CONFLICT
+            )
+
+        try:
+            log.info("Tracing the memory allocations", duration=duration, limit=limit)
+            differences = trace_memory_growth(duration, limit)
+        finally:
+            self.profiling_lock.release()
+
+        return Response(
+            "".join(f"{difference}\n" for difference in differences),
+            content_type=PROFILE_CONTENT_TYPE,
+        )
+
     def get_blockchain_events_channel(
         self,
         token_address: typing.TokenAddress,
@@ -946,6 +1272,7 @@ class RestAPI:
         identifier: typing.PaymentID,
         secret: typing.Secret,
         secret_hash: typing.SecretHash,
+        respond_async: bool = False,
     ):
         log.debug(
             "Initiating payment",
@@ -957,13 +1284,14 @@ class RestAPI:
             payment_identifier=identifier,
             secret=secret,
             secret_hash=secret_hash,
+            respond_async=respond_async,
         )
 
         if identifier is None:
             identifier = create_default_identifier()
 
         try:
-            payment_status = self.raiden_api.transfer(
+            payment_status = self.raiden_api.transfer_async(
                 registry_address=registry_address,
                 token_address=token_address,
                 target=target_address,
@@ -984,6 +1312,19 @@ class RestAPI:
         except InsufficientFunds as e:
             return api_error(errors=str(e), status_code=HTTPStatus.PAYMENT_REQUIRED)
 
+        if respond_async:
+            payment = {
+                "initiator_address": self.raiden_api.address,
+                "registry_address": registry_address,
+                "token_address": token_address,
+                "target_address": target_address,
+                "amount": amount,
+                "identifier": identifier,
+                "status": "pending",
+            }
+            result = self.payment_status_schema.dump(payment)
+            return api_response(result=result, status_code=HTTPStatus.ACCEPTED)
+
         result = payment_status.payment_done.get()
 
         if isinstance(result, EventPaymentSentFailed):
@@ -1006,6 +1347,134 @@ class RestAPI:
         result = self.payment_schema.dump(payment)
         return api_response(result=result)
 
+    def get_payment_status(
+        self,
+        registry_address: typing.PaymentNetworkAddress,
+        token_address: typing.TokenAddress,
+        target_address: typing.Address,
+        identifier: typing.PaymentID,
+        timeout: float,
+    ):
+        """ Return the status of a payment started by this node.
+
+        If the payment is in flight the request is held for up to `timeout`
+        seconds waiting for its outcome, which allows clients to long-poll
+        instead of polling the node.
+        """
+        log.debug(
+            "Getting payment status",
+            node=pex(self.raiden_api.address),
+            token_address=to_checksum_address(token_address),
+            target_address=to_checksum_address(target_address),
+            payment_identifier=identifier,
+            timeout=timeout,
+        )
+        try:
+            payment_status = self.raiden_api.get_pending_payment(
+                token_address=token_address, target=target_address, identifier=identifier
+            )
+        except InvalidAddress as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.CONFLICT)
+        except UnknownTokenAddress as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.NOT_FOUND)
+
+        payment = {
+            "initiator_address": self.raiden_api.address,
+            "registry_address": registry_address,
+            "token_address": token_address,
+            "target_address": target_address,
+            "identifier": identifier,
+            "status": "pending",
+        }
+
+        if payment_status is not None:
+            payment["amount"] = payment_status.amount
+            result = payment_status.payment_done.wait(timeout=timeout)
+        else:
+            result = self.raiden_api.get_payment_result(
+                token_address=token_address, target=target_address, identifier=identifier
+            )
+            if result is None:
+                return api_error(
+                    errors=f"Payment with identifier {identifier} not found",
+                    status_code=HTTPStatus.NOT_FOUND,
+                )
+
+        set_payment_outcome(payment, result)
+        result = self.payment_status_schema.dump(payment)
+        return api_response(result=result)
+
+    def initiate_payment_batch(
+        self,
+        registry_address: typing.PaymentNetworkAddress,
+        token_address: typing.TokenAddress,
+        payments: typing.List[typing.Dict[str, typing.Any]],
+        respond_async: bool = False,
+    ):
+        """ Start all the `payments` as a single batch.
+
+        The response is a stream of newline delimited JSON objects, one for
+        each payment, written as soon as the payment finishes. With
+        `respond_async` the statuses are returned right after the payments
+        are started.
+        """
+        log.debug(
+            "Initiating payment batch",
+            node=pex(self.raiden_api.address),
+            registry_address=to_checksum_address(registry_address),
+            token_address=to_checksum_address(token_address),
+            payments=len(payments),
+            respond_async=respond_async,
+        )
+
+        try:
+            results = self.raiden_api.transfer_batch_async(
+                registry_address=registry_address,
+                token_address=token_address,
+                payments=[
+                    (payment["target_address"], payment["amount"], payment["identifier"])
+                    for payment in payments
+                ],
+            )
+        except (InvalidAddress, UnknownTokenAddress) as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.CONFLICT)
+
+        finished = list()
+        pending: typing.Dict[AsyncResult, typing.List[typing.Dict]] = defaultdict(list)
+        for payment, result in zip(payments, results):
+            payment = {
+                "initiator_address": self.raiden_api.address,
+                "registry_address": registry_address,
+                "token_address": token_address,
+                "target_address": payment["target_address"],
+                "amount": payment["amount"],
+                "identifier": payment["identifier"],
+            }
+            if isinstance(result, Exception):
+                payment["status"] = "failed"
+                payment["reason"] = str(result)
+                finished.append(payment)
+            else:
+                payment["identifier"] = result.payment_identifier
+                payment["status"] = "pending"
+                pending[result.payment_done].append(payment)
+
+        if respond_async:
+            started = [payment for group in pending.values() for payment in group]
+            result = self.payment_status_schema.dump(finished + started, many=True)
+            return api_response(result=result, status_code=HTTPStatus.ACCEPTED)
+
+        def stream_results():
+            for payment in finished:
+                yield json.dumps(self.payment_status_schema.dump(payment)) + "\n"
+
+            for payment_done in gevent.iwait(list(pending)):
+                for payment in pending[payment_done]:
+                    set_payment_outcome(payment, payment_done.get())
+                    yield json.dumps(self.payment_status_schema.dump(payment)) + "\n"
+
+        return Response(stream_results(), mimetype="application/x-ndjson")
+
     def _deposit(
         self,
         registry_address: typing.PaymentNetworkAddress,
@@ -1141,12 +1610,41 @@ class RestAPI:
             )
         return result
 
-    def get_pending_transfers(self, token_address=None, partner_address=None):
+    def get_pending_transfers(
+        self,
+        token_address=None,
+        partner_address=None,
+        cursor: str = None,
+        limit: int = None,
+        projection: typing.List[str] = None,
+    ):
+        unknown_fields = set(projection or ()) - set(PENDING_TRANSFER_FIELDS)
+        if unknown_fields:
+            return api_error(
+                errors="Invalid fields {}".format(", ".join(sorted(unknown_fields))),
+                status_code=HTTPStatus.BAD_REQUEST,
+            )
+
         try:
-            return api_response(
-                self.raiden_api.get_pending_transfers(
-                    token_address=token_address, partner_address=partner_address
-                )
+            after = decode_secrethash_cursor(cursor) if cursor is not None else None
+        except ValueError as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.BAD_REQUEST)
+
+        try:
+            transfers, last_secrethash = self.raiden_api.get_pending_transfers_page(
+                token_address=token_address,
+                partner_address=partner_address,
+                after=after,
+                limit=limit,
             )
         except (ChannelNotFound, UnknownTokenAddress) as e:
             return api_error(errors=str(e), status_code=HTTPStatus.NOT_FOUND)
+
+        if projection:
+            transfers = [{key: transfer[key] for key in projection} for transfer in transfers]
+
+        next_cursor = None
+        if last_secrethash is not None:
+            next_cursor = encode_hex(last_secrethash)
+
+        return api_stream_response(result=transfers, headers=next_page_headers(next_cursor))
@@ -10,14 +10,24 @@ from eth_utils import (
 )
 from marshmallow import Schema, SchemaOpts, fields, post_dump, post_load, pre_load
 from webargs import validate
+from webargs.fields import DelimitedList
 from werkzeug.exceptions import NotFound
 from werkzeug.routing import BaseConverter
 
 from raiden.api.objects import Address, AddressList, PartnersPerToken, PartnersPerTokenList
 from raiden.constants import SECRET_LENGTH, SECRETHASH_LENGTH
-from raiden.settings import DEFAULT_INITIAL_CHANNEL_TARGET, DEFAULT_JOINABLE_FUNDS_TARGET
+from raiden.settings import (
+    DEFAULT_INITIAL_CHANNEL_TARGET,
+    DEFAULT_JOINABLE_FUNDS_TARGET,
+    DEFAULT_PAYMENT_STATUS_MAX_TIMEOUT,
+)
 from raiden.transfer import channel
-from raiden.transfer.state import CHANNEL_STATE_CLOSED, CHANNEL_STATE_OPENED, CHANNEL_STATE_SETTLED
+from raiden.transfer.state import (
+    CHANNEL_ALL_VALID_STATES,
+    CHANNEL_STATE_CLOSED,
+    CHANNEL_STATE_OPENED,
+    CHANNEL_STATE_SETTLED,
+)
 from raiden.utils import data_decoder, data_encoder
 
 
@@ -208,6 +218,58 @@ class RaidenEventsRequestSchema(BaseSchema):
         decoding_class = dict
 
 
+class EventStreamRequestSchema(BaseSchema):
+    after = fields.Integer(missing=None, validate=validate.Range(min=0))
+    last_event_id = fields.Integer(
+        missing=None, validate=validate.Range(min=0), data_key="Last-Event-ID"
+    )
+
+    class Meta:
+        strict = True
+        # decoding to a dict is required by the @use_kwargs decorator from webargs
+        decoding_class = dict
+
+
+class CPUProfileRequestSchema(BaseSchema):
+    duration = fields.Float(missing=10.0, validate=validate.Range(min=0.1, max=600))
+    interval = fields.Float(missing=0.005, validate=validate.Range(min=0.001, max=1))
+
+    class Meta:
+        strict = True
+        # decoding to a dict is required by the @use_kwargs decorator from webargs
+        decoding_class = dict
+
+
+class MemoryGrowthRequestSchema(BaseSchema):
+    duration = fields.Float(missing=10.0, validate=validate.Range(min=0.1, max=600))
+    limit = fields.Integer(missing=50, validate=validate.Range(min=1))
+
+    class Meta:
+        strict = True
+        # decoding to a dict is required by the @use_kwargs decorator from webargs
+        decoding_class = dict
+
+
+class ListPageRequestSchema(BaseSchema):
+    limit = fields.Integer(missing=None, validate=validate.Range(min=1))
+    cursor = fields.String(missing=None)
+    projection = DelimitedList(fields.String(), missing=None, data_key="fields")
+
+    class Meta:
+        strict = True
+        # decoding to a dict is required by the @use_kwargs decorator from webargs
+        decoding_class = dict
+
+
+class ChannelListRequestSchema(ListPageRequestSchema):
+    state = fields.String(missing=None, validate=validate.OneOf(CHANNEL_ALL_VALID_STATES))
+
+    class Meta:
+        strict = True
+        # decoding to a dict is required by the @use_kwargs decorator from webargs
+        decoding_class = dict
+
+
 class AddressSchema(BaseSchema):
     address = AddressField()
 
@@ -316,6 +378,45 @@ class PaymentSchema(BaseSchema):
         decoding_class = dict
 
 
+class BatchedPaymentSchema(BaseSchema):
+    target_address = AddressField(required=True)
+    amount = fields.Integer(required=True)
+    identifier = fields.Integer(missing=None)
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
+class PaymentBatchSchema(BaseSchema):
+    payments = fields.Nested(
+        BatchedPaymentSchema, many=True, required=True, validate=validate.Length(min=1)
+    )
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
+class PaymentStatusSchema(PaymentSchema):
+    status = fields.String()
+    reason = fields.String(missing=None)
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
+class PaymentStatusRequestSchema(BaseSchema):
+    timeout = fields.Float(
+        missing=0, validate=validate.Range(min=0, max=DEFAULT_PAYMENT_STATUS_MAX_TIMEOUT)
+    )
+
+    class Meta:
+        strict = True
+        decoding_class = dict
+
+
 class ConnectionsConnectSchema(BaseSchema):
     funds = fields.Integer(required=True)
     initial_channel_target = fields.Integer(missing=DEFAULT_INITIAL_CHANNEL_TARGET)
@@ -1,14 +1,21 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from flask_restful import Resource
 from webargs.flaskparser import use_kwargs
 
 from raiden.api.v1.encoding import (
     BlockchainEventsRequestSchema,
+    ChannelListRequestSchema,
     ChannelPatchSchema,
     ChannelPutSchema,
     ConnectionsConnectSchema,
     ConnectionsLeaveSchema,
+    CPUProfileRequestSchema,
+    EventStreamRequestSchema,
+    ListPageRequestSchema,
+    MemoryGrowthRequestSchema,
+    PaymentBatchSchema,
     PaymentSchema,
+    PaymentStatusRequestSchema,
     RaidenEventsRequestSchema,
 )
 from raiden.utils import typing
@@ -34,14 +41,16 @@ class AddressResource(BaseResource):
 
 class ChannelsResource(BaseResource):
 
+    get_schema = ChannelListRequestSchema()
     put_schema = ChannelPutSchema
 
-    def get(self):
+    @use_kwargs(get_schema, locations=("query",))
+    def get(self, **kwargs):
         """
         this translates to 'get all channels the node is connected with'
         """
-        return self.rest_api.get_channel_list(
-            self.rest_api.raiden_api.raiden.default_registry.address
+        return self.rest_api.get_channel_page(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address, **kwargs
         )
 
     @use_kwargs(put_schema, locations=("json",))
@@ -52,11 +61,15 @@ class ChannelsResource(BaseResource):
 
 
 class ChannelsResourceByTokenAddress(BaseResource):
+
+    get_schema = ChannelListRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
     def get(self, **kwargs):
         """
         this translates to 'get all channels the node is connected to for the given token address'
         """
-        return self.rest_api.get_channel_list(
+        return self.rest_api.get_channel_page(
             registry_address=self.rest_api.raiden_api.raiden.default_registry.address, **kwargs
         )
 
@@ -150,6 +163,33 @@ class RaidenInternalEventsResource(BaseResource):
         return self.rest_api.get_raiden_internal_events_with_timestamps(limit=limit, offset=offset)
 
 
+class EventStreamResource(BaseResource):
+
+    get_schema = EventStreamRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query", "headers"))
+    def get(self, after, last_event_id):
+        return self.rest_api.get_event_stream(after=after, last_event_id=last_event_id)
+
+
+class CPUProfileResource(BaseResource):
+
+    get_schema = CPUProfileRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
+    def get(self, duration, interval):
+        return self.rest_api.get_cpu_profile(duration=duration, interval=interval)
+
+
+class MemoryGrowthResource(BaseResource):
+
+    get_schema = MemoryGrowthRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
+    def get(self, duration, limit):
+        return self.rest_api.get_memory_growth(duration=duration, limit=limit)
+
+
 class RegisterTokenResource(BaseResource):
     def get(self, token_address):
         return self.rest_api.get_token_network_for_token(
@@ -227,19 +267,67 @@ class PaymentResource(BaseResource):
             identifier=identifier,
             secret=secret,
             secret_hash=secret_hash,
+            respond_async="respond-async" in request.headers.get("Prefer", ""),
+        )
+
+
+class PaymentBatchResource(BaseResource):
+
+    post_schema = PaymentBatchSchema()
+
+    @use_kwargs(post_schema, locations=("json",))
+    def post(self, token_address: typing.TokenAddress, payments: typing.List[typing.Dict]):
+        return self.rest_api.initiate_payment_batch(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address,
+            token_address=token_address,
+            payments=payments,
+            respond_async="respond-async" in request.headers.get("Prefer", ""),
+        )
+
+
+class PaymentStatusResource(BaseResource):
+
+    get_schema = PaymentStatusRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
+    def get(
+        self,
+        token_address: typing.TokenAddress,
+        target_address: typing.TargetAddress,
+        identifier: typing.PaymentID,
+        timeout: float,
+    ):
+        return self.rest_api.get_payment_status(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address,
+            token_address=token_address,
+            target_address=target_address,
+            identifier=identifier,
+            timeout=timeout,
         )
 
 
 class PendingTransfersResource(BaseResource):
-    def get(self):
-        return self.rest_api.get_pending_transfers()
+
+    get_schema = ListPageRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
+    def get(self, **kwargs):
+        return self.rest_api.get_pending_transfers(**kwargs)
 
 
 class PendingTransfersResourceByTokenAddress(BaseResource):
-    def get(self, token_address):
-        return self.rest_api.get_pending_transfers(token_address)
+
+    get_schema = ListPageRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
+    def get(self, token_address, **kwargs):
+        return self.rest_api.get_pending_transfers(token_address, **kwargs)
 
 
 class PendingTransfersResourceByTokenAndPartnerAddress(BaseResource):
-    def get(self, token_address, partner_address):
-        return self.rest_api.get_pending_transfers(token_address, partner_address)
+
+    get_schema = ListPageRequestSchema()
+
+    @use_kwargs(get_schema, locations=("query",))
+    def get(self, token_address, partner_address, **kwargs):
+        return self.rest_api.get_pending_transfers(token_address, partner_address, **kwargs)
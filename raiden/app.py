@@ -17,7 +17,11 @@ from raiden.settings import (
     DEFAULT_REVEAL_TIMEOUT,
     DEFAULT_SETTLE_TIMEOUT,
     DEFAULT_SHUTDOWN_TIMEOUT,
+    DEFAULT_TRANSPORT_MATRIX_BATCH_LINGER,
+    DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_BYTES,
+    DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_MESSAGES,
     DEFAULT_TRANSPORT_MATRIX_RETRY_INTERVAL,
+    DEFAULT_TRANSPORT_MATRIX_SYNC_PIPELINE_DEPTH,
     DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
     PRODUCTION_CONTRACT_VERSION,
 )
@@ -46,6 +50,10 @@ class App:  # pylint: disable=too-few-public-methods
                 "global_rooms": [DISCOVERY_DEFAULT_ROOM, PATH_FINDING_BROADCASTING_ROOM],
                 "retries_before_backoff": DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
                 "retry_interval": DEFAULT_TRANSPORT_MATRIX_RETRY_INTERVAL,
+                "batch_max_messages": DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_MESSAGES,
+                "batch_max_bytes": DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_BYTES,
+                "batch_linger": DEFAULT_TRANSPORT_MATRIX_BATCH_LINGER,
+                "sync_pipeline_depth": DEFAULT_TRANSPORT_MATRIX_SYNC_PIPELINE_DEPTH,
                 "server": "auto",
             }
         },
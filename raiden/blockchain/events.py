@@ -1,7 +1,9 @@
 from collections import namedtuple
 from typing import Dict, List
 
+import gevent
 from eth_utils import to_canonical_address
+from gevent.pool import Pool
 
 from raiden.constants import GENESIS_BLOCK_NUMBER, UINT64_MAX
 from raiden.exceptions import InvalidBlockNumberInput, UnknownEventType
@@ -9,6 +11,7 @@ from raiden.network.blockchain_service import BlockChainService
 from raiden.network.proxies.secret_registry import SecretRegistry
 from raiden.utils import pex, typing
 from raiden.utils.filters import (
+    FILTER_MAX_CONCURRENT_QUERIES,
     StatelessFilter,
     decode_event,
     get_filter_args_for_all_events_from_channel,
@@ -200,17 +203,42 @@ class Event:
 class BlockchainEvents:
     """ Events polling. """
 
-    def __init__(self):
+    def __init__(self, max_concurrent_queries: int = FILTER_MAX_CONCURRENT_QUERIES):
         self.event_listeners = list()
+        self.max_concurrent_queries = max_concurrent_queries
 
     def poll_blockchain_events(self, block_number: typing.BlockNumber):
-        """ Poll for new blockchain events up to `block_number`. """
-
-        for event_listener in self.event_listeners:
+        """ Poll for new blockchain events up to `block_number`.
+
+        The filters of the listeners are queried concurrently, and the block
+        range of each filter is split in windows which are queried
+        concurrently too, which speeds up catching up with the blockchain
+        after a restart. At most `max_concurrent_queries` windows are queried
+        at once, the events are returned in the order of the listeners.
+        Listeners added while the events are consumed, e.g. for a new token
+        network, are polled after the listeners which existed before.
+        """
+        pool = Pool(self.max_concurrent_queries)
+
+        def get_new_entries(event_listener):
             assert isinstance(event_listener.filter, StatelessFilter)
-
-            for log_event in event_listener.filter.get_new_entries(block_number):
-                yield decode_event_to_internal(event_listener.abi, log_event)
+            return event_listener.filter.get_new_entries(block_number, pool=pool)
+
+        num_polled = 0
+        while num_polled < len(self.event_listeners):
+            event_listeners = self.event_listeners[num_polled:]
+            num_polled = len(self.event_listeners)
+
+            # The greenlets of the listeners only wait for the windows queried
+            # by the pool, so they are not bounded by it
+            pollers = [gevent.spawn(get_new_entries, listener) for listener in event_listeners]
+            try:
+                for event_listener, poller in zip(event_listeners, pollers):
+                    for log_event in poller.get():
+                        yield decode_event_to_internal(event_listener.abi, log_event)
+            finally:
+                gevent.killall(pollers)
+                pool.kill()
 
     def uninstall_all_event_listeners(self):
         for listener in self.event_listeners:
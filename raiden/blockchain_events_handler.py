@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set
 
 import gevent
 import structlog
@@ -32,6 +32,7 @@ from raiden.transfer.state_change import (
     ContractReceiveUpdateTransfer,
 )
 from raiden.utils import pex, typing
+from raiden.utils.typing import Address
 from raiden_contracts.constants import (
     EVENT_SECRET_REVEALED,
     EVENT_TOKEN_NETWORK_CREATED,
@@ -46,7 +47,7 @@ if TYPE_CHECKING:
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
-def handle_tokennetwork_new(raiden: "RaidenService", event: Event):
+def handle_tokennetwork_new(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     """ Handles a `TokenNetworkCreated` event. """
     data = event.event_data
     args = data["args"]
@@ -78,10 +79,10 @@ def handle_tokennetwork_new(raiden: "RaidenService", event: Event):
         block_number=block_number,
         block_hash=block_hash,
     )
-    raiden.handle_and_track_state_change(new_token_network)
+    return new_token_network
 
 
-def handle_channel_new(raiden: "RaidenService", event: Event):
+def handle_channel_new(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     data = event.event_data
     block_number = data["block_number"]
     block_hash = data["block_hash"]
@@ -112,44 +113,43 @@ def handle_channel_new(raiden: "RaidenService", event: Event):
             opened_block_number=block_number,
         )
 
-        new_channel = ContractReceiveChannelNew(
+        return ContractReceiveChannelNew(
             transaction_hash=transaction_hash,
             channel_state=channel_state,
             block_number=block_number,
             block_hash=block_hash,
         )
-        raiden.handle_and_track_state_change(new_channel)
 
-        # pylint: disable=E1101
-        partner_address = channel_state.partner_state.address
+    # Raiden node is not participant of channel
+    return ContractReceiveRouteNew(
+        transaction_hash=transaction_hash,
+        canonical_identifier=CanonicalIdentifier(
+            chain_identifier=raiden.chain.network_id,
+            token_network_address=token_network_address,
+            channel_identifier=channel_identifier,
+        ),
+        participant1=participant1,
+        participant2=participant2,
+        block_number=block_number,
+        block_hash=block_hash,
+    )
+
+
+def after_channel_new(raiden: "RaidenService", event: Event, state_change: StateChange) -> None:
+    if isinstance(state_change, ContractReceiveChannelNew):
+        partner_address = state_change.channel_state.partner_state.address
 
         if ConnectionManager.BOOTSTRAP_ADDR != partner_address:
             raiden.start_health_check_for(partner_address)
 
-    # Raiden node is not participant of channel
-    else:
-        new_route = ContractReceiveRouteNew(
-            transaction_hash=transaction_hash,
-            canonical_identifier=CanonicalIdentifier(
-                chain_identifier=raiden.chain.network_id,
-                token_network_address=token_network_address,
-                channel_identifier=channel_identifier,
-            ),
-            participant1=participant1,
-            participant2=participant2,
-            block_number=block_number,
-            block_hash=block_hash,
-        )
-        raiden.handle_and_track_state_change(new_route)
-
     # A new channel is available, run the connection manager in case more
     # connections are needed
-    connection_manager = raiden.connection_manager_for_token_network(token_network_address)
+    connection_manager = raiden.connection_manager_for_token_network(event.originating_contract)
     retry_connect = gevent.spawn(connection_manager.retry_connect)
     raiden.add_pending_greenlet(retry_connect)
 
 
-def handle_channel_new_balance(raiden: "RaidenService", event: Event):
+def handle_channel_new_balance(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     data = event.event_data
     args = data["args"]
     block_number = data["block_number"]
@@ -171,34 +171,54 @@ def handle_channel_new_balance(raiden: "RaidenService", event: Event):
     )
 
     # Channels will only be registered if this node is a participant
-    if previous_channel_state is not None:
-        previous_balance = previous_channel_state.our_state.contract_balance
-        balance_was_zero = previous_balance == 0
+    if previous_channel_state is None:
+        return None
 
-        deposit_transaction = TransactionChannelNewBalance(
-            participant_address, total_deposit, block_number
-        )
+    deposit_transaction = TransactionChannelNewBalance(
+        participant_address, total_deposit, block_number
+    )
 
-        newbalance_statechange = ContractReceiveChannelNewBalance(
-            transaction_hash=transaction_hash,
-            canonical_identifier=previous_channel_state.canonical_identifier,
-            deposit_transaction=deposit_transaction,
-            block_number=block_number,
-            block_hash=block_hash,
-        )
-        raiden.handle_and_track_state_change(newbalance_statechange)
+    return ContractReceiveChannelNewBalance(
+        transaction_hash=transaction_hash,
+        canonical_identifier=previous_channel_state.canonical_identifier,
+        deposit_transaction=deposit_transaction,
+        block_number=block_number,
+        block_hash=block_hash,
+    )
 
-        if balance_was_zero and participant_address != raiden.address:
-            connection_manager = raiden.connection_manager_for_token_network(token_network_address)
 
-            join_channel = gevent.spawn(
-                connection_manager.join_channel, participant_address, total_deposit
-            )
+def after_channel_new_balance(
+    raiden: "RaidenService", event: Event, state_change: StateChange
+) -> None:
+    assert isinstance(state_change, ContractReceiveChannelNewBalance)
+
+    participant_address = state_change.deposit_transaction.participant_address
+    if participant_address == raiden.address:
+        return
 
-            raiden.add_pending_greenlet(join_channel)
+    # The partner's deposit does not change our balance, so the current
+    # balance is the same as the one before the state change was applied.
+    channel_state = views.get_channelstate_by_canonical_identifier(
+        chain_state=views.state_from_raiden(raiden),
+        canonical_identifier=state_change.canonical_identifier,
+    )
+    balance_was_zero = channel_state is not None and channel_state.our_state.contract_balance == 0
 
+    if balance_was_zero:
+        connection_manager = raiden.connection_manager_for_token_network(
+            event.originating_contract
+        )
+
+        join_channel = gevent.spawn(
+            connection_manager.join_channel,
+            participant_address,
+            state_change.deposit_transaction.contract_balance,
+        )
 
-def handle_channel_closed(raiden: "RaidenService", event: Event):
+        raiden.add_pending_greenlet(join_channel)
+
+
+def handle_channel_closed(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     token_network_address = event.originating_contract
     data = event.event_data
     block_number = data["block_number"]
@@ -228,10 +248,9 @@ def handle_channel_closed(raiden: "RaidenService", event: Event):
             block_number=block_number,
             block_hash=block_hash,
         )
-        raiden.handle_and_track_state_change(channel_closed)
     else:
         # This is a channel close event of a channel we're not a participant of
-        route_closed = ContractReceiveRouteClosed(
+        channel_closed = ContractReceiveRouteClosed(
             transaction_hash=transaction_hash,
             canonical_identifier=CanonicalIdentifier(
                 chain_identifier=chain_state.chain_id,
@@ -241,10 +260,11 @@ def handle_channel_closed(raiden: "RaidenService", event: Event):
             block_number=block_number,
             block_hash=block_hash,
         )
-        raiden.handle_and_track_state_change(route_closed)
+
+    return channel_closed
 
 
-def handle_channel_update_transfer(raiden: "RaidenService", event: Event):
+def handle_channel_update_transfer(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     token_network_address = event.originating_contract
     data = event.event_data
     args = data["args"]
@@ -263,18 +283,19 @@ def handle_channel_update_transfer(raiden: "RaidenService", event: Event):
         ),
     )
 
-    if channel_state:
-        channel_transfer_updated = ContractReceiveUpdateTransfer(
-            transaction_hash=transaction_hash,
-            canonical_identifier=channel_state.canonical_identifier,
-            nonce=args["nonce"],
-            block_number=block_number,
-            block_hash=block_hash,
-        )
-        raiden.handle_and_track_state_change(channel_transfer_updated)
+    if not channel_state:
+        return None
 
+    return ContractReceiveUpdateTransfer(
+        transaction_hash=transaction_hash,
+        canonical_identifier=channel_state.canonical_identifier,
+        nonce=args["nonce"],
+        block_number=block_number,
+        block_hash=block_hash,
+    )
 
-def handle_channel_settled(raiden: "RaidenService", event: Event):
+
+def handle_channel_settled(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     data = event.event_data
     token_network_address = event.originating_contract
     channel_identifier = data["args"]["channel_identifier"]
@@ -301,7 +322,7 @@ def handle_channel_settled(raiden: "RaidenService", event: Event):
     # Because we cannot distinguish the two cases, assume the channel is not of
     # interest and ignore the event.
     if not channel_state:
-        return
+        return None
 
     # Recover the locksroot from the blockchain to fix data races. Check
     # get_onchain_locksroots for details.
@@ -336,7 +357,7 @@ def handle_channel_settled(raiden: "RaidenService", event: Event):
             block_identifier="latest",
         )
 
-    channel_settled = ContractReceiveChannelSettled(
+    return ContractReceiveChannelSettled(
         transaction_hash=transaction_hash,
         canonical_identifier=channel_state.canonical_identifier,
         our_onchain_locksroot=our_locksroot,
@@ -344,10 +365,9 @@ def handle_channel_settled(raiden: "RaidenService", event: Event):
         block_number=block_number,
         block_hash=block_hash,
     )
-    raiden.handle_and_track_state_change(channel_settled)
 
 
-def handle_channel_batch_unlock(raiden: "RaidenService", event: Event):
+def handle_channel_batch_unlock(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     assert raiden.wal, "The Raiden Service must be initialize to handle events"
 
     token_network_address = event.originating_contract
@@ -374,7 +394,7 @@ def handle_channel_batch_unlock(raiden: "RaidenService", event: Event):
             participant1=pex(participant1),
             participant2=pex(participant2),
         )
-        return
+        return None
 
     channel_identifiers = token_network_state.partneraddresses_to_channelidentifiers[partner]
     canonical_identifier = None
@@ -415,7 +435,7 @@ def handle_channel_batch_unlock(raiden: "RaidenService", event: Event):
     )
     assert canonical_identifier is not None, msg
 
-    unlock_state_change = ContractReceiveChannelBatchUnlock(
+    return ContractReceiveChannelBatchUnlock(
         transaction_hash=transaction_hash,
         canonical_identifier=canonical_identifier,
         receiver=args["receiver"],
@@ -427,17 +447,15 @@ def handle_channel_batch_unlock(raiden: "RaidenService", event: Event):
         block_hash=block_hash,
     )
 
-    raiden.handle_and_track_state_change(unlock_state_change)
 
-
-def handle_secret_revealed(raiden: "RaidenService", event: Event):
+def handle_secret_revealed(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
     secret_registry_address = event.originating_contract
     data = event.event_data
     args = data["args"]
     block_number = data["block_number"]
     block_hash = data["block_hash"]
     transaction_hash = data["transaction_hash"]
-    registeredsecret_state_change = ContractReceiveSecretReveal(
+    return ContractReceiveSecretReveal(
         transaction_hash=transaction_hash,
         secret_registry_address=secret_registry_address,
         secrethash=args["secrethash"],
@@ -446,10 +464,14 @@ def handle_secret_revealed(raiden: "RaidenService", event: Event):
         block_hash=block_hash,
     )
 
-    raiden.handle_and_track_state_change(registeredsecret_state_change)
 
+def blockchainevent_to_statechange(raiden: "RaidenService", event: Event) -> Optional[StateChange]:
+    """ Converts the blockchain `event` to its state change.
 
-def on_blockchain_event(raiden: "RaidenService", event: Event):
+    The state change must be dispatched, and `after_blockchainevent` called,
+    before converting another event from the same contract, since the
+    conversion may depend on the state of the originating contract.
+    """
     data = event.event_data
     log.debug(
         "Blockchain event",
@@ -460,28 +482,94 @@ def on_blockchain_event(raiden: "RaidenService", event: Event):
 
     event_name = data["event"]
     if event_name == EVENT_TOKEN_NETWORK_CREATED:
-        handle_tokennetwork_new(raiden, event)
+        return handle_tokennetwork_new(raiden, event)
 
     elif event_name == ChannelEvent.OPENED:
-        handle_channel_new(raiden, event)
+        return handle_channel_new(raiden, event)
 
     elif event_name == ChannelEvent.DEPOSIT:
-        handle_channel_new_balance(raiden, event)
+        return handle_channel_new_balance(raiden, event)
 
     elif event_name == ChannelEvent.BALANCE_PROOF_UPDATED:
-        handle_channel_update_transfer(raiden, event)
+        return handle_channel_update_transfer(raiden, event)
 
     elif event_name == ChannelEvent.CLOSED:
-        handle_channel_closed(raiden, event)
+        return handle_channel_closed(raiden, event)
 
     elif event_name == ChannelEvent.SETTLED:
-        handle_channel_settled(raiden, event)
+        return handle_channel_settled(raiden, event)
 
     elif event_name == EVENT_SECRET_REVEALED:
-        handle_secret_revealed(raiden, event)
+        return handle_secret_revealed(raiden, event)
 
     elif event_name == ChannelEvent.UNLOCKED:
-        handle_channel_batch_unlock(raiden, event)
+        return handle_channel_batch_unlock(raiden, event)
 
-    else:
-        log.error("Unknown event type", event_name=data["event"], raiden_event=event)
+    log.error("Unknown event type", event_name=data["event"], raiden_event=event)
+    return None
+
+
+def has_side_effects(event: Event) -> bool:
+    """ True if `after_blockchainevent` must be called for this event. """
+    return event.event_data["event"] in (ChannelEvent.OPENED, ChannelEvent.DEPOSIT)
+
+
+def after_blockchainevent(
+    raiden: "RaidenService", event: Event, state_change: Optional[StateChange]
+) -> None:
+    """ Starts the side-effects of the blockchain `event`.
+
+    This must be called only after `state_change` has been dispatched, the
+    side-effects rely on the node's state being up-to-date.
+    """
+    if state_change is None:
+        return
+
+    event_name = event.event_data["event"]
+    if event_name == ChannelEvent.OPENED:
+        after_channel_new(raiden, event, state_change)
+
+    elif event_name == ChannelEvent.DEPOSIT:
+        after_channel_new_balance(raiden, event, state_change)
+
+
+def dispatch_blockchain_events(
+    raiden: "RaidenService", events: Iterable[Event]
+) -> List[StateChange]:
+    """ Converts the blockchain `events` to state changes and dispatches them
+    in batches.
+
+    A batch is flushed whenever the next event depends on the state of a
+    contract with a pending state change, or when the event has side-effects
+    which need the state to be up-to-date. The last batch is returned instead
+    of being dispatched, so that the caller can add to it.
+    """
+    state_changes: List[StateChange] = list()
+    pending_contracts: Set[Address] = set()
+    for event in events:
+        if event.originating_contract in pending_contracts:
+            raiden.handle_and_track_state_changes(state_changes)
+            state_changes = list()
+            pending_contracts = set()
+
+        state_change = blockchainevent_to_statechange(raiden, event)
+        if state_change is not None:
+            state_changes.append(state_change)
+            pending_contracts.add(event.originating_contract)
+
+        if has_side_effects(event):
+            raiden.handle_and_track_state_changes(state_changes)
+            state_changes = list()
+            pending_contracts = set()
+
+            after_blockchainevent(raiden, event, state_change)
+
+    return state_changes
+
+
+def on_blockchain_event(raiden: "RaidenService", event: Event) -> None:
+    state_change = blockchainevent_to_statechange(raiden, event)
+
+    if state_change is not None:
+        raiden.handle_and_track_state_change(state_change)
+        after_blockchainevent(raiden, event, state_change)
@@ -113,6 +113,56 @@ def add_greenlet_name(
     return event_dict
 
 
+class LazyValue:
+    """ A log event value which is only computed if the event is rendered.
+
+    Use this for values which are expensive to compute, e.g. serialized state
+    changes, so that filtered log events don't pay for them. The value is
+    computed at most once, since an event may be rendered by multiple
+    handlers.
+    """
+
+    __slots__ = ("_func", "_args", "_value")
+
+    _UNSET = object()
+
+    def __init__(self, func: Callable[..., Any], *args: Any) -> None:
+        self._func = func
+        self._args = args
+        self._value: Any = LazyValue._UNSET
+
+    def resolve(self) -> Any:
+        if self._value is LazyValue._UNSET:
+            self._value = self._func(*self._args)
+        return self._value
+
+    def __repr__(self) -> str:
+        return repr(self.resolve())
+
+    def __str__(self) -> str:
+        return str(self.resolve())
+
+
+def resolve_lazy_values(
+    _logger: str, _method_name: str, event_dict: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Replace the `LazyValue`s in the event dict by their values."""
+    for key, value in event_dict.items():
+        if isinstance(value, LazyValue):
+            event_dict[key] = value.resolve()
+    return event_dict
+
+
+def _minimum_log_level(*level_configs: Dict[str, str]) -> str:
+    """ Returns the most verbose level used in any of the `level_configs`. """
+    numeric_levels = [
+        getattr(logging, level.upper(), logging.DEBUG)
+        for config in level_configs
+        for level in config.values()
+    ]
+    return logging.getLevelName(min(numeric_levels))
+
+
 def redactor(blacklist: Dict[Pattern, str]) -> Callable[[str], str]:
     """Returns a function which transforms a str, replacing all matches for its replacement"""
 
@@ -199,6 +249,12 @@ def configure_logging(
             "filters": ["user_filter"],
         }
 
+    debug_log_file_level_config = {
+        "": DEFAULT_LOG_LEVEL,
+        "raiden": "DEBUG",
+        **(_debug_log_file_additional_level_filters or {}),
+    }
+
     if not disable_debug_logfile:
         if debug_log_file_name is None:
             time = datetime.datetime.utcnow().isoformat()
@@ -221,11 +277,7 @@ def configure_logging(
                 "user_filter": {"()": RaidenFilter, "log_level_config": logger_level_config},
                 "raiden_debug_file_filter": {
                     "()": RaidenFilter,
-                    "log_level_config": {
-                        "": DEFAULT_LOG_LEVEL,
-                        "raiden": "DEBUG",
-                        **(_debug_log_file_additional_level_filters or {}),
-                    },
+                    "log_level_config": debug_log_file_level_config,
                 },
             },
             "formatters": {
@@ -254,18 +306,30 @@ def configure_logging(
             "loggers": {"": {"handlers": handlers.keys(), "propagate": True}},
         }
     )
+    # `filter_by_level` drops the events rejected by the logger's level
+    # before any other processor runs, and `resolve_lazy_values` computes the
+    # deferred values only for the events which passed it.
     structlog.configure(
-        processors=processors + [structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+        processors=[structlog.stdlib.filter_by_level]
+        + processors
+        + [resolve_lazy_values, structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
         wrapper_class=structlog.stdlib.BoundLogger,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=cache_logger_on_first_use,
     )
 
-    # set logging level of the root logger to DEBUG, to be able to intercept
-    # all messages, which are then be filtered by the `RaidenFilter`
+    # set logging level of the first party loggers to the most verbose level
+    # used by any handler, to be able to intercept all messages, which are then
+    # filtered by the `RaidenFilter`. Anything less verbose is dropped early,
+    # without running the processors.
+    if disable_debug_logfile:
+        first_party_level = _minimum_log_level(logger_level_config)
+    else:
+        first_party_level = _minimum_log_level(logger_level_config, debug_log_file_level_config)
+
     structlog.get_logger("").setLevel(logger_level_config.get("", DEFAULT_LOG_LEVEL))
     for package in _first_party_packages:
-        structlog.get_logger(package).setLevel("DEBUG")
+        structlog.get_logger(package).setLevel(first_party_level)
 
     # rollover RotatingFileHandler on startup, to split logs also per-session
     root = logging.getLogger()
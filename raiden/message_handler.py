@@ -1,6 +1,7 @@
 import structlog
 
 from raiden.constants import ABSENT_SECRET
+from raiden.exceptions import InvalidAddress, UnknownAddress, UnknownTokenAddress
 from raiden.messages import (
     Delivered,
     LockedTransfer,
@@ -27,12 +28,95 @@ from raiden.transfer.mediated_transfer.state_change import (
 from raiden.transfer.state import balanceproof_from_envelope
 from raiden.transfer.state_change import ReceiveDelivered, ReceiveProcessed, ReceiveUnlock
 from raiden.utils import pex, random_secret
-from raiden.utils.typing import MYPY_ANNOTATION, InitiatorAddress, PaymentAmount
+from raiden.utils.typing import MYPY_ANNOTATION, InitiatorAddress, List, Optional, PaymentAmount
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
 class MessageHandler:
+    def on_messages(self, raiden: RaidenService, messages: List[Message]) -> None:
+        """ Handle the `messages` in order.
+
+        Consecutive messages which are converted to a state change without
+        querying the node's state or the blockchain are dispatched as a single
+        batch, the remaining messages are handled individually by
+        `on_message`. A message which can't be handled because of an invalid
+        or unknown address is logged and skipped, the following messages are
+        still handled.
+        """
+        state_changes: List[StateChange] = list()
+
+        for message in messages:
+            state_change = self.message_to_statechange(message)
+
+            if state_change is not None:
+                state_changes.append(state_change)
+            else:
+                # The message may depend on the state changes of the previous
+                # messages, these must be applied first.
+                if state_changes:
+                    raiden.handle_and_track_state_changes(state_changes)
+                    state_changes = list()
+
+                try:
+                    self.on_message(raiden, message)
+                except (InvalidAddress, UnknownAddress, UnknownTokenAddress):
+                    log.warning("Exception while processing message", exc_info=True)
+
+        if state_changes:
+            raiden.handle_and_track_state_changes(state_changes)
+
+    @staticmethod
+    def message_to_statechange(message: Message) -> Optional[StateChange]:
+        """ Returns the state change for `message`, or None if the message
+        needs the node's state or the blockchain to be handled.
+        """
+        # pylint: disable=unidiomatic-typecheck
+
+        if type(message) == SecretRequest:
+            assert isinstance(message, SecretRequest), MYPY_ANNOTATION
+            return ReceiveSecretRequest(
+                payment_identifier=message.payment_identifier,
+                amount=message.amount,
+                expiration=message.expiration,
+                secrethash=message.secrethash,
+                sender=message.sender,
+            )
+
+        elif type(message) == RevealSecret:
+            assert isinstance(message, RevealSecret), MYPY_ANNOTATION
+            return ReceiveSecretReveal(secret=message.secret, sender=message.sender)
+
+        elif type(message) == Unlock:
+            assert isinstance(message, Unlock), MYPY_ANNOTATION
+            balance_proof = balanceproof_from_envelope(message)
+            return ReceiveUnlock(
+                message_identifier=message.message_identifier,
+                secret=message.secret,
+                balance_proof=balance_proof,
+                sender=balance_proof.sender,
+            )
+
+        elif type(message) == LockExpired:
+            assert isinstance(message, LockExpired), MYPY_ANNOTATION
+            balance_proof = balanceproof_from_envelope(message)
+            return ReceiveLockExpired(
+                sender=balance_proof.sender,
+                balance_proof=balance_proof,
+                secrethash=message.secrethash,
+                message_identifier=message.message_identifier,
+            )
+
+        elif type(message) == Delivered:
+            assert isinstance(message, Delivered), MYPY_ANNOTATION
+            return ReceiveDelivered(message.sender, message.delivered_message_identifier)
+
+        elif type(message) == Processed:
+            assert isinstance(message, Processed), MYPY_ANNOTATION
+            return ReceiveProcessed(message.sender, message.message_identifier)
+
+        return None
+
     def on_message(self, raiden: RaidenService, message: Message) -> None:
         # pylint: disable=unidiomatic-typecheck
 
@@ -70,42 +154,28 @@ class MessageHandler:
         else:
             log.error("Unknown message cmdid {}".format(message.cmdid))
 
-    @staticmethod
-    def handle_message_secretrequest(raiden: RaidenService, message: SecretRequest) -> None:
-        secret_request = ReceiveSecretRequest(
-            payment_identifier=message.payment_identifier,
-            amount=message.amount,
-            expiration=message.expiration,
-            secrethash=message.secrethash,
-            sender=message.sender,
-        )
-        raiden.handle_and_track_state_change(secret_request)
+    @classmethod
+    def handle_message_secretrequest(cls, raiden: RaidenService, message: SecretRequest) -> None:
+        state_change = cls.message_to_statechange(message)
+        assert state_change is not None, MYPY_ANNOTATION
+        raiden.handle_and_track_state_change(state_change)
 
-    @staticmethod
-    def handle_message_revealsecret(raiden: RaidenService, message: RevealSecret) -> None:
-        state_change = ReceiveSecretReveal(secret=message.secret, sender=message.sender)
+    @classmethod
+    def handle_message_revealsecret(cls, raiden: RaidenService, message: RevealSecret) -> None:
+        state_change = cls.message_to_statechange(message)
+        assert state_change is not None, MYPY_ANNOTATION
         raiden.handle_and_track_state_change(state_change)
 
-    @staticmethod
-    def handle_message_unlock(raiden: RaidenService, message: Unlock) -> None:
-        balance_proof = balanceproof_from_envelope(message)
-        state_change = ReceiveUnlock(
-            message_identifier=message.message_identifier,
-            secret=message.secret,
-            balance_proof=balance_proof,
-            sender=balance_proof.sender,
-        )
+    @classmethod
+    def handle_message_unlock(cls, raiden: RaidenService, message: Unlock) -> None:
+        state_change = cls.message_to_statechange(message)
+        assert state_change is not None, MYPY_ANNOTATION
         raiden.handle_and_track_state_change(state_change)
 
-    @staticmethod
-    def handle_message_lockexpired(raiden: RaidenService, message: LockExpired) -> None:
-        balance_proof = balanceproof_from_envelope(message)
-        state_change = ReceiveLockExpired(
-            sender=balance_proof.sender,
-            balance_proof=balance_proof,
-            secrethash=message.secrethash,
-            message_identifier=message.message_identifier,
-        )
+    @classmethod
+    def handle_message_lockexpired(cls, raiden: RaidenService, message: LockExpired) -> None:
+        state_change = cls.message_to_statechange(message)
+        assert state_change is not None, MYPY_ANNOTATION
         raiden.handle_and_track_state_change(state_change)
 
     @staticmethod
@@ -184,12 +254,14 @@ class MessageHandler:
         else:
             raiden.mediate_mediated_transfer(message)
 
-    @staticmethod
-    def handle_message_processed(raiden: RaidenService, message: Processed) -> None:
-        processed = ReceiveProcessed(message.sender, message.message_identifier)
-        raiden.handle_and_track_state_change(processed)
+    @classmethod
+    def handle_message_processed(cls, raiden: RaidenService, message: Processed) -> None:
+        state_change = cls.message_to_statechange(message)
+        assert state_change is not None, MYPY_ANNOTATION
+        raiden.handle_and_track_state_change(state_change)
 
-    @staticmethod
-    def handle_message_delivered(raiden: RaidenService, message: Delivered) -> None:
-        delivered = ReceiveDelivered(message.sender, message.delivered_message_identifier)
-        raiden.handle_and_track_state_change(delivered)
+    @classmethod
+    def handle_message_delivered(cls, raiden: RaidenService, message: Delivered) -> None:
+        state_change = cls.message_to_statechange(message)
+        assert state_change is not None, MYPY_ANNOTATION
+        raiden.handle_and_track_state_change(state_change)
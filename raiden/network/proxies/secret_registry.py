@@ -1,15 +1,17 @@
+import time
 from hashlib import sha256
 from typing import List
 
 import gevent
 import structlog
 from eth_utils import encode_hex, event_abi_to_log_topic, is_binary_address, to_normalized_address
-from gevent.event import AsyncResult
+from gevent.event import AsyncResult, Event
 from gevent.lock import Semaphore
 
 from raiden.constants import (
     GAS_REQUIRED_PER_SECRET_IN_BATCH,
     GENESIS_BLOCK_NUMBER,
+    MAXIMUM_PENDING_TRANSFERS,
     RECEIPT_FAILURE_CODE,
 )
 from raiden.exceptions import (
@@ -20,9 +22,12 @@ from raiden.exceptions import (
 )
 from raiden.network.proxies.utils import compare_contract_versions, log_transaction
 from raiden.network.rpc.client import StatelessFilter, check_address_has_code
+from raiden.settings import DEFAULT_SECRET_REGISTRY_BATCH_LINGER
 from raiden.utils import pex, safe_gas_limit
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram
 from raiden.utils.typing import (
     Any,
+    BlockExpiration,
     BlockNumber,
     BlockSpecification,
     Dict,
@@ -36,9 +41,39 @@ from raiden_contracts.contract_manager import ContractManager
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
+# A transaction sent this close to the expiration of a lock may not be mined in
+# time, queued secrets of such a lock are registered without lingering.
+SECRET_REGISTRY_BATCH_MIN_BLOCKS_LEFT = 2
+
+
+def _expires_soon(expiration: BlockExpiration, block_number: BlockNumber) -> bool:
+    return expiration - block_number <= SECRET_REGISTRY_BATCH_MIN_BLOCKS_LEFT
+
+
+class _QueuedSecrets:
+    """ Secrets waiting to be registered with a single transaction. """
+
+    def __init__(self) -> None:
+        self.secrets: List[Secret] = list()
+        self.expirations: List[BlockExpiration] = list()
+        self.queued_at = time.monotonic()
+        # Known once the sending greenlet checked the expirations, a secret
+        # queued later is checked against it by `register_secret`
+        self.block_number: Optional[BlockNumber] = None
+        # Set when the batch must be sent without waiting for the linger to
+        # be over, because it is full or one of its locks expires soon
+        self.send_now = Event()
+        self.result = AsyncResult()
+
 
 class SecretRegistry:
-    def __init__(self, jsonrpc_client, secret_registry_address, contract_manager: ContractManager):
+    def __init__(
+        self,
+        jsonrpc_client,
+        secret_registry_address,
+        contract_manager: ContractManager,
+        batch_linger: float = DEFAULT_SECRET_REGISTRY_BATCH_LINGER,
+    ):
         if not is_binary_address(secret_registry_address):
             raise InvalidAddress("Expected binary address format for secret registry")
 
@@ -70,8 +105,113 @@ class SecretRegistry:
         self.open_secret_transactions: Dict[Secret, AsyncResult] = dict()
         self._open_secret_transactions_lock = Semaphore()
 
-    def register_secret(self, secret: Secret):
-        self.register_secret_batch([secret])
+        # Secrets given to `register_secret` are coalesced into the batch
+        # below, which is sent by its own greenlet once the linger is over.
+        self.batch_linger = batch_linger
+        self._queued_secrets: Optional[_QueuedSecrets] = None
+        self._queued_secrets_lock = Semaphore()
+        self.batch_size_histogram = Histogram(
+            "raiden_secret_registry_batch_size",
+            "Number of secrets registered with a single registerSecretBatch transaction",
+            buckets=(1, 2, 5, 10, 20, 50, 100, MAXIMUM_PENDING_TRANSFERS),
+        )
+        self.batch_delay_histogram = Histogram(
+            "raiden_secret_registry_batch_delay_seconds",
+            "Time between the first secret of a batch being queued and the batch being sent",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+
+    def get_metrics(self) -> List[Histogram]:
+        return [self.batch_size_histogram, self.batch_delay_histogram]
+
+    def register_secret(self, secret: Secret, expiration: BlockExpiration = None) -> None:
+        """Register `secret`, together with the secrets given to this method
+        by other greenlets within `batch_linger` seconds.
+
+        Every `registerSecretBatch` transaction checks which secrets are
+        already registered and estimates its gas, so coalescing a burst of
+        registrations, e.g. the locks which entered the danger zone in the
+        same block, saves these calls and the base cost of the transactions.
+        The batch is sent without waiting for the linger to be over if
+        `expiration`, the expiration of the lock unlocked by the secret, is
+        close.
+        """
+        with self._queued_secrets_lock:
+            batch = self._queued_secrets
+            if batch is None:
+                batch = _QueuedSecrets()
+                self._queued_secrets = batch
+                gevent.spawn(self._register_queued_secrets, batch)
+
+            if secret not in batch.secrets:
+                batch.secrets.append(secret)
+            if expiration is not None:
+                batch.expirations.append(expiration)
+                if batch.block_number is not None and _expires_soon(
+                    expiration, batch.block_number
+                ):
+                    batch.send_now.set()
+
+            # A full batch is sent right away, the next secret starts a new one
+            if len(batch.secrets) >= MAXIMUM_PENDING_TRANSFERS:
+                self._queued_secrets = None
+                batch.send_now.set()
+
+        batch.result.get()
+
+    def _register_queued_secrets(self, batch: _QueuedSecrets) -> None:
+        # The callers of `register_secret` wait for the result of the batch,
+        # it must be set whatever fails, and the batch must not be joined by
+        # new secrets once it is not sent anymore. The callers are the
+        # node's event handlers, the error crashes the node through them.
+        try:
+            self._send_queued_secrets(batch)
+        except Exception as e:  # pylint: disable=broad-except
+            with self._queued_secrets_lock:
+                if self._queued_secrets is batch:
+                    self._queued_secrets = None
+
+            log.error(
+                "Registering queued secrets failed",
+                node=pex(self.node_address),
+                contract=pex(self.address),
+                num_secrets=len(batch.secrets),
+                error=str(e),
+            )
+            batch.result.set_exception(e)
+        else:
+            batch.result.set()
+
+    def _send_queued_secrets(self, batch: _QueuedSecrets) -> None:
+        # Yield once, so that the greenlets scheduled together with this one,
+        # e.g. the handlers of the other events of the same block, can queue
+        # their secrets before the expirations are checked.
+        gevent.sleep(0)
+
+        block_number = self.client.block_number()
+        with self._queued_secrets_lock:
+            batch.block_number = block_number
+            if batch.expirations and _expires_soon(min(batch.expirations), block_number):
+                batch.send_now.set()
+
+        batch.send_now.wait(self.batch_linger)
+
+        with self._queued_secrets_lock:
+            if self._queued_secrets is batch:
+                self._queued_secrets = None
+
+        queued_for = time.monotonic() - batch.queued_at
+        self.batch_size_histogram.observe(len(batch.secrets))
+        self.batch_delay_histogram.observe(queued_for)
+        log.debug(
+            "Registering queued secrets",
+            node=pex(self.node_address),
+            contract=pex(self.address),
+            num_secrets=len(batch.secrets),
+            queued_for=queued_for,
+        )
+
+        self.register_secret_batch(batch.secrets)
 
     def register_secret_batch(self, secrets: List[Secret]):
         """Register a batch of secrets. Check if they are already registered at
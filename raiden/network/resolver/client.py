@@ -1,24 +1,137 @@
+import random
+import time
+from hashlib import sha256
 from http import HTTPStatus
 from typing import TYPE_CHECKING
 
+import gevent
 import requests
+import structlog
+from cachetools import LRUCache
 from eth_utils import to_bytes, to_hex
+from gevent.lock import BoundedSemaphore
+from requests.adapters import HTTPAdapter
 
+from raiden.settings import (
+    DEFAULT_RESOLVER_CACHE_SIZE,
+    DEFAULT_RESOLVER_POOL_SIZE,
+    DEFAULT_RESOLVER_RETRIES,
+    DEFAULT_RESOLVER_RETRY_BACKOFF,
+    DEFAULT_RESOLVER_TIMEOUT,
+)
 from raiden.storage.wal import WriteAheadLog
 from raiden.transfer.mediated_transfer.events import SendSecretRequest
 from raiden.transfer.mediated_transfer.state_change import ReceiveSecretReveal
 from raiden.utils import Secret
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram
+from raiden.utils.typing import Any, Dict, Optional, SecretHash
 
 if TYPE_CHECKING:
     # pylint: disable=unused-import
     from raiden.raiden_service import RaidenService
 
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+class ResolverClient:
+    """ Asks the resolver server at `endpoint` for the secrets of the payments
+    received by the node.
+
+    The connections to the resolver are kept alive and reused, and at most
+    `pool_size` requests are sent at once. A request waits at most `timeout`
+    seconds for a connection and for each of its attempts, failed attempts are
+    retried `retries` times after a random delay which grows exponentially.
+    The resolved secrets are cached, so that the secret requests emitted again
+    for the same payment do not reach the resolver.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        pool_size: int = DEFAULT_RESOLVER_POOL_SIZE,
+        timeout: float = DEFAULT_RESOLVER_TIMEOUT,
+        retries: int = DEFAULT_RESOLVER_RETRIES,
+        retry_backoff: float = DEFAULT_RESOLVER_RETRY_BACKOFF,
+        cache_size: int = DEFAULT_RESOLVER_CACHE_SIZE,
+    ) -> None:
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._semaphore = BoundedSemaphore(pool_size)
+
+        self.resolved_secrets: Dict[SecretHash, Secret] = LRUCache(maxsize=cache_size)
+        self.request_latency_histogram = Histogram(
+            "raiden_resolver_request_duration_seconds",
+            "Time to get an answer from the resolver, including the retries",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+
+    def resolve(self, secrethash: SecretHash, request: Dict[str, Any]) -> Optional[Secret]:
+        """ Returns the secret of `secrethash`, or None if the resolver does
+        not know it or could not be reached.
+        """
+        secret = self.resolved_secrets.get(secrethash)
+        if secret is not None:
+            return secret
+
+        start = time.monotonic()
+        response = self._post(request)
+        self.request_latency_histogram.observe(time.monotonic() - start)
+
+        if response is None or response.status_code != HTTPStatus.OK:
+            return None
+
+        try:
+            secret = Secret(to_bytes(hexstr=response.json()["secret"]))
+        except (ValueError, KeyError, TypeError):
+            log.warning("Invalid response from the resolver", response=response.text)
+            return None
+
+        if sha256(secret).digest() != secrethash:
+            log.warning(
+                "The resolver answered with the wrong secret", secrethash=to_hex(secrethash)
+            )
+            return None
+
+        self.resolved_secrets[secrethash] = secret
+        return secret
+
+    def _post(self, request: Dict[str, Any]) -> Optional[requests.Response]:
+        for attempt in range(self.retries + 1):
+            if attempt:
+                gevent.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+
+            if not self._semaphore.acquire(timeout=self.timeout):
+                log.debug("Too many requests to the resolver", endpoint=self.endpoint)
+                return None
+
+            try:
+                response = self.session.post(self.endpoint, json=request, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                log.debug("Request to the resolver failed", endpoint=self.endpoint, error=str(e))
+                continue
+            finally:
+                self._semaphore.release()
+
+            # Only server errors are transient, the resolver answers with a
+            # client error when it does not know the secret
+            if response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+                return response
+
+        return None
+
 
 def reveal_secret_with_resolver(
     raiden: "RaidenService", secret_request_event: SendSecretRequest
 ) -> bool:
 
-    if "resolver_endpoint" not in raiden.config:
+    if raiden.resolver_client is None:
         return False
 
     assert isinstance(raiden.wal, WriteAheadLog), "RaidenService has not been started"
@@ -42,17 +155,10 @@ def reveal_secret_with_resolver(
         "settle_timeout": raiden.config["settle_timeout"],
     }
 
-    try:
-        response = requests.post(raiden.config["resolver_endpoint"], json=request)
-    except requests.exceptions.RequestException:
-        return False
-
-    if response is None or response.status_code != HTTPStatus.OK:
+    secret = raiden.resolver_client.resolve(secret_request_event.secrethash, request)
+    if secret is None:
         return False
 
-    state_change = ReceiveSecretReveal(
-        sender=secret_request_event.recipient,
-        secret=Secret(to_bytes(hexstr=response.json()["secret"])),
-    )
+    state_change = ReceiveSecretReveal(sender=secret_request_event.recipient, secret=secret)
     raiden.handle_and_track_state_change(state_change)
     return True
@@ -3,7 +3,7 @@ import json
 import os
 import warnings
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import gevent
 import structlog
@@ -15,7 +15,10 @@ from eth_utils import (
     to_canonical_address,
     to_checksum_address,
 )
+from gevent import Greenlet
+from gevent.event import AsyncResult
 from gevent.lock import Semaphore
+from gevent.pool import Pool
 from hexbytes import HexBytes
 from requests.exceptions import ConnectTimeout
 from web3 import Web3
@@ -38,11 +41,14 @@ from raiden.network.rpc.middleware import (
     block_hash_cache_middleware,
     connection_test_middleware,
     http_retry_with_backoff_middleware,
+    make_request_latency_middleware,
 )
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
+from raiden.settings import DEFAULT_RECEIPT_CHECK_MAX_FAILURES, DEFAULT_RECEIPT_CHECK_POOL_SIZE
 from raiden.utils import pex, privatekey_to_address
 from raiden.utils.ethereum_clients import is_supported_client
 from raiden.utils.filters import StatelessFilter
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram, MetricVector
 from raiden.utils.solc import (
     solidity_library_symbol,
     solidity_resolve_symbols,
@@ -53,6 +59,7 @@ from raiden.utils.typing import (
     Address,
     AddressHex,
     BlockHash,
+    BlockNumber,
     BlockSpecification,
     CompiledContract,
     Nonce,
@@ -465,6 +472,23 @@ class JSONRPCClient:
 
         monkey_patch_web3(web3, gas_price_strategy)
 
+        # Only the latest client of a shared web3 instance, e.g. with the
+        # eth-tester setup, records the latencies.
+        self.request_latency_histograms = MetricVector(
+            Histogram,
+            "raiden_rpc_request_duration_seconds",
+            "Time to complete the JSON-RPC requests to the ethereum node",
+            label="method",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+        request_latency_middleware = make_request_latency_middleware(
+            self.request_latency_histograms
+        )
+        try:
+            web3.middleware_stack.add(request_latency_middleware, name="request_latency")
+        except ValueError:
+            web3.middleware_stack.replace("request_latency", request_latency_middleware)
+
         try:
             version = web3.version.node
         except ConnectTimeout:
@@ -508,6 +532,16 @@ class JSONRPCClient:
 
         self._available_nonce = available_nonce
         self._nonce_lock = Semaphore()
+        self._gas_price_lock = Semaphore()
+
+        # Transactions waited for by `poll`, checked once per block when the
+        # receipts are tracked
+        self._receipt_tracking = False
+        self._receipts_checker: Optional[Greenlet] = None
+        self._pending_transactions: Dict[str, AsyncResult] = dict()
+        self._transactions_in_pool: Set[str] = set()
+        self._receipt_check_failures: Dict[str, int] = dict()
+        self._gas_price_cache: Tuple[Optional[BlockNumber], int] = (None, 0)
         self._gas_estimate_correction = gas_estimate_correction
 
         log.debug(
@@ -520,6 +554,9 @@ class JSONRPCClient:
     def __repr__(self):
         return f"<JSONRPCClient node:{pex(self.address)} nonce:{self._available_nonce}>"
 
+    def get_metrics(self) -> List[MetricVector]:
+        return [self.request_latency_histograms]
+
     def block_number(self):
         """ Return the most recent block. """
         return self.web3.eth.blockNumber
@@ -577,6 +614,25 @@ class JSONRPCClient:
         return None
 
     def gas_price(self) -> int:
+        """ Returns the gas price for transactions sent at the current block.
+
+        The price is computed once per block and shared by all transactions
+        sent in it, the time based gas price strategies sample the recent
+        blocks and are too expensive to run for every transaction.
+        """
+        block_number = self.block_number()
+
+        with self._gas_price_lock:
+            cached_block_number, cached_price = self._gas_price_cache
+            if cached_block_number == block_number:
+                return cached_price
+
+            price = self._generate_gas_price()
+            self._gas_price_cache = (block_number, price)
+
+        return price
+
+    def _generate_gas_price(self) -> int:
         try:
             # generateGasPrice takes the transaction to be send as an optional argument
             # but both strategies that we are using (time-based and rpc-based) don't make
@@ -748,29 +804,25 @@ class JSONRPCClient:
         if to == to_canonical_address(constants.NULL_ADDRESS):
             warnings.warn("For contract creation the empty string must be used.")
 
-        with self._nonce_lock:
-            nonce = self._available_nonce
-            gas_price = self.gas_price()
-
-            transaction = {
-                "data": data,
-                "gas": startgas,
-                "nonce": nonce,
-                "value": value,
-                "gasPrice": gas_price,
-            }
-            node_gas_price = self.web3.eth.gasPrice
-            log.debug(
-                "Calculated gas price for transaction",
-                node=pex(self.address),
-                calculated_gas_price=gas_price,
-                node_gas_price=node_gas_price,
-            )
+        # Only the nonce allocation and the submission are serialized, this
+        # allows concurrent transactions to be sent back to back and be mined
+        # in the same block. Everything that requires a request to the
+        # ethereum node, like the gas price, is done before taking the lock.
+        gas_price = self.gas_price()
+        log.debug(
+            "Calculated gas price for transaction",
+            node=pex(self.address),
+            calculated_gas_price=gas_price,
+        )
 
-            # add the to address if not deploying a contract
-            if to != b"":
-                transaction["to"] = to_checksum_address(to)
+        transaction = {"data": data, "gas": startgas, "value": value, "gasPrice": gas_price}
 
+        # add the to address if not deploying a contract
+        if to != b"":
+            transaction["to"] = to_checksum_address(to)
+
+        with self._nonce_lock:
+            transaction["nonce"] = self._available_nonce
             signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
 
             log_details = {
@@ -787,7 +839,107 @@ class JSONRPCClient:
             log.debug("send_raw_transaction returned", tx_hash=encode_hex(tx_hash), **log_details)
             return tx_hash
 
-    def poll(self, transaction_hash: bytes):
+    def start_receipt_tracking(self) -> None:
+        """ Wait for transactions with `check_pending_transactions` instead of
+        polling each one of them.
+
+        `check_pending_transactions` must be called for every new block, e.g.
+        by registering it as a callback of the AlarmTask.
+        """
+        self._receipt_tracking = True
+
+    def stop_receipt_tracking(self) -> None:
+        """ Go back to polling, the greenlets waiting for a transaction resume
+        polling for it.
+        """
+        self._receipt_tracking = False
+
+        pending_transactions = self._pending_transactions
+        self._pending_transactions = dict()
+        self._receipt_check_failures = dict()
+        for result in pending_transactions.values():
+            result.set(None)
+
+    def check_pending_transactions(self, latest_block: Dict) -> None:
+        """ Checks the receipts of all the transactions waited for with `poll`.
+
+        This is called for every new block. The receipts are fetched
+        concurrently by a bounded pool, if the check of the previous block is
+        still running this block is skipped. A transaction whose receipt can't
+        be fetched stays pending, the waiter gets the error only once the
+        check failed for `DEFAULT_RECEIPT_CHECK_MAX_FAILURES` blocks in a row.
+        """
+        if not self._pending_transactions:
+            return
+
+        receipts_checker = self._receipts_checker
+        if receipts_checker is None or receipts_checker.ready():
+            self._receipts_checker = gevent.spawn(
+                self._check_pending_transactions, latest_block["number"]
+            )
+            self._receipts_checker.name = (
+                f"JSONRPCClient._check_pending_transactions node:{pex(self.address)}"
+            )
+
+    def _check_pending_transactions(self, block_number: BlockNumber) -> None:
+        pending_transactions = list(self._pending_transactions.items())
+        pool = Pool(size=DEFAULT_RECEIPT_CHECK_POOL_SIZE)
+        for transaction_hash, result in pending_transactions:
+            pool.spawn(self._check_pending_transaction, transaction_hash, result, block_number)
+        pool.join()
+
+    def _check_pending_transaction(
+        self, transaction_hash: str, result: AsyncResult, block_number: BlockNumber
+    ) -> None:
+        try:
+            receipt = self.web3.eth.getTransactionReceipt(transaction_hash)
+
+            if receipt is None:
+                # used to check if the transaction was removed, see `poll`
+                transaction = self.web3.eth.getTransaction(transaction_hash)
+                if transaction is not None:
+                    self._transactions_in_pool.add(transaction_hash)
+                elif transaction_hash in self._transactions_in_pool:
+                    self._resolve_pending_transaction(transaction_hash)
+                    result.set_exception(Exception("invalid transaction, check gas price"))
+                    return
+
+                self._receipt_check_failures.pop(transaction_hash, None)
+                return
+
+            # this will wait for both APPLIED and REVERTED transactions
+            confirmation_block = receipt["blockNumber"] + self.default_block_num_confirmations
+            if block_number >= confirmation_block:
+                self._resolve_pending_transaction(transaction_hash)
+                result.set(receipt)
+            else:
+                self._receipt_check_failures.pop(transaction_hash, None)
+
+        except Exception as e:  # pylint: disable=broad-except
+            # The transaction stays pending and is checked again with the next
+            # block, only a node which keeps failing is reported to the waiter,
+            # the same way `poll` does
+            failures = self._receipt_check_failures.get(transaction_hash, 0) + 1
+            self._receipt_check_failures[transaction_hash] = failures
+
+            log.warning(
+                "Checking the transaction receipt failed",
+                node=pex(self.address),
+                transaction_hash=transaction_hash,
+                failures=failures,
+                error=str(e),
+            )
+
+            if failures >= DEFAULT_RECEIPT_CHECK_MAX_FAILURES:
+                self._resolve_pending_transaction(transaction_hash)
+                result.set_exception(e)
+
+    def _resolve_pending_transaction(self, transaction_hash: str) -> None:
+        self._transactions_in_pool.discard(transaction_hash)
+        self._receipt_check_failures.pop(transaction_hash, None)
+        self._pending_transactions.pop(transaction_hash, None)
+
+    def poll(self, transaction_hash: bytes) -> None:
         """ Wait until the `transaction_hash` is applied or rejected.
 
         Args:
@@ -798,6 +950,16 @@ class JSONRPCClient:
 
         transaction_hash = encode_hex(transaction_hash)
 
+        if self._receipt_tracking:
+            result = self._pending_transactions.get(transaction_hash)
+            if result is None:
+                result = AsyncResult()
+                self._pending_transactions[transaction_hash] = result
+
+            # None is set when the tracking is stopped, fall back to polling
+            if result.get() is not None:
+                return
+
         # used to check if the transaction was removed, this could happen
         # if gas price is too low:
         #
@@ -827,7 +989,7 @@ class JSONRPCClient:
                 block_number = self.block_number()
 
                 if block_number >= confirmation_block:
-                    return transaction
+                    return
 
             gevent.sleep(1.0)
 
@@ -1,4 +1,5 @@
 import functools
+import time
 from json.decoder import JSONDecodeError
 from typing import Tuple
 
@@ -9,6 +10,7 @@ from web3.middleware.cache import construct_simple_cache_middleware
 from web3.middleware.exception_retry_request import check_if_retry_on_failure
 
 from raiden.exceptions import EthNodeCommunicationError
+from raiden.utils.metrics import MetricVector
 
 
 def make_connection_test_middleware():
@@ -35,6 +37,24 @@ def make_connection_test_middleware():
 connection_test_middleware = make_connection_test_middleware()
 
 
+def make_request_latency_middleware(latency_histograms: MetricVector):
+    def request_latency_middleware(make_request, web3):  # pylint: disable=unused-argument
+        """ Creates middleware that records the latency of the requests by
+        JSON-RPC method.
+        """
+
+        def middleware(method, params):
+            start = time.monotonic()
+            try:
+                return make_request(method, params)
+            finally:
+                latency_histograms.labels(method).observe(time.monotonic() - start)
+
+        return middleware
+
+    return request_latency_middleware
+
+
 BLOCK_HASH_CACHE_RPC_WHITELIST = {"eth_getBlockByHash"}
 
 
@@ -1,12 +1,13 @@
 import json
 import time
 from functools import wraps
-from itertools import repeat
-from typing import Any, Callable, Container, Dict, Iterable, List, Optional
+from itertools import chain, repeat
+from typing import Any, Callable, Container, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import quote
 
 import gevent
 import structlog
+from gevent.event import AsyncResult, Event
 from gevent.lock import Semaphore
 from matrix_client.api import MatrixHttpApi
 from matrix_client.client import CACHE, MatrixClient
@@ -15,8 +16,15 @@ from matrix_client.room import Room as MatrixRoom
 from matrix_client.user import User
 from requests.adapters import HTTPAdapter
 
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram
+
 log = structlog.get_logger(__name__)
 
+# Maps an ordering key (a room id, or the name of a non-room section of the
+# /sync response) to the event set once the previous response has handled it,
+# and the event to set once this response has handled it.
+SyncOrdering = Dict[str, Tuple[Optional[Event], Event]]
+
 
 class Room(MatrixRoom):
     """ Matrix `Room` subclass that invokes listener callbacks in separate greenlets """
@@ -187,6 +195,7 @@ class GMatrixClient(MatrixClient):
 
     sync_filter: str
     sync_thread: gevent.Greenlet = None
+    # greenlet handling the most recent /sync response
     _handle_thread: gevent.Greenlet = None
 
     def __init__(
@@ -200,12 +209,33 @@ class GMatrixClient(MatrixClient):
         http_pool_maxsize: int = 10,
         http_retry_timeout: int = 60,
         http_retry_delay: Callable[[], Iterable[float]] = lambda: repeat(1),
+        sync_pipeline_depth: int = 4,
     ) -> None:
         # dict of 'type': 'content' key/value pairs
         self.account_data: Dict[str, Dict[str, Any]] = dict()
         self._post_hook_func: Optional[Callable[[str], None]] = None
         self.token: Optional[str] = None
 
+        if sync_pipeline_depth < 1:
+            raise ValueError("sync_pipeline_depth must be at least 1")
+        self.sync_pipeline_depth = sync_pipeline_depth
+        # greenlets handling /sync responses, oldest first
+        self._handle_threads: List[gevent.Greenlet] = list()
+        self._last_handled: Dict[str, Event] = dict()
+        # set to whether the most recent /sync response and the earlier ones were handled
+        self._last_response_handled: Optional[AsyncResult] = None
+
+        self.sync_lag_histogram = Histogram(
+            "raiden_matrix_sync_lag_seconds",
+            "Time between a /sync response being received and it being completely handled",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+        self.sync_handle_time_histogram = Histogram(
+            "raiden_matrix_sync_handle_time_seconds",
+            "Time spent running the listeners for a /sync response",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+
         super().__init__(
             base_url, token, user_id, valid_cert_check, sync_filter_limit, cache_level
         )
@@ -281,10 +311,11 @@ class GMatrixClient(MatrixClient):
         if self.sync_thread:
             self.sync_thread.kill()
             self.sync_thread.get()
-        if self._handle_thread is not None:
-            self._handle_thread.get()
+        while self._handle_threads:
+            self._handle_threads.pop(0).get()
         self.sync_thread = None
         self._handle_thread = None
+        self._last_response_handled = None
 
     def logout(self):
         super().logout()
@@ -369,52 +400,213 @@ class GMatrixClient(MatrixClient):
         return callback(*args, **kwargs)
 
     def _sync(self, timeout_ms=30000):
-        """ Reimplements MatrixClient._sync, add 'account_data' support to /sync """
+        """ Reimplements MatrixClient._sync, add 'account_data' support to /sync
+
+        The responses are handled in a bounded pipeline. Each response is
+        handled by its own greenlet, so the next long-poll is already in flight
+        while the previous response is processed. At most
+        `sync_pipeline_depth` responses are handled concurrently, once the
+        pipeline is full the next /sync waits for the oldest handler. The
+        events of a room, as well as the presence and to_device events, are
+        handled in the order they were synced, each by its own greenlet.
+        The post sync hook is called with the token of a response once it and
+        all the earlier responses are handled.
+        """
         response = self.api.sync(self.sync_token, timeout_ms)
+        received_at = time.time()
         prev_sync_token = self.sync_token
         self.sync_token = response["next_batch"]
 
-        if self._handle_thread is not None:
-            # if previous _handle_thread is still running, wait for it and re-raise if needed
-            self._handle_thread.get()
+        self._wait_for_pipeline_slot()
 
         is_first_sync = prev_sync_token is None
-        self._handle_thread = gevent.Greenlet(self._handle_response, response, is_first_sync)
-        self._handle_thread.name = (
+        handled = AsyncResult()
+        handle_thread = gevent.Greenlet(
+            self._handle_response,
+            response,
+            is_first_sync,
+            self._order_response(response),
+            received_at,
+            (self._last_response_handled, handled),
+        )
+        self._last_response_handled = handled
+        handle_thread.name = (
             f"GMatrixClient._sync user_id:{self.user_id} sync_token:{prev_sync_token}"
         )
-        self._handle_thread.link_exception(lambda g: self.sync_thread.kill(g.exception))
-        self._handle_thread.start()
+        handle_thread.link_exception(lambda g: self.sync_thread.kill(g.exception))
+        handle_thread.start()
+        self._handle_threads.append(handle_thread)
+        self._handle_thread = handle_thread
+
+    def _wait_for_pipeline_slot(self):
+        """ Block until fewer than `sync_pipeline_depth` responses are being handled.
+
+        Finished handlers are removed, re-raising their errors if needed.
+        """
+        while True:
+            for handle_thread in [thread for thread in self._handle_threads if thread.ready()]:
+                self._handle_threads.remove(handle_thread)
+                handle_thread.get()
+
+            if len(self._handle_threads) < self.sync_pipeline_depth:
+                return
+
+            gevent.wait(self._handle_threads, count=1)
+
+    def _order_response(self, response) -> SyncOrdering:
+        """ Chain the handling of every room in `response` to the previous responses. """
+        ordering_keys = {"presence", "to_device"}
+        for membership in ("invite", "leave", "join"):
+            ordering_keys.update(response["rooms"][membership].keys())
+
+        ordering: SyncOrdering = dict()
+        for key in ordering_keys:
+            done = Event()
+            ordering[key] = (self._last_handled.get(key), done)
+            self._last_handled[key] = done
+
+        # forget the rooms which are fully handled, to not grow with every room ever seen
+        for key, done in list(self._last_handled.items()):
+            if done.is_set():
+                del self._last_handled[key]
+
+        return ordering
+
+    def _handle_response(
+        self,
+        response,
+        first_sync: bool = False,
+        ordering: SyncOrdering = None,
+        received_at: float = None,
+        handled: Tuple[Optional[AsyncResult], AsyncResult] = None,
+    ):
+        busy = 0.0
+        turn_started: Dict[str, float] = dict()
+
+        def wait_turn(key: str) -> None:
+            previous = ordering[key][0] if ordering else None
+            if previous is not None:
+                previous.wait()
+            turn_started[key] = time.time()
+
+        def done(key: str) -> None:
+            nonlocal busy
+            busy += time.time() - turn_started.pop(key)
+            if ordering:
+                ordering[key][1].set()
+
+        success = False
+        try:
+            self._handle_response_in_order(response, first_sync, wait_turn, done)
+            success = True
+        finally:
+            # on errors release the remaining rooms too, so later handlers don't block forever
+            for _, done_event in (ordering or {}).values():
+                done_event.set()
+
+            self.sync_handle_time_histogram.observe(busy)
+            if received_at is not None:
+                self.sync_lag_histogram.observe(time.time() - received_at)
+
+            if handled is not None:
+                self._response_handled(response["next_batch"], success, *handled)
+
+    def _response_handled(
+        self,
+        sync_token: str,
+        success: bool,
+        previous_handled: Optional[AsyncResult],
+        handled: AsyncResult,
+    ):
+        """ Call the post sync hook with `sync_token` once its response and all
+        the earlier ones are handled.
+
+        The token is persisted by the hook, a restarted node would skip the
+        events of an earlier response which was still being handled.
+        """
+        try:
+            if success and previous_handled is not None:
+                success = previous_handled.get()
+            if success and self._post_hook_func is not None:
+                self._post_hook_func(sync_token)
+        finally:
+            handled.set(success)
+
+    def _handle_response_in_order(
+        self,
+        response,
+        first_sync: bool,
+        wait_turn: Callable[[str], None],
+        done: Callable[[str], None],
+    ):
+        # the presence events, the to_device events and every room are handled
+        # by their own greenlet, so that one of them waiting for an earlier
+        # response doesn't hold up the others
+        rooms = response["rooms"]
+        room_ids = dict.fromkeys(chain(rooms["invite"], rooms["leave"], rooms["join"]))
+        threads = [
+            gevent.spawn(self._handle_presence, response, wait_turn, done),
+            gevent.spawn(self._handle_to_device, response, wait_turn, done),
+        ]
+        threads.extend(
+            gevent.spawn(self._handle_room, room_id, response, wait_turn, done)
+            for room_id in room_ids
+        )
+        try:
+            gevent.joinall(threads, raise_error=True)
+        finally:
+            gevent.killall(threads)
 
-        if self._post_hook_func is not None:
-            self._post_hook_func(self.sync_token)
+        if first_sync:
+            # Only update the local account data on first sync to avoid races.
+            # We don't support running multiple raiden nodes for the same eth account,
+            # therefore no situation where we would need to be updated from the server
+            # can happen.
+            for event in response["account_data"]["events"]:
+                self.account_data[event["type"]] = event["content"]
 
-    def _handle_response(self, response, first_sync=False):
-        # Handle presence after rooms
+    def _handle_presence(
+        self, response, wait_turn: Callable[[str], None], done: Callable[[str], None]
+    ):
+        wait_turn("presence")
         for presence_update in response["presence"]["events"]:
             for callback in self.presence_listeners.values():
                 self.call(callback, presence_update)
+        done("presence")
 
+    def _handle_to_device(
+        self, response, wait_turn: Callable[[str], None], done: Callable[[str], None]
+    ):
+        wait_turn("to_device")
         for to_device_message in response["to_device"]["events"]:
             for listener in self.listeners:
                 if listener["event_type"] == "to_device":
                     self.call(listener["callback"], to_device_message)
+        done("to_device")
 
-        for room_id, invite_room in response["rooms"]["invite"].items():
+    def _handle_room(
+        self, room_id: str, response, wait_turn: Callable[[str], None], done: Callable[[str], None]
+    ):
+        wait_turn(room_id)
+
+        invite_room = response["rooms"]["invite"].get(room_id)
+        if invite_room is not None:
             for listener in self.invite_listeners:
                 self.call(listener, room_id, invite_room["invite_state"])
 
-        for room_id, left_room in response["rooms"]["leave"].items():
+        left_room = response["rooms"]["leave"].get(room_id)
+        if left_room is not None:
             for listener in self.left_listeners:
                 self.call(listener, room_id, left_room)
             if room_id in self.rooms:
                 del self.rooms[room_id]
 
-        for room_id, sync_room in response["rooms"]["join"].items():
+        sync_room = response["rooms"]["join"].get(room_id)
+        if sync_room is not None:
             if room_id not in self.rooms:
                 self._mkroom(room_id)
             room = self.rooms[room_id]
-            # TODO: the rest of this for loop should be in room object method
+            # TODO: the rest of this block should be in room object method
             room.prev_batch = sync_room["timeline"]["prev_batch"]
 
             for event in sync_room["state"]["events"]:
@@ -450,13 +642,7 @@ class GMatrixClient(MatrixClient):
             for event in sync_room["account_data"]["events"]:
                 room.account_data[event["type"]] = event["content"]
 
-        if first_sync:
-            # Only update the local account data on first sync to avoid races.
-            # We don't support running multiple raiden nodes for the same eth account,
-            # therefore no situation where we would need to be updated from the server
-            # can happen.
-            for event in response["account_data"]["events"]:
-                self.account_data[event["type"]] = event["content"]
+        done(room_id)
 
     def set_account_data(self, type_: str, content: Dict[str, Any]) -> dict:
         """ Use this to set a key: value pair in account_data to keep it synced on server """
@@ -12,7 +12,8 @@ from gevent.queue import JoinableQueue
 from matrix_client.errors import MatrixRequestError
 
 from raiden.constants import DISCOVERY_DEFAULT_ROOM, EMPTY_SIGNATURE
-from raiden.exceptions import InvalidAddress, TransportError, UnknownAddress, UnknownTokenAddress
+from raiden.exceptions import TransportError
+from raiden.log_config import LazyValue
 from raiden.message_handler import MessageHandler
 from raiden.messages import (
     Delivered,
@@ -40,6 +41,12 @@ from raiden.network.transport.matrix.utils import (
 )
 from raiden.network.transport.utils import timeout_exponential_backoff
 from raiden.raiden_service import RaidenService
+from raiden.settings import (
+    DEFAULT_TRANSPORT_MATRIX_BATCH_LINGER,
+    DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_BYTES,
+    DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_MESSAGES,
+    DEFAULT_TRANSPORT_MATRIX_SYNC_PIPELINE_DEPTH,
+)
 from raiden.storage.serialization import JSONSerializer
 from raiden.transfer import views
 from raiden.transfer.identifiers import QueueIdentifier
@@ -55,6 +62,14 @@ from raiden.transfer.state_change import (
     ActionUpdateTransportAuthData,
 )
 from raiden.utils import pex
+from raiden.utils.metrics import (
+    DEFAULT_LATENCY_BUCKETS,
+    Counter,
+    Gauge,
+    Histogram,
+    Metric,
+    MetricVector,
+)
 from raiden.utils.runnable import Runnable
 from raiden.utils.typing import (
     Address,
@@ -90,6 +105,8 @@ class _RetryQueue(Runnable):
         text: str
         # generator that tells if the message should be sent now
         expiration_generator: Iterator[bool]
+        # time the message was enqueued, None once it has been sent for the first time
+        enqueued_at: Optional[float]
 
     def __init__(self, transport: "MatrixTransport", receiver: Address):
         self.transport = transport
@@ -97,6 +114,7 @@ class _RetryQueue(Runnable):
         self._message_queue: List[_RetryQueue._MessageData] = list()
         self._notify_event = gevent.event.Event()
         self._lock = gevent.lock.Semaphore()
+        self._last_send = 0.0
         super().__init__()
         self.greenlet.name = f"RetryQueue " f"recipient:{pex(self.receiver)}"
 
@@ -122,6 +140,31 @@ class _RetryQueue(Runnable):
             while now() < _next:  # yield False while next is still in the future
                 yield False
 
+    @staticmethod
+    def _batch_texts(
+        message_texts: List[str], max_messages: int, max_bytes: int
+    ) -> Iterator[List[str]]:
+        """Split the serialized messages into batches to be sent as a single matrix event.
+
+        A batch has at most `max_messages` messages and `max_bytes` bytes once joined by
+        newlines. A single message bigger than `max_bytes` is sent alone.
+        """
+        batch: List[str] = list()
+        batch_bytes = 0
+        for text in message_texts:
+            # one additional byte for the newline separator
+            text_bytes = len(text.encode()) + 1
+            batch_is_full = len(batch) >= max_messages or batch_bytes + text_bytes > max_bytes
+            if batch and batch_is_full:
+                yield batch
+                batch = list()
+                batch_bytes = 0
+            batch.append(text)
+            batch_bytes += text_bytes
+
+        if batch:
+            yield batch
+
     def enqueue(self, queue_identifier: QueueIdentifier, message: Message):
         """ Enqueue a message to be sent, and notify main loop """
         assert queue_identifier.recipient == self.receiver
@@ -150,6 +193,7 @@ class _RetryQueue(Runnable):
                     message=message,
                     text=JSONSerializer.serialize(message),
                     expiration_generator=expiration_generator,
+                    enqueued_at=time.time(),
                 )
             )
         self.notify()
@@ -185,13 +229,13 @@ class _RetryQueue(Runnable):
             # During startup global messages have to be sent first
             self.transport._global_send_queue.join()
 
-        self.log.debug("Retrying message", receiver=to_checksum_address(self.receiver))
+        self.log.debug("Retrying message", receiver=LazyValue(to_checksum_address, self.receiver))
         status = self.transport._address_mgr.get_address_reachability(self.receiver)
         if status is not AddressReachability.REACHABLE:
             # if partner is not reachable, return
             self.log.debug(
                 "Partner not reachable. Skipping.",
-                partner=to_checksum_address(self.receiver),
+                partner=LazyValue(to_checksum_address, self.receiver),
                 status=status,
             )
             return
@@ -200,12 +244,19 @@ class _RetryQueue(Runnable):
         ordered_queue = sorted(
             self._message_queue, key=lambda d: d.queue_identifier.channel_identifier
         )
-        message_texts = [
-            data.text
-            for data in ordered_queue
+        queue_positions = {id(data): position for position, data in enumerate(self._message_queue)}
+        now = time.time()
+        message_texts: List[str] = list()
+        for data in ordered_queue:
             # if expired_gen generator yields False, message was sent recently, so skip it
-            if next(data.expiration_generator)
-        ]
+            if not next(data.expiration_generator):
+                continue
+
+            message_texts.append(data.text)
+            self.transport.messages_sent_counters.labels(type(data.message).__name__).inc()
+            if data.enqueued_at is not None:
+                self.transport.queueing_delay_histogram.observe(now - data.enqueued_at)
+                self._message_queue[queue_positions[id(data)]] = data._replace(enqueued_at=None)
 
         def message_is_in_queue(data: _RetryQueue._MessageData) -> bool:
             return any(
@@ -242,11 +293,35 @@ class _RetryQueue(Runnable):
             if remove:
                 self._message_queue.remove(msg_data)
 
-        if message_texts:
+        batches = self._batch_texts(
+            message_texts,
+            max_messages=self.transport._batch_max_messages,
+            max_bytes=self.transport._batch_max_bytes,
+        )
+        for batch in batches:
             self.log.debug(
-                "Send", receiver=to_checksum_address(self.receiver), messages=message_texts
+                "Send", receiver=LazyValue(to_checksum_address, self.receiver), messages=batch
             )
-            self.transport._send_raw(self.receiver, "\n".join(message_texts))
+            self.transport._send_raw(self.receiver, "\n".join(batch))
+            self.transport.batch_size_histogram.observe(len(batch))
+            self._last_send = time.time()
+
+    def _linger(self):
+        """Delay the next send to coalesce messages enqueued in a burst.
+
+        The scheduler yields once, so that greenlets scheduled together with the
+        notification are able to enqueue their messages, e.g. the event handler
+        sending the `Processed` for a message that was just acknowledged with a
+        `Delivered`. If a batch was sent less than `batch_linger` seconds ago the
+        send is additionally held back until then, unless the batch is already
+        full. The first message after an idle period is therefore not delayed.
+        """
+        gevent.sleep(0)
+
+        remaining = self._last_send + self.transport._batch_linger - time.time()
+        batch_is_full = len(self._message_queue) >= self.transport._batch_max_messages
+        if remaining > 0 and not batch_is_full:
+            self.transport._stop_event.wait(remaining)
 
     def _run(self):
         msg = f"_RetryQueue started before transport._raiden_service is set"
@@ -264,7 +339,9 @@ class _RetryQueue(Runnable):
                 if self._message_queue:
                     self._check_and_send()
             # wait up to retry_interval (or to be notified) before checking again
-            self._notify_event.wait(self.transport._config["retry_interval"])
+            notified = self._notify_event.wait(self.transport._config["retry_interval"])
+            if notified:
+                self._linger()
 
     def __str__(self):
         return self.greenlet.name
@@ -303,10 +380,55 @@ class MatrixTransport(Runnable):
             http_pool_maxsize=4,
             http_retry_timeout=40,
             http_retry_delay=_http_retry_delay,
+            sync_pipeline_depth=config.get(
+                "sync_pipeline_depth", DEFAULT_TRANSPORT_MATRIX_SYNC_PIPELINE_DEPTH
+            ),
         )
         self._server_url = self._client.api.base_url
         self._server_name = config.get("server_name", urlparse(self._server_url).netloc)
 
+        self._batch_max_messages: int = config.get(
+            "batch_max_messages", DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_MESSAGES
+        )
+        self._batch_max_bytes: int = config.get(
+            "batch_max_bytes", DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_BYTES
+        )
+        self._batch_linger: float = config.get(
+            "batch_linger", DEFAULT_TRANSPORT_MATRIX_BATCH_LINGER
+        )
+        self.batch_size_histogram = Histogram(
+            "raiden_transport_batch_size",
+            "Number of messages sent in a single matrix event",
+            buckets=(1, 2, 5, 10, 20, 50, 100),
+        )
+        self.queueing_delay_histogram = Histogram(
+            "raiden_transport_queueing_delay_seconds",
+            "Time between a message being enqueued and its first send",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+        self.messages_sent_counters = MetricVector(
+            Counter,
+            "raiden_transport_messages_sent_total",
+            "Number of messages sent, including the retries",
+            label="message_type",
+        )
+        self.messages_received_counters = MetricVector(
+            Counter,
+            "raiden_transport_messages_received_total",
+            "Number of messages received",
+            label="message_type",
+        )
+        self.retry_queue_messages_gauge = Gauge(
+            "raiden_transport_retry_queue_messages",
+            "Number of messages in the retry queues of all partners",
+            function=lambda: sum(self._retry_queue_sizes()),
+        )
+        self.retry_queue_max_messages_gauge = Gauge(
+            "raiden_transport_retry_queue_max_messages",
+            "Number of messages in the longest retry queue",
+            function=lambda: max(self._retry_queue_sizes(), default=0),
+        )
+
         self.greenlets: List[gevent.Greenlet] = list()
 
         self._address_to_retrier: Dict[Address, _RetryQueue] = dict()
@@ -374,11 +496,10 @@ class MatrixTransport(Runnable):
         )
         self.log = log.bind(current_user=self._user_id, node=pex(self._raiden_service.address))
 
-        self.log.debug("Start: handle thread", handle_thread=self._client._handle_thread)
-        if self._client._handle_thread:
-            # wait on _handle_thread for initial sync
-            # this is needed so the rooms are populated before we _inventory_rooms
-            self._client._handle_thread.get()
+        self.log.debug("Start: handle threads", handle_threads=self._client._handle_threads)
+        # wait on the handlers of the initial syncs
+        # this is needed so the rooms are populated before we _inventory_rooms
+        gevent.joinall(list(self._client._handle_threads), raise_error=True)
 
         for suffix in self._config["global_rooms"]:
             room_name = make_room_alias(self.network_id, suffix)  # e.g. raiden_ropsten_discovery
@@ -457,6 +578,19 @@ class MatrixTransport(Runnable):
         # parent may want to call get() after stop(), to ensure _run errors are re-raised
         # we don't call it here to avoid deadlock when self crashes and calls stop() on finally
 
+    def get_metrics(self) -> List[Union[Metric, MetricVector]]:
+        """ The metrics of the transport and its matrix client. """
+        return [
+            self.batch_size_histogram,
+            self.queueing_delay_histogram,
+            self.messages_sent_counters,
+            self.messages_received_counters,
+            self.retry_queue_messages_gauge,
+            self.retry_queue_max_messages_gauge,
+            self._client.sync_lag_histogram,
+            self._client.sync_handle_time_histogram,
+        ]
+
     def _spawn(self, func: Callable, *args, **kwargs) -> gevent.Greenlet:
         """ Spawn a sub-task and ensures an error on it crashes self/main greenlet """
 
@@ -530,7 +664,7 @@ class MatrixTransport(Runnable):
 
         self.log.debug(
             "Send async",
-            receiver_address=to_checksum_address(receiver_address),
+            receiver_address=LazyValue(to_checksum_address, receiver_address),
             message=message,
             queue_identifier=queue_identifier,
         )
@@ -821,7 +955,7 @@ class MatrixTransport(Runnable):
         self.log.debug(
             "Incoming messages",
             messages=messages,
-            sender=to_checksum_address(peer_address),
+            sender=LazyValue(to_checksum_address, peer_address),
             sender_user=user,
             room=room,
         )
@@ -829,52 +963,52 @@ class MatrixTransport(Runnable):
         for message in messages:
             if not isinstance(message, (SignedRetrieableMessage, SignedMessage)):
                 self.log.warning("Received invalid message", message=message)
-            if isinstance(message, Delivered):
-                self._receive_delivered(message)
-            elif isinstance(message, Processed):
-                self._receive_message(message)
-            else:
-                assert isinstance(message, SignedRetrieableMessage)
-                self._receive_message(message)
+            assert isinstance(message, (Delivered, Processed, SignedRetrieableMessage))
+
+        self._receive_messages(messages)
 
         return True
 
-    def _receive_delivered(self, delivered: Delivered):
-        self.log.debug(
-            "Delivered message received",
-            sender=to_checksum_address(delivered.sender),
-            message=delivered,
-        )
+    def _receive_messages(self, messages: List[Message]):
+        """ Acknowledge and process the messages of a single Matrix event.
 
+        The messages are given to the node as a batch, so that their state
+        changes can be dispatched together.
+        """
         assert self._raiden_service is not None
-        self._raiden_service.on_message(delivered)
 
-    def _receive_message(self, message: Union[SignedRetrieableMessage, Processed]):
-        assert self._raiden_service is not None
-        self.log.debug(
-            "Message received",
-            node=to_checksum_address(self._raiden_service.address),
-            message=message,
-            sender=to_checksum_address(message.sender),
-        )
+        for message in messages:
+            self.messages_received_counters.labels(type(message).__name__).inc()
+            if isinstance(message, Delivered):
+                self.log.debug(
+                    "Delivered message received",
+                    sender=LazyValue(to_checksum_address, message.sender),
+                    message=message,
+                )
+            else:
+                self.log.debug(
+                    "Message received",
+                    node=LazyValue(to_checksum_address, self._raiden_service.address),
+                    message=message,
+                    sender=LazyValue(to_checksum_address, message.sender),
+                )
+                self._acknowledge_message(message)
 
-        try:
-            # TODO: Maybe replace with Matrix read receipts.
-            #       Unfortunately those work on an 'up to' basis, not on individual messages
-            #       which means that message order is important which isn't guaranteed between
-            #       federated servers.
-            #       See: https://matrix.org/docs/spec/client_server/r0.3.0.html#id57
-            delivered_message = Delivered(
-                delivered_message_identifier=message.message_identifier, signature=EMPTY_SIGNATURE
-            )
-            self._raiden_service.sign(delivered_message)
-            retrier = self._get_retrier(message.sender)
-            retrier.enqueue_global(delivered_message)
-            self._raiden_service.on_message(message)
+        self._raiden_service.on_messages(messages)
 
-        except (InvalidAddress, UnknownAddress, UnknownTokenAddress):
-            self.log.warning("Exception while processing message", exc_info=True)
-            return
+    def _acknowledge_message(self, message: Union[SignedRetrieableMessage, Processed]):
+        # TODO: Maybe replace with Matrix read receipts.
+        #       Unfortunately those work on an 'up to' basis, not on individual messages
+        #       which means that message order is important which isn't guaranteed between
+        #       federated servers.
+        #       See: https://matrix.org/docs/spec/client_server/r0.3.0.html#id57
+        assert self._raiden_service is not None
+        delivered_message = Delivered(
+            delivered_message_identifier=message.message_identifier, signature=EMPTY_SIGNATURE
+        )
+        self._raiden_service.sign(delivered_message)
+        retrier = self._get_retrier(message.sender)
+        retrier.enqueue_global(delivered_message)
 
     def _receive_to_device(self, to_device: ToDevice):
         self.log.debug(
@@ -895,6 +1029,9 @@ class MatrixTransport(Runnable):
             retrier.start()
         return self._address_to_retrier[receiver]
 
+    def _retry_queue_sizes(self) -> List[int]:
+        return [len(retrier._message_queue) for retrier in self._address_to_retrier.values()]
+
     def _send_with_retry(self, queue_identifier: QueueIdentifier, message: Message):
         retrier = self._get_retrier(queue_identifier.recipient)
         retrier.enqueue(queue_identifier=queue_identifier, message=message)
@@ -907,9 +1044,9 @@ class MatrixTransport(Runnable):
             return
         self.log.debug(
             "Send raw",
-            receiver=to_checksum_address(receiver_address),
+            receiver=LazyValue(to_checksum_address, receiver_address),
             room=room,
-            data=data.replace("\n", "\\n"),
+            data=LazyValue(data.replace, "\n", "\\n"),
         )
         room.send_text(data)
 
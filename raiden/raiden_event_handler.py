@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 
 import structlog
 from eth_utils import to_checksum_address, to_hex
+from gevent.queue import Full
 
 from raiden.constants import EMPTY_BALANCE_HASH, EMPTY_HASH, EMPTY_MESSAGE_HASH, EMPTY_SIGNATURE
 from raiden.exceptions import RaidenUnrecoverableError
@@ -61,7 +62,6 @@ if TYPE_CHECKING:
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 UNEVENTFUL_EVENTS = (
-    EventPaymentReceivedSuccess,
     EventUnlockSuccess,
     EventUnlockClaimFailed,
     EventUnlockClaimSuccess,
@@ -126,6 +126,9 @@ class RaidenEventHandler(EventHandler):
         elif type(event) == EventPaymentSentFailed:
             assert isinstance(event, EventPaymentSentFailed), MYPY_ANNOTATION
             self.handle_paymentsentfailed(raiden, event)
+        elif type(event) == EventPaymentReceivedSuccess:
+            assert isinstance(event, EventPaymentReceivedSuccess), MYPY_ANNOTATION
+            self.handle_paymentreceivedsuccess(raiden, event)
         elif type(event) == EventUnlockFailed:
             assert isinstance(event, EventUnlockFailed), MYPY_ANNOTATION
             self.handle_unlockfailed(raiden, event)
@@ -210,7 +213,7 @@ class RaidenEventHandler(EventHandler):
     ):
         target = payment_sent_success_event.target
         payment_identifier = payment_sent_success_event.identifier
-        payment_status = raiden.targets_to_identifiers_to_statuses[target].pop(payment_identifier)
+        payment_status = raiden.pop_payment_status(target, payment_identifier)
 
         # With the introduction of the lock we should always get
         # here only once per identifier so payment_status should always exist
@@ -223,15 +226,27 @@ class RaidenEventHandler(EventHandler):
     ):
         target = payment_sent_failed_event.target
         payment_identifier = payment_sent_failed_event.identifier
-        payment_status = raiden.targets_to_identifiers_to_statuses[target].pop(
-            payment_identifier, None
-        )
+        payment_status = raiden.pop_payment_status(target, payment_identifier)
         # In the case of a refund transfer the payment fails earlier
         # but the lock expiration will generate a second
         # EventPaymentSentFailed message which we can ignore here
         if payment_status:
             payment_status.payment_done.set(payment_sent_failed_event)
 
+    @staticmethod
+    def handle_paymentreceivedsuccess(
+        raiden: "RaidenService", payment_received_success_event: EventPaymentReceivedSuccess
+    ):
+        for queue in raiden.payment_received_subscribers:
+            try:
+                queue.put_nowait(payment_received_success_event)
+            except Full:
+                log.warning(
+                    "Payment received subscriber is full, event dropped",
+                    node=pex(raiden.address),
+                    identifier=payment_received_success_event.identifier,
+                )
+
     @staticmethod
     def handle_unlockfailed(raiden: "RaidenService", unlock_failed_event: EventUnlockFailed):
         # pylint: disable=unused-argument
@@ -246,7 +261,10 @@ class RaidenEventHandler(EventHandler):
     def handle_contract_send_secretreveal(
         raiden: "RaidenService", channel_reveal_secret_event: ContractSendSecretReveal
     ):
-        raiden.default_secret_registry.register_secret(secret=channel_reveal_secret_event.secret)
+        raiden.default_secret_registry.register_secret(
+            secret=channel_reveal_secret_event.secret,
+            expiration=channel_reveal_secret_event.expiration,
+        )
 
     @staticmethod
     def handle_contract_send_channelclose(
@@ -585,7 +603,10 @@ class PFSFeedbackEventHandler(RaidenEventHandler):
 
     @staticmethod
     def handle_routefailed(raiden: "RaidenService", route_failed_event: EventRouteFailed) -> None:
-        feedback_token = raiden.route_to_feeback_token.get(tuple(route_failed_event.route))
+        # The route is not used again by the payment, concurrent payments over
+        # the same route share the token and lose their feedback, which is
+        # best effort anyway
+        feedback_token = raiden.route_to_feeback_token.pop(tuple(route_failed_event.route), None)
 
         if feedback_token:
             log.debug(
@@ -606,7 +627,9 @@ class PFSFeedbackEventHandler(RaidenEventHandler):
     def handle_paymentsentsuccess(
         raiden: "RaidenService", payment_sent_success_event: EventPaymentSentSuccess
     ) -> None:
-        feedback_token = raiden.route_to_feeback_token.get(tuple(payment_sent_success_event.route))
+        feedback_token = raiden.route_to_feeback_token.pop(
+            tuple(payment_sent_success_event.route), None
+        )
 
         if feedback_token:
             log.debug(
@@ -9,13 +9,15 @@ from uuid import UUID
 import filelock
 import gevent
 import structlog
+from cachetools import TTLCache
 from eth_utils import is_binary_address
 from gevent import Greenlet
 from gevent.event import AsyncResult, Event
+from gevent.queue import Queue
 
 from raiden import constants, routing
 from raiden.blockchain.events import BlockchainEvents
-from raiden.blockchain_events_handler import on_blockchain_event
+from raiden.blockchain_events_handler import dispatch_blockchain_events
 from raiden.connection_manager import ConnectionManager
 from raiden.constants import (
     ABSENT_SECRET,
@@ -33,6 +35,7 @@ from raiden.exceptions import (
     RaidenRecoverableError,
     RaidenUnrecoverableError,
 )
+from raiden.log_config import LazyValue
 from raiden.messages import (
     LockedTransfer,
     Message,
@@ -47,14 +50,23 @@ from raiden.network.proxies.secret_registry import SecretRegistry
 from raiden.network.proxies.service_registry import ServiceRegistry
 from raiden.network.proxies.token_network_registry import TokenNetworkRegistry
 from raiden.network.proxies.user_deposit import UserDeposit
+from raiden.network.resolver.client import ResolverClient
 from raiden.raiden_event_handler import EventHandler
-from raiden.settings import MEDIATION_FEE, MONITORING_MIN_CAPACITY, MONITORING_REWARD
+from raiden.settings import (
+    DEFAULT_PATHFINDING_FEEDBACK_TOKENS_MAX,
+    DEFAULT_PATHFINDING_FEEDBACK_TOKENS_TTL,
+    DEFAULT_PAYMENT_RECEIVED_SUBSCRIPTION_SIZE,
+    MEDIATION_FEE,
+    MONITORING_MIN_CAPACITY,
+    MONITORING_REWARD,
+)
 from raiden.storage import sqlite, wal
-from raiden.storage.serialization import JSONSerializer
+from raiden.storage.serialization import DictSerializer, JSONSerializer
 from raiden.storage.wal import WriteAheadLog
 from raiden.tasks import AlarmTask
 from raiden.transfer import channel, node, views
-from raiden.transfer.architecture import Event as RaidenEvent, StateChange
+from raiden.transfer.architecture import ContractSendEvent, Event as RaidenEvent, StateChange
+from raiden.transfer.events import ContractSendSecretReveal
 from raiden.transfer.mediated_transfer.events import SendLockedTransfer
 from raiden.transfer.mediated_transfer.state import TransferDescriptionWithSecretState
 from raiden.transfer.mediated_transfer.state_change import (
@@ -69,6 +81,7 @@ from raiden.transfer.state import (
     ChainState,
     HopState,
     PaymentNetworkState,
+    RouteState,
 )
 from raiden.transfer.state_change import (
     ActionChangeNodeNetworkState,
@@ -77,8 +90,10 @@ from raiden.transfer.state_change import (
     ContractReceiveNewPaymentNetwork,
 )
 from raiden.utils import create_default_identifier, lpex, pex, random_secret, to_rdn
+from raiden.utils.metrics import Gauge, Metric, MetricsRegistry, MetricVector
 from raiden.utils.runnable import Runnable
 from raiden.utils.signer import LocalSigner, Signer
+from raiden.utils.subscriptions import StateChangeSubscriptions, SubscriptionKey, block_key
 from raiden.utils.typing import (
     Address,
     BlockHash,
@@ -121,6 +136,14 @@ def _redact_secret(data: Union[Dict, List],) -> Union[Dict, List]:
     return data
 
 
+def _serialize_and_redact(obj: Any) -> Union[Dict, List]:
+    return _redact_secret(DictSerializer.serialize(obj))
+
+
+def _serialize_and_redact_all(objs: List[Any]) -> List[Union[Dict, List]]:
+    return [_serialize_and_redact(obj) for obj in objs]
+
+
 def initiator_init(
     raiden: "RaidenService",
     transfer_identifier: PaymentID,
@@ -130,7 +153,12 @@ def initiator_init(
     transfer_fee: FeeAmount,
     token_network_address: TokenNetworkAddress,
     target_address: TargetAddress,
+    routes: List[RouteState] = None,
 ) -> ActionInitInitiator:
+    """ Create the state change that starts a payment as the initiator.
+
+    `routes` is computed with `initiator_routes` if not given.
+    """
     transfer_state = TransferDescriptionWithSecretState(
         payment_network_address=raiden.default_registry.address,
         payment_identifier=transfer_identifier,
@@ -143,13 +171,30 @@ def initiator_init(
         secrethash=transfer_secrethash,
     )
 
+    if routes is None:
+        routes = initiator_routes(
+            raiden=raiden,
+            token_network_address=token_network_address,
+            target_address=target_address,
+            amount=transfer_amount,
+        )
+
+    return ActionInitInitiator(transfer_state, routes)
+
+
+def initiator_routes(
+    raiden: "RaidenService",
+    token_network_address: TokenNetworkAddress,
+    target_address: TargetAddress,
+    amount: PaymentAmount,
+) -> List[RouteState]:
     routes, feedback_token = routing.get_best_routes(
         chain_state=views.state_from_raiden(raiden),
         token_network_address=token_network_address,
         one_to_n_address=raiden.default_one_to_n_address,
         from_address=InitiatorAddress(raiden.address),
         to_address=target_address,
-        amount=transfer_amount,
+        amount=amount,
         previous_address=None,
         config=raiden.config,
         privkey=raiden.privkey,
@@ -160,7 +205,7 @@ def initiator_init(
         for route_state in routes:
             raiden.route_to_feeback_token[tuple(route_state.route)] = feedback_token
 
-    return ActionInitInitiator(transfer_state, routes)
+    return routes
 
 
 def mediator_init(raiden: "RaidenService", transfer: LockedTransfer) -> ActionInitMediator:
@@ -350,6 +395,10 @@ class RaidenService(Runnable):
 
         self.user_deposit = user_deposit
 
+        self.resolver_client: Optional[ResolverClient] = None
+        if config.get("resolver_endpoint"):
+            self.resolver_client = ResolverClient(config["resolver_endpoint"])
+
         self.blockchain_events = BlockchainEvents()
         self.alarm = AlarmTask(chain)
         self.raiden_event_handler = raiden_event_handler
@@ -359,6 +408,13 @@ class RaidenService(Runnable):
         self.stop_event.set()  # inits as stopped
         self.greenlets: List[Greenlet] = list()
 
+        # Set and replaced after every dispatch, this is used to wake up the
+        # greenlets waiting for a change in the node's state, instead of
+        # having them poll the state. The subscriptions only wake up the
+        # greenlets waiting for the parts of the state which changed.
+        self.state_changed_event = Event()
+        self.state_change_subscriptions = StateChangeSubscriptions()
+
         self.snapshot_group = 0
 
         self.contract_manager = ContractManager(config["contracts_path"])
@@ -393,8 +449,49 @@ class RaidenService(Runnable):
         self.gas_reserve_lock = gevent.lock.Semaphore()
         self.payment_identifier_lock = gevent.lock.Semaphore()
 
-        # A list is not hashable, so use tuple as key here
-        self.route_to_feeback_token: Dict[Tuple[Address, ...], UUID] = dict()
+        # A list is not hashable, so use tuple as key here. The token of a
+        # route is removed once the payment using it finishes, the cache bounds
+        # the memory used by the tokens of payments that never finish.
+        self.route_to_feeback_token: Dict[Tuple[Address, ...], UUID] = TTLCache(
+            maxsize=DEFAULT_PATHFINDING_FEEDBACK_TOKENS_MAX,
+            ttl=DEFAULT_PATHFINDING_FEEDBACK_TOKENS_TTL,
+        )
+
+        # Filled by the event handler for the in-process consumers of the
+        # received payments, e.g. the echo node
+        self.payment_received_subscribers: List[Queue] = list()
+
+        self.route_feedback_tokens_gauge = Gauge(
+            "raiden_route_feedback_tokens",
+            "Number of routes waiting for the outcome of their payment to send PFS feedback",
+            function=lambda: len(self.route_to_feeback_token),
+        )
+        self.payments_in_flight_gauge = Gauge(
+            "raiden_payments_in_flight",
+            "Number of payments started by this node which did not finish yet",
+            function=lambda: sum(
+                len(statuses) for statuses in self.targets_to_identifiers_to_statuses.values()
+            ),
+        )
+        self.database_size_gauge = Gauge(
+            "raiden_database_size_bytes",
+            "Size of the node's database",
+            function=lambda: self.wal.storage.database_size() if self.wal else 0,
+        )
+
+        self.metrics = MetricsRegistry()
+        self.metrics.register(
+            self.route_feedback_tokens_gauge,
+            self.payments_in_flight_gauge,
+            self.database_size_gauge,
+            self.alarm.block_lag_gauge,
+            *self.chain.client.get_metrics(),
+            *self.default_secret_registry.get_metrics(),
+        )
+        self.metrics.register(*self.transport.get_metrics())
+        if self.resolver_client is not None:
+            self.metrics.register(self.resolver_client.request_latency_histogram)
+        self.metrics.register_collector(self._collect_wal_metrics)
 
         # Flag used to skip the processing of all Raiden events during the
         # startup.
@@ -511,6 +608,10 @@ class RaidenService(Runnable):
         # - The alarm must complete its first run before the transport is started,
         #   to reject messages for closed/settled channels.
         self.alarm.register_callback(self._callback_new_block)
+        # The receipts of the transactions sent by the node are checked once
+        # per block, instead of polling for each transaction
+        self.alarm.register_callback(self.chain.client.check_pending_transactions)
+        self.chain.client.start_receipt_tracking()
         self.alarm.first_run(last_log_block_number)
 
         chain_state = views.state_from_raiden(self)
@@ -547,6 +648,11 @@ class RaidenService(Runnable):
         except Exception:
             self.stop()
             raise
+        finally:
+            # Also when the service is killed, otherwise the greenlets waiting
+            # for a transaction would wait for the alarm task forever. This is
+            # idempotent, `stop` calls it too once the alarm task is stopped.
+            self.chain.client.stop_receipt_tracking()
 
     def stop(self) -> None:
         """ Stop the node gracefully. Raise if any stop-time error occurred on any subtask """
@@ -569,6 +675,9 @@ class RaidenService(Runnable):
         self.transport.join()
         self.alarm.join()
 
+        # Without the alarm task the transactions must be polled again
+        self.chain.client.stop_receipt_tracking()
+
         self.blockchain_events.uninstall_all_event_listeners()
 
         # Close storage DB to release internal DB lock
@@ -641,6 +750,44 @@ class RaidenService(Runnable):
         # This flag /must/ be set to true before the transport or the alarm task is started
         self.ready_to_process_events = True
 
+    def wait_for_state_change(
+        self,
+        timeout: Optional[float] = None,
+        key: Optional[SubscriptionKey] = None,
+        block_number: Optional[BlockNumber] = None,
+    ) -> bool:
+        """ Block until the next state change is dispatched, or until the
+        `timeout` expires. Returns False on timeout.
+
+        If `key` is given only the state changes notifying it are waited for,
+        see `raiden.utils.subscriptions`. If `block_number` is given too, the
+        wait is also over once the node has seen that block, this is used for
+        the changes applied by a `Block`, which don't notify any other key.
+
+        gevent is cooperative, so a caller that checks a condition on the
+        state and then calls this method without yielding in between can not
+        miss a state change.
+        """
+        if key is None:
+            return self.state_changed_event.wait(timeout)
+
+        subscriptions = [self.state_change_subscriptions.subscribe(key)]
+        if block_number is not None:
+            subscriptions.append(
+                self.state_change_subscriptions.subscribe(block_key(block_number))
+            )
+
+        return bool(gevent.wait(subscriptions, timeout=timeout, count=1))
+
+    def _notify_state_change(
+        self, state_changes: List[StateChange], events: List[RaidenEvent]
+    ) -> None:
+        self.state_change_subscriptions.notify(state_changes, events)
+
+        state_changed_event = self.state_changed_event
+        self.state_changed_event = Event()
+        state_changed_event.set()
+
     def get_block_number(self) -> BlockNumber:
         assert self.wal, f"WAL object not yet initialized. node:{self!r}"
         return views.block_number(self.wal.state_manager.current_state)  # type: ignore
@@ -648,13 +795,25 @@ class RaidenService(Runnable):
     def on_message(self, message: Message) -> None:
         self.message_handler.on_message(self, message)
 
+    def on_messages(self, messages: List[Message]) -> None:
+        self.message_handler.on_messages(self, messages)
+
     def handle_and_track_state_change(self, state_change: StateChange) -> None:
         """ Dispatch the state change and does not handle the exceptions.
 
         When the method is used the exceptions are tracked and re-raised in the
         raiden service thread.
         """
-        for greenlet in self.handle_state_change(state_change):
+        self.handle_and_track_state_changes([state_change])
+
+    def handle_and_track_state_changes(self, state_changes: List[StateChange]) -> None:
+        """ Dispatch the state changes as a batch and does not handle the
+        exceptions.
+
+        When the method is used the exceptions are tracked and re-raised in the
+        raiden service thread.
+        """
+        for greenlet in self.handle_state_changes(state_changes):
             self.add_pending_greenlet(greenlet)
 
     def handle_state_change(self, state_change: StateChange) -> List[Greenlet]:
@@ -663,25 +822,41 @@ class RaidenService(Runnable):
         Use this for error reporting, failures in the returned greenlets,
         should be re-raised using `gevent.joinall` with `raise_error=True`.
         """
+        return self.handle_state_changes([state_change])
+
+    def handle_state_changes(self, state_changes: List[StateChange]) -> List[Greenlet]:
+        """ Dispatch the state changes as a single batch and return the
+        processing threads.
+
+        The batch is saved in one storage transaction and applied with a
+        single copy of the state, which is considerably cheaper than
+        dispatching each state change individually. The events of all the
+        state changes are handled in order, after the whole batch is applied.
+        """
         assert self.wal, f"WAL not restored. node:{self!r}"
-        log.debug(
-            "State change",
-            node=pex(self.address),
-            state_change=_redact_secret(JSONSerializer.serialize(state_change)),
-        )
+
+        if not state_changes:
+            return list()
+
+        for state_change in state_changes:
+            log.debug(
+                "State change",
+                node=pex(self.address),
+                state_change=LazyValue(_serialize_and_redact, state_change),
+            )
 
         old_state = views.state_from_raiden(self)
-        new_state, raiden_event_list = self.wal.log_and_dispatch(state_change)
+        new_state, raiden_event_list = self.wal.log_and_dispatch_batch(state_changes)
 
         for changed_balance_proof in views.detect_balance_proof_change(old_state, new_state):
             update_services_from_balance_proof(self, new_state, changed_balance_proof)
 
+        self._notify_state_change(state_changes, raiden_event_list)
+
         log.debug(
             "Raiden events",
             node=pex(self.address),
-            raiden_events=[
-                _redact_secret(JSONSerializer.serialize(event)) for event in raiden_event_list
-            ],
+            raiden_events=LazyValue(_serialize_and_redact_all, raiden_event_list),
         )
 
         greenlets: List[Greenlet] = list()
@@ -746,6 +921,12 @@ class RaidenService(Runnable):
         state_change = ActionChangeNodeNetworkState(node_address, network_state)
         self.handle_and_track_state_change(state_change)
 
+    def _collect_wal_metrics(self) -> List[Union[Metric, MetricVector]]:
+        # The write-ahead log is created when the service is started
+        if self.wal is None:
+            return []
+        return [self.wal.duration_histograms, self.wal.state_manager.dispatch_histograms]
+
     def start_health_check_for(self, node_address: Address) -> None:
         """Start health checking `node_address`.
 
@@ -785,12 +966,13 @@ class RaidenService(Runnable):
                 GENESIS_BLOCK_NUMBER,
                 latest_block_number - self.config["blockchain"]["confirmation_blocks"],
             )
-            confirmed_block = self.chain.client.web3.eth.getBlock(confirmed_block_number)
+            confirmed_block = self.alarm.get_block(confirmed_block_number)
 
             # These state changes will be procesed with a block_number which is
             # /larger/ than the ChainState's block_number.
-            for event in self.blockchain_events.poll_blockchain_events(confirmed_block_number):
-                on_blockchain_event(self, event)
+            state_changes = dispatch_blockchain_events(
+                self, self.blockchain_events.poll_blockchain_events(confirmed_block_number)
+            )
 
             # On restart the Raiden node will re-create the filters with the
             # ethereum node. These filters will have the from_block set to the
@@ -802,7 +984,7 @@ class RaidenService(Runnable):
             # twice, this will happen if the node crashed and some events have
             # been processed but the Block state change has not been
             # dispatched.
-            state_change = Block(
+            block_state_change = Block(
                 block_number=confirmed_block_number,
                 gas_limit=confirmed_block["gasLimit"],
                 block_hash=BlockHash(bytes(confirmed_block["hash"])),
@@ -811,7 +993,8 @@ class RaidenService(Runnable):
             # Note: It's important to /not/ block here, because this function
             # can be called from the alarm task greenlet, which should not
             # starve.
-            self.handle_and_track_state_change(state_change)
+            state_changes.append(block_state_change)
+            self.handle_and_track_state_changes(state_changes)
 
     def _initialize_transactions_queues(self, chain_state: ChainState) -> None:
         """Initialize the pending transaction queue from the previous run.
@@ -832,7 +1015,7 @@ class RaidenService(Runnable):
             node=pex(self.address),
         )
 
-        for transaction in pending_transactions:
+        def handle_transaction(transaction: ContractSendEvent) -> None:
             try:
                 self.raiden_event_handler.on_raiden_event(
                     raiden=self, chain_state=chain_state, event=transaction
@@ -851,6 +1034,19 @@ class RaidenService(Runnable):
                 else:
                     raise
 
+        # The secret registrations wait for the registrations queued with them
+        # to be sent as a single transaction, they are replayed concurrently
+        # so that they are queued together instead of each waiting for the
+        # batch linger.
+        secret_reveals = list()
+        for transaction in pending_transactions:
+            if isinstance(transaction, ContractSendSecretReveal):
+                secret_reveals.append(gevent.spawn(handle_transaction, transaction))
+            else:
+                handle_transaction(transaction)
+
+        gevent.joinall(secret_reveals, raise_error=True)
+
     def _initialize_payment_statuses(self, chain_state: ChainState) -> None:
         """ Re-initialize targets_to_identifiers_to_statuses.
 
@@ -1030,6 +1226,40 @@ class RaidenService(Runnable):
 
         return manager
 
+    def pop_payment_status(
+        self, target: TargetAddress, identifier: PaymentID
+    ) -> Optional[PaymentStatus]:
+        """ Removes and returns the status of a finished payment.
+
+        The target's mapping is removed with its last payment, otherwise every
+        target ever paid would keep an entry.
+        """
+        statuses = self.targets_to_identifiers_to_statuses.get(target)
+        if statuses is None:
+            return None
+
+        payment_status = statuses.pop(identifier, None)
+        if not statuses:
+            del self.targets_to_identifiers_to_statuses[target]
+
+        return payment_status
+
+    def subscribe_payments_received(
+        self, maxsize: int = DEFAULT_PAYMENT_RECEIVED_SUBSCRIPTION_SIZE
+    ) -> Queue:
+        """ Returns a queue of the `EventPaymentReceivedSuccess` of the
+        payments received from now on.
+
+        The queue holds at most `maxsize` events, the events received while it
+        is full are dropped instead of slowing down the event handling.
+        """
+        queue: Queue = Queue(maxsize)
+        self.payment_received_subscribers.append(queue)
+        return queue
+
+    def unsubscribe_payments_received(self, queue: Queue) -> None:
+        self.payment_received_subscribers.remove(queue)
+
     def mediated_transfer_async(
         self,
         token_network_address: TokenNetworkAddress,
@@ -1068,6 +1298,96 @@ class RaidenService(Runnable):
 
         return payment_status
 
+    def mediated_transfers_async(
+        self,
+        token_network_address: TokenNetworkAddress,
+        payments: List[Tuple[TargetAddress, PaymentAmount, Optional[PaymentID]]],
+        fee: FeeAmount = MEDIATION_FEE,
+    ) -> List[Union[PaymentStatus, PaymentConflict]]:
+        """ Start a transfer for each `(target, amount, identifier)` in
+        `payments`, all in the same token network.
+
+        This is the batched version of `mediated_transfer_async`, the init
+        state changes of all the transfers are dispatched as a single batch,
+        and the routes are computed once per target and amount. Each transfer
+        uses a new random secret, which can not be registered on-chain, so
+        the secret registry is not queried.
+
+        The result for each payment is either its `PaymentStatus`, or the
+        `PaymentConflict` if another payment with the same identifier and a
+        different amount is in flight.
+        """
+        results: List[Union[PaymentStatus, PaymentConflict]] = list()
+        state_changes: List[StateChange] = list()
+        started: List[Tuple[TargetAddress, PaymentID]] = list()
+
+        for target in {target for target, _, _ in payments}:
+            self.start_health_check_for(Address(target))
+
+        # Computing the routes may query the PFS, it must not hold up the
+        # other payments waiting for the lock
+        routes_cache: Dict[Tuple[TargetAddress, PaymentAmount], List[RouteState]] = {
+            (target, amount): initiator_routes(
+                raiden=self,
+                token_network_address=token_network_address,
+                target_address=target,
+                amount=amount,
+            )
+            for target, amount in {(target, amount) for target, amount, _ in payments}
+        }
+
+        with self.payment_identifier_lock:
+            for target, amount, identifier in payments:
+                if identifier is None:
+                    identifier = create_default_identifier()
+
+                payment_status = self.targets_to_identifiers_to_statuses[target].get(identifier)
+                if payment_status:
+                    if payment_status.matches(token_network_address, amount):
+                        results.append(payment_status)
+                    else:
+                        results.append(
+                            PaymentConflict("Another payment with the same id is in flight")
+                        )
+                    continue
+
+                payment_status = PaymentStatus(
+                    payment_identifier=identifier,
+                    amount=amount,
+                    token_network_address=token_network_address,
+                    payment_done=AsyncResult(),
+                )
+                self.targets_to_identifiers_to_statuses[target][identifier] = payment_status
+                started.append((target, identifier))
+                results.append(payment_status)
+
+                secret = random_secret()
+                state_changes.append(
+                    initiator_init(
+                        raiden=self,
+                        transfer_identifier=identifier,
+                        transfer_amount=amount,
+                        transfer_secret=secret,
+                        transfer_secrethash=SecretHash(sha256(secret).digest()),
+                        transfer_fee=fee,
+                        token_network_address=token_network_address,
+                        target_address=target,
+                        routes=routes_cache[(target, amount)],
+                    )
+                )
+
+        try:
+            self.handle_and_track_state_changes(state_changes)
+        except Exception:
+            # No initiator task was started, a status left behind would never
+            # be done and would conflict with a retry of the payment
+            with self.payment_identifier_lock:
+                for target, identifier in started:
+                    self.pop_payment_status(target, identifier)
+            raise
+
+        return results
+
     def start_mediated_transfer_with_secret(
         self,
         token_network_address: TokenNetworkAddress,
@@ -13,6 +13,15 @@ DEFAULT_TRANSPORT_THROTTLE_CAPACITY = 10.0
 DEFAULT_TRANSPORT_THROTTLE_FILL_RATE = 10.0
 # matrix gets spammed with the default retry-interval of 1s, wait a little more
 DEFAULT_TRANSPORT_MATRIX_RETRY_INTERVAL = 5.0
+# upper bounds for the messages coalesced into a single matrix text event, the
+# byte limit leaves headroom for the event envelope under synapse's 64KiB limit
+DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_MESSAGES = 100
+DEFAULT_TRANSPORT_MATRIX_BATCH_MAX_BYTES = 60_000
+# time a send is held back to coalesce a burst, the first message after an idle
+# period is never delayed
+DEFAULT_TRANSPORT_MATRIX_BATCH_LINGER = 0.05
+# number of /sync responses handled concurrently while the next one is fetched
+DEFAULT_TRANSPORT_MATRIX_SYNC_PIPELINE_DEPTH = 4
 DEFAULT_MATRIX_KNOWN_SERVERS = {
     Environment.PRODUCTION: (
         "https://raw.githubusercontent.com/raiden-network/raiden-transport"
@@ -36,9 +45,63 @@ DEFAULT_CHANNEL_SYNC_TIMEOUT = 5
 
 DEFAULT_SHUTDOWN_TIMEOUT = 2
 
+# maximum number of connections handled by the API server at once
+DEFAULT_API_MAX_CONNECTIONS = 1000
+# maximum number of requests processed at once per endpoint class, a request
+# that waits longer than the queue timeout for its turn is rejected with 503,
+# the streams are counted until they are closed
+DEFAULT_API_CONCURRENCY_LIMITS = {"payments": 500, "query": 2, "streams": 10, "default": 50}
+DEFAULT_API_QUEUE_TIMEOUT = 5.0
+
 DEFAULT_PATHFINDING_MAX_PATHS = 3
 DEFAULT_PATHFINDING_MAX_FEE = 1000
 DEFAULT_PATHFINDING_IOU_TIMEOUT = 50000  # now the pfs has 200h to cash in
+# The PFS feedback token of a route is kept until the payment using it
+# finishes, these bound the memory used by payments which never do
+DEFAULT_PATHFINDING_FEEDBACK_TOKENS_MAX = 100_000
+DEFAULT_PATHFINDING_FEEDBACK_TOKENS_TTL = 3 * 60 * 60
+
+# time a secret registration is held back to be sent in a single
+# registerSecretBatch transaction with the registrations of the same burst,
+# e.g. all the locks which entered the danger zone in the same block
+DEFAULT_SECRET_REGISTRY_BATCH_LINGER = 0.5
+
+# receipts of the pending transactions fetched at once for every new block, a
+# transaction whose receipt check keeps failing for this many blocks in a row is
+# reported to the greenlet waiting for it
+DEFAULT_RECEIPT_CHECK_POOL_SIZE = 10
+DEFAULT_RECEIPT_CHECK_MAX_FAILURES = 5
+
+# seconds a payment status request may wait for a pending payment to finish,
+# longer long-polls are rejected
+DEFAULT_PAYMENT_STATUS_MAX_TIMEOUT = 60.0
+
+# events buffered for each in-process subscriber of the received payments, the
+# newer events are dropped while a subscriber's buffer is full
+DEFAULT_PAYMENT_RECEIVED_SUBSCRIPTION_SIZE = 1024
+
+# connections kept alive to the resolver, which is also the number of secret
+# requests sent to it at once, a request waits at most the timeout for its turn
+# and at most the timeout for each of its attempts
+DEFAULT_RESOLVER_POOL_SIZE = 10
+DEFAULT_RESOLVER_TIMEOUT = 2.0
+DEFAULT_RESOLVER_RETRIES = 2
+DEFAULT_RESOLVER_RETRY_BACKOFF = 0.1
+DEFAULT_RESOLVER_CACHE_SIZE = 1024
+
+# payment events posted to the webhook at once, a failed post is retried after
+# a random delay which doubles up to the maximum
+DEFAULT_WEBHOOK_BATCH_SIZE = 100
+DEFAULT_WEBHOOK_TIMEOUT = 5.0
+DEFAULT_WEBHOOK_RETRY_BACKOFF = 0.5
+DEFAULT_WEBHOOK_MAX_RETRY_BACKOFF = 60.0
+# seconds between the comments sent to keep an idle event stream open
+DEFAULT_EVENT_STREAM_KEEPALIVE = 15.0
+
+# a greenlet running for longer than this without switching is reported by the
+# hub monitor, the loop latency is sampled once per interval
+DEFAULT_HUB_MONITOR_BLOCKING_THRESHOLD = 0.1
+DEFAULT_HUB_MONITOR_LATENCY_INTERVAL = 1.0
 
 ORACLE_BLOCKNUMBER_DRIFT_TOLERANCE = 3
 ETHERSCAN_API = "https://{network}.etherscan.io/api?module=proxy&action={action}"
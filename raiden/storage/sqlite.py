@@ -154,6 +154,12 @@ class SQLiteStorage:
 
         return int(result[0][0])
 
+    def database_size(self) -> int:
+        """ Returns the size of the database in bytes, including the free pages. """
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
     def write_state_change(self, state_change: StateChange, log_time: datetime) -> StateChangeID:
         with self.write_lock:
             cursor = self.conn.execute(
@@ -520,6 +526,53 @@ class SQLiteStorage:
         entries = self._query_events(limit, offset)
         return [entry[0] for entry in entries]
 
+    def get_events_after(
+        self, event_identifier: EventID, types: List[str], limit: int
+    ) -> Tuple[List[Tuple[EventID, TimestampedEvent]], EventID]:
+        """ Return the first `limit` events of the given `types` logged after
+        `event_identifier`, and the identifier of the last event scanned.
+
+        This only scans the events after the identifier, unlike the queries
+        with an offset. The next query can start after the last event
+        scanned, so that the events of the other types are scanned once.
+        """
+        latest_event_identifier = self.get_latest_event_identifier()
+        if latest_event_identifier <= event_identifier:
+            return list(), event_identifier
+
+        placeholders = ", ".join("?" * len(types))
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT identifier, data, log_time FROM state_events
+                WHERE identifier > ? AND identifier <= ?
+                AND json_extract(data, '$._type') IN ({placeholders})
+                ORDER BY identifier ASC LIMIT ?
+            """,
+            (event_identifier, latest_event_identifier, *types, limit),
+        )
+        events = [(row[0], TimestampedEvent(row[1], row[2])) for row in cursor]
+
+        if len(events) < limit:
+            return events, latest_event_identifier
+        return events, events[-1][0]
+
+    def get_latest_event_identifier(self) -> EventID:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MAX(identifier) FROM state_events")
+        return EventID(cursor.fetchone()[0] or 0)
+
+    def get_setting(self, name: str) -> Optional[str]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM settings WHERE name=?", (name,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, name: str, value: str) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)", (name, value))
+        self.maybe_commit()
+
     def get_state_changes(self, limit: int = None, offset: int = None) -> List[str]:
         entries = self._get_state_changes(limit, offset)
         return [entry.data for entry in entries]
@@ -587,9 +640,15 @@ class SerializedSQLiteStorage:
     def get_version(self) -> RaidenDBVersion:
         return self.database.get_version()
 
+    def database_size(self) -> int:
+        return self.database.database_size()
+
     def log_run(self) -> None:
         self.database.log_run()
 
+    def transaction(self):
+        return self.database.transaction()
+
     def write_state_change(self, state_change: StateChange, log_time: datetime) -> StateChangeID:
         serialized_data = self.serializer.serialize(state_change)
         return self.database.write_state_change(serialized_data, log_time)
@@ -689,6 +748,28 @@ class SerializedSQLiteStorage:
         events = self.database.get_events(limit, offset)
         return [self.serializer.deserialize(event) for event in events]
 
+    def get_events_after(
+        self, event_identifier: EventID, types: List[str], limit: int
+    ) -> Tuple[List[Tuple[EventID, TimestampedEvent]], EventID]:
+        events, last_scanned = self.database.get_events_after(event_identifier, types, limit)
+        result = [
+            (
+                identifier,
+                TimestampedEvent(self.serializer.deserialize(event.wrapped_event), event.log_time),
+            )
+            for identifier, event in events
+        ]
+        return result, last_scanned
+
+    def get_latest_event_identifier(self) -> EventID:
+        return self.database.get_latest_event_identifier()
+
+    def get_setting(self, name: str) -> Optional[str]:
+        return self.database.get_setting(name)
+
+    def set_setting(self, name: str, value: str) -> None:
+        self.database.set_setting(name, value)
+
     def close(self):
         self.database.close()
 
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime
 
 import gevent.lock
@@ -5,6 +6,7 @@ import structlog
 
 from raiden.storage.sqlite import SerializedSQLiteStorage
 from raiden.transfer.architecture import Event, State, StateChange, StateManager
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram, MetricVector
 from raiden.utils.typing import (
     Callable,
     Generic,
@@ -80,6 +82,24 @@ class WriteAheadLog(Generic[ST]):
         # execution order.
         self._lock = gevent.lock.Semaphore()
 
+        self.duration_histograms = MetricVector(
+            Histogram,
+            "raiden_wal_duration_seconds",
+            "Time spent in each phase of logging and dispatching state changes",
+            label="phase",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+
+    def _observe_durations(
+        self, start: float, state_changes_written: float, dispatched: float
+    ) -> None:
+        now = time.monotonic()
+        self.duration_histograms.labels("write_state_changes").observe(
+            state_changes_written - start
+        )
+        self.duration_histograms.labels("dispatch").observe(dispatched - state_changes_written)
+        self.duration_histograms.labels("write_events").observe(now - dispatched)
+
     def log_and_dispatch(self, state_change: StateChange) -> Tuple[ST, List[Event]]:
         """ Log and apply a state change.
 
@@ -91,16 +111,56 @@ class WriteAheadLog(Generic[ST]):
         """
 
         with self._lock:
+            start = time.monotonic()
             timestamp = datetime.utcnow()
             state_change_id = self.storage.write_state_change(state_change, timestamp)
             self.state_change_id = state_change_id
+            state_changes_written = time.monotonic()
 
             state, events = self.state_manager.dispatch(state_change)
+            dispatched = time.monotonic()
 
             self.storage.write_events(state_change_id, events, timestamp)
+            self._observe_durations(start, state_changes_written, dispatched)
 
         return state, events
 
+    def log_and_dispatch_batch(self, state_changes: List[StateChange]) -> Tuple[ST, List[Event]]:
+        """ Log and apply a batch of state changes.
+
+        Same as calling `log_and_dispatch` for every state change in order, but
+        the lock is acquired once, all the writes are done in a single storage
+        transaction and the state is copied only once. The batch is atomic, if
+        any of the transitions fail nothing is saved and the state is unchanged.
+
+        Returns the resulting state and the events of all the state changes,
+        in the order they were produced.
+        """
+        assert state_changes, "at least one state change must be given"
+
+        with self._lock:
+            start = time.monotonic()
+            timestamp = datetime.utcnow()
+
+            with self.storage.transaction():
+                state_change_ids = [
+                    self.storage.write_state_change(state_change, timestamp)
+                    for state_change in state_changes
+                ]
+                state_changes_written = time.monotonic()
+
+                state, events_per_state_change = self.state_manager.dispatch_batch(state_changes)
+                dispatched = time.monotonic()
+
+                for state_change_id, events in zip(state_change_ids, events_per_state_change):
+                    self.storage.write_events(state_change_id, events, timestamp)
+
+            self.state_change_id = state_change_ids[-1]
+            self._observe_durations(start, state_changes_written, dispatched)
+
+        all_events = [event for events in events_per_state_change for event in events]
+        return state, all_events
+
     def snapshot(self) -> None:
         """ Snapshot the application state.
 
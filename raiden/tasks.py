@@ -1,10 +1,12 @@
 import re
+import time
 from json.decoder import JSONDecodeError
 
 import click
 import gevent
 import requests
 import structlog
+from cachetools import LRUCache
 from eth_utils import to_hex
 from gevent.event import AsyncResult
 from pkg_resources import parse_version
@@ -23,10 +25,17 @@ from raiden.exceptions import EthNodeCommunicationError
 from raiden.network.proxies.user_deposit import UserDeposit
 from raiden.settings import MIN_REI_THRESHOLD
 from raiden.utils import gas_reserve, pex, to_rdn
+from raiden.utils.metrics import Gauge
 from raiden.utils.runnable import Runnable
-from raiden.utils.typing import Tuple
+from raiden.utils.typing import BlockNumber, Dict, Optional, Tuple
 
 REMOVE_CALLBACK = object()
+
+# The block time estimate follows the observed block times with this weight,
+# and is capped to poll at least this often regardless of the estimate
+BLOCK_TIME_SMOOTHING = 0.2
+MAX_BLOCK_TIME = 30.0
+BLOCK_HEADERS_CACHE_SIZE = 32
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
@@ -142,10 +151,28 @@ class AlarmTask(Runnable):
         self.known_block_number = None
         self._stop_event = None
 
-        # TODO: Start with a larger sleep_time and decrease it as the
-        # probability of a new block increases.
+        # The shortest time between two polls, used while a new block is
+        # expected
         self.sleep_time = 0.5
 
+        # Estimated time between blocks, computed from the timestamps of the
+        # blocks, and the time the last new block was seen. These are used to
+        # sleep until the next block is expected instead of polling every
+        # `sleep_time`.
+        self.block_time: Optional[float] = None
+        self._last_block_seen_at: Optional[float] = None
+        self._last_block: Optional[Dict] = None
+
+        # Headers of the recently seen blocks of the chain of the latest block,
+        # the callbacks use them to avoid requesting the confirmed block again
+        self.block_headers: Dict[BlockNumber, Dict] = LRUCache(maxsize=BLOCK_HEADERS_CACHE_SIZE)
+
+        self.block_lag_gauge = Gauge(
+            "raiden_alarm_block_lag_seconds",
+            "Time since the latest block seen by the alarm task was mined",
+            function=self._block_lag,
+        )
+
     def __repr__(self):
         return f"<{self.__class__.__name__} node:{pex(self.chain.client.address)}>"
 
@@ -192,8 +219,7 @@ class AlarmTask(Runnable):
         msg = "Only start the AlarmTask after it has been primed with the first_run"
         assert self.is_primed(), msg
 
-        sleep_time = self.sleep_time
-        while self._stop_event.wait(sleep_time) is not True:
+        while self._stop_event.wait(self.next_poll_in()) is not True:
             try:
                 latest_block = self.chain.get_block(block_identifier="latest")
             except JSONDecodeError as e:
@@ -201,6 +227,83 @@ class AlarmTask(Runnable):
 
             self._maybe_run_callbacks(latest_block)
 
+    def next_poll_in(self) -> float:
+        """ Seconds until the next block is expected, but at least `sleep_time`.
+
+        Once the expected time has passed the chain is polled every
+        `sleep_time` until the new block is seen.
+        """
+        if self.block_time is None or self._last_block_seen_at is None:
+            return self.sleep_time
+
+        elapsed = time.monotonic() - self._last_block_seen_at
+        return max(self.sleep_time, min(self.block_time, MAX_BLOCK_TIME) - elapsed)
+
+    def get_block(self, block_number: BlockNumber) -> Dict:
+        """ Returns the block `block_number` of the chain of the latest block
+        seen, from the recently seen blocks if possible.
+
+        The cache only holds ancestors of the latest block. A missing block is
+        requested by number, and checked against its child if the child is
+        known. If they don't match the block was orphaned by a reorg since the
+        child was seen, and the parent of the child is requested by hash
+        instead. Walking back the parent hashes of every skipped block is
+        avoided, a reorg which is not detected here is detected once the next
+        block is seen.
+        """
+        block = self.block_headers.get(block_number)
+        if block is not None:
+            return block
+
+        block = self.chain.get_block(block_identifier=block_number)
+
+        child = self.block_headers.get(block_number + 1)
+        if child is not None and child["parentHash"] != block["hash"]:
+            block = self.chain.get_block(block_identifier=child["parentHash"])
+
+        # The known ancestors are from another chain, they can't be trusted
+        parent = self.block_headers.get(block_number - 1)
+        if parent is not None and parent["hash"] != block["parentHash"]:
+            for number in [number for number in self.block_headers if number < block_number]:
+                del self.block_headers[number]
+
+        self.block_headers[block_number] = block
+        return block
+
+    def _new_block_seen(self, latest_block: Dict) -> None:
+        latest_block_number = latest_block["number"]
+
+        # A new block replaces the blocks with the same or a higher number. If
+        # it's not a child of the known parent there was a reorg, if the parent
+        # is not known blocks were skipped and a reorg could have been missed,
+        # in both cases none of the known blocks can be trusted.
+        for block_number in [
+            number for number in self.block_headers if number >= latest_block_number
+        ]:
+            del self.block_headers[block_number]
+        parent = self.block_headers.get(latest_block_number - 1)
+        if parent is None or parent["hash"] != latest_block["parentHash"]:
+            self.block_headers.clear()
+        self.block_headers[latest_block_number] = latest_block
+
+        last_block = self._last_block
+        if last_block is not None and latest_block_number > last_block["number"]:
+            interval = (latest_block["timestamp"] - last_block["timestamp"]) / (
+                latest_block_number - last_block["number"]
+            )
+            if self.block_time is None:
+                self.block_time = interval
+            else:
+                self.block_time += BLOCK_TIME_SMOOTHING * (interval - self.block_time)
+
+        self._last_block = latest_block
+        self._last_block_seen_at = time.monotonic()
+
+    def _block_lag(self) -> float:
+        if self._last_block is None:
+            return 0.0
+        return time.time() - self._last_block["timestamp"]
+
     def first_run(self, known_block_number):
         """ Blocking call to update the local state, if necessary. """
         assert self.callbacks, "callbacks not set"
@@ -251,6 +354,8 @@ class AlarmTask(Runnable):
 
             log.debug("Received new block", **log_details)
 
+            self._new_block_seen(latest_block)
+
             remove = list()
             for callback in self.callbacks:
                 result = callback(latest_block)
@@ -0,0 +1,169 @@
+""" Measures how long a node takes to catch up with the blockchain events.
+
+Polls all the events of the token network registry at `--registry` and of the
+token networks it created, from `--from-block` to the latest block, converts
+them to state changes and dispatches them in batches to a write-ahead log, the
+same way the node does on its first run after a restart. Reports the time
+until the node is ready, i.e. until the `Block` state change of the latest
+block is dispatched, and the events/s. Run it against a chain with a large
+event history, with different `--concurrency` values to compare.
+
+The node uses a new random account, so it is not a participant of any channel
+and the events have no side-effects besides the node's state.
+
+Usage: python -m raiden.tests.benchmark.catch_up_sync --eth-rpc-endpoint http://127.0.0.1:8545 \
+    --registry 0x... --concurrency 8
+"""
+from gevent import monkey  # isort:skip # noqa
+
+monkey.patch_all()  # isort:skip # noqa
+
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from eth_utils import to_canonical_address
+from web3 import HTTPProvider, Web3
+
+from raiden import constants
+from raiden.blockchain.events import BlockchainEvents
+from raiden.blockchain_events_handler import dispatch_blockchain_events
+from raiden.network.blockchain_service import BlockChainService
+from raiden.network.rpc.client import JSONRPCClient
+from raiden.settings import DEFAULT_REVEAL_TIMEOUT, DEVELOPMENT_CONTRACT_VERSION
+from raiden.storage.serialization import JSONSerializer
+from raiden.storage.sqlite import SerializedSQLiteStorage
+from raiden.storage.wal import WriteAheadLog
+from raiden.transfer import node
+from raiden.transfer.architecture import StateManager
+from raiden.transfer.state import PaymentNetworkState
+from raiden.transfer.state_change import ActionInitChain, Block, ContractReceiveNewPaymentNetwork
+from raiden.utils.typing import BlockHash
+from raiden_contracts.contract_manager import ContractManager, contracts_precompiled_path
+
+
+class CatchUpNode:
+    """ The parts of the RaidenService used to handle the blockchain events. """
+
+    def __init__(
+        self,
+        web3: Web3,
+        registry_address: bytes,
+        from_block: int,
+        database_path: Path,
+        concurrency: int,
+    ) -> None:
+        self.contract_manager = ContractManager(
+            contracts_precompiled_path(DEVELOPMENT_CONTRACT_VERSION)
+        )
+        self.chain = BlockChainService(JSONRPCClient(web3, os.urandom(32)), self.contract_manager)
+        self.address = self.chain.node_address
+        self.config = {"reveal_timeout": DEFAULT_REVEAL_TIMEOUT}
+        self.default_registry = self.chain.token_network_registry(registry_address)
+        self.blockchain_events = BlockchainEvents(max_concurrent_queries=concurrency)
+        self.blockchain_events.add_token_network_registry_listener(
+            self.default_registry, self.contract_manager, from_block=from_block
+        )
+
+        storage = SerializedSQLiteStorage(database_path, JSONSerializer)
+        self.wal = WriteAheadLog(StateManager(node.state_transition, None), storage)
+        self.num_events = 0
+        self.num_batches = 0
+
+        block = self.chain.get_block(block_identifier=from_block)
+        block_hash = BlockHash(bytes(block["hash"]))
+        self.wal.log_and_dispatch(
+            ActionInitChain(
+                pseudo_random_generator=random.Random(),
+                block_number=from_block,
+                block_hash=block_hash,
+                our_address=self.address,
+                chain_id=self.chain.network_id,
+            )
+        )
+        self.wal.log_and_dispatch(
+            ContractReceiveNewPaymentNetwork(
+                transaction_hash=constants.EMPTY_TRANSACTION_HASH,
+                payment_network=PaymentNetworkState(self.default_registry.address, []),
+                block_number=from_block,
+                block_hash=block_hash,
+            )
+        )
+
+    def handle_and_track_state_changes(self, state_changes):
+        if state_changes:
+            self.wal.log_and_dispatch_batch(state_changes)
+            self.num_batches += 1
+
+    def handle_and_track_state_change(self, state_change):
+        self.handle_and_track_state_changes([state_change])
+
+    def start_health_check_for(self, node_address):
+        pass
+
+    def add_pending_greenlet(self, greenlet):
+        pass
+
+    def connection_manager_for_token_network(self, token_network_address):
+        return self
+
+    def retry_connect(self):
+        pass
+
+    def _count_events(self, block_number: int):
+        for event in self.blockchain_events.poll_blockchain_events(block_number):
+            self.num_events += 1
+            yield event
+
+    def catch_up(self, block_number: int) -> None:
+        """ Dispatch the events up to `block_number` and the `Block` state
+        change, like the node's new block callback does.
+        """
+        state_changes = dispatch_blockchain_events(self, self._count_events(block_number))
+        block = self.chain.get_block(block_identifier=block_number)
+        state_changes.append(
+            Block(
+                block_number=block_number,
+                gas_limit=block["gasLimit"],
+                block_hash=BlockHash(bytes(block["hash"])),
+            )
+        )
+        self.handle_and_track_state_changes(state_changes)
+
+
+@click.command()
+@click.option("--eth-rpc-endpoint", default="http://127.0.0.1:8545", help="Ethereum node.")
+@click.option("--registry", required=True, help="Address of the token network registry.")
+@click.option("--from-block", default=0, help="First block to poll the events from.")
+@click.option("--concurrency", default=8, help="Maximum number of block ranges queried at once.")
+def main(eth_rpc_endpoint: str, registry: str, from_block: int, concurrency: int) -> None:
+    web3 = Web3(HTTPProvider(eth_rpc_endpoint))
+    latest_block_number = web3.eth.blockNumber
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        catch_up_node = CatchUpNode(
+            web3=web3,
+            registry_address=to_canonical_address(registry),
+            from_block=from_block,
+            database_path=Path(tmpdir) / "catch_up.db",
+            concurrency=concurrency,
+        )
+
+        start = time.monotonic()
+        catch_up_node.catch_up(latest_block_number)
+        elapsed = time.monotonic() - start
+
+    print(
+        f"blocks={latest_block_number - from_block} "
+        f"listeners={len(catch_up_node.blockchain_events.event_listeners)} "
+        f"events={catch_up_node.num_events} batches={catch_up_node.num_batches} "
+        f"concurrency={concurrency}"
+    )
+    print(f"time to ready: {elapsed:.3f}s {catch_up_node.num_events / elapsed:.1f} events/s")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,87 @@
+""" Cost of the gas reserve estimate for nodes with many channels.
+
+Builds a chain state with `--token-networks` token networks of `--channels`
+channels each, and times `--rounds` gas reserve estimates, first by filtering
+the channels of every token network once per channel status like the estimate
+used to do, then with the channel status counts kept by the token networks.
+The first estimate with the counts builds them from the channels, the
+following ones only read them.
+
+Usage: python -m raiden.tests.benchmark.gas_reserve --channels 10000 --rounds 100
+"""
+import time
+from unittest.mock import Mock
+
+import click
+
+from raiden.tests.benchmark.state_machine import make_chain_state
+from raiden.transfer import views
+from raiden.utils.gas_reserve import (
+    _get_required_gas_estimate,
+    _get_required_gas_estimate_for_state,
+)
+
+
+def estimate_by_filtering(raiden) -> int:
+    chain_state = views.state_from_raiden(raiden)
+    registry_address = raiden.default_registry.address
+
+    gas_estimate = 0
+    for token_address in views.get_token_identifiers(chain_state, registry_address):
+        gas_estimate += _get_required_gas_estimate(
+            opened_channels=len(
+                views.get_channelstate_open(chain_state, registry_address, token_address)
+            ),
+            closing_channels=len(
+                views.get_channelstate_closing(chain_state, registry_address, token_address)
+            ),
+            closed_channels=len(
+                views.get_channelstate_closed(chain_state, registry_address, token_address)
+            ),
+            settling_channels=len(
+                views.get_channelstate_settling(chain_state, registry_address, token_address)
+            ),
+            settled_channels=len(
+                views.get_channelstate_settled(chain_state, registry_address, token_address)
+            ),
+        )
+
+    return gas_estimate
+
+
+def run(name, estimate, raiden, rounds):
+    start = time.perf_counter()
+    result = estimate(raiden)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        estimate(raiden)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name}: first {first * 1000:.3f}ms, then {elapsed / rounds * 1000:.3f}ms "
+        f"per estimate, estimate: {result}"
+    )
+
+
+@click.command()
+@click.option("--token-networks", default=1, help="Number of token networks.")
+@click.option("--channels", default=10_000, help="Number of channels per token network.")
+@click.option("--rounds", default=100, help="Number of estimates to time.")
+def main(token_networks, channels, rounds):
+    chain_state = make_chain_state(token_networks, channels)
+
+    raiden = Mock()
+    raiden.wal.state_manager.current_state = chain_state
+    raiden.default_registry.address = next(iter(chain_state.identifiers_to_paymentnetworks))
+    # The channels being opened are tracked by the proxies, not by the state
+    raiden.chain.token_network.return_value.open_channel_transactions = dict()
+
+    print(f"token_networks={token_networks} channels={channels} rounds={rounds}")
+    run("filter by status", estimate_by_filtering, raiden, rounds)
+    run("status counts", _get_required_gas_estimate_for_state, raiden, rounds)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
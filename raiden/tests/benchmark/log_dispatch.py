@@ -0,0 +1,68 @@
+""" Measures the state change dispatch throughput with debug logging on and off.
+
+Each dispatch logs the state change and its events at debug level the same way
+`RaidenService.handle_state_changes` does, with debug logging disabled this
+should cost close to nothing.
+
+Usage: python -m raiden.tests.benchmark.log_dispatch --channels 100 --messages 2000
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import click
+import structlog
+
+from raiden.log_config import LazyValue, configure_logging
+from raiden.raiden_service import _serialize_and_redact, _serialize_and_redact_all
+from raiden.tests.benchmark.wal_dispatch import make_chain_state, new_wal
+from raiden.tests.utils import factories
+from raiden.transfer.state_change import ReceiveProcessed
+
+log = structlog.get_logger("raiden.tests.benchmark")  # pylint: disable=invalid-name
+
+
+def run_dispatch(database_path: Path, channels: int, messages: int) -> float:
+    wal = new_wal(database_path, make_chain_state(channels))
+    sender = factories.make_address()
+    state_changes = [
+        ReceiveProcessed(sender=sender, message_identifier=identifier)
+        for identifier in range(messages)
+    ]
+
+    start = time.monotonic()
+    for state_change in state_changes:
+        log.debug("State change", state_change=LazyValue(_serialize_and_redact, state_change))
+        _, events = wal.log_and_dispatch(state_change)
+        log.debug("Raiden events", raiden_events=LazyValue(_serialize_and_redact_all, events))
+    return time.monotonic() - start
+
+
+@click.command()
+@click.option("--channels", default=100, help="Number of open channels in the state.")
+@click.option("--messages", default=2000, help="Number of state changes to dispatch.")
+def main(channels: int, messages: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configure_logging(
+            {"": "INFO"},
+            log_file=str(Path(tmpdir) / "raiden.log"),
+            disable_debug_logfile=True,
+            cache_logger_on_first_use=False,
+        )
+        debug_off = run_dispatch(Path(tmpdir) / "off.db", channels, messages)
+
+        configure_logging(
+            {"": "INFO", "raiden": "DEBUG"},
+            log_file=str(Path(tmpdir) / "raiden.log"),
+            disable_debug_logfile=True,
+            cache_logger_on_first_use=False,
+        )
+        debug_on = run_dispatch(Path(tmpdir) / "on.db", channels, messages)
+
+    print(f"channels={channels} messages={messages}")
+    print(f"debug off: {debug_off:.3f}s {messages / debug_off:.1f} state changes/s")
+    print(f"debug on:  {debug_on:.3f}s {messages / debug_on:.1f} state changes/s")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,162 @@
+""" End-to-end payment throughput of many nodes running in this process.
+
+Starts `--nodes` `RaidenService`s connected by an in-memory transport, on top
+of an in-memory blockchain, see `raiden.tests.utils.inmemory`. The channels are
+opened following `--topology`:
+
+- line: every node has a channel with the next one.
+- star: the first node has a channel with every other node.
+- mesh: every node has a channel with every other node.
+
+Then `--payments` payments are sent, at most `--concurrency` at a time, either
+between random pairs of nodes or from the first node to the last one with
+`--pattern ends`. The payments/s, the latency of the payments and of each hop,
+and the CPU time used by each node, accounted by the `HubMonitor`, are
+reported. Everything runs in a single thread, so the CPU time of the nodes adds
+up.
+
+Usage: python -m raiden.tests.benchmark.multi_node --nodes 5 --topology line \
+    --pattern ends --payments 500 --concurrency 20
+"""
+from gevent import monkey  # isort:skip # noqa
+
+monkey.patch_all()  # isort:skip # noqa
+
+import random
+import tempfile
+import time
+
+import click
+import gevent
+import gevent.pool
+from gevent.hub import Hub
+
+from raiden.log_config import configure_logging
+from raiden.tests.utils.factories import UNIT_CHAIN_ID
+from raiden.tests.utils.inmemory import (
+    TOPOLOGIES,
+    InMemoryBlockchain,
+    InMemoryNetwork,
+    start_nodes,
+)
+from raiden.transfer.events import EventPaymentSentSuccess
+from raiden.utils import pex
+from raiden.utils.debugging import HubMonitor
+
+PAYMENT_TIMEOUT = 60
+
+
+def node_label(owners):
+    """ Groups the greenlets by node for the `HubMonitor`.
+
+    A greenlet belongs to a node if the function it runs is a method of one of
+    the node's objects, e.g. the `RaidenService` or its transport.
+    """
+
+    def label(greenlet_):
+        if isinstance(greenlet_, Hub):
+            return "hub"
+        owner = getattr(getattr(greenlet_, "_run", None), "__self__", None)
+        return owners.get(id(owner), "harness")
+
+    return label
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+@click.command()
+@click.option("--nodes", default=5, help="Number of nodes.")
+@click.option("--topology", type=click.Choice(sorted(TOPOLOGIES)), default="line")
+@click.option(
+    "--pattern",
+    type=click.Choice(["random", "ends"]),
+    default="random",
+    help="Pay between random pairs of nodes, or from the first node to the last.",
+)
+@click.option("--payments", default=500, help="Number of payments to send.")
+@click.option("--concurrency", default=20, help="Maximum number of payments in flight.")
+@click.option("--deposit", default=10 ** 9, help="Deposit of each participant of a channel.")
+@click.option("--latency", default=0.0, help="Seconds for a message to reach its receiver.")
+@click.option("--block-time", default=1.0, help="Seconds between two blocks.")
+@click.option("--seed", default=0, help="Seed of the random pairs of nodes.")
+def main(
+    nodes, topology, pattern, payments, concurrency, deposit, latency, block_time, seed
+):  # pylint: disable=too-many-arguments,too-many-locals
+    configure_logging({"": "WARNING"}, disable_debug_logfile=True)
+    rng = random.Random(seed)
+
+    blockchain = InMemoryBlockchain(network_id=UNIT_CHAIN_ID, block_time=block_time)
+    network = InMemoryNetwork(latency=latency)
+
+    with tempfile.TemporaryDirectory() as database_dir:
+        raiden_services, token_network_address = start_nodes(
+            blockchain, network, nodes, topology, deposit, database_dir
+        )
+
+        owners = dict()
+        for number, raiden in enumerate(raiden_services):
+            for owner in (raiden, raiden.transport, raiden.alarm):
+                owners[id(owner)] = f"node{number} {pex(raiden.address)}"
+        hub_monitor = HubMonitor(label=node_label(owners))
+
+        latencies = list()
+        failures = 0
+
+        def pay(initiator, target, identifier):
+            nonlocal failures
+            start = time.monotonic()
+            payment_status = initiator.mediated_transfer_async(
+                token_network_address=token_network_address,
+                amount=1,
+                target=target.address,
+                identifier=identifier,
+            )
+            success = payment_status.payment_done.wait(timeout=PAYMENT_TIMEOUT)
+            if isinstance(success, EventPaymentSentSuccess):
+                latencies.append(time.monotonic() - start)
+            else:
+                failures += 1
+
+        pool = gevent.pool.Pool(concurrency)
+        hub_monitor.start()
+        start = time.monotonic()
+        for identifier in range(1, payments + 1):
+            if pattern == "ends":
+                initiator, target = raiden_services[0], raiden_services[-1]
+            else:
+                initiator, target = rng.sample(raiden_services, 2)
+            pool.spawn(pay, initiator, target, identifier)
+        pool.join(raise_error=True)
+        elapsed = time.monotonic() - start
+        hub_monitor.stop()
+
+        for raiden in raiden_services:
+            raiden.stop()
+        blockchain.stop()
+
+    print(
+        f"nodes={nodes} topology={topology} pattern={pattern} payments={payments} "
+        f"concurrency={concurrency} latency={latency}"
+    )
+    print(f"elapsed: {elapsed:.3f}s {payments / elapsed:.1f} payments/s failures: {failures}")
+    if latencies:
+        print(
+            f"payment latency p50: {percentile(latencies, 50):.3f}s "
+            f"p90: {percentile(latencies, 90):.3f}s p99: {percentile(latencies, 99):.3f}s"
+        )
+    print(
+        f"hop latency p50: {percentile(network.hop_latencies, 50) * 1000:.3f}ms "
+        f"p99: {percentile(network.hop_latencies, 99) * 1000:.3f}ms"
+    )
+    cpu_time = {
+        metric.labels["greenlet"]: metric.value for metric in hub_monitor.cpu_time_counters
+    }
+    for label, seconds in sorted(cpu_time.items()):
+        print(f"cpu {label}: {seconds:.3f}s {seconds / elapsed:.1%}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
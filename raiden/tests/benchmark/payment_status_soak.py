@@ -0,0 +1,114 @@
+""" Soak test for the memory used by the bookkeeping of finished payments.
+
+Runs `--payments` payments through the same bookkeeping a node does: the PFS
+feedback tokens of the `--routes` routes are stored when the payment starts,
+the payment status is stored until the payment finishes, and the success
+events are handled by the event handlers of a node. Only
+the first route of every payment is used, the tokens of the other routes must
+be evicted by the bounds of the cache. The RSS of the process should stay
+flat.
+
+Usage: python -m raiden.tests.benchmark.payment_status_soak --payments 1000000
+"""
+import resource
+import time
+import types
+import uuid
+from collections import defaultdict
+from unittest.mock import patch
+
+import click
+from cachetools import TTLCache
+from gevent.event import AsyncResult
+
+from raiden.log_config import configure_logging
+from raiden.raiden_event_handler import PFSFeedbackEventHandler, RaidenEventHandler
+from raiden.raiden_service import PaymentStatus, RaidenService, initiator_routes
+from raiden.settings import (
+    DEFAULT_PATHFINDING_FEEDBACK_TOKENS_MAX,
+    DEFAULT_PATHFINDING_FEEDBACK_TOKENS_TTL,
+)
+from raiden.tests.utils import factories
+from raiden.tests.utils.mocks import MockRaidenService
+from raiden.transfer.events import EventPaymentSentSuccess
+from raiden.transfer.state import RouteState
+from raiden.transfer.views import state_from_raiden
+
+
+def make_raiden() -> MockRaidenService:
+    raiden = MockRaidenService(config={})
+    raiden.route_to_feeback_token = TTLCache(
+        maxsize=DEFAULT_PATHFINDING_FEEDBACK_TOKENS_MAX,
+        ttl=DEFAULT_PATHFINDING_FEEDBACK_TOKENS_TTL,
+    )
+    raiden.targets_to_identifiers_to_statuses = defaultdict(dict)
+    raiden.pop_payment_status = types.MethodType(RaidenService.pop_payment_status, raiden)
+    return raiden
+
+
+def max_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@click.command()
+@click.option("--payments", default=1_000_000, help="Number of payments to run.")
+@click.option("--routes", default=3, help="Number of routes returned for every payment.")
+@click.option("--reports", default=10, help="Number of times the memory usage is reported.")
+def main(payments: int, routes: int, reports: int) -> None:
+    configure_logging({"": "INFO"}, disable_debug_logfile=True)
+    raiden = make_raiden()
+    chain_state = state_from_raiden(raiden)
+    event_handler = PFSFeedbackEventHandler(RaidenEventHandler())
+    token_network_address = factories.make_address()
+    payment_network_address = factories.make_address()
+    secret = factories.make_secret()
+    report_every = max(1, payments // reports)
+
+    def get_best_routes(to_address, **_kwargs):
+        route_states = [
+            RouteState(route=[factories.make_address(), to_address], forward_channel_id=1)
+            for _ in range(routes)
+        ]
+        return route_states, uuid.uuid4()
+
+    start = time.monotonic()
+    with patch("raiden.routing.get_best_routes", new=get_best_routes):
+        for identifier in range(1, payments + 1):
+            target = factories.make_address()
+            route_states = initiator_routes(raiden, token_network_address, target, 1)
+            raiden.targets_to_identifiers_to_statuses[target][identifier] = PaymentStatus(
+                payment_identifier=identifier,
+                amount=1,
+                token_network_address=token_network_address,
+                payment_done=AsyncResult(),
+            )
+
+            event = EventPaymentSentSuccess(
+                payment_network_address=payment_network_address,
+                token_network_address=token_network_address,
+                identifier=identifier,
+                amount=1,
+                target=target,
+                secret=secret,
+                route=route_states[0].route,
+            )
+            event_handler.on_raiden_event(raiden, chain_state, event)
+
+            if identifier % report_every == 0:
+                in_flight = sum(
+                    len(statuses)
+                    for statuses in raiden.targets_to_identifiers_to_statuses.values()
+                )
+                print(
+                    f"payments={identifier} max_rss={max_rss_mib():.1f}MiB "
+                    f"feedback_tokens={len(raiden.route_to_feeback_token)} "
+                    f"payments_in_flight={in_flight}"
+                )
+
+    elapsed = time.monotonic() - start
+    print(f"elapsed: {elapsed:.3f}s {payments / elapsed:.1f} payments/s")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
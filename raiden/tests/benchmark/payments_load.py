@@ -0,0 +1,138 @@
+""" Load generator for the payments endpoint of a running node.
+
+Sends `--payments` payments from the node at `--api-url` to `--target`, at
+most `--concurrency` at a time, and reports the payments/s and the latency of
+each payment. With `--async` the payments are started with the
+`Prefer: respond-async` header and their outcome is long-polled from the
+payment status endpoint, so the number of payments in flight is not bound to
+the number of requests the node is processing. With `--batch-size` the
+payments are sent in batches through the payment batches endpoint, the
+latency is then measured per batch.
+
+Usage: python -m raiden.tests.benchmark.payments_load --api-url http://127.0.0.1:5001 \
+    --token 0x... --target 0x... --payments 1000 --concurrency 100 --async
+       python -m raiden.tests.benchmark.payments_load --api-url http://127.0.0.1:5001 \
+    --token 0x... --target 0x... --payments 1000 --concurrency 4 --batch-size 250
+"""
+from gevent import monkey  # isort:skip # noqa
+
+monkey.patch_all()  # isort:skip # noqa
+
+import json
+import random
+import time
+from http import HTTPStatus
+
+import click
+import gevent.pool
+import requests
+
+PAYMENT_STATUS_TIMEOUT = 30
+
+
+def send_payment(session, payments_url, amount, identifier, respond_async):
+    """ Send one payment and return True if it succeeded. """
+    headers = {"Prefer": "respond-async"} if respond_async else {}
+    response = session.post(
+        payments_url, json={"amount": amount, "identifier": identifier}, headers=headers
+    )
+
+    if not respond_async:
+        return response.status_code == HTTPStatus.OK
+
+    if response.status_code != HTTPStatus.ACCEPTED:
+        return False
+
+    status = "pending"
+    while status == "pending":
+        response = session.get(
+            f"{payments_url}/{identifier}", params={"timeout": PAYMENT_STATUS_TIMEOUT}
+        )
+        if response.status_code != HTTPStatus.OK:
+            return False
+        status = response.json()["status"]
+
+    return status == "success"
+
+
+def send_batch(session, batches_url, target, amount, identifiers):
+    """ Send a batch of payments and return the number of failed payments. """
+    payments = [
+        {"target_address": target, "amount": amount, "identifier": identifier}
+        for identifier in identifiers
+    ]
+    response = session.post(batches_url, json={"payments": payments}, stream=True)
+    if response.status_code != HTTPStatus.OK:
+        return len(identifiers)
+
+    succeeded = sum(
+        json.loads(line)["status"] == "success" for line in response.iter_lines() if line
+    )
+    return len(identifiers) - succeeded
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+@click.command()
+@click.option("--api-url", default="http://127.0.0.1:5001", help="Address of the node's API.")
+@click.option("--token", required=True, help="Address of the token to pay with.")
+@click.option("--target", required=True, help="Address of the target of the payments.")
+@click.option("--payments", default=1000, help="Number of payments to send.")
+@click.option("--concurrency", default=100, help="Maximum number of payments in flight.")
+@click.option("--amount", default=1, help="Amount of each payment.")
+@click.option("--async", "respond_async", is_flag=True, help="Use asynchronous payments.")
+@click.option("--batch-size", default=0, help="Number of payments per batch, 0 disables batches.")
+def main(api_url, token, target, payments, concurrency, amount, respond_async, batch_size):
+    payments_url = f"{api_url}/api/v1/payments/{token}/{target}"
+    batches_url = f"{api_url}/api/v1/payment_batches/{token}"
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Random identifiers, so that runs against the same node don't conflict
+    first_identifier = random.randint(1, 2 ** 48)
+    latencies = []
+    failures = 0
+
+    def run(identifier):
+        nonlocal failures
+        start = time.monotonic()
+        if not send_payment(session, payments_url, amount, identifier, respond_async):
+            failures += 1
+        latencies.append(time.monotonic() - start)
+
+    def run_batch(identifiers):
+        nonlocal failures
+        start = time.monotonic()
+        failures += send_batch(session, batches_url, target, amount, identifiers)
+        latencies.append(time.monotonic() - start)
+
+    identifiers = range(first_identifier, first_identifier + payments)
+    pool = gevent.pool.Pool(concurrency)
+    start = time.monotonic()
+    if batch_size:
+        for pos in range(0, payments, batch_size):
+            pool.spawn(run_batch, identifiers[pos : pos + batch_size])
+    else:
+        for identifier in identifiers:
+            pool.spawn(run, identifier)
+    pool.join()
+    elapsed = time.monotonic() - start
+
+    latencies.sort()
+    print(
+        f"payments={payments} concurrency={concurrency} async={respond_async} "
+        f"batch_size={batch_size}"
+    )
+    print(f"elapsed: {elapsed:.3f}s {payments / elapsed:.1f} payments/s failures: {failures}")
+    print(
+        f"latency p50: {percentile(latencies, 50):.3f}s "
+        f"p90: {percentile(latencies, 90):.3f}s p99: {percentile(latencies, 99):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
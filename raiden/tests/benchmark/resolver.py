@@ -0,0 +1,72 @@
+""" Compares the resolver client with plain `requests.post` calls.
+
+Sends `--requests` secret requests to the resolver at `--endpoint`, at most
+`--concurrency` at a time, first with a new connection per request like the
+node used to do, then with the `ResolverClient`, and reports the requests/s and
+the latency percentiles of both. The secrethashes are unknown to the resolver,
+so the client's cache is not involved. Start the dummy resolver first:
+
+    python tools/dummy_resolver_server.py
+
+Usage: python -m raiden.tests.benchmark.resolver --requests 2000 --concurrency 10
+"""
+from gevent import monkey  # isort:skip # noqa
+
+monkey.patch_all()  # isort:skip # noqa
+
+import os
+import time
+
+import click
+import gevent.pool
+import requests
+from eth_utils import to_hex
+
+from raiden.network.resolver.client import ResolverClient
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(name, resolve, num_requests, concurrency):
+    latencies = list()
+
+    def timed_resolve():
+        secrethash = os.urandom(32)
+        start = time.monotonic()
+        resolve(secrethash, {"secrethash": to_hex(secrethash)})
+        latencies.append(time.monotonic() - start)
+
+    pool = gevent.pool.Pool(concurrency)
+    start = time.monotonic()
+    for _ in range(num_requests):
+        pool.spawn(timed_resolve)
+    pool.join(raise_error=True)
+    elapsed = time.monotonic() - start
+
+    print(
+        f"{name}: {elapsed:.3f}s {num_requests / elapsed:.1f} requests/s "
+        f"p50: {percentile(latencies, 50) * 1000:.3f}ms "
+        f"p99: {percentile(latencies, 99) * 1000:.3f}ms"
+    )
+
+
+@click.command()
+@click.option("--endpoint", default="http://localhost:8000", help="URL of the resolver.")
+@click.option("--requests", "num_requests", default=2000, help="Number of secret requests.")
+@click.option("--concurrency", default=10, help="Maximum number of requests in flight.")
+def main(endpoint, num_requests, concurrency):
+    def unpooled(_secrethash, request):
+        requests.post(endpoint, json=request)
+
+    client = ResolverClient(endpoint, pool_size=concurrency)
+
+    print(f"requests={num_requests} concurrency={concurrency}")
+    run("requests.post", unpooled, num_requests, concurrency)
+    run("ResolverClient", client.resolve, num_requests, concurrency)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,435 @@
+""" Throughput of the state machine with a realistic mix of state changes.
+
+Builds a chain state with `--token-networks` token networks of `--channels`
+channels each, and starts `--pending-payments` payments which are never
+finished, so that the state carries their pending locks and payment tasks.
+Then runs `--payments` payments, at most `--in-flight` at a time, each is the
+same sequence of state changes a node handles as the initiator of a payment:
+ActionInitInitiator, the Processed for the locked transfer, the secret request,
+the secret reveal which unlocks the payment and the Processed for the unlock.
+A Block is dispatched every `--block-every` state changes.
+
+The state changes are applied with `node.state_transition`, to measure the
+state machine alone, and through `WriteAheadLog.log_and_dispatch`, which also
+copies the state and writes to the database like a node does. Each mode runs
+in a process of its own, the same `--seed` runs the same workload. The ops/s,
+the latency percentiles per state change type and the peak memory are printed,
+and with `--output` saved as JSON. With `--baseline` the results are compared
+with the JSON saved by an earlier run, e.g. on another commit.
+
+Usage: python -m raiden.tests.benchmark.state_machine --channels 100 --payments 2000 \
+    --output results.json
+       python -m raiden.tests.benchmark.state_machine --baseline results.json
+"""
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from collections import defaultdict, deque
+from hashlib import sha256
+from pathlib import Path
+
+import click
+
+from raiden.storage.serialization import JSONSerializer
+from raiden.tests.benchmark.wal_dispatch import new_wal
+from raiden.tests.utils import factories
+from raiden.tests.utils.factories import UNIT_CHAIN_ID
+from raiden.transfer import node
+from raiden.transfer.mediated_transfer.events import SendBalanceProof, SendLockedTransfer
+from raiden.transfer.mediated_transfer.state_change import (
+    ActionInitInitiator,
+    ReceiveSecretRequest,
+    ReceiveSecretReveal,
+    TransferDescriptionWithSecretState,
+)
+from raiden.transfer.state import (
+    NODE_NETWORK_REACHABLE,
+    ChainState,
+    PaymentNetworkState,
+    TokenNetworkGraphState,
+    TokenNetworkState,
+)
+from raiden.transfer.state_change import Block, ReceiveProcessed
+
+# The locks of the pending payments must not expire during the run
+REVEAL_TIMEOUT = 1_000_000
+CHANNEL_BALANCE = 10 ** 18
+PERCENTILES = (50, 90, 99)
+
+
+def make_chain_state(number_of_token_networks: int, number_of_channels: int) -> ChainState:
+    chain_state = ChainState(
+        # seeded from the global generator, so that the runs are reproducible
+        pseudo_random_generator=random.Random(random.getrandbits(64)),
+        block_number=1,
+        block_hash=factories.make_block_hash(),
+        our_address=factories.make_address(),
+        chain_id=UNIT_CHAIN_ID,
+    )
+    payment_network = PaymentNetworkState(factories.make_address(), [])
+    chain_state.identifiers_to_paymentnetworks[payment_network.address] = payment_network
+
+    for _ in range(number_of_token_networks):
+        token_network_address = factories.make_address()
+        token_network = TokenNetworkState(
+            address=token_network_address,
+            token_address=factories.make_address(),
+            network_graph=TokenNetworkGraphState(token_network_address),
+        )
+        payment_network.tokennetworkaddresses_to_tokennetworks[
+            token_network.address
+        ] = token_network
+        payment_network.tokenaddresses_to_tokennetworkaddresses[
+            token_network.token_address
+        ] = token_network.address
+        chain_state.tokennetworkaddresses_to_paymentnetworkaddresses[
+            token_network.address
+        ] = payment_network.address
+
+        for _ in range(number_of_channels):
+            partner = factories.make_address()
+            canonical_identifier = factories.make_canonical_identifier(
+                token_network_address=token_network.address
+            )
+            channel_state = factories.create(
+                factories.NettingChannelStateProperties(
+                    our_state=factories.NettingChannelEndStateProperties(
+                        balance=CHANNEL_BALANCE, address=chain_state.our_address
+                    ),
+                    partner_state=factories.NettingChannelEndStateProperties(
+                        balance=CHANNEL_BALANCE, address=partner
+                    ),
+                    token_address=token_network.token_address,
+                    payment_network_address=payment_network.address,
+                    canonical_identifier=canonical_identifier,
+                    reveal_timeout=REVEAL_TIMEOUT,
+                    settle_timeout=REVEAL_TIMEOUT * 3,
+                )
+            )
+            channel_id = canonical_identifier.channel_identifier
+            token_network.partneraddresses_to_channelidentifiers[partner].append(channel_id)
+            token_network.channelidentifiers_to_channels[channel_id] = channel_state
+            chain_state.nodeaddresses_to_networkstates[partner] = NODE_NETWORK_REACHABLE
+
+    return chain_state
+
+
+def all_channels(chain_state: ChainState):
+    return [
+        channel_state
+        for payment_network in chain_state.identifiers_to_paymentnetworks.values()
+        for token_network in payment_network.tokennetworkaddresses_to_tokennetworks.values()
+        for channel_state in token_network.channelidentifiers_to_channels.values()
+    ]
+
+
+def find_event(events, event_type):
+    return next(event for event in events if isinstance(event, event_type))
+
+
+def payment_flow(channel_state, identifier, finish=True):
+    """ Generates the state changes of a payment to the partner of
+    `channel_state`, the events of every state change are sent back to the
+    generator.
+    """
+    partner = channel_state.partner_state.address
+    secret = factories.make_secret()
+    transfer = TransferDescriptionWithSecretState(
+        payment_network_address=channel_state.payment_network_address,
+        payment_identifier=identifier,
+        amount=1,
+        allocated_fee=0,
+        token_network_address=channel_state.token_network_address,
+        initiator=channel_state.our_state.address,
+        target=partner,
+        secret=secret,
+    )
+    route = factories.make_route_from_channel(channel_state)
+    events = yield ActionInitInitiator(transfer, [route])
+    locked_transfer = find_event(events, SendLockedTransfer)
+    yield ReceiveProcessed(sender=partner, message_identifier=locked_transfer.message_identifier)
+
+    if not finish:
+        return
+
+    yield ReceiveSecretRequest(
+        payment_identifier=identifier,
+        amount=transfer.amount,
+        expiration=locked_transfer.transfer.lock.expiration,
+        secrethash=sha256(secret).digest(),
+        sender=partner,
+    )
+    events = yield ReceiveSecretReveal(secret=secret, sender=partner)
+    unlock = find_event(events, SendBalanceProof)
+    yield ReceiveProcessed(sender=partner, message_identifier=unlock.message_identifier)
+
+
+class Workload:
+    """ Interleaves the state changes of the payments in flight, and of the
+    new blocks.
+    """
+
+    def __init__(self, chain_state, payments, in_flight, block_every):
+        self.channels = all_channels(chain_state)
+        self.block_number = chain_state.block_number
+        self.payments = payments
+        self.in_flight = in_flight
+        self.block_every = block_every
+        self.next_identifier = 1
+        self.flows = deque()
+
+    def _new_flow(self, finish=True):
+        channel_state = self.channels[self.next_identifier % len(self.channels)]
+        flow = payment_flow(channel_state, self.next_identifier, finish)
+        self.next_identifier += 1
+        return flow, next(flow)
+
+    def pending_payments(self, number_of_payments):
+        """ State changes of payments which stay pending. """
+        for _ in range(number_of_payments):
+            flow, state_change = self._new_flow(finish=False)
+            while state_change is not None:
+                events = yield state_change
+                state_change = self._send(flow, events)
+
+    def _send(self, flow, events):
+        try:
+            return flow.send(events)
+        except StopIteration:
+            return None
+
+    def _new_block(self):
+        self.block_number += 1
+        return Block(
+            block_number=self.block_number, gas_limit=1, block_hash=factories.make_block_hash()
+        )
+
+    def __iter__(self):
+        started = 0
+        dispatched = 0
+        while self.flows or started < self.payments:
+            while len(self.flows) < self.in_flight and started < self.payments:
+                self.flows.append(self._new_flow())
+                started += 1
+
+            dispatched += 1
+            if dispatched % self.block_every == 0:
+                yield self._new_block()
+                continue
+
+            flow, state_change = self.flows.popleft()
+            events = yield state_change
+            next_state_change = self._send(flow, events)
+            if next_state_change is not None:
+                self.flows.append((flow, next_state_change))
+
+
+def drive(workload, dispatch, latencies=None):
+    """ Apply the state changes of the workload with `dispatch`, and return
+    the number of state changes.
+    """
+    operations = 0
+    iterator = iter(workload)
+    events = None
+    while True:
+        try:
+            state_change = iterator.send(events)
+        except StopIteration:
+            return operations
+
+        start = time.perf_counter()
+        events = dispatch(state_change)
+        if latencies is not None:
+            latencies[type(state_change).__name__].append(time.perf_counter() - start)
+        operations += 1
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def max_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def summarize(operations, elapsed, latencies):
+    all_latencies = sorted(latency for values in latencies.values() for latency in values)
+    result = {
+        "operations": operations,
+        "elapsed": elapsed,
+        "ops_per_second": operations / elapsed,
+        "max_rss_mib": max_rss_mib(),
+        "latency": {f"p{pct}": percentile(all_latencies, pct) for pct in PERCENTILES},
+        "latency_by_state_change": {},
+    }
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        result["latency_by_state_change"][name] = {
+            "count": len(values),
+            **{f"p{pct}": percentile(values, pct) for pct in PERCENTILES},
+        }
+    return result
+
+
+def setup(token_networks, channels, pending_payments, payments, in_flight, block_every):
+    chain_state = make_chain_state(token_networks, channels)
+    workload = Workload(chain_state, payments, in_flight, block_every)
+
+    def dispatch(state_change):
+        return node.state_transition(chain_state, state_change).events
+
+    drive(workload.pending_payments(pending_payments), dispatch)
+    return chain_state, workload
+
+
+def run_state_transition(chain_state, workload):
+    latencies = defaultdict(list)
+
+    def dispatch(state_change):
+        return node.state_transition(chain_state, state_change).events
+
+    start = time.perf_counter()
+    operations = drive(workload, dispatch, latencies)
+    elapsed = time.perf_counter() - start
+    return summarize(operations, elapsed, latencies), chain_state
+
+
+def run_write_ahead_log(chain_state, workload, database_path):
+    latencies = defaultdict(list)
+    wal = new_wal(database_path, chain_state)
+
+    def dispatch(state_change):
+        return wal.log_and_dispatch(state_change)[1]
+
+    start = time.perf_counter()
+    operations = drive(workload, dispatch, latencies)
+    elapsed = time.perf_counter() - start
+    return summarize(operations, elapsed, latencies), wal.state_manager.current_state
+
+
+def run_mode(mode, parameters, database_path):
+    """ Run the workload in `mode`.
+
+    Every mode is run in a process of its own, ru_maxrss is the peak of the
+    whole process and would include the earlier modes otherwise.
+    """
+    random.seed(parameters["seed"])
+    chain_state, workload = setup(
+        parameters["token_networks"],
+        parameters["channels"],
+        parameters["pending_payments"],
+        parameters["payments"],
+        parameters["in_flight"],
+        parameters["block_every"],
+    )
+    if mode == "state_transition":
+        result, state = run_state_transition(chain_state, workload)
+    else:
+        result, state = run_write_ahead_log(chain_state, workload, database_path)
+
+    result["state_size_bytes"] = len(JSONSerializer.serialize(state))
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(mode, result, baseline):
+    line = (
+        f"{mode}: {result['ops_per_second']:.1f} ops/s "
+        f"p50: {result['latency']['p50'] * 1000:.3f}ms "
+        f"p99: {result['latency']['p99'] * 1000:.3f}ms "
+        f"max_rss: {result['max_rss_mib']:.1f}MiB state: {result['state_size_bytes']}B"
+    )
+    if baseline is not None and mode in baseline["results"]:
+        previous = baseline["results"][mode]
+        change = result["ops_per_second"] / previous["ops_per_second"] - 1
+        p99_change = result["latency"]["p99"] / previous["latency"]["p99"] - 1
+        line += f" (ops/s {change:+.1%}, p99 {p99_change:+.1%} vs {baseline['commit']})"
+    print(line)
+
+    for name, latency in result["latency_by_state_change"].items():
+        print(
+            f"    {name:<24} count={latency['count']:<8} "
+            f"p50: {latency['p50'] * 1000:.3f}ms p99: {latency['p99'] * 1000:.3f}ms"
+        )
+
+
+@click.command()
+@click.option("--token-networks", default=2, help="Number of token networks in the state.")
+@click.option("--channels", default=50, help="Number of channels per token network.")
+@click.option(
+    "--pending-payments", default=200, help="Number of payments with a pending lock in the state."
+)
+@click.option("--payments", default=1000, help="Number of payments to run.")
+@click.option("--in-flight", default=20, help="Number of payments in flight at a time.")
+@click.option("--block-every", default=50, help="Number of state changes between two blocks.")
+@click.option("--seed", default=0, help="Seed of the random generators.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Save the results as JSON.")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Compare with the JSON results of an earlier run.",
+)
+def main(
+    token_networks,
+    channels,
+    pending_payments,
+    payments,
+    in_flight,
+    block_every,
+    seed,
+    output,
+    baseline,
+):  # pylint: disable=too-many-arguments,too-many-locals
+    parameters = {
+        "token_networks": token_networks,
+        "channels": channels,
+        "pending_payments": pending_payments,
+        "payments": payments,
+        "in_flight": in_flight,
+        "block_every": block_every,
+        "seed": seed,
+    }
+    if baseline is not None:
+        with open(baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["parameters"] != parameters:
+            print(f"WARNING: the baseline was run with {baseline['parameters']}")
+
+    results = dict()
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for mode in ("state_transition", "write_ahead_log"):
+            with context.Pool(processes=1) as pool:
+                results[mode] = pool.apply(run_mode, (mode, parameters, Path(tmpdir) / "db"))
+
+    print(" ".join(f"{key}={value}" for key, value in parameters.items()))
+    for mode, result in results.items():
+        print_results(mode, result, baseline)
+
+    if output is not None:
+        report = {
+            "commit": git_commit(),
+            "python_version": platform.python_version(),
+            "parameters": parameters,
+            "results": results,
+        }
+        with open(output, "w") as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
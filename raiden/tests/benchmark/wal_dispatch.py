@@ -0,0 +1,118 @@
+""" Compares dispatching state changes one by one against batched dispatch.
+
+Every dispatch copies the whole chain state and does one storage commit, the
+batched version does this once per batch. This simulates a node receiving
+`Processed` messages at a high rate with a given number of open channels.
+
+Usage: python -m raiden.tests.benchmark.wal_dispatch --channels 500 --batch-size 50
+"""
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from raiden.storage.serialization import JSONSerializer
+from raiden.storage.sqlite import SerializedSQLiteStorage
+from raiden.storage.wal import WriteAheadLog
+from raiden.tests.utils import factories
+from raiden.tests.utils.factories import UNIT_CHAIN_ID
+from raiden.transfer import node
+from raiden.transfer.architecture import StateManager
+from raiden.transfer.state import (
+    ChainState,
+    PaymentNetworkState,
+    TokenNetworkGraphState,
+    TokenNetworkState,
+)
+from raiden.transfer.state_change import ReceiveProcessed
+
+
+def make_chain_state(number_of_channels: int) -> ChainState:
+    chain_state = ChainState(
+        pseudo_random_generator=random.Random(),
+        block_number=1,
+        block_hash=factories.make_block_hash(),
+        our_address=factories.make_address(),
+        chain_id=UNIT_CHAIN_ID,
+    )
+
+    payment_network = PaymentNetworkState(factories.make_address(), [])
+    token_network_address = factories.make_address()
+    token_network = TokenNetworkState(
+        address=token_network_address,
+        token_address=factories.make_address(),
+        network_graph=TokenNetworkGraphState(token_network_address),
+    )
+    chain_state.identifiers_to_paymentnetworks[payment_network.address] = payment_network
+    payment_network.tokennetworkaddresses_to_tokennetworks[token_network.address] = token_network
+    payment_network.tokenaddresses_to_tokennetworkaddresses[
+        token_network.token_address
+    ] = token_network.address
+    chain_state.tokennetworkaddresses_to_paymentnetworkaddresses[
+        token_network.address
+    ] = payment_network.address
+
+    for _ in range(number_of_channels):
+        partner = factories.make_address()
+        canonical_identifier = factories.make_canonical_identifier(
+            token_network_address=token_network.address
+        )
+        channel_state = factories.create(
+            factories.NettingChannelStateProperties(
+                our_state=factories.NettingChannelEndStateProperties(
+                    balance=10, address=chain_state.our_address
+                ),
+                partner_state=factories.NettingChannelEndStateProperties(
+                    balance=10, address=partner
+                ),
+                token_address=token_network.token_address,
+                payment_network_address=payment_network.address,
+                canonical_identifier=canonical_identifier,
+            )
+        )
+        channel_id = canonical_identifier.channel_identifier
+        token_network.partneraddresses_to_channelidentifiers[partner].append(channel_id)
+        token_network.channelidentifiers_to_channels[channel_id] = channel_state
+
+    return chain_state
+
+
+def new_wal(database_path: Path, chain_state: ChainState) -> WriteAheadLog:
+    state_manager = StateManager(node.state_transition, chain_state)
+    storage = SerializedSQLiteStorage(database_path, JSONSerializer)
+    return WriteAheadLog(state_manager, storage)
+
+
+@click.command()
+@click.option("--channels", default=100, help="Number of open channels in the state.")
+@click.option("--messages", default=2000, help="Number of messages to dispatch.")
+@click.option("--batch-size", default=20, help="Number of state changes per batch.")
+def main(channels: int, messages: int, batch_size: int) -> None:
+    sender = factories.make_address()
+    state_changes = [
+        ReceiveProcessed(sender=sender, message_identifier=identifier)
+        for identifier in range(messages)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = new_wal(Path(tmpdir) / "single.db", make_chain_state(channels))
+        start = time.monotonic()
+        for state_change in state_changes:
+            wal.log_and_dispatch(state_change)
+        single_elapsed = time.monotonic() - start
+
+        wal = new_wal(Path(tmpdir) / "batch.db", make_chain_state(channels))
+        start = time.monotonic()
+        for pos in range(0, messages, batch_size):
+            wal.log_and_dispatch_batch(state_changes[pos : pos + batch_size])
+        batch_elapsed = time.monotonic() - start
+
+    print(f"channels={channels} messages={messages} batch_size={batch_size}")
+    print(f"one by one: {single_elapsed:.3f}s {messages / single_elapsed:.1f} msg/s")
+    print(f"batched:    {batch_elapsed:.3f}s {messages / batch_elapsed:.1f} msg/s")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
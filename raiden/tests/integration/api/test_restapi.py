@@ -844,6 +844,105 @@ def test_api_payments(api_server_test_instance, raiden_network, token_addresses)
     assert_payment_secret_and_hash(response, payment)
 
 
+@pytest.mark.parametrize("number_of_nodes", [2])
+def test_api_payments_async(api_server_test_instance, raiden_network, token_addresses):
+    _, app1 = raiden_network
+    amount = 200
+    identifier = 42
+    token_address = token_addresses[0]
+    target_address = app1.raiden.address
+
+    our_address = api_server_test_instance.rest_api.raiden_api.address
+
+    payment = {
+        "initiator_address": to_checksum_address(our_address),
+        "target_address": to_checksum_address(target_address),
+        "token_address": to_checksum_address(token_address),
+        "amount": amount,
+        "identifier": identifier,
+    }
+
+    request = grequests.post(
+        api_url_for(
+            api_server_test_instance,
+            "token_target_paymentresource",
+            token_address=to_checksum_address(token_address),
+            target_address=to_checksum_address(target_address),
+        ),
+        json={"amount": amount, "identifier": identifier},
+        headers={"Prefer": "respond-async"},
+    )
+    response = request.send().response
+    assert_proper_response(response, status_code=HTTPStatus.ACCEPTED)
+    response = response.json()
+    assert response.items() >= payment.items()
+    assert response["status"] == "pending"
+
+    request = grequests.get(
+        api_url_for(
+            api_server_test_instance,
+            "paymentstatusresource",
+            token_address=to_checksum_address(token_address),
+            target_address=to_checksum_address(target_address),
+            identifier=identifier,
+        ),
+        params={"timeout": 10},
+    )
+    response = request.send().response
+    assert_proper_response(response)
+    response = response.json()
+    assert_payment_secret_and_hash(response, payment)
+    assert response["status"] == "success"
+
+    request = grequests.get(
+        api_url_for(
+            api_server_test_instance,
+            "paymentstatusresource",
+            token_address=to_checksum_address(token_address),
+            target_address=to_checksum_address(target_address),
+            identifier=identifier + 1,
+        )
+    )
+    response = request.send().response
+    assert_proper_response(response, status_code=HTTPStatus.NOT_FOUND)
+
+
+@pytest.mark.parametrize("number_of_nodes", [2])
+def test_api_payment_batches(api_server_test_instance, raiden_network, token_addresses):
+    _, app1 = raiden_network
+    amount = 50
+    token_address = token_addresses[0]
+    target_address = app1.raiden.address
+
+    request = grequests.post(
+        api_url_for(
+            api_server_test_instance,
+            "paymentbatchresource",
+            token_address=to_checksum_address(token_address),
+        ),
+        json={
+            "payments": [
+                {
+                    "target_address": to_checksum_address(target_address),
+                    "amount": amount,
+                    "identifier": identifier,
+                }
+                for identifier in (1, 2, 3)
+            ]
+            + [{"target_address": to_checksum_address(target_address), "amount": -1}]
+        },
+    )
+    response = request.send().response
+    assert response.status_code == HTTPStatus.OK
+    results = [json.loads(line) for line in response.text.splitlines()]
+
+    assert len(results) == 4
+    assert results[0]["status"] == "failed"
+    assert results[0]["amount"] == -1
+    assert sorted(result["identifier"] for result in results[1:]) == [1, 2, 3]
+    assert all(result["status"] == "success" for result in results[1:])
+
+
 @pytest.mark.parametrize("number_of_nodes", [2])
 def test_api_payments_secret_hash_errors(
     api_server_test_instance, raiden_network, token_addresses
@@ -1,8 +1,10 @@
 from collections import defaultdict
 from hashlib import sha256
+from unittest.mock import patch
 
 import gevent
 import pytest
+from requests.exceptions import RequestException
 
 from raiden.constants import STATE_PRUNING_AFTER_BLOCKS
 from raiden.exceptions import NoStateForBlockIdentifier
@@ -180,3 +182,104 @@ def test_concurrent_secret_registration(secret_registry_proxy, monkeypatch):
 
         msg = "All secrets must be registered, " "and they all must be registered only once"
         assert all(count[secret] == 1 for secret in secrets), msg
+
+
+def test_register_secret_coalesces_concurrent_registrations(secret_registry_proxy, monkeypatch):
+    """Secrets registered concurrently with `register_secret` must be sent in
+    a single transaction, which uses less gas than a transaction per secret.
+    """
+    transaction_hashes = list()
+    transact = secret_registry_proxy.proxy.transact
+
+    def record_transactions(function_name, startgas, secrets):
+        transaction_hash = transact(function_name, startgas, secrets)
+        transaction_hashes.append(transaction_hash)
+        return transaction_hash
+
+    monkeypatch.setattr(secret_registry_proxy.proxy, "transact", record_transactions)
+
+    secret_registry_proxy.register_secret(secret=make_secret())
+
+    secrets = [make_secret() for _ in range(10)]
+    expiration = secret_registry_proxy.client.block_number() + 100
+    greenlets = {
+        gevent.spawn(secret_registry_proxy.register_secret, secret, expiration)
+        for secret in secrets
+    }
+    gevent.joinall(greenlets, raise_error=True)
+
+    assert len(transaction_hashes) == 2, "The concurrent secrets must be sent in one transaction"
+    assert secret_registry_proxy.batch_size_histogram.sum == len(secrets) + 1
+
+    single_receipt, batch_receipt = [
+        secret_registry_proxy.client.get_transaction_receipt(transaction_hash)
+        for transaction_hash in transaction_hashes
+    ]
+    assert batch_receipt["gasUsed"] < single_receipt["gasUsed"] * len(secrets)
+
+    for secret in secrets:
+        assert secret_registry_proxy.is_secret_registered(
+            secrethash=sha256(secret).digest(), block_identifier="latest"
+        )
+
+
+def test_register_secret_does_not_linger_close_to_the_lock_expiration(secret_registry_proxy):
+    """A secret must be registered right away if the lock it unlocks is about
+    to expire.
+    """
+    secret_registry_proxy.batch_linger = 60
+    secret = make_secret()
+    expiration = secret_registry_proxy.client.block_number() + 1
+
+    with gevent.Timeout(30):
+        secret_registry_proxy.register_secret(secret=secret, expiration=expiration)
+
+    assert secret_registry_proxy.is_secret_registered(
+        secrethash=sha256(secret).digest(), block_identifier="latest"
+    )
+
+
+def test_register_secret_sends_a_lingering_batch_for_a_lock_about_to_expire(secret_registry_proxy):
+    """A batch which is lingering must be sent right away once a secret of a
+    lock about to expire is queued.
+    """
+    secret_registry_proxy.batch_linger = 60
+    block_number = secret_registry_proxy.client.block_number()
+
+    lingering = gevent.spawn(
+        secret_registry_proxy.register_secret, make_secret(), block_number + 100
+    )
+    # let the batch check the expirations it has so far
+    gevent.sleep(1)
+    assert not lingering.ready()
+
+    urgent_secret = make_secret()
+    with gevent.Timeout(30):
+        secret_registry_proxy.register_secret(secret=urgent_secret, expiration=block_number + 1)
+        lingering.get()
+
+    assert secret_registry_proxy.batch_size_histogram.sum == 2
+    assert secret_registry_proxy.is_secret_registered(
+        secrethash=sha256(urgent_secret).digest(), block_identifier="latest"
+    )
+
+
+def test_register_secret_fails_the_batch_on_errors(secret_registry_proxy):
+    """An error of the batch must be raised to its callers, and the next
+    secret must start a new batch.
+    """
+    secret = make_secret()
+    with patch.object(
+        secret_registry_proxy.client, "block_number", side_effect=RequestException()
+    ):
+        with gevent.Timeout(30), pytest.raises(RequestException):
+            secret_registry_proxy.register_secret(secret=secret)
+
+    assert secret_registry_proxy._queued_secrets is None
+
+    with gevent.Timeout(30):
+        secret_registry_proxy.register_secret(secret=secret)
+
+    assert secret_registry_proxy.is_secret_registered(
+        secrethash=sha256(secret).digest(), block_identifier="latest"
+    )
@@ -74,9 +74,9 @@ def mock_matrix(
     ):
         pass
 
-    def mock_receive_message(klass, message):  # pylint: disable=unused-argument
+    def mock_receive_messages(klass, messages):  # pylint: disable=unused-argument
         # We are just unit testing the matrix transport receive so do nothing
-        assert message
+        assert messages
 
     config = dict(
         retry_interval=retry_interval,
@@ -99,7 +99,7 @@ def mock_matrix(
         MatrixTransport, "_get_room_ids_for_address", mock_get_room_ids_for_address
     )
     monkeypatch.setattr(MatrixTransport, "_set_room_id_for_address", mock_set_room_id_for_address)
-    monkeypatch.setattr(MatrixTransport, "_receive_message", mock_receive_message)
+    monkeypatch.setattr(MatrixTransport, "_receive_messages", mock_receive_messages)
 
     return transport
 
@@ -27,3 +27,52 @@ def test_geth_discover_next_available_nonce(
     assert nonce < 100
 
     gevent.joinall(greenlets, raise_error=True)
+
+
+def test_concurrent_transactions_use_sequential_nonces(deploy_client):
+    """ Transactions sent concurrently must get one nonce each, without gaps,
+    even though the gas price is computed outside of the nonce lock.
+    """
+    first_nonce = deploy_client._available_nonce  # pylint: disable=protected-access
+
+    greenlets = [
+        gevent.spawn(deploy_client.send_transaction, make_address(), 50000) for _ in range(20)
+    ]
+    gevent.joinall(greenlets, raise_error=True)
+
+    nonces = list()
+    for greenlet in greenlets:
+        transaction_hash = greenlet.get()
+        deploy_client.poll(transaction_hash)
+        nonces.append(deploy_client.web3.eth.getTransaction(transaction_hash)["nonce"])
+    nonces.sort()
+    assert nonces == list(range(first_nonce, first_nonce + 20))
+
+
+def test_receipt_tracking_resolves_all_pending_transactions(deploy_client):
+    """ With the receipts tracked, every transaction waited for is resolved by
+    the checks done once per block, and the waiters fall back to polling when
+    the tracking stops.
+    """
+    deploy_client.start_receipt_tracking()
+    try:
+        transaction_hashes = [
+            deploy_client.send_transaction(make_address(), 50000) for _ in range(5)
+        ]
+        waiters = [gevent.spawn(deploy_client.poll, tx_hash) for tx_hash in transaction_hashes]
+
+        while not all(waiter.ready() for waiter in waiters):
+            deploy_client.check_pending_transactions(deploy_client.get_block("latest"))
+            gevent.sleep(0.5)
+
+        gevent.joinall(waiters, raise_error=True)
+    finally:
+        deploy_client.stop_receipt_tracking()
+
+    deploy_client.start_receipt_tracking()
+    waiter = gevent.spawn(
+        deploy_client.poll, deploy_client.send_transaction(make_address(), 50000)
+    )
+    gevent.sleep(0.1)
+    deploy_client.stop_receipt_tracking()
+    waiter.get(timeout=60)
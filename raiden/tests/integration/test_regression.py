@@ -117,7 +117,9 @@ def run_test_regression_revealsecret_after_secret(
     app2.raiden.sign(reveal_secret)
 
     if transport_protocol is TransportProtocol.MATRIX:
-        app1.raiden.transport._receive_message(reveal_secret)  # pylint: disable=protected-access
+        app1.raiden.transport._receive_messages(  # pylint: disable=protected-access
+            [reveal_secret]
+        )
     else:
         raise TypeError("Unknown TransportProtocol")
 
@@ -189,7 +191,7 @@ def run_test_regression_multiple_revealsecret(raiden_network, token_addresses, t
     app0.raiden.sign(mediated_transfer)
 
     if transport_protocol is TransportProtocol.MATRIX:
-        app1.raiden.transport._receive_message(mediated_transfer)
+        app1.raiden.transport._receive_messages([mediated_transfer])
     else:
         raise TypeError("Unknown TransportProtocol")
 
@@ -216,8 +218,8 @@ def run_test_regression_multiple_revealsecret(raiden_network, token_addresses, t
 
     if transport_protocol is TransportProtocol.MATRIX:
         messages = [unlock, reveal_secret]
-        receive_method = app1.raiden.transport._receive_message
-        wait = set(gevent.spawn_later(0.1, receive_method, data) for data in messages)
+        receive_method = app1.raiden.transport._receive_messages
+        wait = set(gevent.spawn_later(0.1, receive_method, [data]) for data in messages)
     else:
         raise TypeError("Unknown TransportProtocol")
 
@@ -1,7 +1,8 @@
 from hashlib import sha256
 
-from raiden.api.python import transfer_tasks_view
+from raiden.api.python import transfer_tasks_page, transfer_tasks_view
 from raiden.tests.utils import factories
+from raiden.transfer.channel import get_status, set_closed
 from raiden.transfer.mediated_transfer.state import (
     InitiatorPaymentState,
     InitiatorTransferState,
@@ -12,7 +13,8 @@ from raiden.transfer.mediated_transfer.state import (
     WaitingTransferState,
 )
 from raiden.transfer.mediated_transfer.tasks import InitiatorTask, MediatorTask, TargetTask
-from raiden.transfer.views import list_channelstate_for_tokennetwork
+from raiden.transfer.state import CHANNEL_STATE_CLOSED
+from raiden.transfer.views import iter_channelstate, list_channelstate_for_tokennetwork
 
 
 def test_list_channelstate_for_tokennetwork(chain_state, payment_network_address, token_id):
@@ -26,6 +28,98 @@ def test_list_channelstate_for_tokennetwork(chain_state, payment_network_address
     assert isinstance(result, list)
 
 
+def test_iter_channelstate_pages(
+    chain_state, payment_network_address, token_network_state, payment_network_state
+):
+    """iter_channelstate() must resume right after the given position, so that
+    pages of the channel list don't skip nor repeat channels.
+    """
+    for position in range(5):
+        partner = factories.make_address()
+        canonical_identifier = factories.make_canonical_identifier(
+            token_network_address=token_network_state.address,
+            channel_identifier=factories.make_channel_identifier(),
+        )
+        channel_state = factories.create(
+            factories.NettingChannelStateProperties(
+                partner_state=factories.NettingChannelEndStateProperties(address=partner),
+                token_address=token_network_state.token_address,
+                payment_network_address=payment_network_state.address,
+                canonical_identifier=canonical_identifier,
+            )
+        )
+        if position % 2:
+            set_closed(channel_state, block_number=1)
+        channel_id = canonical_identifier.channel_identifier
+        token_network_state.partneraddresses_to_channelidentifiers[partner].append(channel_id)
+        token_network_state.channelidentifiers_to_channels[channel_id] = channel_state
+
+    all_channels = list(iter_channelstate(chain_state, payment_network_address))
+    channel_ids = [channel_state.identifier for channel_state in all_channels]
+    assert channel_ids == sorted(token_network_state.channelidentifiers_to_channels)
+
+    after = (token_network_state.address, channel_ids[1])
+    page = list(iter_channelstate(chain_state, payment_network_address, after=after))
+    assert page == all_channels[2:]
+
+    by_token = iter_channelstate(
+        chain_state, payment_network_address, token_network_state.token_address, after=after
+    )
+    assert list(by_token) == all_channels[2:]
+    assert not list(
+        iter_channelstate(chain_state, payment_network_address, factories.make_address())
+    )
+
+    closed_channels = [
+        channel_state
+        for channel_state in all_channels
+        if get_status(channel_state) == CHANNEL_STATE_CLOSED
+    ]
+    assert len(closed_channels) == 2
+    closed = iter_channelstate(chain_state, payment_network_address, state=CHANNEL_STATE_CLOSED)
+    assert list(closed) == closed_channels
+    after = (token_network_state.address, closed_channels[0].identifier)
+    closed = iter_channelstate(
+        chain_state, payment_network_address, state=CHANNEL_STATE_CLOSED, after=after
+    )
+    assert list(closed) == closed_channels[1:]
+
+
+def test_transfer_tasks_page():
+    """transfer_tasks_page() must return the views in secrethash order and the
+    position to continue from.
+    """
+    payment_mapping = dict()
+    for _ in range(3):
+        transfer = factories.create(
+            factories.LockedTransferSignedStateProperties(secret=factories.make_secret())
+        )
+        transfer_state = TargetTransferState(from_hop=None, transfer=transfer)
+        payment_mapping[transfer.lock.secrethash] = TargetTask(
+            canonical_identifier=transfer.balance_proof.canonical_identifier,
+            target_state=transfer_state,
+        )
+    secrethashes = sorted(payment_mapping)
+
+    view, last_secrethash = transfer_tasks_page(payment_mapping, limit=2)
+    assert len(view) == 2
+    assert last_secrethash == secrethashes[1]
+
+    view, last_secrethash = transfer_tasks_page(payment_mapping, after=last_secrethash, limit=2)
+    assert len(view) == 1
+    assert last_secrethash is None
+
+    view, last_secrethash = transfer_tasks_page(payment_mapping)
+    assert len(view) == 3
+    assert last_secrethash is None
+
+    view, last_secrethash = transfer_tasks_page(
+        payment_mapping, after=secrethashes[0], limit=1, sorted_secrethashes=secrethashes
+    )
+    assert view == [transfer_tasks_view({secrethashes[1]: payment_mapping[secrethashes[1]]})[0]]
+    assert last_secrethash == secrethashes[1]
+
+
 def test_initiator_task_view():
     """Test transfer_tasks_view(), which is used to generate the output of the
     pending transfers API, with an initiator task.
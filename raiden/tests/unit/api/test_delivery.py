@@ -0,0 +1,205 @@
+import json
+from datetime import datetime
+from http import HTTPStatus
+from unittest.mock import Mock, patch
+
+import gevent
+import requests
+from eth_utils import to_checksum_address
+from gevent.event import Event
+
+from raiden.api.delivery import WEBHOOK_CURSOR_SETTING, WebhookDelivery, get_payment_events
+from raiden.api.rest import APIServer, RestAPI
+from raiden.storage.serialization import JSONSerializer
+from raiden.storage.sqlite import SerializedSQLiteStorage
+from raiden.tests.utils import factories
+from raiden.transfer.events import (
+    EventPaymentReceivedSuccess,
+    EventPaymentSentFailed,
+    EventPaymentSentSuccess,
+)
+from raiden.transfer.mediated_transfer.events import SendSecretRequest
+
+LOG_TIME = datetime(2018, 9, 7, 20, 2, 35)
+
+
+def make_raiden(storage):
+    raiden = Mock()
+    raiden.address = factories.make_address()
+    raiden.wal.storage = storage
+    raiden.stop_event = Event()
+    raiden.state_changed_event = Event()
+    return raiden
+
+
+def log_event(raiden, event):
+    state_change_identifier = raiden.wal.storage.write_state_change("", LOG_TIME)
+    raiden.wal.storage.write_events(state_change_identifier, [event], LOG_TIME)
+
+    state_changed_event = raiden.state_changed_event
+    raiden.state_changed_event = Event()
+    state_changed_event.set()
+
+
+def make_payment_events(token_network_address):
+    payment_network_address = factories.make_payment_network_address()
+    return [
+        EventPaymentSentSuccess(
+            payment_network_address=payment_network_address,
+            token_network_address=token_network_address,
+            identifier=1,
+            amount=5,
+            target=factories.make_address(),
+            secret=factories.make_secret(),
+            route=[],
+        ),
+        EventPaymentReceivedSuccess(
+            payment_network_address=payment_network_address,
+            token_network_address=token_network_address,
+            identifier=2,
+            amount=5,
+            initiator=factories.make_address(),
+        ),
+        EventPaymentSentFailed(
+            payment_network_address=payment_network_address,
+            token_network_address=token_network_address,
+            identifier=3,
+            target=factories.make_address(),
+            reason="whatever",
+        ),
+    ]
+
+
+def wait_until(condition, timeout=5):
+    with gevent.Timeout(timeout):
+        while not condition():
+            gevent.sleep(0.001)
+
+
+def test_get_payment_events_skips_the_other_events():
+    storage = SerializedSQLiteStorage(":memory:", JSONSerializer)
+    raiden = make_raiden(storage)
+    token_network_address = factories.make_address()
+    sent, received, failed = make_payment_events(token_network_address)
+
+    log_event(raiden, sent)
+    secret_request = SendSecretRequest(
+        recipient=factories.make_address(),
+        channel_identifier=factories.make_channel_identifier(),
+        message_identifier=1,
+        payment_identifier=1,
+        amount=5,
+        expiration=10,
+        secrethash=factories.UNIT_SECRETHASH,
+    )
+    log_event(raiden, secret_request)
+    log_event(raiden, received)
+    log_event(raiden, failed)
+
+    events, last_scanned = get_payment_events(storage, after=0, limit=10)
+    assert last_scanned == 4
+    assert [event["event"] for _, event in events] == [
+        "EventPaymentSentSuccess",
+        "EventPaymentReceivedSuccess",
+        "EventPaymentSentFailed",
+    ]
+    assert [identifier for identifier, _ in events] == [1, 3, 4]
+    assert all(event["event_identifier"] == identifier for identifier, event in events)
+    assert all(
+        event["token_network_address"] == to_checksum_address(token_network_address)
+        for _, event in events
+    )
+
+    # A full batch is scanned up to its last event
+    assert get_payment_events(storage, after=1, limit=1) == (events[1:2], 3)
+    assert get_payment_events(storage, after=4, limit=10) == ([], 4)
+
+    # The events which are not payment events are scanned once
+    log_event(raiden, secret_request)
+    assert get_payment_events(storage, after=4, limit=10) == ([], 5)
+    assert get_payment_events(storage, after=5, limit=10) == ([], 5)
+
+
+def test_webhook_delivery_retries_and_resumes():
+    storage = SerializedSQLiteStorage(":memory:", JSONSerializer)
+    raiden = make_raiden(storage)
+    sent, received, failed = make_payment_events(factories.make_address())
+    log_event(raiden, sent)
+    log_event(raiden, received)
+
+    delivery = WebhookDelivery(raiden, "http://webhook", batch_size=10, retry_backoff=0)
+    responses = [requests.ConnectionError(), Mock(ok=False, status_code=500)]
+    responses.extend(Mock(ok=True) for _ in range(2))
+    with patch.object(delivery.session, "post", side_effect=responses) as post:
+        delivery.start()
+        wait_until(lambda: delivery.delivered_counter.value == 2)
+
+        # The delivery waits for the new events
+        log_event(raiden, failed)
+        wait_until(lambda: delivery.delivered_counter.value == 3)
+        delivery.stop()
+
+    assert delivery.failed_counter.value == 2
+    assert post.call_count == 4
+    batches = [call[1]["json"]["events"] for call in post.call_args_list]
+    assert batches[0] == batches[1] == batches[2]
+    assert [event["identifier"] for event in batches[2]] == [1, 2]
+    assert [event["event"] for event in batches[3]] == ["EventPaymentSentFailed"]
+    assert storage.get_setting(WEBHOOK_CURSOR_SETTING) == "3"
+
+    # A new delivery starts after the last acknowledged event
+    log_event(raiden, sent)
+    delivery = WebhookDelivery(raiden, "http://webhook")
+    with patch.object(delivery.session, "post", return_value=Mock(ok=True)) as post:
+        delivery.start()
+        wait_until(lambda: delivery.delivered_counter.value == 1)
+        delivery.stop()
+
+    assert post.call_count == 1
+    assert post.call_args[1]["json"]["events"][0]["event_identifier"] == 4
+
+
+def test_api_event_stream():
+    storage = SerializedSQLiteStorage(":memory:", JSONSerializer)
+    raiden_api = Mock()
+    raiden_api.raiden = make_raiden(storage)
+    raiden_api.address = raiden_api.raiden.address
+    config = dict(
+        host="127.0.0.1",
+        port=5001,
+        concurrency_limits={"streams": 1, "default": 1},
+        queue_timeout=0.01,
+    )
+    api_server = APIServer(RestAPI(raiden_api), config)
+    client = api_server.flask_app.test_client()
+
+    sent, received, failed = make_payment_events(factories.make_address())
+    log_event(raiden_api.raiden, sent)
+
+    # Without a cursor the stream starts with the new events
+    response = client.get("/api/v1/events/stream", buffered=False)
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == "text/event-stream"
+    assert next(response.response) == b": connected\n\n"
+    log_event(raiden_api.raiden, received)
+    message = next(response.response).decode()
+    assert message.startswith("id: 2\ndata: ")
+    assert json.loads(message.split("data: ", 1)[1])["event"] == "EventPaymentReceivedSuccess"
+
+    # An open stream holds the slot of its own endpoint class only
+    assert client.get("/api/v1/events/stream").status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert client.get("/api/v1/address").status_code == HTTPStatus.OK
+    response.close()
+
+    # A client reconnecting gets the events it missed
+    log_event(raiden_api.raiden, failed)
+    response = client.get(
+        "/api/v1/events/stream?after=0", headers={"Last-Event-ID": "1"}, buffered=False
+    )
+    next(response.response)
+    assert next(response.response).decode().startswith("id: 2\n")
+    assert next(response.response).decode().startswith("id: 3\n")
+    response.close()
+
+    response = client.get("/api/v1/events/stream?after=-1")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
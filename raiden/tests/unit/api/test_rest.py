@@ -0,0 +1,166 @@
+from http import HTTPStatus
+from unittest.mock import Mock
+from urllib.parse import quote
+
+import gevent
+from eth_utils import to_checksum_address
+from gevent.event import Event
+
+from raiden.api.rest import APIServer, RestAPI, api_response, encode_channel_cursor
+from raiden.settings import DEFAULT_PAYMENT_STATUS_MAX_TIMEOUT
+from raiden.tests.utils import factories
+from raiden.utils.metrics import Gauge, MetricsRegistry
+
+
+def make_api_server(config):
+    raiden_api = Mock()
+    raiden_api.address = factories.make_address()
+    config = dict(host="127.0.0.1", port=5001, **config)
+    return APIServer(RestAPI(raiden_api), config)
+
+
+def test_api_rejects_requests_over_the_concurrency_limit():
+    api_server = make_api_server({"concurrency_limits": {"query": 1}, "queue_timeout": 0.01})
+    client = api_server.flask_app.test_client()
+
+    release = Event()
+
+    def slow_query(**_kwargs):
+        release.wait()
+        return api_response(result=[])
+
+    api_server.rest_api.get_raiden_events_payment_history_with_timestamps = slow_query
+
+    first = gevent.spawn(client.get, "/api/v1/payments")
+    gevent.sleep(0.001)
+
+    response = client.get("/api/v1/payments")
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    # Other endpoint classes are not affected by the limit
+    api_server.rest_api.get_our_address = lambda: api_response(result={})
+    response = client.get("/api/v1/address")
+    assert response.status_code == HTTPStatus.OK
+
+    release.set()
+    assert first.get().status_code == HTTPStatus.OK
+
+    response = client.get("/api/v1/payments")
+    assert response.status_code == HTTPStatus.OK
+
+    histogram = api_server.request_latency_histograms["GET /api/v1/payments"]
+    assert histogram.count == 3
+
+
+def test_api_channel_list_pages():
+    api_server = make_api_server({})
+    client = api_server.flask_app.test_client()
+
+    channel_state = factories.create(factories.NettingChannelStateProperties())
+    canonical_identifier = channel_state.canonical_identifier
+    next_position = (
+        canonical_identifier.token_network_address,
+        canonical_identifier.channel_identifier,
+    )
+    raiden_api = api_server.rest_api.raiden_api
+    raiden_api.raiden.default_registry.address = factories.make_address()
+    raiden_api.get_channel_page.return_value = ([channel_state], next_position)
+
+    response = client.get("/api/v1/channels?limit=1&fields=channel_identifier,state")
+    assert response.status_code == HTTPStatus.OK
+    assert response.get_json() == [
+        {"channel_identifier": canonical_identifier.channel_identifier, "state": "opened"}
+    ]
+
+    cursor = encode_channel_cursor(next_position)
+    assert f"cursor={quote(cursor)}" in response.headers["Link"]
+    assert raiden_api.get_channel_page.call_args[1]["after"] is None
+
+    response = client.get("/api/v1/channels", query_string={"limit": 1, "cursor": cursor})
+    assert response.status_code == HTTPStatus.OK
+    assert raiden_api.get_channel_page.call_args[1]["after"] == next_position
+
+    response = client.get("/api/v1/channels?fields=unknown")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    response = client.get("/api/v1/channels?cursor=invalid")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_api_metrics():
+    api_server = make_api_server({})
+    client = api_server.flask_app.test_client()
+
+    metrics = MetricsRegistry()
+    metrics.register(Gauge("raiden_payments_in_flight", "Payments", function=lambda: 7))
+    api_server.rest_api.raiden_api.raiden.metrics = metrics
+    api_server.rest_api.get_our_address = lambda: api_response(result={})
+
+    assert client.get("/api/v1/address").status_code == HTTPStatus.OK
+
+    response = client.get("/metrics")
+    assert response.status_code == HTTPStatus.OK
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert "raiden_payments_in_flight 7.0" in lines
+    assert 'raiden_api_request_duration_seconds_count{route="GET /api/v1/address"} 1' in lines
+
+
+def test_api_profiling_endpoints_are_opt_in():
+    client = make_api_server({}).flask_app.test_client()
+    assert client.get("/api/v1/_debug/profile").status_code == HTTPStatus.NOT_FOUND
+
+    api_server = make_api_server({"enable_profiling": True})
+    client = api_server.flask_app.test_client()
+
+    response = client.get("/api/v1/_debug/profile?duration=0.1&interval=0.001")
+    assert response.status_code == HTTPStatus.OK
+    assert response.content_type == "text/plain; charset=utf-8"
+
+    response = client.get("/api/v1/_debug/memory?duration=0.1&limit=5")
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.get_data(as_text=True).splitlines()) <= 5
+
+    # Only one profile can be taken at a time
+    first = gevent.spawn(client.get, "/api/v1/_debug/profile?duration=0.1")
+    gevent.sleep(0.01)
+    response = client.get("/api/v1/_debug/memory?duration=0.1")
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert first.get().status_code == HTTPStatus.OK
+
+
+def test_api_payment_status_rejects_invalid_timeouts():
+    api_server = make_api_server({})
+    client = api_server.flask_app.test_client()
+    api_server.rest_api.get_payment_status = lambda **_kwargs: api_response(result={})
+
+    token_address = to_checksum_address(factories.make_address())
+    target_address = to_checksum_address(factories.make_address())
+    url = f"/api/v1/payments/{token_address}/{target_address}/42"
+
+    assert client.get(f"{url}?timeout=30").status_code == HTTPStatus.OK
+    assert client.get(f"{url}?timeout=-1").status_code == HTTPStatus.BAD_REQUEST
+    response = client.get(f"{url}?timeout={DEFAULT_PAYMENT_STATUS_MAX_TIMEOUT + 1}")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_api_streamed_response_holds_its_slot_until_sent():
+    api_server = make_api_server({"concurrency_limits": {"default": 1}, "queue_timeout": 0.01})
+    client = api_server.flask_app.test_client()
+
+    raiden_api = api_server.rest_api.raiden_api
+    raiden_api.raiden.default_registry.address = factories.make_address()
+    channel_state = factories.create(factories.NettingChannelStateProperties())
+    raiden_api.get_channel_page.return_value = ([channel_state], None)
+    api_server.rest_api.get_our_address = lambda: api_response(result={})
+
+    response = client.get("/api/v1/channels", buffered=False)
+    assert response.status_code == HTTPStatus.OK
+    assert client.get("/api/v1/address").status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert "GET /api/v1/channels" not in api_server.request_latency_histograms
+
+    assert len(response.get_json()) == 1
+    response.close()
+
+    assert client.get("/api/v1/address").status_code == HTTPStatus.OK
+    assert api_server.request_latency_histograms["GET /api/v1/channels"].count == 1
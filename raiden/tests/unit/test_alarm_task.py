@@ -0,0 +1,126 @@
+from unittest.mock import Mock
+
+from raiden.tasks import AlarmTask
+from raiden.tests.utils.factories import make_block_hash
+
+
+def make_block(number, timestamp, parent_hash=None):
+    return {
+        "number": number,
+        "timestamp": timestamp,
+        "hash": make_block_hash(),
+        "parentHash": parent_hash or make_block_hash(),
+        "gasLimit": 1,
+    }
+
+
+def make_alarm_task():
+    alarm = AlarmTask(chain=Mock())
+    alarm.register_callback(lambda _: None)
+    alarm.known_block_number = 0
+    return alarm
+
+
+def test_alarm_task_estimates_the_block_time():
+    alarm = make_alarm_task()
+    assert alarm.next_poll_in() == alarm.sleep_time
+
+    block = make_block(1, timestamp=100)
+    alarm._maybe_run_callbacks(block)  # pylint: disable=protected-access
+    assert alarm.block_time is None
+
+    # Two blocks were mined since the last poll
+    alarm._maybe_run_callbacks(make_block(3, timestamp=130))  # pylint: disable=protected-access
+    assert alarm.block_time == 15
+
+    # Right after a block the next poll is scheduled for the expected block
+    assert alarm.sleep_time < alarm.next_poll_in() <= 15
+
+
+def make_chain(alarm, blocks, orphaned_blocks=()):
+    """ Serve the blocks by number and the blocks and orphaned blocks by hash
+    to the alarm task.
+    """
+    blocks_by_identifier = {block["number"]: block for block in blocks}
+    for block in (*blocks, *orphaned_blocks):
+        blocks_by_identifier[block["hash"]] = block
+    alarm.chain.get_block.side_effect = lambda block_identifier: blocks_by_identifier[
+        block_identifier
+    ]
+
+
+def test_alarm_task_block_headers_are_invalidated_by_reorgs():
+    alarm = make_alarm_task()
+
+    block1 = make_block(1, timestamp=100)
+    block2 = make_block(2, timestamp=115, parent_hash=block1["hash"])
+    block3 = make_block(3, timestamp=130, parent_hash=block2["hash"])
+    for block in (block1, block2, block3):
+        alarm._maybe_run_callbacks(block)  # pylint: disable=protected-access
+
+    assert alarm.get_block(1) is block1
+    assert not alarm.chain.get_block.called
+
+    # A reorg two blocks deep, the new block 4 is a child of the new block 3
+    # which replaced the known blocks 2 and 3
+    reorg2 = make_block(2, timestamp=115, parent_hash=block1["hash"])
+    reorg3 = make_block(3, timestamp=130, parent_hash=reorg2["hash"])
+    reorg4 = make_block(4, timestamp=145, parent_hash=reorg3["hash"])
+    make_chain(alarm, [block1, reorg2, reorg3])
+    alarm._maybe_run_callbacks(reorg4)  # pylint: disable=protected-access
+
+    assert alarm.get_block(4) is reorg4
+    assert alarm.get_block(2) is reorg2
+    assert alarm.get_block(3) is reorg3
+    assert alarm.get_block(1) is block1
+    assert alarm.chain.get_block.call_count == 3
+
+
+def test_alarm_task_block_headers_are_invalidated_by_skipped_blocks():
+    alarm = make_alarm_task()
+
+    block1 = make_block(1, timestamp=100)
+    block2 = make_block(2, timestamp=115, parent_hash=block1["hash"])
+    alarm._maybe_run_callbacks(block1)  # pylint: disable=protected-access
+    alarm._maybe_run_callbacks(block2)  # pylint: disable=protected-access
+
+    # The block 2 was orphaned while the alarm task didn't poll, the new block
+    # 4 is a descendant of a block 2 which was never seen
+    reorg2 = make_block(2, timestamp=115, parent_hash=block1["hash"])
+    block3 = make_block(3, timestamp=130, parent_hash=reorg2["hash"])
+    block4 = make_block(4, timestamp=145, parent_hash=block3["hash"])
+    make_chain(alarm, [block1, reorg2, block3])
+    alarm._maybe_run_callbacks(block4)  # pylint: disable=protected-access
+
+    # The confirmed block is requested once, without walking back from the
+    # latest block
+    assert alarm.get_block(2) is reorg2
+    assert alarm.get_block(2) is reorg2
+    assert alarm.chain.get_block.call_count == 1
+
+    assert alarm.get_block(3) is block3
+    assert alarm.chain.get_block.call_count == 2
+
+
+def test_alarm_task_block_headers_only_hold_the_chain_of_the_latest_block():
+    alarm = make_alarm_task()
+
+    block1 = make_block(1, timestamp=100)
+    block2 = make_block(2, timestamp=115, parent_hash=block1["hash"])
+    block3 = make_block(3, timestamp=130, parent_hash=block2["hash"])
+    alarm._maybe_run_callbacks(block1)  # pylint: disable=protected-access
+    alarm._maybe_run_callbacks(block3)  # pylint: disable=protected-access
+
+    # The blocks 2 and 3 were orphaned after the block 3 was seen, the block 2
+    # requested by number doesn't match the known block 3
+    reorg2 = make_block(2, timestamp=115, parent_hash=block1["hash"])
+    make_chain(alarm, [block1, reorg2], orphaned_blocks=[block2])
+    assert alarm.get_block(2) is block2
+    assert alarm.chain.get_block.call_count == 2
+
+    # A block which doesn't match the known parent replaces it
+    alarm.block_headers.clear()
+    alarm.block_headers[1] = make_block(1, timestamp=100)
+    make_chain(alarm, [block1, reorg2])
+    assert alarm.get_block(2) is reorg2
+    assert 1 not in alarm.block_headers
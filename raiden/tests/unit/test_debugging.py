@@ -0,0 +1,73 @@
+import time
+
+import gevent
+
+from raiden.utils.debugging import HubMonitor, SamplingProfiler, trace_memory_growth
+
+
+def busy_loop(duration):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+def test_hub_monitor_reports_blocking_greenlets():
+    hub_monitor = HubMonitor(blocking_threshold=0.01, latency_interval=0.01)
+    hub_monitor.start()
+
+    try:
+        gevent.spawn(busy_loop, 0.2).join()
+        gevent.spawn(gevent.sleep, 0.001).join()
+        gevent.sleep(0.05)
+    finally:
+        hub_monitor.stop()
+
+    blocked = {metric.labels["greenlet"]: metric.value for metric in hub_monitor.blocked_counters}
+    assert blocked == {"busy_loop": 1}
+
+    cpu_time = {
+        metric.labels["greenlet"]: metric.value for metric in hub_monitor.cpu_time_counters
+    }
+    assert cpu_time["busy_loop"] >= 0.15
+    assert cpu_time["sleep"] < 0.1
+
+    # The blocked loop woke up the sampling greenlet late
+    assert hub_monitor.loop_latency_histogram.count > 0
+    assert hub_monitor.loop_latency_histogram.sum >= 0.1
+
+
+def test_sampling_profiler_samples_the_running_greenlet():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+
+    try:
+        gevent.spawn(busy_loop, 0.2).join()
+    finally:
+        profiler.stop()
+
+    lines = profiler.collapsed_stacks().splitlines()
+    busy_samples = 0
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        if stack.split(";")[-1].startswith("busy_loop (raiden/tests/unit/test_debugging.py:"):
+            busy_samples += int(count)
+
+    # The busy loop is the only greenlet using the CPU
+    total_samples = sum(int(line.rsplit(" ", 1)[1]) for line in lines)
+    assert busy_samples > total_samples / 2
+
+
+def test_trace_memory_growth():
+    retained = []
+
+    def allocate():
+        for _ in range(1000):
+            retained.append(bytearray(1000))
+            gevent.sleep(0)
+
+    allocator = gevent.spawn_later(0.01, allocate)
+    differences = trace_memory_growth(duration=0.1, limit=1)
+    allocator.join()
+
+    assert len(differences) == 1
+    assert "test_debugging.py" in differences[0]
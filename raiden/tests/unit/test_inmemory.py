@@ -0,0 +1,40 @@
+from raiden.tests.utils.factories import UNIT_CHAIN_ID
+from raiden.tests.utils.inmemory import InMemoryBlockchain, InMemoryNetwork, start_nodes
+from raiden.transfer import views
+from raiden.transfer.events import EventPaymentSentSuccess
+
+
+def test_payments_are_mediated_by_in_memory_nodes(tmpdir):
+    """ Smoke test of the in-memory nodes used by the multi node benchmark. """
+    blockchain = InMemoryBlockchain(network_id=UNIT_CHAIN_ID, block_time=0.1)
+    network = InMemoryNetwork()
+    raiden_services, token_network_address = start_nodes(
+        blockchain, network, 3, "line", 100, str(tmpdir)
+    )
+    initiator, mediator, target = raiden_services
+
+    try:
+        for identifier in range(1, 4):
+            payment_status = initiator.mediated_transfer_async(
+                token_network_address=token_network_address,
+                amount=1,
+                target=target.address,
+                identifier=identifier,
+            )
+            result = payment_status.payment_done.wait(timeout=30)
+            assert isinstance(result, EventPaymentSentSuccess)
+
+        assert network.hop_latencies
+        channel_state = views.get_channelstate_for(
+            views.state_from_raiden(target),
+            target.default_registry.address,
+            views.get_token_network_by_address(
+                views.state_from_raiden(target), token_network_address
+            ).token_address,
+            mediator.address,
+        )
+        assert channel_state.partner_state.balance_proof.transferred_amount == 3
+    finally:
+        for raiden in raiden_services:
+            raiden.stop()
+        blockchain.stop()
@@ -4,7 +4,7 @@ import traceback
 import pytest
 import structlog
 
-from raiden.log_config import LogFilter, configure_logging
+from raiden.log_config import LazyValue, LogFilter, configure_logging
 
 
 def test_log_filter():
@@ -147,3 +147,27 @@ def test_redacted_traceback(capsys, tmpdir):
 
     assert token not in captured.err
     assert "accessToken=<redacted>" in captured.err
+
+
+@pytest.mark.parametrize("level", ["DEBUG", "INFO"])
+def test_lazy_values(capsys, level, tmpdir):
+    configure_logging(
+        {"": level}, disable_debug_logfile=True, debug_log_file_name=str(tmpdir / "debug.log")
+    )
+    calls = []
+
+    def expensive(value):
+        calls.append(value)
+        return f"computed {value}"
+
+    log = structlog.get_logger("raiden.test")
+    log.debug("lazy event", key=LazyValue(expensive, "value"))
+
+    captured = capsys.readouterr()
+
+    if level == "DEBUG":
+        assert calls == ["value"]
+        assert "computed value" in captured.err
+    else:
+        assert calls == []
+        assert captured.err == ""
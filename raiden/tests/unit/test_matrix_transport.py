@@ -2,8 +2,10 @@ import random
 from unittest.mock import Mock, create_autospec
 from urllib.parse import urlparse
 
+import gevent
 import pytest
 from eth_utils import decode_hex, encode_hex, to_canonical_address, to_normalized_address
+from gevent.event import AsyncResult
 from matrix_client.errors import MatrixRequestError
 from matrix_client.room import Room
 from matrix_client.user import User
@@ -11,6 +13,8 @@ from matrix_client.user import User
 import raiden.network.transport.matrix.client
 import raiden.network.transport.matrix.utils
 from raiden.exceptions import TransportError
+from raiden.network.transport.matrix import _RetryQueue
+from raiden.network.transport.matrix.client import GMatrixClient, Room as GRoom
 from raiden.network.transport.matrix.utils import (
     join_global_room,
     login_or_register,
@@ -217,3 +221,106 @@ def test_invite_tiebreaker():
 
     assert my_place_or_yours(address, address1) == address
     assert my_place_or_yours(address1, address2) == address1
+
+
+def test_retry_queue_batch_texts():
+    texts = ["a" * 10, "b" * 10, "c" * 10, "d" * 10, "e" * 10]
+
+    batches = list(_RetryQueue._batch_texts(texts, max_messages=2, max_bytes=1000))
+    assert batches == [texts[0:2], texts[2:4], texts[4:5]]
+
+    # every message takes 11 bytes with its newline separator
+    batches = list(_RetryQueue._batch_texts(texts, max_messages=100, max_bytes=33))
+    assert batches == [texts[0:3], texts[3:5]]
+
+    # a message bigger than the byte limit is sent on its own
+    big = "x" * 100
+    batches = list(_RetryQueue._batch_texts([texts[0], big, texts[1]], 100, max_bytes=50))
+    assert batches == [[texts[0]], [big], [texts[1]]]
+
+    assert list(_RetryQueue._batch_texts([], max_messages=1, max_bytes=1)) == []
+
+
+def make_sync_response(room_bodies):
+    """ Build a minimal /sync response with one text message per room """
+    join = {
+        room_id: {
+            "timeline": {
+                "prev_batch": "",
+                "events": [
+                    {"type": "m.room.message", "content": {"msgtype": "m.text", "body": body}}
+                ],
+            },
+            "state": {"events": []},
+            "ephemeral": {"events": []},
+            "account_data": {"events": []},
+        }
+        for room_id, body in room_bodies.items()
+    }
+    return {
+        "next_batch": "",
+        "presence": {"events": []},
+        "to_device": {"events": []},
+        "account_data": {"events": []},
+        "rooms": {"invite": {}, "leave": {}, "join": join},
+    }
+
+
+def test_sync_pipeline_keeps_room_order():
+    client = GMatrixClient("http://localhost:8008")
+    for room_id in ("!a:localhost", "!b:localhost"):
+        room = GRoom(client, room_id)
+        room.canonical_alias = room_id
+        client.rooms[room_id] = room
+
+    handled = list()
+    client.add_listener(lambda event: handled.append(event["content"]["body"]), "m.room.message")
+
+    first = make_sync_response({"!a:localhost": "a1"})
+    second = make_sync_response({"!a:localhost": "a2", "!b:localhost": "b1"})
+    first_ordering = client._order_response(first)
+    second_ordering = client._order_response(second)
+
+    # the second response is handled first, room a must wait for the first
+    # response but room b doesn't
+    second_handler = gevent.spawn(client._handle_response, second, False, second_ordering)
+    gevent.sleep(0.01)
+    assert handled == ["b1"]
+
+    client._handle_response(first, False, first_ordering)
+    second_handler.get(timeout=1)
+
+    assert handled == ["b1", "a1", "a2"]
+    assert client.sync_handle_time_histogram.count == 2
+
+
+def test_sync_token_persisted_once_earlier_responses_are_handled():
+    client = GMatrixClient("http://localhost:8008")
+    persisted = list()
+    client.set_post_sync_hook(persisted.append)
+
+    first = make_sync_response({})
+    first["next_batch"] = "first"
+    second = make_sync_response({})
+    second["next_batch"] = "second"
+    first_handled, second_handled = AsyncResult(), AsyncResult()
+
+    # the second response is handled first, its token must not be persisted
+    # before the first response is handled too
+    second_handler = gevent.spawn(
+        client._handle_response, second, False, None, None, (first_handled, second_handled)
+    )
+    gevent.sleep(0.01)
+    assert persisted == []
+
+    client._handle_response(first, False, None, None, (None, first_handled))
+    second_handler.get(timeout=1)
+    assert persisted == ["first", "second"]
+
+    # the tokens following a failed response are not persisted
+    third = make_sync_response({})
+    third["next_batch"] = "third"
+    failed = AsyncResult()
+    failed.set(False)
+    client._handle_response(third, False, None, None, (failed, AsyncResult()))
+    assert persisted == ["first", "second"]
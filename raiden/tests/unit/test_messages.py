@@ -1,8 +1,9 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
 import pytest
 
 from raiden.constants import EMPTY_SIGNATURE, UINT64_MAX, UINT256_MAX
+from raiden.exceptions import UnknownTokenAddress
 from raiden.message_handler import MessageHandler
 from raiden.messages import (
     Delivered,
@@ -387,3 +388,79 @@ def test_message_handler():
     receive = ReceiveProcessed(message_identifier=42, sender=sender)
     message_handler.on_message(mock_raiden, processed)
     assert_method_call(mock_raiden, "handle_and_track_state_change", receive)
+
+
+def test_message_handler_batches_state_changes():
+    """
+    MessageHandler.on_messages must dispatch the consecutive messages which don't need the
+    node's state in a single batch, and apply them before handling a locked transfer.
+    """
+    our_address = factories.make_address()
+    sender_privkey, sender = factories.make_privkey_address()
+    signer = LocalSigner(sender_privkey)
+    message_handler = MessageHandler()
+    mock_raiden = Mock(
+        address=our_address, default_secret_registry=Mock(is_secret_registered=lambda **_: False)
+    )
+
+    processed = Processed(message_identifier=42, signature=factories.EMPTY_SIGNATURE)
+    processed.sign(signer)
+    delivered = Delivered(delivered_message_identifier=1, signature=factories.EMPTY_SIGNATURE)
+    delivered.sign(signer)
+    properties = factories.LockedTransferProperties(sender=sender, pkey=sender_privkey)
+    locked_transfer = factories.create(properties)
+    secret = factories.make_secret()
+    reveal_secret = RevealSecret(
+        message_identifier=100, signature=factories.EMPTY_SIGNATURE, secret=secret
+    )
+    reveal_secret.sign(signer)
+
+    message_handler.on_messages(
+        mock_raiden, [processed, delivered, locked_transfer, reveal_secret]
+    )
+
+    assert mock_raiden.mock_calls == [
+        call.handle_and_track_state_changes(
+            [
+                ReceiveProcessed(message_identifier=42, sender=sender),
+                ReceiveDelivered(message_identifier=1, sender=sender),
+            ]
+        ),
+        call.mediate_mediated_transfer(locked_transfer),
+        call.handle_and_track_state_changes([ReceiveSecretReveal(sender=sender, secret=secret)]),
+    ]
+
+
+def test_message_handler_skips_invalid_message_in_batch():
+    """
+    A message of a batch which can't be handled must not prevent the following messages
+    from being handled, nor the previous ones from being dispatched again.
+    """
+    our_address = factories.make_address()
+    sender_privkey, sender = factories.make_privkey_address()
+    signer = LocalSigner(sender_privkey)
+    message_handler = MessageHandler()
+    mock_raiden = Mock(
+        address=our_address,
+        default_secret_registry=Mock(is_secret_registered=lambda **_: False),
+        mediate_mediated_transfer=Mock(side_effect=UnknownTokenAddress("unknown")),
+    )
+
+    processed = Processed(message_identifier=42, signature=factories.EMPTY_SIGNATURE)
+    processed.sign(signer)
+    properties = factories.LockedTransferProperties(sender=sender, pkey=sender_privkey)
+    locked_transfer = factories.create(properties)
+    delivered = Delivered(delivered_message_identifier=1, signature=factories.EMPTY_SIGNATURE)
+    delivered.sign(signer)
+
+    message_handler.on_messages(mock_raiden, [processed, locked_transfer, delivered])
+
+    assert mock_raiden.mock_calls == [
+        call.handle_and_track_state_changes(
+            [ReceiveProcessed(message_identifier=42, sender=sender)]
+        ),
+        call.mediate_mediated_transfer(locked_transfer),
+        call.handle_and_track_state_changes(
+            [ReceiveDelivered(message_identifier=1, sender=sender)]
+        ),
+    ]
@@ -0,0 +1,45 @@
+from raiden.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    MetricVector,
+    render_metrics,
+)
+
+
+def test_render_metrics():
+    histograms = MetricVector(
+        Histogram, "dispatch_seconds", "Dispatch time", label="state_change", buckets=(0.1, 1)
+    )
+    histograms.labels("Block").observe(0.05)
+    histograms.labels("Block").observe(0.5)
+    histograms.labels("ActionInitChain").observe(2)
+
+    counter = Counter("messages_total", "Messages", labels={"message_type": 'Say "hi"'})
+    counter.inc(3)
+
+    registry = MetricsRegistry()
+    registry.register(histograms, counter)
+    registry.register_collector(lambda: [Gauge("size_bytes", "Size", function=lambda: 42)])
+
+    assert render_metrics(registry.collect()).splitlines() == [
+        "# HELP dispatch_seconds Dispatch time",
+        "# TYPE dispatch_seconds histogram",
+        'dispatch_seconds_bucket{state_change="Block",le="0.1"} 1',
+        'dispatch_seconds_bucket{state_change="Block",le="1.0"} 2',
+        'dispatch_seconds_bucket{state_change="Block",le="+Inf"} 2',
+        'dispatch_seconds_sum{state_change="Block"} 0.55',
+        'dispatch_seconds_count{state_change="Block"} 2',
+        'dispatch_seconds_bucket{state_change="ActionInitChain",le="0.1"} 0',
+        'dispatch_seconds_bucket{state_change="ActionInitChain",le="1.0"} 0',
+        'dispatch_seconds_bucket{state_change="ActionInitChain",le="+Inf"} 1',
+        'dispatch_seconds_sum{state_change="ActionInitChain"} 2.0',
+        'dispatch_seconds_count{state_change="ActionInitChain"} 1',
+        "# HELP messages_total Messages",
+        "# TYPE messages_total counter",
+        'messages_total{message_type="Say \\"hi\\""} 3.0',
+        "# HELP size_bytes Size",
+        "# TYPE size_bytes gauge",
+        "size_bytes 42.0",
+    ]
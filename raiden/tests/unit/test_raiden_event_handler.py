@@ -1,14 +1,24 @@
+import uuid
+from unittest.mock import Mock, patch
+
+from gevent.queue import Queue
+
 from raiden.constants import EMPTY_HASH, EMPTY_MERKLE_ROOT
 from raiden.network.proxies.token_network import ParticipantDetails, ParticipantsDetails
-from raiden.raiden_event_handler import RaidenEventHandler
+from raiden.raiden_event_handler import PFSFeedbackEventHandler, RaidenEventHandler
 from raiden.tests.utils.factories import (
     make_32bytes,
     make_address,
     make_block_hash,
     make_canonical_identifier,
+    make_secret,
+)
+from raiden.tests.utils.mocks import MockRaidenService, make_raiden_service_mock
+from raiden.transfer.events import (
+    ContractSendChannelBatchUnlock,
+    EventPaymentReceivedSuccess,
+    EventPaymentSentSuccess,
 )
-from raiden.tests.utils.mocks import make_raiden_service_mock
-from raiden.transfer.events import ContractSendChannelBatchUnlock
 from raiden.transfer.utils import hash_balance_data
 from raiden.transfer.views import get_channelstate_by_token_network_and_partner, state_from_raiden
 
@@ -89,3 +99,54 @@ def test_handle_contract_send_channelunlock_already_unlocked():
     RaidenEventHandler().on_raiden_event(
         raiden=raiden, chain_state=raiden.wal.state_manager.current_state, event=event
     )
+
+
+def test_pfs_feedback_handler_forgets_the_routes_of_finished_payments():
+    raiden = MockRaidenService(config={})
+    route = [make_address(), make_address()]
+    feedback_token = uuid.uuid4()
+    raiden.route_to_feeback_token[tuple(route)] = feedback_token
+
+    event = EventPaymentSentSuccess(
+        payment_network_address=make_address(),
+        token_network_address=make_address(),
+        identifier=1,
+        amount=1,
+        target=route[-1],
+        secret=make_secret(),
+        route=route,
+    )
+    handler = PFSFeedbackEventHandler(Mock())
+    with patch("raiden.raiden_event_handler.post_pfs_feedback") as post_pfs_feedback:
+        handler.on_raiden_event(raiden, state_from_raiden(raiden), event)
+
+        assert post_pfs_feedback.call_args[1]["token"] == feedback_token
+        assert tuple(route) not in raiden.route_to_feeback_token
+
+        handler.on_raiden_event(raiden, state_from_raiden(raiden), event)
+        assert post_pfs_feedback.call_count == 1
+
+
+def test_payments_received_are_published_to_the_subscribers():
+    raiden = MockRaidenService(config={})
+    slow_subscriber = Queue(1)
+    subscriber = Queue()
+    raiden.payment_received_subscribers.extend([slow_subscriber, subscriber])
+
+    events = [
+        EventPaymentReceivedSuccess(
+            payment_network_address=make_address(),
+            token_network_address=make_address(),
+            identifier=identifier,
+            amount=1,
+            initiator=make_address(),
+        )
+        for identifier in (1, 2)
+    ]
+    for event in events:
+        RaidenEventHandler().on_raiden_event(raiden, state_from_raiden(raiden), event)
+
+    # A full subscriber loses the newer events without affecting the others
+    assert slow_subscriber.get_nowait() == events[0]
+    assert slow_subscriber.empty()
+    assert [subscriber.get_nowait() for _ in events] == events
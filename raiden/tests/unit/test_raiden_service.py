@@ -0,0 +1,60 @@
+from collections import defaultdict
+from functools import partial
+from unittest.mock import Mock, patch
+
+import gevent
+import pytest
+from gevent.event import Event
+from gevent.lock import Semaphore
+
+from raiden.raiden_service import RaidenService
+from raiden.tests.utils import factories
+
+
+def test_mediated_transfers_async_removes_the_statuses_of_a_failed_batch():
+    raiden = Mock()
+    raiden.targets_to_identifiers_to_statuses = defaultdict(dict)
+    raiden.payment_identifier_lock = Semaphore()
+    raiden.pop_payment_status = partial(RaidenService.pop_payment_status, raiden)
+    raiden.handle_and_track_state_changes.side_effect = RuntimeError()
+
+    token_network_address = factories.make_token_network_address()
+    target = factories.make_address()
+    payments = [(target, 5, 1), (target, 5, 2)]
+
+    def routes_computed_without_the_lock(**kwargs):
+        assert not raiden.payment_identifier_lock.locked()
+        return []
+
+    with patch("raiden.raiden_service.initiator_init"), patch(
+        "raiden.raiden_service.initiator_routes", side_effect=routes_computed_without_the_lock
+    ) as routes:
+        with pytest.raises(RuntimeError):
+            RaidenService.mediated_transfers_async(raiden, token_network_address, payments)
+
+        assert routes.call_count == 1, "the routes are computed once per target and amount"
+        assert not raiden.targets_to_identifiers_to_statuses
+
+        # The payments can be retried with the same identifiers
+        raiden.handle_and_track_state_changes.side_effect = None
+        results = RaidenService.mediated_transfers_async(raiden, token_network_address, payments)
+
+    assert [status.payment_identifier for status in results] == [1, 2]
+    assert not any(status.payment_done.ready() for status in results)
+
+
+def test_killed_raiden_service_stops_the_receipt_tracking():
+    raiden = Mock()
+    raiden.address = factories.make_address()
+    raiden.stop_event = Event()
+    raiden.alarm = gevent.spawn(gevent.sleep, 60)
+    raiden.transport = gevent.spawn(gevent.sleep, 60)
+
+    service = gevent.spawn(RaidenService._run, raiden)
+    gevent.sleep(0)
+    assert not service.dead
+    service.kill()
+
+    # The greenlets waiting for a transaction go back to polling for it
+    assert raiden.chain.client.stop_receipt_tracking.called
+    assert raiden.alarm.dead and raiden.transport.dead
@@ -0,0 +1,59 @@
+from hashlib import sha256
+from http import HTTPStatus
+from unittest.mock import Mock, patch
+
+import requests
+from eth_utils import to_hex
+
+from raiden.network.resolver.client import ResolverClient
+from raiden.tests.utils.factories import make_secret
+
+
+def make_response(status_code, secret=None):
+    response = Mock(status_code=status_code)
+    response.json.return_value = {"secret": to_hex(secret)} if secret else {}
+    return response
+
+
+def test_resolver_client_caches_the_resolved_secrets():
+    secret = make_secret()
+    secrethash = sha256(secret).digest()
+    client = ResolverClient("http://resolver", retry_backoff=0)
+
+    ok = make_response(HTTPStatus.OK, secret)
+    with patch.object(client.session, "post", return_value=ok) as post:
+        assert client.resolve(secrethash, {}) == secret
+        assert client.resolve(secrethash, {}) == secret
+    assert post.call_count == 1
+    assert client.request_latency_histogram.count == 1
+
+    # A secret which does not match the secrethash is ignored
+    other_secrethash = sha256(make_secret()).digest()
+    with patch.object(client.session, "post", return_value=ok):
+        assert client.resolve(other_secrethash, {}) is None
+    assert other_secrethash not in client.resolved_secrets
+
+
+def test_resolver_client_retries_transient_errors():
+    secret = make_secret()
+    secrethash = sha256(secret).digest()
+    client = ResolverClient("http://resolver", retries=2, retry_backoff=0)
+
+    responses = [
+        requests.exceptions.Timeout(),
+        make_response(HTTPStatus.SERVICE_UNAVAILABLE),
+        make_response(HTTPStatus.OK, secret),
+    ]
+    with patch.object(client.session, "post", side_effect=responses) as post:
+        assert client.resolve(secrethash, {}) == secret
+    assert post.call_count == 3
+    assert post.call_args[1]["timeout"] == client.timeout
+
+    # The resolver does not know the secret, retrying will not help
+    with patch.object(client.session, "post", return_value=make_response(404)) as post:
+        assert client.resolve(sha256(make_secret()).digest(), {}) is None
+    assert post.call_count == 1
+
+    with patch.object(client.session, "post", side_effect=requests.ConnectionError()) as post:
+        assert client.resolve(sha256(make_secret()).digest(), {}) is None
+    assert post.call_count == 3
@@ -1,5 +1,15 @@
+from unittest.mock import Mock
+
+import pytest
+from eth_utils import encode_hex
+from gevent.event import AsyncResult
+
 from raiden.constants import EthClient
+from raiden.network.rpc.client import JSONRPCClient
 from raiden.network.rpc.smartcontract_proxy import ClientErrorInspectResult, inspect_client_error
+from raiden.settings import DEFAULT_RECEIPT_CHECK_MAX_FAILURES
+from raiden.tests.utils.factories import make_address, make_transaction_hash
+from raiden.utils.typing import BlockNumber
 
 
 def test_inspect_client_error():
@@ -12,3 +22,45 @@ def test_inspect_client_error():
 
     result = inspect_client_error(exception, EthClient.PARITY)
     assert result == ClientErrorInspectResult.ALWAYS_FAIL
+
+
+def make_tracking_client(get_receipt):
+    client = JSONRPCClient.__new__(JSONRPCClient)
+    client.address = make_address()
+    client.default_block_num_confirmations = 0
+    client.web3 = Mock()
+    client.web3.eth.getTransactionReceipt.side_effect = get_receipt
+    client._receipt_tracking = False
+    client._receipts_checker = None
+    client._pending_transactions = dict()
+    client._transactions_in_pool = set()
+    client._receipt_check_failures = dict()
+    client.start_receipt_tracking()
+    return client
+
+
+def test_receipt_check_failure_leaves_the_other_transactions_pending():
+    failing_hash = encode_hex(make_transaction_hash())
+    mined_hash = encode_hex(make_transaction_hash())
+
+    def get_receipt(transaction_hash):
+        if transaction_hash == failing_hash:
+            raise ConnectionError("node unavailable")
+        return {"blockNumber": 1}
+
+    client = make_tracking_client(get_receipt)
+    failing = client._pending_transactions[failing_hash] = AsyncResult()
+    mined = client._pending_transactions[mined_hash] = AsyncResult()
+
+    client._check_pending_transactions(BlockNumber(1))
+    assert mined.get(timeout=0) == {"blockNumber": 1}
+    assert not failing.ready()
+    assert failing_hash in client._pending_transactions
+
+    for _ in range(DEFAULT_RECEIPT_CHECK_MAX_FAILURES - 1):
+        client._check_pending_transactions(BlockNumber(1))
+
+    with pytest.raises(ConnectionError):
+        failing.get(timeout=0)
+    assert not client._pending_transactions
+    assert not client._receipt_check_failures
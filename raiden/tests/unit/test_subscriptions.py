@@ -0,0 +1,60 @@
+from raiden.tests.utils import factories
+from raiden.transfer.events import EventPaymentReceivedSuccess
+from raiden.transfer.state_change import ActionChannelClose, Block
+from raiden.utils.subscriptions import (
+    StateChangeSubscriptions,
+    block_key,
+    channel_key,
+    payment_key,
+    token_network_key,
+)
+
+
+def test_subscriptions_only_notify_the_affected_keys():
+    subscriptions = StateChangeSubscriptions()
+    token_network_address = factories.make_token_network_address()
+    closed = factories.make_canonical_identifier(token_network_address=token_network_address)
+    other = factories.make_canonical_identifier(token_network_address=token_network_address)
+
+    closed_channel = subscriptions.subscribe(
+        channel_key(token_network_address, closed.channel_identifier)
+    )
+    other_channel = subscriptions.subscribe(
+        channel_key(token_network_address, other.channel_identifier)
+    )
+    token_network = subscriptions.subscribe(token_network_key(token_network_address))
+    payment = subscriptions.subscribe(payment_key(1))
+
+    subscriptions.notify([ActionChannelClose(canonical_identifier=closed)], [])
+    assert closed_channel.is_set()
+    assert token_network.is_set()
+    assert not other_channel.is_set()
+    assert not payment.is_set()
+
+    received = EventPaymentReceivedSuccess(
+        payment_network_address=factories.make_payment_network_address(),
+        token_network_address=token_network_address,
+        identifier=1,
+        amount=5,
+        initiator=factories.make_address(),
+    )
+    subscriptions.notify([], [received])
+    assert payment.is_set()
+    assert not other_channel.is_set()
+
+    # A notified subscription is replaced by a new one
+    assert not subscriptions.subscribe(payment_key(1)).is_set()
+
+
+def test_subscriptions_notify_the_blocks_up_to_the_new_block():
+    subscriptions = StateChangeSubscriptions()
+    block_5 = subscriptions.subscribe(block_key(5))
+    block_7 = subscriptions.subscribe(block_key(7))
+    block_8 = subscriptions.subscribe(block_key(8))
+
+    # Blocks may be skipped, the subscriptions for the skipped blocks are notified too
+    block = Block(block_number=7, gas_limit=1, block_hash=factories.make_block_hash())
+    subscriptions.notify([block], [])
+    assert block_5.is_set()
+    assert block_7.is_set()
+    assert not block_8.is_set()
@@ -1,16 +1,19 @@
 from datetime import timedelta
 from unittest.mock import Mock, patch
 
+import gevent
 import pytest
 import requests
 from eth_keys.exceptions import BadSignature, ValidationError
 from eth_utils import decode_hex, to_canonical_address
+from gevent.pool import Pool
 
 from raiden.constants import EMPTY_HASH
 from raiden.exceptions import InvalidSignature
 from raiden.network.utils import get_http_rtt
 from raiden.tests.utils.mocks import MockWeb3
 from raiden.utils import block_specification_to_number, privatekey_to_publickey, sha3
+from raiden.utils.filters import FILTER_MAX_BLOCK_RANGE, StatelessFilter
 from raiden.utils.signer import LocalSigner, Signer, recover
 from raiden.utils.typing import BlockNumber
 
@@ -92,3 +95,32 @@ def test_get_http_rtt():
 
     with patch.object(requests, "request", side_effect=request_mock):
         assert get_http_rtt(url="url", method="get") == 0.3
+
+
+def test_stateless_filter_queries_the_windows_concurrently_in_order():
+    queried = list()
+
+    def get_logs(filter_params):
+        window = (filter_params["fromBlock"], filter_params["toBlock"])
+        queried.append(window)
+        # the later windows are answered first
+        gevent.sleep(0.01 / len(queried))
+        return [window]
+
+    web3 = Mock()
+    web3.eth.getLogs.side_effect = get_logs
+    stateless_filter = StatelessFilter(web3, {"fromBlock": 1})
+
+    target_block_number = BlockNumber(FILTER_MAX_BLOCK_RANGE * 2 + 10)
+    entries = stateless_filter.get_new_entries(target_block_number, pool=Pool(3))
+    assert entries == [
+        (1, FILTER_MAX_BLOCK_RANGE),
+        (FILTER_MAX_BLOCK_RANGE + 1, FILTER_MAX_BLOCK_RANGE * 2),
+        (FILTER_MAX_BLOCK_RANGE * 2 + 1, target_block_number),
+    ]
+    assert len(queried) == 3
+
+    # The next query starts after the last queried block
+    assert stateless_filter.get_new_entries(target_block_number + 1) == [
+        (target_block_number + 1, target_block_number + 1)
+    ]
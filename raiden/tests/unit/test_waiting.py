@@ -0,0 +1,65 @@
+from functools import partial
+from unittest.mock import Mock
+
+import gevent
+
+from raiden import waiting
+from raiden.raiden_service import RaidenService
+from raiden.settings import DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS
+from raiden.tests.utils import factories
+from raiden.transfer import node
+from raiden.transfer.state import TransactionChannelNewBalance
+from raiden.transfer.state_change import Block, ContractReceiveChannelNewBalance
+from raiden.utils.subscriptions import StateChangeSubscriptions
+
+
+def make_raiden(chain_state):
+    raiden = Mock()
+    raiden.address = chain_state.our_address
+    raiden.wal.state_manager.current_state = chain_state
+    raiden.state_change_subscriptions = StateChangeSubscriptions()
+    raiden.wait_for_state_change = partial(RaidenService.wait_for_state_change, raiden)
+    return raiden
+
+
+def test_wait_for_participant_newbalance_wakes_up_when_a_block_confirms_the_deposit(
+    chain_state, netting_channel_state
+):
+    raiden = make_raiden(chain_state)
+    deposit_block_number = chain_state.block_number
+    new_balance = ContractReceiveChannelNewBalance(
+        transaction_hash=factories.make_transaction_hash(),
+        canonical_identifier=netting_channel_state.canonical_identifier,
+        deposit_transaction=TransactionChannelNewBalance(
+            chain_state.our_address, 20, deposit_block_number
+        ),
+        block_number=deposit_block_number,
+        block_hash=factories.make_block_hash(),
+    )
+    node.state_transition(chain_state, new_balance)
+    raiden.state_change_subscriptions.notify([new_balance], [])
+
+    waiter = gevent.spawn(
+        waiting.wait_for_participant_newbalance,
+        raiden=raiden,
+        payment_network_address=netting_channel_state.payment_network_address,
+        token_address=netting_channel_state.token_address,
+        partner_address=netting_channel_state.partner_state.address,
+        target_address=chain_state.our_address,
+        target_balance=20,
+        retry_timeout=60,
+    )
+    gevent.sleep(0)
+    assert not waiter.ready(), "the deposit is not confirmed yet"
+
+    # The deposit is applied by the Block, which doesn't notify the channel
+    block = Block(
+        block_number=deposit_block_number + DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS + 1,
+        gas_limit=1,
+        block_hash=factories.make_block_hash(),
+    )
+    node.state_transition(chain_state, block)
+    raiden.state_change_subscriptions.notify([block], [])
+
+    waiter.get(timeout=5)
+    assert netting_channel_state.our_state.contract_balance == 20
@@ -226,3 +226,57 @@ def test_get_snapshot_closest_to_state_change():
 
     snapshot = wal.storage.get_snapshot_closest_to_state_change("latest")
     assert snapshot.data == AccState([block1, block2, block3])
+
+
+def test_log_and_dispatch_batch():
+    wal = new_wal(state_transtion_acc)
+
+    blocks = [
+        Block(block_number=number, gas_limit=1, block_hash=factories.make_transaction_hash())
+        for number in range(5, 10)
+    ]
+    state, events = wal.log_and_dispatch_batch(blocks)
+
+    assert state == AccState(blocks)
+    assert events == []
+    assert wal.state_manager.current_state == AccState(blocks)
+    assert wal.state_change_id == len(blocks)
+
+    state_changes = wal.storage.get_statechanges_by_identifier(
+        from_identifier=0, to_identifier="latest"
+    )
+    assert state_changes == blocks
+
+    newwal = restore_to_state_change(
+        transition_function=state_transtion_acc,
+        storage=wal.storage,
+        state_change_identifier="latest",
+    )
+    assert newwal.state_manager.current_state == AccState(blocks)
+
+
+def test_log_and_dispatch_batch_is_atomic():
+    def state_transition_fail_on_block_7(state, state_change):
+        if state_change.block_number == 7:
+            raise ValueError("invalid block")
+        return state_transtion_acc(state, state_change)
+
+    wal = new_wal(state_transition_fail_on_block_7)
+
+    block5 = Block(block_number=5, gas_limit=1, block_hash=factories.make_transaction_hash())
+    wal.log_and_dispatch(block5)
+
+    blocks = [
+        Block(block_number=number, gas_limit=1, block_hash=factories.make_transaction_hash())
+        for number in range(6, 9)
+    ]
+    with pytest.raises(ValueError):
+        wal.log_and_dispatch_batch(blocks)
+
+    assert wal.state_manager.current_state == AccState([block5])
+    assert wal.state_change_id == 1
+
+    state_changes = wal.storage.get_statechanges_by_identifier(
+        from_identifier=0, to_identifier="latest"
+    )
+    assert state_changes == [block5]
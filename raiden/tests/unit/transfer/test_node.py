@@ -1,9 +1,40 @@
+from copy import deepcopy
+from hashlib import sha256
+from unittest.mock import Mock
+
+import pytest
+
 from raiden.constants import EMPTY_MERKLE_ROOT
-from raiden.tests.utils.factories import HOP1, HOP2, UNIT_SECRETHASH, make_block_hash
-from raiden.transfer.events import ContractSendChannelBatchUnlock
-from raiden.transfer.node import is_transaction_effect_satisfied, state_transition
+from raiden.tests.utils.events import search_for_item
+from raiden.tests.utils.factories import (
+    HOP1,
+    HOP2,
+    UNIT_SECRETHASH,
+    make_block_hash,
+    make_secret,
+    make_transaction_hash,
+)
+from raiden.transfer import token_network, views
+from raiden.transfer.channel import set_closed
+from raiden.transfer.events import ContractSendChannelBatchUnlock, ContractSendChannelSettle
+from raiden.transfer.node import (
+    is_transaction_effect_satisfied,
+    remove_transfer_task,
+    set_transfer_task,
+    state_transition,
+)
+from raiden.transfer.state import (
+    CHANNEL_STATE_CLOSED,
+    CHANNEL_STATE_CLOSING,
+    CHANNEL_STATE_OPENED,
+    CHANNEL_STATE_SETTLING,
+    ChannelDeadline,
+)
 from raiden.transfer.state_change import (
+    ActionChannelClose,
+    Block,
     ContractReceiveChannelBatchUnlock,
+    ContractReceiveChannelClosed,
     ContractReceiveChannelSettled,
 )
 
@@ -56,3 +87,147 @@ def test_is_transaction_effect_satisfied(
     iteration = state_transition(chain_state=chain_state, state_change=channel_settled)
 
     assert is_transaction_effect_satisfied(iteration.new_state, transaction, state_change)
+
+
+def test_block_is_dispatched_to_due_channels(chain_state, netting_channel_state):
+    canonical_identifier = netting_channel_state.canonical_identifier
+    settle_timeout = netting_channel_state.settle_timeout
+
+    def block(block_number):
+        return Block(block_number=block_number, gas_limit=1, block_hash=make_block_hash())
+
+    # The first block builds the index, no channel has a deadline yet
+    iteration = state_transition(chain_state=chain_state, state_change=block(2))
+    assert iteration.new_state.channel_deadlines == []
+
+    channel_closed = ContractReceiveChannelClosed(
+        transaction_hash=make_transaction_hash(),
+        transaction_from=netting_channel_state.our_state.address,
+        canonical_identifier=canonical_identifier,
+        block_number=3,
+        block_hash=make_block_hash(),
+    )
+    iteration = state_transition(chain_state=iteration.new_state, state_change=channel_closed)
+
+    settlement_end = 3 + settle_timeout
+    assert iteration.new_state.channel_deadlines == [
+        ChannelDeadline(settlement_end + 1, canonical_identifier)
+    ]
+
+    iteration = state_transition(chain_state=iteration.new_state, state_change=block(4))
+    assert not iteration.events
+    iteration = state_transition(
+        chain_state=iteration.new_state, state_change=block(settlement_end)
+    )
+    assert not iteration.events
+
+    iteration = state_transition(
+        chain_state=iteration.new_state, state_change=block(settlement_end + 1)
+    )
+    assert search_for_item(iteration.events, ContractSendChannelSettle, {})
+    assert iteration.new_state.channel_deadlines == []
+
+
+def test_channel_deadlines_are_rebuilt(chain_state, netting_channel_state):
+    """ States without the deadline index, e.g. restored from an old snapshot,
+    must rebuild it from the channels.
+    """
+    set_closed(netting_channel_state, block_number=3)
+    settlement_end = 3 + netting_channel_state.settle_timeout
+    assert chain_state.channel_deadlines is None
+
+    settle_block = Block(
+        block_number=settlement_end + 1, gas_limit=1, block_hash=make_block_hash()
+    )
+    iteration = state_transition(chain_state=chain_state, state_change=settle_block)
+
+    assert search_for_item(iteration.events, ContractSendChannelSettle, {})
+    assert iteration.new_state.channel_deadlines == []
+
+
+def test_channel_status_index_follows_the_channel_lifecycle(
+    chain_state, token_network_state, netting_channel_state
+):
+    canonical_identifier = netting_channel_state.canonical_identifier
+
+    def status_counts():
+        index = views.get_channel_identifiers_by_status(token_network_state)
+
+        # The index must match the one built from the channels
+        rebuilt_state = deepcopy(token_network_state)
+        rebuilt_state.channel_identifiers_by_status = None
+        assert index == views.get_channel_identifiers_by_status(rebuilt_state)
+
+        return views.get_channel_status_counts(token_network_state)
+
+    assert token_network_state.channel_identifiers_by_status is None
+    assert status_counts() == {CHANNEL_STATE_OPENED: 1}
+
+    channel_close = ActionChannelClose(canonical_identifier=canonical_identifier)
+    state_transition(chain_state=chain_state, state_change=channel_close)
+    assert status_counts() == {CHANNEL_STATE_CLOSING: 1}
+
+    channel_closed = ContractReceiveChannelClosed(
+        transaction_hash=make_transaction_hash(),
+        transaction_from=netting_channel_state.partner_state.address,
+        canonical_identifier=canonical_identifier,
+        block_number=3,
+        block_hash=make_block_hash(),
+    )
+    state_transition(chain_state=chain_state, state_change=channel_closed)
+    assert status_counts() == {CHANNEL_STATE_CLOSED: 1}
+
+    settlement_end = 3 + netting_channel_state.settle_timeout
+    settle_block = Block(
+        block_number=settlement_end + 1, gas_limit=1, block_hash=make_block_hash()
+    )
+    state_transition(chain_state=chain_state, state_change=settle_block)
+    assert status_counts() == {CHANNEL_STATE_SETTLING: 1}
+
+    # The channel has no locks, it is removed once settled
+    channel_settled = ContractReceiveChannelSettled(
+        transaction_hash=make_transaction_hash(),
+        canonical_identifier=canonical_identifier,
+        our_onchain_locksroot=EMPTY_MERKLE_ROOT,
+        partner_onchain_locksroot=EMPTY_MERKLE_ROOT,
+        block_number=settlement_end + 2,
+        block_hash=make_block_hash(),
+    )
+    state_transition(chain_state=chain_state, state_change=channel_settled)
+    assert status_counts() == {}
+
+
+def test_channel_status_index_rejects_a_channel_missing_from_it(token_network_state):
+    token_network_state.channel_identifiers_by_status = {CHANNEL_STATE_OPENED: [1, 3]}
+
+    with pytest.raises(AssertionError):
+        token_network.update_channel_status_index(
+            token_network_state, 2, CHANNEL_STATE_OPENED, CHANNEL_STATE_CLOSED
+        )
+    with pytest.raises(AssertionError):
+        token_network.update_channel_status_index(
+            token_network_state, 4, CHANNEL_STATE_OPENED, CHANNEL_STATE_CLOSED
+        )
+
+    # The neighbouring channels are left in the index
+    assert token_network_state.channel_identifiers_by_status == {CHANNEL_STATE_OPENED: [1, 3]}
+
+
+def test_sorted_secrethashes_follow_the_transfer_tasks(chain_state):
+    tasks = [Mock() for _ in range(3)]
+    secrethashes = [sha256(make_secret()).digest() for _ in tasks]
+    set_transfer_task(chain_state, secrethashes[0], tasks[0])
+    assert chain_state.payment_mapping.sorted_secrethashes is None
+
+    assert views.get_sorted_secrethashes(chain_state) == [secrethashes[0]]
+    set_transfer_task(chain_state, secrethashes[1], tasks[1])
+    set_transfer_task(chain_state, secrethashes[2], tasks[2])
+    set_transfer_task(chain_state, secrethashes[1], tasks[0])
+    assert views.get_sorted_secrethashes(chain_state) == sorted(secrethashes)
+
+    remove_transfer_task(chain_state, secrethashes[1])
+    assert views.get_sorted_secrethashes(chain_state) == sorted([secrethashes[0], secrethashes[2]])
+    assert set(chain_state.payment_mapping.secrethashes_to_task) == {
+        secrethashes[0],
+        secrethashes[2],
+    }
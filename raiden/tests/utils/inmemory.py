@@ -0,0 +1,554 @@
+""" In-process replacements for the Matrix transport and the blockchain.
+
+These run many `RaidenService`s in a single process without a Matrix server
+nor an Ethereum node, e.g. to measure the throughput of the nodes. The
+messages are serialized, signed and validated like with the Matrix transport.
+The blockchain has no contracts: blocks are mined at a fixed interval, the
+filters return no events, and the on-chain setup of the nodes (token
+networks, channels) is dispatched to the nodes directly with
+`register_token_network` and `open_channel`, see `start_nodes`.
+"""
+import time
+from copy import deepcopy
+from hashlib import sha256
+
+import gevent
+import structlog
+from eth_utils import to_checksum_address
+from gevent.event import Event
+from gevent.queue import Queue
+
+from raiden.app import App
+from raiden.constants import EMPTY_SIGNATURE, Environment
+from raiden.message_handler import MessageHandler
+from raiden.messages import Delivered, Ping, Pong
+from raiden.network.transport.matrix.utils import validate_and_parse_message
+from raiden.raiden_event_handler import RaidenEventHandler
+from raiden.raiden_service import RaidenService
+from raiden.settings import DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS
+from raiden.storage.serialization import JSONSerializer
+from raiden.tests.utils.app import database_from_privatekey
+from raiden.tests.utils.factories import make_address, make_privkey_address
+from raiden.transfer import views
+from raiden.transfer.identifiers import CanonicalIdentifier
+from raiden.transfer.state import (
+    NODE_NETWORK_REACHABLE,
+    NettingChannelEndState,
+    NettingChannelState,
+    TokenNetworkGraphState,
+    TokenNetworkState,
+    TransactionExecutionStatus,
+)
+from raiden.transfer.state_change import (
+    ActionChangeNodeNetworkState,
+    ContractReceiveChannelNew,
+    ContractReceiveNewTokenNetwork,
+    ContractReceiveRouteNew,
+)
+from raiden.utils import pex, privatekey_to_address, sha3
+from raiden.utils.filters import StatelessFilter
+from raiden.utils.metrics import Metric
+from raiden.utils.runnable import Runnable
+from raiden.utils.typing import (
+    Address,
+    Any,
+    BlockSpecification,
+    Dict,
+    List,
+    Optional,
+    Secret,
+    SecretHash,
+    Tuple,
+)
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+GAS_LIMIT = 6_000_000
+
+
+class InMemoryNetwork:
+    """ Delivers the messages between the `InMemoryTransport`s of the nodes
+    running in this process, after a fixed `latency`.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.transports: Dict[Address, "InMemoryTransport"] = dict()
+        # Time from a message being sent until the receiver processed it
+        self.hop_latencies: List[float] = list()
+
+    def register(self, address: Address, transport: "InMemoryTransport") -> None:
+        self.transports[address] = transport
+
+    def deliver(self, sender: Address, receiver: Address, data: str) -> None:
+        transport = self.transports.get(receiver)
+        if transport is None:
+            log.debug("Message to unknown node dropped", receiver=pex(receiver))
+            return
+
+        item = (time.monotonic(), sender, data)
+        if self.latency:
+            gevent.spawn_later(self.latency, transport.inbox.put, item)
+        else:
+            transport.inbox.put(item)
+
+
+class InMemoryTransport(Runnable):
+    """ Implements the interface of the `MatrixTransport` on top of an
+    `InMemoryNetwork`.
+
+    Delivery is reliable, so the messages are sent once instead of being
+    retried until the partner processed them.
+    """
+
+    def __init__(self, network: InMemoryNetwork) -> None:
+        super().__init__()
+        self.network = network
+        self.inbox: Queue = Queue()
+        self._raiden_service = None
+        self._message_handler = None
+        self._stop_event = Event()
+        self._stop_event.set()
+        self._whitelist: set = set()
+        self._health_checked: set = set()
+        # Messages sent before the transport is started
+        self._pending_sends: List[Tuple[Address, Any]] = list()
+
+    def start(  # type: ignore
+        self, raiden_service, message_handler, prev_auth_data: Optional[str]
+    ) -> None:  # pylint: disable=unused-argument
+        if not self._stop_event.ready():
+            raise RuntimeError(f"{self!r} already started")
+        self._stop_event.clear()
+        self._raiden_service = raiden_service
+        self._message_handler = message_handler
+        self.network.register(raiden_service.address, self)
+
+        for receiver, message in self._pending_sends:
+            self._send(receiver, message)
+        self._pending_sends = list()
+
+        super().start()
+
+    def _run(self) -> None:  # pylint: disable=method-hidden
+        self.greenlet.name = f"InMemoryTransport._run node:{pex(self._raiden_service.address)}"
+        while not self._stop_event.ready():
+            items = [self.inbox.get()]
+            while not self.inbox.empty():
+                items.append(self.inbox.get_nowait())
+
+            for item in items:
+                if item is None:
+                    return
+                self._receive(*item)
+
+    def stop(self) -> None:
+        if self._stop_event.ready():
+            return
+        self._stop_event.set()
+        self.inbox.put(None)
+        self.network.transports.pop(self._raiden_service.address, None)
+
+    def __repr__(self) -> str:
+        node = pex(self._raiden_service.address) if self._raiden_service else None
+        return f"<{self.__class__.__name__} node:{node}>"
+
+    def get_metrics(self) -> List[Metric]:  # pylint: disable=no-self-use
+        return list()
+
+    def whitelist(self, address: Address) -> None:
+        self._whitelist.add(address)
+
+    def start_health_check(self, node_address: Address) -> None:
+        """ The nodes of the network are always reachable. """
+        if self._stop_event.ready() or node_address in self._health_checked:
+            return
+
+        self.whitelist(node_address)
+        if node_address in self.network.transports:
+            self._health_checked.add(node_address)
+            state_change = ActionChangeNodeNetworkState(node_address, NODE_NETWORK_REACHABLE)
+            self._raiden_service.handle_and_track_state_change(state_change)
+
+    def send_async(self, queue_identifier, message) -> None:
+        if isinstance(message, (Delivered, Ping, Pong)):
+            raise ValueError(f"Do not use send_async for {message.__class__.__name__} messages")
+
+        if self._raiden_service is None:
+            self._pending_sends.append((queue_identifier.recipient, message))
+        else:
+            self._send(queue_identifier.recipient, message)
+
+    def send_global(self, room: str, message) -> None:  # pylint: disable=unused-argument
+        """ Nobody listens to the global rooms, e.g. there is no path finding
+        service.
+        """
+
+    def _send(self, receiver: Address, message) -> None:
+        self.network.deliver(
+            self._raiden_service.address, receiver, JSONSerializer.serialize(message)
+        )
+
+    def _receive(self, sent_at: float, sender: Address, data: str) -> None:
+        if self._stop_event.ready() or sender not in self._whitelist:
+            return
+
+        messages = validate_and_parse_message(data, sender)
+        for message in messages:
+            if not isinstance(message, Delivered):
+                delivered = Delivered(
+                    delivered_message_identifier=message.message_identifier,
+                    signature=EMPTY_SIGNATURE,
+                )
+                self._raiden_service.sign(delivered)
+                self._send(sender, delivered)
+
+        self._raiden_service.on_messages(messages)
+        self.network.hop_latencies.append(time.monotonic() - sent_at)
+
+
+def make_block(number: int, timestamp: float) -> Dict[str, Any]:
+    return {
+        "number": number,
+        "hash": sha256(number.to_bytes(32, "big")).digest(),
+        "parentHash": sha256((number - 1).to_bytes(32, "big", signed=True)).digest(),
+        "timestamp": int(timestamp),
+        "gasLimit": GAS_LIMIT,
+    }
+
+
+class InMemoryBlockchain(Runnable):
+    """ Mines an empty block every `block_time` seconds, the block hashes
+    only depend on the block number.
+    """
+
+    def __init__(self, network_id: int, block_time: float = 1.0) -> None:
+        super().__init__()
+        self.network_id = network_id
+        self.block_time = block_time
+        # The state machine expects the confirmed blocks to be past the genesis
+        self.blocks: List[Dict[str, Any]] = [
+            make_block(number, time.time())
+            for number in range(DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS + 2)
+        ]
+        self.blocks_by_hash = {block["hash"]: block for block in self.blocks}
+        self.registered_secrets: Dict[SecretHash, int] = dict()
+        self._next_channel_identifier = 1
+        self._stop_event = Event()
+
+    def _run(self) -> None:  # pylint: disable=method-hidden
+        self.greenlet.name = "InMemoryBlockchain._run"
+        while not self._stop_event.wait(self.block_time):
+            self.mine()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def mine(self) -> Dict[str, Any]:
+        block = make_block(len(self.blocks), time.time())
+        self.blocks.append(block)
+        self.blocks_by_hash[block["hash"]] = block
+        return block
+
+    def block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def get_block(self, block_identifier: BlockSpecification) -> Dict[str, Any]:
+        if block_identifier == "latest":
+            return self.blocks[-1]
+        if isinstance(block_identifier, bytes):
+            return self.blocks_by_hash[block_identifier]
+        return self.blocks[block_identifier]
+
+    def new_channel_identifier(self) -> int:
+        channel_identifier = self._next_channel_identifier
+        self._next_channel_identifier += 1
+        return channel_identifier
+
+
+class InMemoryFilter(StatelessFilter):
+    """ A filter for the contracts of the in-memory blockchain, which never
+    emit events.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(web3=None, filter_params=dict())
+
+    def get_new_entries(self, target_block_number, pool=None):
+        return list()
+
+    def get_all_entries(self, block_number=None):
+        return list()
+
+
+class InMemoryClient:
+    """ Stands for the `JSONRPCClient` of a node. """
+
+    def __init__(self, blockchain: InMemoryBlockchain, privkey: bytes) -> None:
+        self.blockchain = blockchain
+        self.privkey = privkey
+        self.address = privatekey_to_address(privkey)
+        self.web3 = None
+
+    def get_metrics(self) -> List[Metric]:  # pylint: disable=no-self-use
+        return list()
+
+    def get_block(self, block_identifier: BlockSpecification) -> Dict[str, Any]:
+        return self.blockchain.get_block(block_identifier)
+
+    def blockhash_from_blocknumber(self, block_number: BlockSpecification) -> bytes:
+        return self.get_block(block_number)["hash"]
+
+    def block_number(self) -> int:
+        return self.blockchain.block_number()
+
+    def start_receipt_tracking(self) -> None:
+        pass
+
+    def stop_receipt_tracking(self) -> None:
+        pass
+
+    def check_pending_transactions(self, latest_block: Dict) -> None:
+        pass
+
+
+class InMemoryTokenNetworkRegistry:
+    def __init__(self, address: Address, settlement_timeout_min: int, settlement_timeout_max: int):
+        self.address = address
+        self._settlement_timeout_min = settlement_timeout_min
+        self._settlement_timeout_max = settlement_timeout_max
+
+    def tokenadded_filter(self, from_block: BlockSpecification = None) -> InMemoryFilter:
+        # pylint: disable=unused-argument,no-self-use
+        return InMemoryFilter()
+
+    def settlement_timeout_min(self) -> int:
+        return self._settlement_timeout_min
+
+    def settlement_timeout_max(self) -> int:
+        return self._settlement_timeout_max
+
+
+class InMemoryTokenNetwork:
+    def __init__(self, address: Address) -> None:
+        self.address = address
+
+    def all_events_filter(self, from_block: BlockSpecification = None) -> InMemoryFilter:
+        # pylint: disable=unused-argument,no-self-use
+        return InMemoryFilter()
+
+
+class InMemorySecretRegistry:
+    def __init__(self, blockchain: InMemoryBlockchain, address: Address) -> None:
+        self.blockchain = blockchain
+        self.address = address
+
+    def get_metrics(self) -> List[Metric]:  # pylint: disable=no-self-use
+        return list()
+
+    def secret_registered_filter(self, from_block: BlockSpecification = None) -> InMemoryFilter:
+        # pylint: disable=unused-argument,no-self-use
+        return InMemoryFilter()
+
+    def register_secret(self, secret: Secret, expiration: int = None) -> None:
+        # pylint: disable=unused-argument
+        secrethash = SecretHash(sha256(secret).digest())
+        self.blockchain.registered_secrets.setdefault(secrethash, self.blockchain.block_number())
+
+    def get_secret_registration_block_by_secrethash(
+        self, secrethash: SecretHash, block_identifier: BlockSpecification
+    ) -> Optional[int]:  # pylint: disable=unused-argument
+        return self.blockchain.registered_secrets.get(secrethash)
+
+    def is_secret_registered(
+        self, secrethash: SecretHash, block_identifier: BlockSpecification
+    ) -> bool:
+        return (
+            self.get_secret_registration_block_by_secrethash(secrethash, block_identifier)
+            is not None
+        )
+
+
+class InMemoryChain:
+    """ Stands for the `BlockChainService` of a node. """
+
+    def __init__(self, blockchain: InMemoryBlockchain, privkey: bytes) -> None:
+        self.blockchain = blockchain
+        self.client = InMemoryClient(blockchain, privkey)
+        self.node_address = self.client.address
+        self.network_id = blockchain.network_id
+
+    def block_number(self) -> int:
+        return self.blockchain.block_number()
+
+    def get_block(self, block_identifier: BlockSpecification) -> Dict[str, Any]:
+        return self.blockchain.get_block(block_identifier)
+
+    def token_network(self, address: Address) -> InMemoryTokenNetwork:
+        return InMemoryTokenNetwork(address)
+
+
+def _contract_receive_fields(blockchain: InMemoryBlockchain, description: str) -> Dict[str, Any]:
+    block = blockchain.get_block("latest")
+    return dict(
+        transaction_hash=sha3(description.encode()),
+        block_number=block["number"],
+        block_hash=block["hash"],
+    )
+
+
+def register_token_network(
+    raiden_services: List, blockchain: InMemoryBlockchain, token_address: Address
+) -> Address:
+    """ Register `token_address` with the payment network of the nodes. """
+    token_network_address = Address(sha3(b"token_network" + token_address)[:20])
+    for raiden in raiden_services:
+        state_change = ContractReceiveNewTokenNetwork(
+            payment_network_address=raiden.default_registry.address,
+            token_network=TokenNetworkState(
+                address=token_network_address,
+                token_address=token_address,
+                network_graph=TokenNetworkGraphState(token_network_address),
+            ),
+            **_contract_receive_fields(
+                blockchain, f"register {to_checksum_address(token_address)}"
+            ),
+        )
+        raiden.handle_and_track_state_change(state_change)
+    return token_network_address
+
+
+def open_channel(
+    raiden_services: List,
+    blockchain: InMemoryBlockchain,
+    token_network_address: Address,
+    participant1,
+    participant2,
+    deposit: int,
+) -> int:
+    """ Open a channel between the nodes `participant1` and `participant2`
+    with `deposit` tokens from each of them, and tell the other nodes about
+    the new route.
+    """
+    channel_identifier = blockchain.new_channel_identifier()
+    canonical_identifier = CanonicalIdentifier(
+        chain_identifier=blockchain.network_id,
+        token_network_address=token_network_address,
+        channel_identifier=channel_identifier,
+    )
+    fields = _contract_receive_fields(blockchain, f"open {channel_identifier}")
+    open_transaction = TransactionExecutionStatus(
+        started_block_number=None,
+        finished_block_number=fields["block_number"],
+        result=TransactionExecutionStatus.SUCCESS,
+    )
+
+    for raiden in raiden_services:
+        if raiden not in (participant1, participant2):
+            state_change = ContractReceiveRouteNew(
+                canonical_identifier=canonical_identifier,
+                participant1=participant1.address,
+                participant2=participant2.address,
+                **fields,
+            )
+            raiden.handle_and_track_state_change(state_change)
+            continue
+
+        partner = participant2 if raiden is participant1 else participant1
+        token_network_state = views.get_token_network_by_address(
+            views.state_from_raiden(raiden), token_network_address
+        )
+        channel_state = NettingChannelState(
+            canonical_identifier=canonical_identifier,
+            token_address=token_network_state.token_address,
+            payment_network_address=raiden.default_registry.address,
+            reveal_timeout=raiden.config["reveal_timeout"],
+            settle_timeout=raiden.config["settle_timeout"],
+            mediation_fee=0,
+            our_state=NettingChannelEndState(raiden.address, deposit),
+            partner_state=NettingChannelEndState(partner.address, deposit),
+            open_transaction=open_transaction,
+        )
+        raiden.handle_and_track_state_change(
+            ContractReceiveChannelNew(channel_state=channel_state, **fields)
+        )
+        raiden.start_health_check_for(partner.address)
+
+    return channel_identifier
+
+
+TOPOLOGIES = {
+    "line": lambda nodes: [(i, i + 1) for i in range(nodes - 1)],
+    "star": lambda nodes: [(0, i) for i in range(1, nodes)],
+    "mesh": lambda nodes: [(i, j) for i in range(nodes) for j in range(i + 1, nodes)],
+}
+
+
+def create_node(
+    blockchain: InMemoryBlockchain,
+    network: InMemoryNetwork,
+    registry: InMemoryTokenNetworkRegistry,
+    secret_registry: InMemorySecretRegistry,
+    database_dir: str,
+    number: int,
+) -> RaidenService:
+    privkey, _ = make_privkey_address()
+    config = deepcopy(App.DEFAULT_CONFIG)
+    config.update(
+        {
+            "chain_id": blockchain.network_id,
+            "environment_type": Environment.DEVELOPMENT,
+            "unrecoverable_error_should_crash": True,
+            "database_path": database_from_privatekey(database_dir, number),
+        }
+    )
+    return RaidenService(
+        chain=InMemoryChain(blockchain, privkey),
+        query_start_block=blockchain.block_number(),
+        default_registry=registry,
+        default_secret_registry=secret_registry,
+        default_service_registry=None,
+        default_one_to_n_address=None,
+        transport=InMemoryTransport(network),
+        raiden_event_handler=RaidenEventHandler(),
+        message_handler=MessageHandler(),
+        config=config,
+    )
+
+
+def start_nodes(
+    blockchain: InMemoryBlockchain,
+    network: InMemoryNetwork,
+    number_of_nodes: int,
+    topology: str,
+    deposit: int,
+    database_dir: str,
+) -> Tuple[List[RaidenService], Address]:
+    """ Start `number_of_nodes` nodes and the `blockchain`, register a token
+    network and open its channels following `topology`, one of `TOPOLOGIES`.
+
+    Returns the nodes and the address of the token network.
+    """
+    registry = InMemoryTokenNetworkRegistry(make_address(), 500, 555428)
+    secret_registry = InMemorySecretRegistry(blockchain, make_address())
+
+    raiden_services = [
+        create_node(blockchain, network, registry, secret_registry, database_dir, number)
+        for number in range(number_of_nodes)
+    ]
+    for raiden in raiden_services:
+        raiden.start()
+    blockchain.start()
+
+    token_network_address = register_token_network(raiden_services, blockchain, make_address())
+    for first, second in TOPOLOGIES[topology](number_of_nodes):
+        open_channel(
+            raiden_services,
+            blockchain,
+            token_network_address,
+            raiden_services[first],
+            raiden_services[second],
+            deposit,
+        )
+
+    return raiden_services, token_network_address
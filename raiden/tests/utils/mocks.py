@@ -128,6 +128,7 @@ class MockRaidenService:
         self.default_one_to_n_address = factories.make_address()
 
         self.route_to_feeback_token = {}
+        self.payment_received_subscribers = []
 
         if state_transition is None:
             state_transition = node.state_transition
@@ -151,6 +152,10 @@ class MockRaidenService:
         if self.message_handler:
             self.message_handler.on_message(self, message)
 
+    def on_messages(self, messages):
+        for message in messages:
+            self.on_message(message)
+
     def handle_and_track_state_change(self, state_change):
         pass
 
@@ -52,6 +52,12 @@ class WaitForMessage(MessageHandler):
             if check_nested_attrs(message, waiting.attributes):
                 waiting.async_result.set(message)
 
+    def on_messages(self, raiden: RaidenService, messages: typing.List[Message]) -> None:
+        # The messages are handled one by one, so that the waiting results
+        # are set right after the message they wait for is applied
+        for message in messages:
+            self.on_message(raiden, message)
+
 
 class HoldRaidenEventHandler(EventHandler):
     """ Use this handler to stop the node from processing an event.
@@ -1,10 +1,12 @@
 # pylint: disable=too-few-public-methods
+import time
 from copy import deepcopy
 from dataclasses import dataclass, field
 
 from raiden.constants import EMPTY_BALANCE_HASH, UINT64_MAX, UINT256_MAX
 from raiden.transfer.identifiers import CanonicalIdentifier, QueueIdentifier
 from raiden.transfer.utils import hash_balance_data
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Histogram, MetricVector
 from raiden.utils.typing import (
     AdditionalHash,
     Address,
@@ -202,7 +204,7 @@ class StateManager(Generic[ST]):
     state transitions by applying the StateChanges to the current State.
     """
 
-    __slots__ = ("state_transition", "current_state")
+    __slots__ = ("state_transition", "current_state", "dispatch_histograms")
 
     def __init__(
         self,
@@ -220,6 +222,13 @@ class StateManager(Generic[ST]):
 
         self.state_transition = state_transition
         self.current_state = current_state
+        self.dispatch_histograms = MetricVector(
+            Histogram,
+            "raiden_state_change_dispatch_seconds",
+            "Time to apply a state change to the state machine",
+            label="state_change",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
 
     def dispatch(self, state_change: StateChange) -> Tuple[ST, List[Event]]:
         """ Apply the `state_change` in the current machine and return the
@@ -235,6 +244,7 @@ class StateManager(Generic[ST]):
             these events.
         """
         assert isinstance(state_change, StateChange)
+        start = time.monotonic()
 
         # the state objects must be treated as immutable, so make a copy of the
         # current state and pass the copy to the state machine to be modified.
@@ -244,6 +254,9 @@ class StateManager(Generic[ST]):
         iteration = self.state_transition(next_state, state_change)
 
         assert isinstance(iteration, TransitionResult)
+        self.dispatch_histograms.labels(type(state_change).__name__).observe(
+            time.monotonic() - start
+        )
 
         self.current_state = iteration.new_state
         events = iteration.events
@@ -253,6 +266,38 @@ class StateManager(Generic[ST]):
 
         return next_state, events
 
+    def dispatch_batch(self, state_changes: List[StateChange]) -> Tuple[ST, List[List[Event]]]:
+        """ Apply all `state_changes` in order and return the events produced
+        by each of them.
+
+        The current state is copied only once for the whole batch, the
+        intermediate states are never visible outside of this method, so the
+        result is the same as dispatching the state changes one by one. If any
+        transition fails the current state is left untouched.
+        """
+        assert all(isinstance(state_change, StateChange) for state_change in state_changes)
+
+        next_state = deepcopy(self.current_state)
+        events_per_state_change: List[List[Event]] = list()
+
+        for state_change in state_changes:
+            start = time.monotonic()
+            iteration = self.state_transition(next_state, state_change)
+
+            assert isinstance(iteration, TransitionResult)
+            self.dispatch_histograms.labels(type(state_change).__name__).observe(
+                time.monotonic() - start
+            )
+            assert isinstance(iteration.new_state, State)
+            assert all(isinstance(e, Event) for e in iteration.events)
+
+            next_state = iteration.new_state
+            events_per_state_change.append(iteration.events)
+
+        self.current_state = next_state
+
+        return next_state, events_per_state_change
+
     def __eq__(self, other: Any) -> bool:
         return (
             isinstance(other, StateManager)
@@ -229,6 +229,33 @@ def is_deposit_confirmed(channel_state: NettingChannelState, block_number: Block
     )
 
 
+def get_block_deadline(channel_state: NettingChannelState) -> Optional[BlockNumber]:
+    """ Returns the first block at which a `Block` state change has an effect
+    on the channel, or None if there is no such block.
+
+    This must be kept in sync with `handle_block`.
+    """
+    deadlines: List[BlockNumber] = list()
+
+    if get_status(channel_state) == CHANNEL_STATE_CLOSED:
+        assert channel_state.close_transaction, "closed channel without close_transaction"
+        closed_block_number = channel_state.close_transaction.finished_block_number
+        assert closed_block_number, "closed channel without the close block number"
+
+        settlement_end = closed_block_number + channel_state.settle_timeout
+        deadlines.append(BlockNumber(settlement_end + 1))
+
+    if channel_state.deposit_transaction_queue:
+        deposit_block_number = channel_state.deposit_transaction_queue[0].block_number
+        confirmation_block = deposit_block_number + DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS
+        deadlines.append(BlockNumber(confirmation_block + 1))
+
+    if deadlines:
+        return min(deadlines)
+
+    return None
+
+
 def is_lock_locked(end_state: NettingChannelEndState, secrethash: SecretHash) -> bool:
     """True if the `secrethash` is for a lock with an unknown secret."""
     return secrethash in end_state.secrethashes_to_lockedlocks
@@ -1,3 +1,6 @@
+import heapq
+from bisect import bisect_left, insort
+
 from raiden.transfer import channel, token_network, views
 from raiden.transfer.architecture import (
     ContractReceiveStateChange,
@@ -5,6 +8,7 @@ from raiden.transfer.architecture import (
     Event,
     SendMessageEvent,
     StateChange,
+    TransferTask,
     TransitionResult,
 )
 from raiden.transfer.events import (
@@ -33,7 +37,12 @@ from raiden.transfer.mediated_transfer.state_change import (
     ReceiveTransferRefundCancelRoute,
 )
 from raiden.transfer.mediated_transfer.tasks import InitiatorTask, MediatorTask, TargetTask
-from raiden.transfer.state import ChainState, PaymentNetworkState, TokenNetworkState
+from raiden.transfer.state import (
+    ChainState,
+    ChannelDeadline,
+    PaymentNetworkState,
+    TokenNetworkState,
+)
 from raiden.transfer.state_change import (
     ActionChangeNodeNetworkState,
     ActionChannelClose,
@@ -63,6 +72,7 @@ from raiden.utils.typing import (
     BlockHash,
     BlockNumber,
     ChannelID,
+    Dict,
     List,
     Optional,
     PaymentNetworkAddress,
@@ -130,26 +140,98 @@ def get_token_network_by_address(
     return token_network_state
 
 
-def subdispatch_to_all_channels(
-    chain_state: ChainState,
-    state_change: StateChange,
-    block_number: BlockNumber,
-    block_hash: BlockHash,
+def subdispatch_to_due_channels(
+    chain_state: ChainState, state_change: Block, block_number: BlockNumber, block_hash: BlockHash
 ) -> TransitionResult[ChainState]:
+    """ Dispatch the `Block` only to the channels with a deadline that has
+    been reached, the other channels are not affected by it.
+    """
+    if chain_state.channel_deadlines is None:
+        chain_state.channel_deadlines = get_channel_deadlines(chain_state)
+
+    deadlines = chain_state.channel_deadlines
+    due_channels: Dict[Tuple[TokenNetworkAddress, ChannelID], CanonicalIdentifier] = dict()
+    while deadlines and deadlines[0].block_number <= block_number:
+        canonical_identifier = heapq.heappop(deadlines).canonical_identifier
+        key = (canonical_identifier.token_network_address, canonical_identifier.channel_identifier)
+        due_channels[key] = canonical_identifier
+
     events = list()
+    for canonical_identifier in due_channels.values():
+        channel_state = views.get_channelstate_by_canonical_identifier(
+            chain_state=chain_state, canonical_identifier=canonical_identifier
+        )
+
+        # The channel may have been settled and removed since the deadline was
+        # added
+        if channel_state is None:
+            continue
+
+        old_status = channel.get_status(channel_state)
+        result = channel.state_transition(
+            channel_state=channel_state,
+            state_change=state_change,
+            block_number=block_number,
+            block_hash=block_hash,
+        )
+        events.extend(result.events)
+
+        # A Block starts the settlement of the channels
+        token_network_state = get_token_network_by_address(
+            chain_state, canonical_identifier.token_network_address
+        )
+        if token_network_state is not None:
+            token_network.update_channel_status_index(
+                token_network_state,
+                canonical_identifier.channel_identifier,
+                old_status,
+                channel.get_status(channel_state),
+            )
+
+        schedule_channel_deadline(chain_state, canonical_identifier)
+
+    return TransitionResult(chain_state, events)
+
+
+def get_channel_deadlines(chain_state: ChainState) -> List[ChannelDeadline]:
+    """ Build the heap of block deadlines from all the channels. """
+    deadlines: List[ChannelDeadline] = list()
 
     for payment_network in chain_state.identifiers_to_paymentnetworks.values():
         for token_network_state in payment_network.tokennetworkaddresses_to_tokennetworks.values():
             for channel_state in token_network_state.channelidentifiers_to_channels.values():
-                result = channel.state_transition(
-                    channel_state=channel_state,
-                    state_change=state_change,
-                    block_number=block_number,
-                    block_hash=block_hash,
-                )
-                events.extend(result.events)
+                block_number = channel.get_block_deadline(channel_state)
 
-    return TransitionResult(chain_state, events)
+                if block_number is not None:
+                    deadline = ChannelDeadline(block_number, channel_state.canonical_identifier)
+                    deadlines.append(deadline)
+
+    heapq.heapify(deadlines)
+    return deadlines
+
+
+def schedule_channel_deadline(
+    chain_state: ChainState, canonical_identifier: CanonicalIdentifier
+) -> None:
+    """ Add the next block deadline of the channel to the chain state.
+
+    Must be called after every state change which may introduce a new
+    deadline for the channel (see `channel.get_block_deadline`).
+    """
+    # The index will be built from all channels with the next block
+    if chain_state.channel_deadlines is None:
+        return
+
+    channel_state = views.get_channelstate_by_canonical_identifier(
+        chain_state=chain_state, canonical_identifier=canonical_identifier
+    )
+    if channel_state is None:
+        return
+
+    block_number = channel.get_block_deadline(channel_state)
+    if block_number is not None:
+        deadline = ChannelDeadline(block_number, channel_state.canonical_identifier)
+        heapq.heappush(chain_state.channel_deadlines, deadline)
 
 
 def subdispatch_by_canonical_id(
@@ -174,6 +256,30 @@ def subdispatch_by_canonical_id(
     return TransitionResult(chain_state, events)
 
 
+def set_transfer_task(
+    chain_state: ChainState, secrethash: SecretHash, transfer_task: TransferTask
+) -> None:
+    """ Add or replace the transfer task of `secrethash`. """
+    payment_mapping = chain_state.payment_mapping
+    if (
+        payment_mapping.sorted_secrethashes is not None
+        and secrethash not in payment_mapping.secrethashes_to_task
+    ):
+        insort(payment_mapping.sorted_secrethashes, secrethash)
+
+    payment_mapping.secrethashes_to_task[secrethash] = transfer_task
+
+
+def remove_transfer_task(chain_state: ChainState, secrethash: SecretHash) -> None:
+    payment_mapping = chain_state.payment_mapping
+    del payment_mapping.secrethashes_to_task[secrethash]
+
+    # The index will be built from all tasks when it is needed
+    secrethashes = payment_mapping.sorted_secrethashes
+    if secrethashes is not None:
+        del secrethashes[bisect_left(secrethashes, secrethash)]
+
+
 def subdispatch_to_all_lockedtransfers(
     chain_state: ChainState, state_change: StateChange
 ) -> TransitionResult[ChainState]:
@@ -216,7 +322,7 @@ def subdispatch_to_paymenttask(
                 events = sub_iteration.events
 
                 if sub_iteration.new_state is None:
-                    del chain_state.payment_mapping.secrethashes_to_task[secrethash]
+                    remove_transfer_task(chain_state, secrethash)
 
         elif isinstance(sub_task, MediatorTask):
             token_network_address = sub_task.token_network_address
@@ -236,7 +342,7 @@ def subdispatch_to_paymenttask(
                 events = sub_iteration.events
 
                 if sub_iteration.new_state is None:
-                    del chain_state.payment_mapping.secrethashes_to_task[secrethash]
+                    remove_transfer_task(chain_state, secrethash)
 
         elif isinstance(sub_task, TargetTask):
             token_network_address = sub_task.token_network_address
@@ -262,7 +368,7 @@ def subdispatch_to_paymenttask(
                 events = sub_iteration.events
 
                 if sub_iteration.new_state is None:
-                    del chain_state.payment_mapping.secrethashes_to_task[secrethash]
+                    remove_transfer_task(chain_state, secrethash)
 
     return TransitionResult(chain_state, events)
 
@@ -306,9 +412,9 @@ def subdispatch_initiatortask(
             if iteration.new_state:
                 sub_task = InitiatorTask(token_network_address, iteration.new_state)
                 if sub_task is not None:
-                    chain_state.payment_mapping.secrethashes_to_task[secrethash] = sub_task
+                    set_transfer_task(chain_state, secrethash, sub_task)
             elif secrethash in chain_state.payment_mapping.secrethashes_to_task:
-                del chain_state.payment_mapping.secrethashes_to_task[secrethash]
+                remove_transfer_task(chain_state, secrethash)
 
     return TransitionResult(chain_state, events)
 
@@ -354,9 +460,9 @@ def subdispatch_mediatortask(
             if iteration.new_state:
                 sub_task = MediatorTask(token_network_address, iteration.new_state)
                 if sub_task is not None:
-                    chain_state.payment_mapping.secrethashes_to_task[secrethash] = sub_task
+                    set_transfer_task(chain_state, secrethash, sub_task)
             elif secrethash in chain_state.payment_mapping.secrethashes_to_task:
-                del chain_state.payment_mapping.secrethashes_to_task[secrethash]
+                remove_transfer_task(chain_state, secrethash)
 
     return TransitionResult(chain_state, events)
 
@@ -409,9 +515,9 @@ def subdispatch_targettask(
         if iteration.new_state:
             sub_task = TargetTask(channel_state.canonical_identifier, iteration.new_state)
             if sub_task is not None:
-                chain_state.payment_mapping.secrethashes_to_task[secrethash] = sub_task
+                set_transfer_task(chain_state, secrethash, sub_task)
         elif secrethash in chain_state.payment_mapping.secrethashes_to_task:
-            del chain_state.payment_mapping.secrethashes_to_task[secrethash]
+            remove_transfer_task(chain_state, secrethash)
 
     return TransitionResult(chain_state, events)
 
@@ -486,12 +592,15 @@ def handle_block(chain_state: ChainState, state_change: Block) -> TransitionResu
     chain_state.block_hash = state_change.block_hash
 
     # Subdispatch Block state change
-    channels_result = subdispatch_to_all_channels(
+    channels_result = subdispatch_to_due_channels(
         chain_state=chain_state,
         state_change=state_change,
         block_number=block_number,
         block_hash=chain_state.block_hash,
     )
+    # Unlike the channels, every payment task gets the Block. What a Block
+    # does to a task also depends on its channel's locks, which are changed
+    # by state changes that are not dispatched to the task.
     transfers_result = subdispatch_to_all_lockedtransfers(chain_state, state_change)
     events = channels_result.events + transfers_result.events
     return TransitionResult(chain_state, events)
@@ -537,14 +646,15 @@ def handle_token_network_action(
 def handle_contract_receive_channel_closed(
     chain_state: ChainState, state_change: ContractReceiveChannelClosed
 ) -> TransitionResult[ChainState]:
+    canonical_identifier = CanonicalIdentifier(
+        chain_identifier=chain_state.chain_id,
+        token_network_address=state_change.token_network_address,
+        channel_identifier=state_change.channel_identifier,
+    )
+
     # cleanup queue for channel
     channel_state = views.get_channelstate_by_canonical_identifier(
-        chain_state=chain_state,
-        canonical_identifier=CanonicalIdentifier(
-            chain_identifier=chain_state.chain_id,
-            token_network_address=state_change.token_network_address,
-            channel_identifier=state_change.channel_identifier,
-        ),
+        chain_state=chain_state, canonical_identifier=canonical_identifier
     )
     if channel_state:
         queue_id = QueueIdentifier(
@@ -554,7 +664,35 @@ def handle_contract_receive_channel_closed(
         if queue_id in chain_state.queueids_to_queues:
             chain_state.queueids_to_queues.pop(queue_id)
 
-    return handle_token_network_action(chain_state=chain_state, state_change=state_change)
+    iteration = handle_token_network_action(chain_state=chain_state, state_change=state_change)
+    schedule_channel_deadline(chain_state, canonical_identifier)
+
+    return iteration
+
+
+def handle_contract_receive_channel_new(
+    chain_state: ChainState, state_change: ContractReceiveChannelNew
+) -> TransitionResult[ChainState]:
+    iteration = handle_token_network_action(chain_state=chain_state, state_change=state_change)
+    schedule_channel_deadline(chain_state, state_change.channel_state.canonical_identifier)
+
+    return iteration
+
+
+def handle_contract_receive_channel_new_balance(
+    chain_state: ChainState, state_change: ContractReceiveChannelNewBalance
+) -> TransitionResult[ChainState]:
+    iteration = handle_token_network_action(chain_state=chain_state, state_change=state_change)
+    schedule_channel_deadline(
+        chain_state,
+        CanonicalIdentifier(
+            chain_identifier=chain_state.chain_id,
+            token_network_address=state_change.token_network_address,
+            channel_identifier=state_change.channel_identifier,
+        ),
+    )
+
+    return iteration
 
 
 def handle_delivered(
@@ -791,13 +929,13 @@ def handle_state_change(
         iteration = handle_token_network_action(chain_state, state_change)
     elif type(state_change) == ContractReceiveChannelNew:
         assert isinstance(state_change, ContractReceiveChannelNew), MYPY_ANNOTATION
-        iteration = handle_token_network_action(chain_state, state_change)
+        iteration = handle_contract_receive_channel_new(chain_state, state_change)
     elif type(state_change) == ContractReceiveChannelClosed:
         assert isinstance(state_change, ContractReceiveChannelClosed), MYPY_ANNOTATION
         iteration = handle_contract_receive_channel_closed(chain_state, state_change)
     elif type(state_change) == ContractReceiveChannelNewBalance:
         assert isinstance(state_change, ContractReceiveChannelNewBalance), MYPY_ANNOTATION
-        iteration = handle_token_network_action(chain_state, state_change)
+        iteration = handle_contract_receive_channel_new_balance(chain_state, state_change)
     elif type(state_change) == ContractReceiveChannelSettled:
         assert isinstance(state_change, ContractReceiveChannelSettled), MYPY_ANNOTATION
         iteration = handle_token_network_action(chain_state, state_change)
@@ -1112,6 +1250,7 @@ def _get_channels_close_events(
             channel_states, [channel.CHANNEL_STATE_UNUSABLE]
         )
         for channel_state in filtered_channel_states:
+            old_status = channel.get_status(channel_state)
             events.extend(
                 channel.events_for_close(
                     channel_state=channel_state,
@@ -1119,4 +1258,10 @@ def _get_channels_close_events(
                     block_hash=chain_state.block_hash,
                 )
             )
+            token_network.update_channel_status_index(
+                token_network_state,
+                channel_state.identifier,
+                old_status,
+                channel.get_status(channel_state),
+            )
     return events
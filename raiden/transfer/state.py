@@ -144,6 +144,13 @@ class PaymentMappingState(State):
     # payment task is kept in this mapping, instead of inside an arbitrary
     # token network.
     secrethashes_to_task: Dict[SecretHash, TransferTask] = field(repr=False, default_factory=dict)
+    #: The keys of `secrethashes_to_task` in ascending order, used to page over
+    #: the tasks. `None` means the index has to be rebuilt from the tasks,
+    #: e.g. for snapshots which predate it. The index is derived data, so it
+    #: is not compared.
+    sorted_secrethashes: Optional[List[SecretHash]] = field(
+        repr=False, compare=False, default=None
+    )
 
 
 # This is necessary for the routing only, maybe it should be transient state
@@ -321,6 +328,16 @@ class TransactionOrder(State):
     transaction: TransactionChannelNewBalance
 
 
+@dataclass(order=True)
+class ChannelDeadline(State):
+    """ The block at which a `Block` state change must be dispatched to the
+    channel, e.g. to settle it or to apply a confirmed deposit.
+    """
+
+    block_number: BlockNumber
+    canonical_identifier: CanonicalIdentifier = field(compare=False)
+
+
 @dataclass
 class NettingChannelEndState(State):
     """ The state of one of the nodes in a two party netting channel. """
@@ -451,6 +468,14 @@ class TokenNetworkState(State):
     partneraddresses_to_channelidentifiers: Dict[Address, List[ChannelID]] = field(
         repr=False, default_factory=lambda: defaultdict(list)
     )
+    #: Identifiers of the channels in ascending order by status, see
+    #: `channel.get_status`, kept up to date by the state transitions which
+    #: change the status of a channel. `None` means the index has to be
+    #: rebuilt from the channels, e.g. for snapshots which predate it. The
+    #: index is derived data, so it is not compared.
+    channel_identifiers_by_status: Optional[Dict[str, List[ChannelID]]] = field(
+        repr=False, compare=False, default=None
+    )
 
     def __post_init__(self) -> None:
         if not isinstance(self.address, T_Address):
@@ -519,6 +544,13 @@ class ChainState(State):
     tokennetworkaddresses_to_paymentnetworkaddresses: Dict[
         TokenNetworkAddress, PaymentNetworkAddress
     ] = field(repr=False, default_factory=dict)
+    #: Heap of the channels' block deadlines, a `Block` is only dispatched to
+    #: the channels with a deadline that has been reached. `None` means the
+    #: index has to be rebuilt from the channels, e.g. for snapshots which
+    #: predate it. The index is derived data, so it is not compared.
+    channel_deadlines: Optional[List[ChannelDeadline]] = field(
+        repr=False, compare=False, default=None
+    )
 
     def __post_init__(self) -> None:
         if not isinstance(self.block_number, T_BlockNumber):
@@ -1,3 +1,5 @@
+from bisect import bisect_left, insort
+
 from raiden.transfer import channel
 from raiden.transfer.architecture import Event, StateChange, TransitionResult
 from raiden.transfer.state import TokenNetworkState
@@ -13,7 +15,15 @@ from raiden.transfer.state_change import (
     ContractReceiveRouteNew,
     ContractReceiveUpdateTransfer,
 )
-from raiden.utils.typing import MYPY_ANNOTATION, BlockHash, BlockNumber, List, Union
+from raiden.utils.typing import (
+    MYPY_ANNOTATION,
+    BlockHash,
+    BlockNumber,
+    ChannelID,
+    List,
+    Optional,
+    Union,
+)
 
 # TODO: The proper solution would be to introduce a marker for state changes
 # that contains channel IDs and other specific channel attributes
@@ -27,6 +37,40 @@ StateChangeWithChannelID = Union[
 ]
 
 
+def update_channel_status_index(
+    token_network_state: TokenNetworkState,
+    channel_identifier: ChannelID,
+    old_status: Optional[str],
+    new_status: Optional[str],
+) -> None:
+    """ Move a channel from `old_status` to `new_status` in the channel status
+    index of the token network, the status of a channel which is not in the
+    token network is `None`.
+
+    Must be called after every state change which may add or remove a channel,
+    or change its status (see `channel.get_status`).
+    """
+    index = token_network_state.channel_identifiers_by_status
+
+    # The index will be built from all channels when it is needed
+    if index is None or old_status == new_status:
+        return
+
+    if old_status is not None:
+        channel_identifiers = index[old_status]
+        position = bisect_left(channel_identifiers, channel_identifier)
+        assert (
+            position < len(channel_identifiers)
+            and channel_identifiers[position] == channel_identifier
+        ), f"channel {channel_identifier} is not indexed with the status {old_status}"
+        del channel_identifiers[position]
+        if not channel_identifiers:
+            del index[old_status]
+
+    if new_status is not None:
+        insort(index.setdefault(new_status, list()), channel_identifier)
+
+
 def subdispatch_to_channel_by_id(
     token_network_state: TokenNetworkState,
     state_change: StateChangeWithChannelID,
@@ -40,6 +84,7 @@ def subdispatch_to_channel_by_id(
     channel_state = ids_to_channels.get(state_change.channel_identifier)
 
     if channel_state:
+        old_status = channel.get_status(channel_state)
         result = channel.state_transition(
             channel_state=channel_state,
             state_change=state_change,
@@ -55,8 +100,13 @@ def subdispatch_to_channel_by_id(
         if result.new_state is None:
             del ids_to_channels[channel_identifier]
             partner_to_channelids.remove(channel_identifier)
+            update_channel_status_index(token_network_state, channel_identifier, old_status, None)
         else:
             ids_to_channels[channel_identifier] = result.new_state
+            new_status = channel.get_status(result.new_state)
+            update_channel_status_index(
+                token_network_state, channel_identifier, old_status, new_status
+            )
 
         events.extend(result.events)
 
@@ -100,6 +150,8 @@ def handle_channelnew(
         token_network_state.channelidentifiers_to_channels[channel_identifier] = channel_state
         addresses_to_ids = token_network_state.partneraddresses_to_channelidentifiers
         addresses_to_ids[partner_address].append(channel_identifier)
+        new_status = channel.get_status(channel_state)
+        update_channel_status_index(token_network_state, channel_identifier, None, new_status)
 
     return TransitionResult(token_network_state, events)
 
@@ -184,6 +236,7 @@ def handle_batch_unlock(
         state_change.canonical_identifier.channel_identifier
     )
     if channel_state is not None:
+        old_status = channel.get_status(channel_state)
         sub_iteration = channel.state_transition(
             channel_state=channel_state,
             state_change=state_change,
@@ -199,6 +252,14 @@ def handle_batch_unlock(
             ].remove(channel_state.identifier)
 
             del token_network_state.channelidentifiers_to_channels[channel_state.identifier]
+            update_channel_status_index(
+                token_network_state, channel_state.identifier, old_status, None
+            )
+        else:
+            new_status = channel.get_status(sub_iteration.new_state)
+            update_channel_status_index(
+                token_network_state, channel_state.identifier, old_status, new_status
+            )
 
     return TransitionResult(token_network_state, events)
 
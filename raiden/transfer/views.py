@@ -1,3 +1,6 @@
+import heapq
+from bisect import bisect_right
+
 from raiden.transfer import channel
 from raiden.transfer.architecture import ContractSendEvent, TransferTask
 from raiden.transfer.identifiers import CanonicalIdentifier
@@ -23,6 +26,7 @@ from raiden.utils.typing import (
     Address,
     BlockNumber,
     Callable,
+    ChannelID,
     Dict,
     Iterator,
     List,
@@ -33,6 +37,7 @@ from raiden.utils.typing import (
     Set,
     TokenAddress,
     TokenNetworkAddress,
+    Tuple,
     Union,
 )
 
@@ -207,6 +212,32 @@ def total_token_network_channels(
     return result
 
 
+def get_channel_identifiers_by_status(
+    token_network_state: TokenNetworkState
+) -> Dict[str, List[ChannelID]]:
+    """ Return the identifiers of the channels of the token network by status,
+    in ascending order.
+    """
+    if token_network_state.channel_identifiers_by_status is None:
+        index: Dict[str, List[ChannelID]] = dict()
+        for channel_identifier in sorted(token_network_state.channelidentifiers_to_channels):
+            channel_state = token_network_state.channelidentifiers_to_channels[channel_identifier]
+            index.setdefault(channel.get_status(channel_state), list()).append(channel_identifier)
+        token_network_state.channel_identifiers_by_status = index
+
+    return token_network_state.channel_identifiers_by_status
+
+
+def get_channel_status_counts(token_network_state: TokenNetworkState) -> Dict[str, int]:
+    """ Return the number of channels by status in the token network. """
+    return {
+        status: len(channel_identifiers)
+        for status, channel_identifiers in get_channel_identifiers_by_status(
+            token_network_state
+        ).items()
+    }
+
+
 def get_token_network_by_token_address(
     chain_state: ChainState,
     payment_network_address: PaymentNetworkAddress,
@@ -449,6 +480,15 @@ def get_all_transfer_tasks(chain_state: ChainState) -> Dict[SecretHash, Transfer
     return chain_state.payment_mapping.secrethashes_to_task
 
 
+def get_sorted_secrethashes(chain_state: ChainState) -> List[SecretHash]:
+    """ Return the secrethashes of the transfer tasks in ascending order. """
+    payment_mapping = chain_state.payment_mapping
+    if payment_mapping.sorted_secrethashes is None:
+        payment_mapping.sorted_secrethashes = sorted(payment_mapping.secrethashes_to_task)
+
+    return payment_mapping.sorted_secrethashes
+
+
 def list_channelstate_for_tokennetwork(
     chain_state: ChainState,
     payment_network_address: PaymentNetworkAddress,
@@ -477,6 +517,65 @@ def list_all_channelstate(chain_state: ChainState) -> List[NettingChannelState]:
     return result
 
 
+def iter_channelstate(
+    chain_state: ChainState,
+    payment_network_address: PaymentNetworkAddress,
+    token_address: TokenAddress = None,
+    state: str = None,
+    after: Tuple[TokenNetworkAddress, ChannelID] = None,
+) -> Iterator[NettingChannelState]:
+    """ Iterate over the channels of the payment network, optionally only the
+    ones of `token_address` and the ones in `state`, ordered by token network
+    address and channel identifier.
+
+    `after` is the position of the last channel seen, iteration starts right
+    after it. This is used to paginate over the channels, the channels are
+    found with a binary search in the status index of the token networks, so
+    a page costs O(page + log N).
+    """
+    payment_network = chain_state.identifiers_to_paymentnetworks.get(payment_network_address)
+    if payment_network is None:
+        return
+
+    if token_address is not None:
+        token_network_address = payment_network.tokenaddresses_to_tokennetworkaddresses.get(
+            token_address
+        )
+        token_network_addresses = [token_network_address] if token_network_address else []
+    else:
+        token_network_addresses = sorted(payment_network.tokennetworkaddresses_to_tokennetworks)
+
+    for token_network_address in token_network_addresses:
+        if after is not None and token_network_address < after[0]:
+            continue
+
+        token_network = payment_network.tokennetworkaddresses_to_tokennetworks[
+            token_network_address
+        ]
+        index = get_channel_identifiers_by_status(token_network)
+        if state is not None:
+            statuses = [state] if state in index else []
+        else:
+            statuses = list(index)
+
+        after_channel_id = None
+        if after is not None and token_network_address == after[0]:
+            after_channel_id = after[1]
+
+        ranges = list()
+        for status in statuses:
+            channel_identifiers = index[status]
+            start = 0
+            if after_channel_id is not None:
+                start = bisect_right(channel_identifiers, after_channel_id)
+            ranges.append(
+                map(channel_identifiers.__getitem__, range(start, len(channel_identifiers)))
+            )
+
+        for channel_id in heapq.merge(*ranges):
+            yield token_network.channelidentifiers_to_channels[channel_id]
+
+
 def filter_channels_by_partneraddress(
     chain_state: ChainState,
     payment_network_address: PaymentNetworkAddress,
@@ -22,6 +22,7 @@ from raiden.exceptions import ReplacementTransactionUnderpriced, TransactionAlre
 from raiden.log_config import configure_logging
 from raiden.network.utils import get_free_port
 from raiden.settings import (
+    DEFAULT_HUB_MONITOR_BLOCKING_THRESHOLD,
     DEFAULT_PATHFINDING_IOU_TIMEOUT,
     DEFAULT_PATHFINDING_MAX_FEE,
     DEFAULT_PATHFINDING_MAX_PATHS,
@@ -373,6 +374,27 @@ def options(func):
                 is_flag=True,
                 default=False,
             ),
+            option(
+                "--monitor-hub",
+                help=(
+                    "Log the greenlets which block the gevent hub for longer than "
+                    f"{DEFAULT_HUB_MONITOR_BLOCKING_THRESHOLD}s, and expose the hub "
+                    "latency and the CPU time used by each greenlet in the metrics "
+                    "of the API. This slows down every greenlet switch."
+                ),
+                is_flag=True,
+                default=False,
+            ),
+            option(
+                "--enable-profiling",
+                help=(
+                    "Enable the /_debug/profile and /_debug/memory endpoints of the "
+                    "API, which profile the CPU and the memory allocations of the node "
+                    "on demand. Profiling slows down the node while it runs."
+                ),
+                is_flag=True,
+                default=False,
+            ),
         ),
         option_group(
             "Hash Resolver options",
@@ -388,6 +410,20 @@ def options(func):
                 show_default=True,
             ),
         ),
+        option_group(
+            "Webhook options",
+            option(
+                "--webhook-url",
+                help=(
+                    "URL to which the payment events of the node are posted, in "
+                    "order and in batches. A batch is retried until the webhook "
+                    "answers with a 2xx status code, the delivery resumes where it "
+                    "stopped when the node restarts."
+                ),
+                default=None,
+                type=str,
+            ),
+        ),
     ]
 
     for option_ in reversed(options_):
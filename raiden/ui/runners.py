@@ -14,6 +14,7 @@ from gevent.event import AsyncResult
 from requests.exceptions import ConnectionError as RequestsConnectionError
 
 from raiden import constants, settings
+from raiden.api.delivery import WebhookDelivery
 from raiden.api.rest import APIServer, RestAPI
 from raiden.app import App
 from raiden.exceptions import (
@@ -25,6 +26,7 @@ from raiden.exceptions import (
 from raiden.log_config import configure_logging
 from raiden.tasks import check_gas_reserve, check_network_id, check_rdn_deposits, check_version
 from raiden.utils import get_system_spec, merge_dict, split_endpoint, typing
+from raiden.utils.debugging import HubMonitor
 from raiden.utils.echo_node import EchoNode
 from raiden.utils.runnable import Runnable
 
@@ -104,6 +106,18 @@ class NodeRunner:
 
         tasks = [app_.raiden]  # RaidenService takes care of Transport and AlarmTask
 
+        if self._options["monitor_hub"]:
+            hub_monitor = HubMonitor()
+            hub_monitor.start()
+            app_.raiden.metrics.register(*hub_monitor.get_metrics())
+            tasks.append(hub_monitor)
+
+        if self._options["webhook_url"]:
+            webhook_delivery = WebhookDelivery(app_.raiden, self._options["webhook_url"])
+            webhook_delivery.start()
+            app_.raiden.metrics.register(*webhook_delivery.get_metrics())
+            tasks.append(webhook_delivery)
+
         domain_list = []
         if self._options["rpccorsdomain"]:
             if "," in self._options["rpccorsdomain"]:
@@ -119,7 +133,11 @@ class NodeRunner:
             (api_host, api_port) = split_endpoint(self._options["api_address"])
             api_server = APIServer(
                 rest_api,
-                config={"host": api_host, "port": api_port},
+                config={
+                    "host": api_host,
+                    "port": api_port,
+                    "enable_profiling": self._options["enable_profiling"],
+                },
                 cors_domain_list=domain_list,
                 web_ui=self._options["web_ui"],
                 eth_rpc_endpoint=self._options["eth_rpc_endpoint"],
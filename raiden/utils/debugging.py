@@ -1,3 +1,37 @@
+import os
+import sys
+import time
+import traceback
+import tracemalloc
+from collections import Counter as SampleCounter, deque
+
+import gevent
+import gevent.monkey
+import greenlet
+import structlog
+from gevent.event import Event
+from gevent.hub import Hub
+
+from raiden.settings import (
+    DEFAULT_HUB_MONITOR_BLOCKING_THRESHOLD,
+    DEFAULT_HUB_MONITOR_LATENCY_INTERVAL,
+)
+from raiden.utils.metrics import DEFAULT_LATENCY_BUCKETS, Counter, Histogram, MetricVector
+from raiden.utils.runnable import Runnable
+from raiden.utils.typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# The monitor thread must not be a greenlet, otherwise it could not run while
+# the hub is blocked
+start_new_thread = gevent.monkey.get_original("_thread", "start_new_thread")
+allocate_lock = gevent.monkey.get_original("_thread", "allocate_lock")
+thread_sleep = gevent.monkey.get_original("time", "sleep")
+
+PROFILER_DEFAULT_INTERVAL = 0.005
+TRACEMALLOC_FRAMES = 10
+
+
 def enable_gevent_monitoring_signal():
     """ Install a signal handler for SIGUSR1 that executes gevent.util.print_run_info().
     This can help evaluating the gevent greenlet tree.
@@ -12,3 +46,284 @@ def enable_gevent_monitoring_signal():
     import signal
 
     signal.signal(signal.SIGUSR1, gevent.util.print_run_info)
+
+
+def greenlet_label(greenlet_: greenlet.greenlet) -> str:
+    """ A name for `greenlet_` which is shared by the greenlets doing the same
+    work, used to attribute the time spent in them.
+
+    The names given to long running greenlets include the node and partner
+    addresses, only the part before the first space is used.
+    """
+    if isinstance(greenlet_, Hub):
+        return "Hub"
+
+    name = getattr(greenlet_, "name", None)
+    if name is None:
+        return "main"
+
+    if name.startswith("Greenlet-"):
+        run = getattr(greenlet_, "_run", None)
+        return getattr(run, "__qualname__", "Greenlet")
+
+    return name.split(" ", 1)[0]
+
+
+class HubMonitor(Runnable):
+    """ Opt-in monitor of the greenlets sharing the gevent hub.
+
+    - The CPU time used between two switches is attributed to the greenlet that
+      was running, using a greenlet trace function.
+    - A native thread checks every `blocking_threshold` seconds if a greenlet
+      other than the hub is running since the last check. The stack of such a
+      greenlet is captured while it blocks the hub, and logged together with
+      the blocking time once it switches.
+    - The latency of the hub's event loop is sampled by measuring how late a
+      sleep of `latency_interval` seconds wakes up.
+
+    The trace function runs on every switch, which makes switches slower, this
+    is why the monitor must be enabled explicitly. The greenlets are grouped by
+    `label`, `greenlet_label` by default.
+    """
+
+    def __init__(
+        self,
+        blocking_threshold: float = DEFAULT_HUB_MONITOR_BLOCKING_THRESHOLD,
+        latency_interval: float = DEFAULT_HUB_MONITOR_LATENCY_INTERVAL,
+        label: Callable[[greenlet.greenlet], str] = greenlet_label,
+    ) -> None:
+        super().__init__()
+        self.blocking_threshold = blocking_threshold
+        self.latency_interval = latency_interval
+        self.label = label
+
+        self.loop_latency_histogram = Histogram(
+            "raiden_hub_loop_latency_seconds",
+            "Delay of the hub's event loop to wake up a sleeping greenlet",
+            buckets=DEFAULT_LATENCY_BUCKETS,
+        )
+        self.blocked_counters = MetricVector(
+            Counter,
+            "raiden_hub_blocked_total",
+            "Number of times a greenlet blocked the hub for longer than the threshold",
+            label="greenlet",
+        )
+        self.cpu_time_counters = MetricVector(
+            Counter,
+            "raiden_greenlet_cpu_seconds_total",
+            "CPU time used by the greenlets",
+            label="greenlet",
+        )
+
+        self._stop_event = Event()
+        self._previous_trace: Optional[Callable] = None
+        self._thread_ident: Optional[int] = None
+        self._monitoring = False
+
+        # Written by the trace function on every switch
+        self._active: Optional[greenlet.greenlet] = None
+        self._active_label = ""
+        self._switch_count = 0
+        self._switched_at = 0.0
+        self._switched_at_cpu = 0.0
+
+        # The stack of the greenlet blocking the hub, set by the monitor
+        # thread, and the blocks which were not logged yet
+        self._blocking_stack: Optional[List[str]] = None
+        self._blocks: Deque[Tuple[str, float, List[str]]] = deque()
+
+    def start(self) -> None:
+        log.debug("Hub monitor started", blocking_threshold=self.blocking_threshold)
+        self._stop_event.clear()
+
+        self._active = greenlet.getcurrent()
+        self._active_label = self.label(self._active)
+        self._switched_at = time.perf_counter()
+        self._switched_at_cpu = time.thread_time()
+        self._previous_trace = greenlet.settrace(self._trace)
+
+        # The trace function is per thread, the stack to capture is the one of
+        # the thread running the hub
+        self._thread_ident = gevent.get_hub().thread_ident
+        self._monitoring = True
+        start_new_thread(self._monitor_blocking, ())
+
+        super().start()
+
+    def stop(self) -> None:
+        self._monitoring = False
+        greenlet.settrace(self._previous_trace)
+        self._stop_event.set()
+        self.greenlet.join()
+
+    def get_metrics(self) -> List[Union[Counter, Histogram, MetricVector]]:
+        return [self.loop_latency_histogram, self.blocked_counters, self.cpu_time_counters]
+
+    def _trace(self, event: str, args: Any) -> None:
+        if event in ("switch", "throw"):
+            _origin, target = args
+            now = time.perf_counter()
+            now_cpu = time.thread_time()
+
+            # The label is computed when the greenlet is switched to, gevent
+            # drops the function of a greenlet before its last switch
+            label = self._active_label
+            self.cpu_time_counters.labels(label).inc(now_cpu - self._switched_at_cpu)
+
+            if self._blocking_stack is not None:
+                self._blocks.append((label, now - self._switched_at, self._blocking_stack))
+                self._blocking_stack = None
+
+            self._active = target
+            self._active_label = self.label(target)
+            self._switch_count += 1
+            self._switched_at = now
+            self._switched_at_cpu = now_cpu
+
+        if self._previous_trace is not None:
+            self._previous_trace(event, args)
+
+    def _monitor_blocking(self) -> None:
+        """ Runs in a native thread, captures the stack of greenlets which
+        don't switch for longer than the threshold.
+        """
+        last_switch_count = -1
+        while self._monitoring:
+            thread_sleep(self.blocking_threshold)
+
+            switch_count = self._switch_count
+            active = self._active
+            blocking = (
+                switch_count == last_switch_count
+                and self._blocking_stack is None
+                and not isinstance(active, Hub)
+            )
+            last_switch_count = switch_count
+
+            if blocking:
+                frame = sys._current_frames().get(self._thread_ident)  # noqa
+                stack = traceback.format_stack(frame) if frame is not None else []
+
+                # The greenlet may have switched while the stack was captured
+                if self._switch_count == switch_count:
+                    self._blocking_stack = stack
+
+    def _report_blocks(self) -> None:
+        while self._blocks:
+            label, blocked_for, stack = self._blocks.popleft()
+            self.blocked_counters.labels(label).inc()
+            log.warning(
+                "Greenlet blocked the hub",
+                blocking_greenlet=label,
+                blocked_for=blocked_for,
+                stack="".join(stack),
+            )
+
+    def _run(self) -> None:  # pylint: disable=method-hidden
+        self.greenlet.name = "HubMonitor"
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            self._stop_event.wait(self.latency_interval)
+            elapsed = time.perf_counter() - start
+
+            if not self._stop_event.is_set():
+                self.loop_latency_histogram.observe(max(0.0, elapsed - self.latency_interval))
+            self._report_blocks()
+
+
+class SamplingProfiler:
+    """ Statistical profiler of the thread running the gevent hub.
+
+    A native thread samples the stack of the hub's thread every `interval`
+    seconds. Only the greenlet which is running has its stack in the thread,
+    so the samples of all greenlets are the time each of them used the CPU,
+    and the samples of the idle hub are the time spent waiting for IO. The
+    profiled code is not instrumented, the overhead is the sampling thread
+    competing for the GIL.
+
+    The result is in the collapsed stack format, which can be rendered by
+    flamegraph.pl or opened with speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILER_DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: SampleCounter = SampleCounter()
+        self._frame_names: Dict[Any, str] = dict()
+        self._thread_ident = gevent.get_hub().thread_ident
+        self._sampling = False
+        self._sampler_done = allocate_lock()
+
+    def start(self) -> None:
+        self._sampling = True
+        self._sampler_done.acquire()
+        start_new_thread(self._sample, ())
+
+    def stop(self) -> None:
+        """ Stop sampling and wait for the sampling thread to exit. """
+        self._sampling = False
+        while not self._sampler_done.acquire(False):
+            gevent.sleep(self.interval)
+        self._sampler_done.release()
+
+    def _frame_name(self, code: Any) -> str:
+        name = self._frame_names.get(code)
+        if name is None:
+            path = code.co_filename
+            for prefix in sorted(sys.path, key=len, reverse=True):
+                if prefix and path.startswith(prefix + os.sep):
+                    path = path[len(prefix) + 1 :]
+                    break
+            name = f"{code.co_name} ({path}:{code.co_firstlineno})"
+            self._frame_names[code] = name
+        return name
+
+    def _sample(self) -> None:
+        try:
+            while self._sampling:
+                thread_sleep(self.interval)
+
+                frame = sys._current_frames().get(self._thread_ident)  # noqa
+                stack: List[str] = list()
+                while frame is not None:
+                    stack.append(self._frame_name(frame.f_code))
+                    frame = frame.f_back
+
+                if stack:
+                    stack.reverse()
+                    self.samples[tuple(stack)] += 1
+        finally:
+            self._sampler_done.release()
+
+    def collapsed_stacks(self) -> str:
+        """ One line per stack, root first, with the frames separated by `;`
+        followed by the number of samples.
+        """
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()]
+        return "".join(f"{line}\n" for line in lines)
+
+
+def trace_memory_growth(duration: float, limit: int) -> List[str]:
+    """ Returns the `limit` source lines whose allocations grew the most in
+    the next `duration` seconds.
+
+    Tracing the allocations slows down the whole node, tracemalloc is only
+    running during the call, unless it was already enabled.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    try:
+        before = tracemalloc.take_snapshot()
+        gevent.sleep(duration)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    ignored = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ]
+    differences = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "lineno")
+    return [str(difference) for difference in differences[:limit]]
@@ -1,18 +1,13 @@
-import copy
 import random
 from collections import deque
 
 import gevent
 import structlog
 from gevent.event import Event
-from gevent.lock import BoundedSemaphore
-from gevent.queue import Queue
-from gevent.timeout import Timeout
+from gevent.queue import Empty, Queue
 
 from raiden.api.python import RaidenAPI
-from raiden.tasks import REMOVE_CALLBACK
-from raiden.transfer import channel
-from raiden.transfer.events import EventPaymentReceivedSuccess
+from raiden.transfer import channel, views
 from raiden.transfer.state import CHANNEL_STATE_OPENED
 from raiden.utils import pex
 
@@ -55,98 +50,44 @@ class EchoNode:
                 joinable_funds_target=0.5,
             )
 
-        self.last_poll_offset = 0
-        self.received_transfers = Queue()
-        self.stop_signal = None  # used to signal REMOVE_CALLBACK and stop echo_workers
+        self.token_network_address = views.get_token_network_address_by_token_address(
+            views.state_from_raiden(self.api.raiden),
+            self.api.raiden.default_registry.address,
+            self.token_address,
+        )
+        self.received_transfers = self.api.raiden.subscribe_payments_received()
+        self.stop_signal = None  # used to stop echo_workers
         self.greenlets = set()
-        self.lock = BoundedSemaphore()
         self.seen_transfers = deque(list(), TRANSFER_MEMORY)
         self.num_handled_transfers = 0
         self.lottery_pool = Queue()
-        # register ourselves with the raiden alarm task
-        self.api.raiden.alarm.register_callback(self.echo_node_alarm_callback)
         self.echo_worker_greenlet = gevent.spawn(self.echo_worker)
+        self.ready.set()
         log.info("Echo node started")
 
-    def echo_node_alarm_callback(self, block_number):
-        """ This can be registered with the raiden AlarmTask.
-        If `EchoNode.stop()` is called, it will give the return signal to be removed from
-        the AlarmTask callbacks.
-        """
-        if not self.ready.is_set():
-            self.ready.set()
-        log.debug("echo_node callback", block_number=block_number)
-        if self.stop_signal is not None:
-            return REMOVE_CALLBACK
-        else:
-            self.greenlets.add(gevent.spawn(self.poll_all_received_events))
-            return True
-
-    def poll_all_received_events(self):
-        """ This will be triggered once for each `echo_node_alarm_callback`.
-        It polls all channels for `EventPaymentReceivedSuccess` events,
-        adds all new events to the `self.received_transfers` queue and
-        respawns `self.echo_node_worker`, if it died. """
-
-        locked = False
-        try:
-            with Timeout(10):
-                locked = self.lock.acquire(blocking=False)
-                if not locked:
-                    return
-                else:
-                    received_transfers = self.api.get_raiden_events_payment_history(
-                        token_address=self.token_address, offset=self.last_poll_offset
-                    )
-
-                    # received transfer is a tuple of (block_number, event)
-                    received_transfers = [
-                        event
-                        for event in received_transfers
-                        if type(event) == EventPaymentReceivedSuccess
-                    ]
-
-                    for event in received_transfers:
-                        transfer = copy.deepcopy(event)
-                        self.received_transfers.put(transfer)
-
-                    # set last_poll_block after events are enqueued (timeout safe)
-                    if received_transfers:
-                        self.last_poll_offset += len(received_transfers)
-
-                    if not self.echo_worker_greenlet.started:
-                        log.debug(
-                            "restarting echo_worker_greenlet",
-                            dead=self.echo_worker_greenlet.dead,
-                            successful=self.echo_worker_greenlet.successful(),
-                            exception=self.echo_worker_greenlet.exception,
-                        )
-                        self.echo_worker_greenlet = gevent.spawn(self.echo_worker)
-        except Timeout:
-            log.info("timeout while polling for events")
-        finally:
-            if locked:
-                self.lock.release()
-
     def echo_worker(self):
-        """ The `echo_worker` works through the `self.received_transfers` queue and spawns
-        `self.on_transfer` greenlets for all not-yet-seen transfers. """
+        """ The `echo_worker` works through the payments received by the node
+        and spawns `self.on_transfer` greenlets for all not-yet-seen transfers. """
         log.debug("echo worker", qsize=self.received_transfers.qsize())
         while self.stop_signal is None:
-            if self.received_transfers.qsize() > 0:
-                transfer = self.received_transfers.get()
-                if transfer in self.seen_transfers:
-                    log.debug(
-                        "duplicate transfer ignored",
-                        initiator=pex(transfer.initiator),
-                        amount=transfer.amount,
-                        identifier=transfer.identifier,
-                    )
-                else:
-                    self.seen_transfers.append(transfer)
-                    self.greenlets.add(gevent.spawn(self.on_transfer, transfer))
+            try:
+                transfer = self.received_transfers.get(timeout=0.5)
+            except Empty:
+                continue
+
+            if transfer.token_network_address != self.token_network_address:
+                continue
+
+            if transfer in self.seen_transfers:
+                log.debug(
+                    "duplicate transfer ignored",
+                    initiator=pex(transfer.initiator),
+                    amount=transfer.amount,
+                    identifier=transfer.identifier,
+                )
             else:
-                gevent.sleep(0.5)
+                self.seen_transfers.append(transfer)
+                self.greenlets.add(gevent.spawn(self.on_transfer, transfer))
 
     def on_transfer(self, transfer):
         """ This handles the echo logic, as described in
@@ -243,5 +184,6 @@ class EchoNode:
 
     def stop(self):
         self.stop_signal = True
+        self.api.raiden.unsubscribe_payments_received(self.received_transfers)
         self.greenlets.add(self.echo_worker_greenlet)
         gevent.joinall(self.greenlets, raise_error=True)
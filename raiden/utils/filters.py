@@ -1,6 +1,8 @@
 import structlog
+from cachetools import LRUCache
 from eth_utils import decode_hex, event_abi_to_log_topic, to_checksum_address
 from gevent.lock import Semaphore
+from gevent.pool import Pool
 from web3 import Web3
 from web3.utils.abi import filter_by_type
 from web3.utils.events import get_event_data
@@ -16,6 +18,7 @@ from raiden.utils.typing import (
     Dict,
     List,
     TokenNetworkAddress,
+    Tuple,
 )
 from raiden_contracts.constants import CONTRACT_TOKEN_NETWORK, ChannelEvent
 from raiden_contracts.contract_manager import ContractManager
@@ -28,6 +31,15 @@ log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 # https://github.com/raiden-network/raiden/issues/3558
 FILTER_MAX_BLOCK_RANGE = 100000
 
+# The maximum number of filters queried at the same time, e.g. while catching
+# up with the blockchain after a restart
+FILTER_MAX_CONCURRENT_QUERIES = 8
+
+# The ABIs are reused for every event of a contract, this caches the mapping
+# from the event topic to the event ABI, which is costly to compute. The ABI
+# is kept with the mapping, so that its id is not reused.
+_topic_to_event_abi_cache: Dict[int, Tuple[List[Dict], Dict[bytes, Dict]]] = LRUCache(maxsize=32)
+
 
 def get_filter_args_for_specific_event_from_channel(
     token_network_address: TokenNetworkAddress,
@@ -98,10 +110,19 @@ def decode_event(abi: List[Dict], log: Dict):
     elif isinstance(log["topics"][0], int):
         log["topics"][0] = decode_hex(hex(log["topics"][0]))
     event_id = log["topics"][0]
+    event_abi = get_topic_to_event_abi(abi)[event_id]
+    return get_event_data(event_abi, log)
+
+
+def get_topic_to_event_abi(abi: List[Dict]) -> Dict[bytes, Dict]:
+    cached = _topic_to_event_abi_cache.get(id(abi))
+    if cached is not None and cached[0] is abi:
+        return cached[1]
+
     events = filter_by_type("event", abi)
     topic_to_event_abi = {event_abi_to_log_topic(event_abi): event_abi for event_abi in events}
-    event_abi = topic_to_event_abi[event_id]
-    return get_event_data(event_abi, log)
+    _topic_to_event_abi_cache[id(abi)] = (abi, topic_to_event_abi)
+    return topic_to_event_abi
 
 
 class StatelessFilter(LogFilter):
@@ -116,17 +137,26 @@ class StatelessFilter(LogFilter):
         self._last_block: BlockNumber = BlockNumber(-1)
         self._lock = Semaphore()
 
-    def _do_get_new_entries(self, from_block: BlockSpecification, to_block: BlockSpecification):
+    def _do_get_new_entries(self, window: Tuple[BlockNumber, BlockNumber]):
+        from_block, to_block = window
         filter_params = self.filter_params.copy()
         filter_params["fromBlock"] = from_block
         filter_params["toBlock"] = to_block
 
         log.debug("Querying StatelessFilter", from_block=from_block, to_block=to_block)
-        result = self.web3.eth.getLogs(filter_params)
-        self._last_block = block_specification_to_number(block=to_block, web3=self.web3)
-        return result
-
-    def get_new_entries(self, target_block_number: BlockNumber) -> List[Dict[str, Any]]:
+        return self.web3.eth.getLogs(filter_params)
+
+    def get_new_entries(
+        self, target_block_number: BlockNumber, pool: Pool = None
+    ) -> List[Dict[str, Any]]:
+        """ Returns the entries from the last queried block up to
+        `target_block_number`.
+
+        The range is queried in windows of FILTER_MAX_BLOCK_RANGE blocks to
+        avoid timeout problems. With a `pool` the windows are queried
+        concurrently by its greenlets, the entries are still returned in
+        order.
+        """
         with self._lock:
             result: List[Dict[str, Any]] = []
             filter_from_number = block_specification_to_number(
@@ -134,14 +164,33 @@ class StatelessFilter(LogFilter):
             )
             from_block_number = max(filter_from_number, self._last_block + 1)
 
-            # Batch the filter queries in ranges of FILTER_MAX_BLOCK_RANGE
-            # to avoid timeout problems
-            while from_block_number <= target_block_number:
-                to_block = min(from_block_number + FILTER_MAX_BLOCK_RANGE, target_block_number)
-                result.extend(
-                    self._do_get_new_entries(from_block=from_block_number, to_block=to_block)
+            windows = [
+                (
+                    BlockNumber(from_block),
+                    BlockNumber(min(from_block + FILTER_MAX_BLOCK_RANGE - 1, target_block_number)),
+                )
+                for from_block in range(
+                    from_block_number, target_block_number + 1, FILTER_MAX_BLOCK_RANGE
                 )
-                from_block_number += FILTER_MAX_BLOCK_RANGE
+            ]
+            catching_up = len(windows) > 1
+
+            # imap returns the results in order
+            all_log_events = (pool.imap if pool is not None else map)(
+                self._do_get_new_entries, windows
+            )
+            for (_, to_block), log_events in zip(windows, all_log_events):
+                result.extend(log_events)
+                self._last_block = to_block
+
+                if catching_up:
+                    log.info(
+                        "Catching up with the blockchain events",
+                        address=self.filter_params.get("address"),
+                        block_number=to_block,
+                        target_block_number=target_block_number,
+                        num_events=len(result),
+                    )
 
             return result
 
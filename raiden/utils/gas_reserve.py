@@ -2,6 +2,13 @@ from typing import Tuple
 
 from raiden.constants import UNLOCK_TX_GAS_LIMIT
 from raiden.transfer import views
+from raiden.transfer.state import (
+    CHANNEL_STATE_CLOSED,
+    CHANNEL_STATE_CLOSING,
+    CHANNEL_STATE_OPENED,
+    CHANNEL_STATE_SETTLED,
+    CHANNEL_STATE_SETTLING,
+)
 from raiden_contracts.constants import (
     GAS_REQUIRED_FOR_CLOSE_CHANNEL,
     GAS_REQUIRED_FOR_OPEN_CHANNEL,
@@ -49,43 +56,27 @@ def _get_required_gas_estimate(
 
 def _get_required_gas_estimate_for_state(raiden) -> int:
     chain_state = views.state_from_raiden(raiden)
-    registry_address = raiden.default_registry.address
-    token_addresses = views.get_token_identifiers(chain_state, registry_address)
+    payment_network = chain_state.identifiers_to_paymentnetworks.get(
+        raiden.default_registry.address
+    )
+    if payment_network is None:
+        return 0
 
     gas_estimate = 0
 
-    for token_address in token_addresses:
-        token_network_address = views.get_token_network_address_by_token_address(
-            chain_state=chain_state,
-            payment_network_address=registry_address,
-            token_address=token_address,
-        )
+    for token_network_state in payment_network.tokennetworkaddresses_to_tokennetworks.values():
         num_opening_channels = len(
-            raiden.chain.token_network(token_network_address).open_channel_transactions
-        )
-        num_opened_channels = len(
-            views.get_channelstate_open(chain_state, registry_address, token_address)
-        )
-        num_closing_channels = len(
-            views.get_channelstate_closing(chain_state, registry_address, token_address)
-        )
-        num_closed_channels = len(
-            views.get_channelstate_closed(chain_state, registry_address, token_address)
-        )
-        num_settling_channels = len(
-            views.get_channelstate_settling(chain_state, registry_address, token_address)
-        )
-        num_settled_channels = len(
-            views.get_channelstate_settled(chain_state, registry_address, token_address)
+            raiden.chain.token_network(token_network_state.address).open_channel_transactions
         )
+        channel_status_counts = views.get_channel_status_counts(token_network_state)
 
         gas_estimate += _get_required_gas_estimate(
             opening_channels=num_opening_channels,
-            opened_channels=num_opened_channels,
-            closing_channels=num_closing_channels,
-            closed_channels=num_closed_channels,
-            settling_channels=num_settling_channels,
-            settled_channels=num_settled_channels,
+            opened_channels=channel_status_counts.get(CHANNEL_STATE_OPENED, 0),
+            closing_channels=channel_status_counts.get(CHANNEL_STATE_CLOSING, 0),
+            closed_channels=channel_status_counts.get(CHANNEL_STATE_CLOSED, 0),
+            settling_channels=channel_status_counts.get(CHANNEL_STATE_SETTLING, 0),
+            settled_channels=channel_status_counts.get(CHANNEL_STATE_SETTLED, 0),
         )
 
     return gas_estimate
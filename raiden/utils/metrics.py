@@ -0,0 +1,248 @@
+from bisect import bisect_left
+
+from raiden.utils.typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """ Cumulative histogram of observed values, modeled after Prometheus'.
+
+    Each bucket counts the observations smaller or equal to its upper bound,
+    the implicit `+Inf` bucket is the total number of observations.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labels: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if list(buckets) != sorted(buckets):
+            raise ValueError("Histogram buckets must be sorted")
+
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels or dict()
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+        self._bucket_counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self._bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_buckets(self) -> Dict[float, int]:
+        """ Returns the mapping `upper bound -> number of observations <= bound`. """
+        result = dict()
+        accumulated = 0
+        for bound, count in zip(self.buckets, self._bucket_counts):
+            accumulated += count
+            result[bound] = accumulated
+        result[float("inf")] = self.count
+        return result
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} count:{self.count} sum:{self.sum}>"
+
+
+class Gauge:
+    """ A value that can go up and down, modeled after Prometheus'.
+
+    If `function` is given the gauge reports its result, this is used to
+    expose the size of containers without updating the gauge on every change.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels or dict()
+        self._function = function
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} value:{self.value}>"
+
+
+class Counter:
+    """ A value that only goes up, modeled after Prometheus'. """
+
+    metric_type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels or dict()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} value:{self.value}>"
+
+
+Metric = Union[Histogram, Gauge, Counter]
+
+
+class MetricVector:
+    """ Metrics with the same name partitioned by the value of `label`, e.g.
+    the dispatch time by state change type.
+
+    The metric of a value is created on its first use, the remaining keyword
+    arguments are given to `metric_class`.
+    """
+
+    def __init__(
+        self, metric_class: type, name: str, documentation: str, label: str, **kwargs: Any
+    ) -> None:
+        self.metric_class = metric_class
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._kwargs = kwargs
+        self._metrics: Dict[str, Metric] = dict()
+
+    def labels(self, value: str) -> Any:
+        metric = self._metrics.get(value)
+        if metric is None:
+            metric = self.metric_class(
+                self.name, self.documentation, labels={self.label: value}, **self._kwargs
+            )
+            self._metrics[value] = metric
+        return metric
+
+    def __iter__(self) -> Iterator[Metric]:
+        return iter(list(self._metrics.values()))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} by:{self.label} size:{len(self._metrics)}>"
+
+
+class MetricsRegistry:
+    """ The metrics of the components of a node.
+
+    The metrics are owned and updated by the components, the registry only
+    knows where to find them. Collectors are called on every collection, they
+    are used for the metrics of components which are created later or
+    replaced, e.g. the write-ahead log.
+    """
+
+    def __init__(self) -> None:
+        self._collectors: List[Callable[[], Iterable[Union[Metric, MetricVector]]]] = list()
+
+    def register(self, *metrics: Union[Metric, MetricVector]) -> None:
+        self._collectors.append(lambda: metrics)
+
+    def register_collector(
+        self, collector: Callable[[], Iterable[Union[Metric, MetricVector]]]
+    ) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Metric]:
+        result: List[Metric] = list()
+        for collector in self._collectors:
+            for metric in collector():
+                if isinstance(metric, MetricVector):
+                    result.extend(metric)
+                else:
+                    result.append(metric)
+        return result
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    pairs = ",".join(f'{name}="{escape(str(value))}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_metrics(metrics: Iterable[Metric]) -> str:
+    """ Render `metrics` in the Prometheus text exposition format.
+
+    Metrics with the same name are grouped under a single HELP and TYPE, the
+    documentation of the first one is used.
+    """
+    by_name: Dict[str, List[Metric]] = dict()
+    for metric in metrics:
+        by_name.setdefault(metric.name, list()).append(metric)
+
+    lines: List[str] = list()
+    for name, same_name in by_name.items():
+        first = same_name[0]
+        lines.append(f"# HELP {name} {first.documentation}")
+        lines.append(f"# TYPE {name} {first.metric_type}")
+
+        for metric in same_name:
+            if isinstance(metric, Histogram):
+                for bound, count in metric.cumulative_buckets().items():
+                    labels = _format_labels(dict(metric.labels, le=_format_value(bound)))
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _format_labels(metric.labels)
+                lines.append(f"{name}_sum{labels} {_format_value(metric.sum)}")
+                lines.append(f"{name}_count{labels} {metric.count}")
+            else:
+                labels = _format_labels(metric.labels)
+                lines.append(f"{name}{labels} {_format_value(metric.value)}")
+
+    return "\n".join(lines) + "\n"
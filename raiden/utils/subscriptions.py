@@ -0,0 +1,189 @@
+""" Per key notifications of the changes to the node's state.
+
+The greenlets waiting for a condition on the node's state subscribe to the
+part of the state the condition depends on, e.g. a channel or a payment, and
+are only woken up by the state changes which affect it, instead of by every
+state change dispatched by the node.
+
+The keys of a batch of state changes are derived from the state changes and
+from the events they produced. The derivation is conservative: a state
+change which is not recognized doesn't notify anybody, waiters must keep
+re-checking their condition after a timeout.
+"""
+import heapq
+from itertools import chain
+
+from gevent.event import Event
+
+from raiden.transfer.architecture import Event as RaidenEvent, StateChange
+from raiden.transfer.events import (
+    EventPaymentReceivedSuccess,
+    EventPaymentSentFailed,
+    EventPaymentSentSuccess,
+)
+from raiden.transfer.identifiers import CanonicalIdentifier
+from raiden.transfer.mediated_transfer.events import (
+    SendBalanceProof,
+    SendLockedTransfer,
+    SendLockExpired,
+    SendRefundTransfer,
+)
+from raiden.transfer.state_change import (
+    ActionChangeNodeNetworkState,
+    BalanceProofStateChange,
+    Block,
+    ContractReceiveChannelNew,
+    ContractReceiveNewTokenNetwork,
+)
+from raiden.utils.typing import (
+    Address,
+    Any,
+    BlockNumber,
+    ChannelID,
+    Dict,
+    List,
+    Optional,
+    PaymentID,
+    PaymentNetworkAddress,
+    Set,
+    TokenNetworkAddress,
+    Tuple,
+)
+
+SubscriptionKey = Tuple[Any, ...]
+
+BLOCK_KEY = "block"
+
+
+def block_key(block_number: BlockNumber) -> SubscriptionKey:
+    """ Notified once the node has seen the block `block_number`, or a later one. """
+    return (BLOCK_KEY, block_number)
+
+
+def channel_key(
+    token_network_address: TokenNetworkAddress, channel_identifier: ChannelID
+) -> SubscriptionKey:
+    """ Notified on the changes of the channel. """
+    return ("channel", token_network_address, channel_identifier)
+
+
+def token_network_key(token_network_address: TokenNetworkAddress) -> SubscriptionKey:
+    """ Notified on the changes of any channel of the token network, including
+    new channels.
+    """
+    return ("token_network", token_network_address)
+
+
+def payment_network_key(payment_network_address: PaymentNetworkAddress) -> SubscriptionKey:
+    """ Notified when a token network is added to the payment network. """
+    return ("payment_network", payment_network_address)
+
+
+def node_key(node_address: Address) -> SubscriptionKey:
+    """ Notified when the network state of the node changes. """
+    return ("node", node_address)
+
+
+def payment_key(payment_identifier: PaymentID) -> SubscriptionKey:
+    """ Notified when a payment with the identifier succeeds or fails. """
+    return ("payment", payment_identifier)
+
+
+def _get_canonical_identifier(item: Any) -> Optional[CanonicalIdentifier]:
+    # pylint: disable=too-many-return-statements
+    if isinstance(item, ContractReceiveChannelNew):
+        return item.channel_state.canonical_identifier
+    if isinstance(item, BalanceProofStateChange):
+        return item.balance_proof.canonical_identifier
+    if isinstance(item, (SendLockedTransfer, SendRefundTransfer)):
+        return item.transfer.balance_proof.canonical_identifier
+    if isinstance(item, (SendBalanceProof, SendLockExpired)):
+        return item.balance_proof.canonical_identifier
+
+    # The channel actions, the channel related blockchain state changes and
+    # the channel related blockchain transactions
+    canonical_identifier = getattr(item, "canonical_identifier", None)
+    if isinstance(canonical_identifier, CanonicalIdentifier):
+        return canonical_identifier
+
+    return None
+
+
+def get_subscription_keys(
+    state_changes: List[StateChange], events: List[RaidenEvent]
+) -> Set[SubscriptionKey]:
+    """ Returns the keys notified by the state changes of a batch and the
+    events they produced, except for the block keys.
+    """
+    keys: Set[SubscriptionKey] = set()
+
+    for item in chain(state_changes, events):
+        canonical_identifier = _get_canonical_identifier(item)
+        if canonical_identifier is not None:
+            keys.add(
+                channel_key(
+                    canonical_identifier.token_network_address,
+                    canonical_identifier.channel_identifier,
+                )
+            )
+            keys.add(token_network_key(canonical_identifier.token_network_address))
+
+        if isinstance(item, ContractReceiveNewTokenNetwork):
+            keys.add(payment_network_key(item.payment_network_address))
+        elif isinstance(item, ActionChangeNodeNetworkState):
+            keys.add(node_key(item.node_address))
+        elif isinstance(
+            item, (EventPaymentSentSuccess, EventPaymentSentFailed, EventPaymentReceivedSuccess)
+        ):
+            keys.add(payment_key(item.identifier))
+
+    return keys
+
+
+class StateChangeSubscriptions:
+    """ The subscriptions of the greenlets waiting for the node's state. """
+
+    def __init__(self) -> None:
+        self._events: Dict[SubscriptionKey, Event] = dict()
+        # heap of the block numbers with a subscription
+        self._block_numbers: List[BlockNumber] = list()
+
+    def subscribe(self, key: SubscriptionKey) -> Event:
+        """ Returns the event set by the next state change notifying `key`.
+
+        gevent is cooperative, so a caller that checks a condition on the
+        state and then subscribes without yielding in between can not miss a
+        state change.
+        """
+        event = self._events.get(key)
+
+        if event is None:
+            event = Event()
+            self._events[key] = event
+
+            if key[0] == BLOCK_KEY:
+                heapq.heappush(self._block_numbers, key[1])
+
+        return event
+
+    def notify(self, state_changes: List[StateChange], events: List[RaidenEvent]) -> None:
+        """ Wake up the subscribers of the keys affected by the batch. """
+        for key in get_subscription_keys(state_changes, events):
+            self._set(key)
+
+        block_number = max(
+            (
+                state_change.block_number
+                for state_change in state_changes
+                if isinstance(state_change, Block)
+            ),
+            default=None,
+        )
+        if block_number is not None:
+            while self._block_numbers and self._block_numbers[0] <= block_number:
+                self._set(block_key(heapq.heappop(self._block_numbers)))
+
+    def _set(self, key: SubscriptionKey) -> None:
+        event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
@@ -1,6 +1,5 @@
 from typing import TYPE_CHECKING, List, cast
 
-import gevent
 import structlog
 
 from raiden.transfer import channel, views
@@ -11,6 +10,14 @@ from raiden.transfer.state import (
     CHANNEL_STATE_SETTLED,
     NODE_NETWORK_REACHABLE,
 )
+from raiden.utils.subscriptions import (
+    block_key,
+    channel_key,
+    node_key,
+    payment_key,
+    payment_network_key,
+    token_network_key,
+)
 from raiden.utils.typing import (
     Address,
     BlockNumber,
@@ -31,6 +38,10 @@ log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 ALARM_TASK_ERROR_MSG = "Waiting relies on alarm task polling to update the node's internal state."
 TRANSPORT_ERROR_MSG = "Waiting for protocol messags requires a running transport."
 
+# The functions below wait for a condition on the node's state. The condition
+# is re-checked as soon as a state change affecting it is dispatched,
+# `retry_timeout` is only an upper bound for the time between checks.
+
 
 def wait_for_block(
     raiden: "RaidenService", block_number: BlockNumber, retry_timeout: float
@@ -39,7 +50,7 @@ def wait_for_block(
         assert raiden, ALARM_TASK_ERROR_MSG
         assert raiden.alarm, ALARM_TASK_ERROR_MSG
 
-        gevent.sleep(retry_timeout)
+        raiden.wait_for_state_change(retry_timeout, block_key(block_number))
 
 
 def wait_for_newchannel(
@@ -54,15 +65,21 @@ def wait_for_newchannel(
     Note:
         This does not time out, use gevent.Timeout.
     """
+    chain_state = views.state_from_raiden(raiden)
     channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden), payment_network_address, token_address, partner_address
+        chain_state, payment_network_address, token_address, partner_address
+    )
+    token_network_address = views.get_token_network_address_by_token_address(
+        chain_state, payment_network_address, token_address
     )
+    # Until the token network is known, wait for any state change
+    key = token_network_key(token_network_address) if token_network_address else None
 
     while channel_state is None:
         assert raiden, ALARM_TASK_ERROR_MSG
         assert raiden.alarm, ALARM_TASK_ERROR_MSG
 
-        gevent.sleep(retry_timeout)
+        raiden.wait_for_state_change(retry_timeout, key)
         channel_state = views.get_channelstate_for(
             views.state_from_raiden(raiden),
             payment_network_address,
@@ -96,11 +113,18 @@ def wait_for_participant_newbalance(
         views.state_from_raiden(raiden), payment_network_address, token_address, partner_address
     )
 
+    key = channel_key(
+        channel_state.canonical_identifier.token_network_address, channel_state.identifier
+    )
+
     while balance(channel_state) < target_balance:
         assert raiden, ALARM_TASK_ERROR_MSG
         assert raiden.alarm, ALARM_TASK_ERROR_MSG
 
-        gevent.sleep(retry_timeout)
+        # A Block applies the confirmed deposits without notifying the channel
+        raiden.wait_for_state_change(
+            retry_timeout, key, block_number=channel.get_block_deadline(channel_state)
+        )
         channel_state = views.get_channelstate_for(
             views.state_from_raiden(raiden),
             payment_network_address,
@@ -141,12 +165,19 @@ def wait_for_payment_balance(
         views.state_from_raiden(raiden), payment_network_address, token_address, partner_address
     )
 
+    key = channel_key(
+        channel_state.canonical_identifier.token_network_address, channel_state.identifier
+    )
+
     while balance(channel_state) < target_balance:
         assert raiden, ALARM_TASK_ERROR_MSG
         assert raiden.alarm, ALARM_TASK_ERROR_MSG
 
         log.critical("wait", b=balance(channel_state), t=target_balance)
-        gevent.sleep(retry_timeout)
+        # A Block changes the channel without notifying it
+        raiden.wait_for_state_change(
+            retry_timeout, key, block_number=channel.get_block_deadline(channel_state)
+        )
         channel_state = views.get_channelstate_for(
             views.state_from_raiden(raiden),
             payment_network_address,
@@ -214,7 +245,9 @@ def wait_for_channel_in_states(
         if channel_is_settled:
             list_cannonical_ids.pop()
         else:
-            gevent.sleep(retry_timeout)
+            raiden.wait_for_state_change(
+                retry_timeout, channel_key(token_network_address, canonical_id.channel_identifier)
+            )
 
 
 def wait_for_close(
@@ -252,7 +285,7 @@ def wait_for_payment_network(
         assert raiden, ALARM_TASK_ERROR_MSG
         assert raiden.alarm, ALARM_TASK_ERROR_MSG
 
-        gevent.sleep(retry_timeout)
+        raiden.wait_for_state_change(retry_timeout, payment_network_key(payment_network_address))
         token_network = views.get_token_network_by_token_address(
             views.state_from_raiden(raiden), payment_network_address, token_address
         )
@@ -320,7 +353,7 @@ def wait_for_network_state(
         assert raiden, TRANSPORT_ERROR_MSG
         assert raiden.transport, TRANSPORT_ERROR_MSG
 
-        gevent.sleep(retry_timeout)
+        raiden.wait_for_state_change(retry_timeout, node_key(node_address))
         network_statuses = views.get_networkstatuses(views.state_from_raiden(raiden))
 
 
@@ -347,12 +380,16 @@ def wait_for_transfer_success(
         This does not time out, use gevent.Timeout.
     """
     found = False
+    events_seen = 0
     while not found:
         assert raiden, TRANSPORT_ERROR_MSG
         assert raiden.wal, TRANSPORT_ERROR_MSG
         assert raiden.transport, TRANSPORT_ERROR_MSG
 
-        state_events = raiden.wal.storage.get_events()
+        # Only the events stored since the last iteration are inspected,
+        # otherwise every state change would re-read the whole event log.
+        state_events = raiden.wal.storage.get_events(offset=events_seen)
+        events_seen += len(state_events)
         for event in state_events:
             found = (
                 isinstance(event, EventPaymentReceivedSuccess)
@@ -362,4 +399,5 @@ def wait_for_transfer_success(
             if found:
                 break
 
-        gevent.sleep(retry_timeout)
+        if not found:
+            raiden.wait_for_state_change(retry_timeout, payment_key(payment_identifier))
@@ -1,11 +1,10 @@
 import json
 import logging
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from eth_utils import to_bytes, to_hex
 
-from raiden.utils import sha3
-
 # The code below simulates XUD resolver functionality.
 # It should only be used for testing and should not be used in
 # run time or production.
@@ -16,9 +15,9 @@ def resolve(request):
     preimage = None
 
     x_secret = "0x2ff886d47b156de00d4cad5d8c332706692b5b572adfe35e6d2f65e92906806e"
-    x_secret_hash = to_hex(sha3(to_bytes(hexstr=x_secret)))
+    x_secret_hash = to_hex(sha256(to_bytes(hexstr=x_secret)).digest())
 
-    if request["secret_hash"] == x_secret_hash:
+    if request["secrethash"] == x_secret_hash:
         preimage = {"secret": x_secret}
 
     return preimage
@@ -26,6 +25,9 @@ def resolve(request):
 
 def serve():
     class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
+        # Keep the connections alive, like a production resolver would
+        protocol_version = "HTTP/1.1"
+
         def do_POST(self):
             try:
                 content_len = int(self.headers.get("Content-Length"))
@@ -34,17 +36,23 @@ def serve():
                 preimage = resolve(json.loads(body.decode("utf8")))
                 if preimage is None:
                     self.send_response(404)
+                    self.send_header("Content-Length", "0")
                     self.end_headers()
                 else:
                     response = to_bytes(text=json.dumps(preimage))
                     self.send_response(200)
+                    self.send_header("Content-Length", str(len(response)))
                     self.end_headers()
                     self.wfile.write(response)
             except BaseException:
                 self.send_response(400)
+                self.send_header("Content-Length", "0")
                 self.end_headers()
 
-    httpd = HTTPServer(("localhost", 8000), SimpleHTTPRequestHandler)
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    httpd = ThreadingHTTPServer(("localhost", 8000), SimpleHTTPRequestHandler)
     httpd.serve_forever()
 
 